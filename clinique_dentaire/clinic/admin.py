@@ -1,19 +1,125 @@
 # ==========================================
 # 8. ADMIN.PY
 # ==========================================
+from urllib.parse import urlencode
+
+from django import forms
 from django.contrib import admin
-from .models import Service, Dentiste, Horaire, RendezVous, Contact
+from django.contrib.admin import helpers, widgets
+from django.contrib.admin.utils import unquote
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .agenda import url_agenda
+from .antispam import liberer
+from .journal import historique
+from .models import (
+    Clinique, Service, Dentiste, Horaire, Fermeture, Patient, RendezVous, RendezVousArchive, Contact,
+    ListeAttente, JournalModification, Quarantaine, CapaciteAtteinte,
+)
+from .search import FTS_TABLES, FullTextSearchMixin
+from .statistiques import periode, rapport
+from .telephones import normalize_phone
+from .transitions import changer_statut
+
+class ConfirmationForm(forms.Form):
+    """Date de rendez-vous affectée par l'action « Confirmer »"""
+    date_confirmee = forms.SplitDateTimeField(
+        required=False,
+        widget=widgets.AdminSplitDateTime,
+        label="Date et heure confirmées",
+        help_text="Laisser vide pour garder la date déjà saisie sur chaque rendez-vous.",
+    )
+
+class CliniqueAdminMixin:
+    """
+    Données du site de la requête uniquement (request.clinique, voir sites.py) :
+    listes, formulaires et choix des services. Le site d'un nouvel objet est
+    celui de la requête.
+    """
+    # Fermeture : les lignes sans site (communes à tous) restent visibles
+    communes_visibles = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        clinique = getattr(request, 'clinique', None)
+        if clinique is None:
+            return queryset
+        if self.communes_visibles:
+            return queryset.filter(Q(clinique=clinique) | Q(clinique__isnull=True))
+        return queryset.filter(clinique=clinique)
+
+    def get_exclude(self, request, obj=None):
+        exclude = list(super().get_exclude(request, obj) or [])
+        if not self.communes_visibles:
+            exclude.append('clinique')
+        return exclude
+
+    def save_model(self, request, obj, form, change):
+        if not change and not self.communes_visibles and getattr(request, 'clinique', None) is not None:
+            obj.clinique = request.clinique
+        super().save_model(request, obj, form, change)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        clinique = getattr(request, 'clinique', None)
+        if db_field.name == 'service' and clinique is not None:
+            kwargs['queryset'] = Service.objects.filter(clinique=clinique)
+        if db_field.name == 'dentiste' and clinique is not None:
+            kwargs['queryset'] = Dentiste.objects.filter(clinique=clinique)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+class JournalAdminMixin:
+    """Page « Historique » d'un objet : ses lignes du journal des modifications (voir journal.py)"""
+    # Modèle journalisé, si ce n'est pas celui de l'admin (archives des rendez-vous)
+    modele_journal = None
+
+    def history_view(self, request, object_id, extra_context=None):
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            return self._get_obj_does_not_exist_redirect(request, self.opts, object_id)
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+        contexte = {
+            **self.admin_site.each_context(request),
+            'title': f'Historique : {obj}',
+            'opts': self.opts,
+            'object': obj,
+            'lignes': historique(self.modele_journal or self.model, obj.pk),
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, 'admin/clinic/historique.html', contexte)
+
+class AgendaAdminMixin:
+    """Lien d'abonnement à l'agenda .ics de l'objet (voir agenda.py)"""
+    readonly_fields = ['agenda']
+
+    @admin.display(description="Agenda (abonnement .ics)")
+    def agenda(self, obj):
+        if obj is None or obj.pk is None:
+            return '-'
+        url = url_agenda(obj)
+        return format_html('<a href="{}">{}</a>', url, url)
+
+@admin.register(Clinique)
+class CliniqueAdmin(admin.ModelAdmin):
+    list_display = ['nom', 'slug', 'domaine', 'telephone', 'actif']
+    list_filter = ['actif']
+    search_fields = ['nom', 'slug', 'domaine']
+    prepopulated_fields = {'slug': ['nom']}
+    ordering = ['id']
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
-    list_display = ['nom', 'prix_min', 'prix_max', 'duree_minutes', 'actif', 'ordre']
+class ServiceAdmin(AgendaAdminMixin, CliniqueAdminMixin, admin.ModelAdmin):
+    list_display = ['nom', 'prix_min', 'prix_max', 'duree_minutes', 'capacite_journaliere', 'actif', 'ordre']
     list_filter = ['actif', 'created_at']
     search_fields = ['nom', 'description']
     ordering = ['ordre', 'nom']
     list_editable = ['ordre', 'actif']
 
 @admin.register(Dentiste)
-class DentisteAdmin(admin.ModelAdmin):
+class DentisteAdmin(AgendaAdminMixin, CliniqueAdminMixin, admin.ModelAdmin):
     list_display = ['nom_complet', 'specialite', 'actif', 'ordre']
     list_filter = ['actif', 'created_at']
     search_fields = ['nom', 'prenom', 'specialite']
@@ -21,28 +127,86 @@ class DentisteAdmin(admin.ModelAdmin):
     list_editable = ['ordre', 'actif']
 
 @admin.register(Horaire)
-class HoraireAdmin(admin.ModelAdmin):
+class HoraireAdmin(CliniqueAdminMixin, admin.ModelAdmin):
     list_display = ['jour', 'ouverture_matin', 'fermeture_matin', 'ouverture_apres_midi', 'fermeture_apres_midi', 'ferme']
     ordering = ['id']
 
+@admin.register(Fermeture)
+class FermetureAdmin(CliniqueAdminMixin, admin.ModelAdmin):
+    list_display = ['motif', 'date_debut', 'date_fin', 'annuelle', 'clinique']
+    list_filter = ['annuelle', 'clinique']
+    communes_visibles = True
+    search_fields = ['motif']
+    ordering = ['date_debut']
+
+class RendezVousInline(CliniqueAdminMixin, admin.TabularInline):
+    """Historique des rendez-vous d'un patient sur le site de la requête (lecture seule)"""
+    model = RendezVous
+    fields = ['date_souhaitee', 'service', 'statut', 'created_at']
+    readonly_fields = fields
+    ordering = ['-date_souhaitee']
+    extra = 0
+    show_change_link = True
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+class ContactInline(CliniqueAdminMixin, admin.TabularInline):
+    """Messages envoyés par un patient au site de la requête (lecture seule)"""
+    model = Contact
+    fields = ['sujet', 'lu', 'created_at']
+    readonly_fields = fields
+    ordering = ['-created_at']
+    extra = 0
+    show_change_link = True
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+@admin.register(Patient)
+class PatientAdmin(admin.ModelAdmin):
+    # Patient commun à tous les sites (un numéro de téléphone) ; ses rendez-vous
+    # et messages affichés sont ceux du site de la requête (inlines)
+    list_display = ['nom_complet', 'telephone', 'email', 'created_at']
+    search_fields = ['nom', 'prenom', 'email']
+    ordering = ['nom', 'prenom']
+    readonly_fields = ['created_at', 'updated_at']
+    inlines = [RendezVousInline, ContactInline]
+
+    def get_search_results(self, request, queryset, search_term):
+        """Un numéro de téléphone est cherché tel quel sur l'index unique, sans icontains"""
+        numero = normalize_phone(search_term.strip())
+        if numero is not None:
+            return queryset.filter(telephone=numero), False
+        return super().get_search_results(request, queryset, search_term)
+
 @admin.register(RendezVous)
-class RendezVousAdmin(admin.ModelAdmin):
+class RendezVousAdmin(JournalAdminMixin, CliniqueAdminMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['nom_complet', 'service', 'date_souhaitee', 'telephone', 'statut', 'created_at']
-    list_filter = ['statut', 'service', 'date_souhaitee', 'created_at']
+    list_filter = [
+        'statut', ('service', admin.RelatedOnlyFieldListFilter), ('dentiste', admin.RelatedOnlyFieldListFilter),
+        'date_souhaitee', 'created_at',
+    ]
     search_fields = ['nom', 'prenom', 'telephone', 'email']
+    fts_table = FTS_TABLES['clinic_rendezvous']
     ordering = ['-created_at']
     list_editable = ['statut']
-    readonly_fields = ['created_at', 'updated_at']
+    list_select_related = ['service']
+    readonly_fields = ['patient', 'rappel_envoye_le', 'created_at', 'updated_at']
+    # Changements de statut groupés : une requête UPDATE pour toute la sélection
+    actions = ['confirmer', 'annuler', 'terminer']
     
     fieldsets = (
         ('Informations Patient', {
-            'fields': ('nom', 'prenom', 'telephone', 'email')
+            'fields': ('patient', 'nom', 'prenom', 'telephone', 'email')
         }),
         ('Détails du Rendez-vous', {
             'fields': ('service', 'date_souhaitee', 'message')
         }),
         ('Gestion', {
-            'fields': ('statut', 'notes_admin', 'date_confirmation')
+            'fields': ('statut', 'date_confirmee', 'dentiste', 'rappel_envoye_le')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -50,11 +214,182 @@ class RendezVousAdmin(admin.ModelAdmin):
         }),
     )
 
+    def changelist_view(self, request, extra_context=None):
+        """Signale les correspondances dans les archives lors d'une recherche"""
+        terme = request.GET.get('q', '').strip()
+        if terme:
+            archive_admin = self.admin_site._registry[RendezVousArchive]
+            resultats, _ = archive_admin.get_search_results(request, archive_admin.get_queryset(request), terme)
+            nombre = resultats.count()
+            if nombre:
+                url = reverse('admin:clinic_rendezvousarchive_changelist') + '?' + urlencode({'q': terme})
+                self.message_user(request, format_html(
+                    '{} rendez-vous archivé(s) correspondent aussi à « {} » : <a href="{}">voir les archives</a>',
+                    nombre, terme, url,
+                ))
+        return super().changelist_view(request, extra_context)
+
+    def _changer_statut(self, request, queryset, statut, date_confirmee=None):
+        modifies, ignores = changer_statut(queryset, statut, date_confirmee)
+        libelle = dict(RendezVous.STATUS_CHOICES)[statut].lower()
+        self.message_user(request, f'{len(modifies)} rendez-vous {libelle}(s).')
+        if ignores:
+            self.message_user(
+                request,
+                f'{ignores} rendez-vous ignoré(s) : leur statut actuel ne permet pas ce changement.',
+                level='warning',
+            )
+
+    @admin.action(description="Confirmer les rendez-vous sélectionnés", permissions=['change'])
+    def confirmer(self, request, queryset):
+        """Page intermédiaire pour saisir la date confirmée, puis confirmation groupée"""
+        if 'appliquer' in request.POST:
+            form = ConfirmationForm(request.POST)
+            if form.is_valid():
+                self._changer_statut(request, queryset, 'confirmed', form.cleaned_data['date_confirmee'])
+                return None
+        else:
+            form = ConfirmationForm()
+        contexte = {
+            **self.admin_site.each_context(request),
+            'title': 'Confirmer des rendez-vous',
+            'opts': self.model._meta,
+            'form': form,
+            'media': self.media + form.media,
+            'selection': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/clinic/rendezvous/confirmer.html', contexte)
+
+    @admin.action(description="Annuler les rendez-vous sélectionnés", permissions=['change'])
+    def annuler(self, request, queryset):
+        self._changer_statut(request, queryset, 'cancelled')
+
+    @admin.action(description="Marquer les rendez-vous sélectionnés comme terminés", permissions=['change'])
+    def terminer(self, request, queryset):
+        self._changer_statut(request, queryset, 'completed')
+
+    def get_urls(self):
+        vue = self.admin_site.admin_view(self.statistiques_view)
+        return [
+            path('statistiques/', vue, name='clinic_rendezvous_statistiques'),
+        ] + super().get_urls()
+
+    def statistiques_view(self, request):
+        """Tableau de bord des réservations, lu dans la table de synthèse"""
+        try:
+            debut, fin = periode(request.GET)
+        except ValueError as e:
+            self.message_user(request, f'Période invalide: {e}', level='error')
+            debut, fin = periode({})
+        contexte = {
+            **self.admin_site.each_context(request),
+            'title': 'Statistiques des rendez-vous',
+            'opts': self.model._meta,
+            'rapport': rapport(debut, fin, clinique=getattr(request, 'clinique', None)),
+            'debut': debut,
+            'fin': fin,
+        }
+        return TemplateResponse(request, 'admin/clinic/statistiques.html', contexte)
+
+@admin.register(RendezVousArchive)
+class RendezVousArchiveAdmin(JournalAdminMixin, CliniqueAdminMixin, admin.ModelAdmin):
+    """Consultation seule des rendez-vous archivés"""
+    # Historique conservé sous l'identifiant du rendez-vous d'origine
+    modele_journal = RendezVous
+    list_display = ['nom_complet', 'service', 'date_souhaitee', 'telephone', 'statut', 'created_at', 'archived_at']
+    list_filter = ['statut', ('service', admin.RelatedOnlyFieldListFilter)]
+    search_fields = ['nom', 'prenom', 'telephone', 'email']
+    ordering = ['-created_at']
+    list_select_related = ['service']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 @admin.register(Contact)
-class ContactAdmin(admin.ModelAdmin):
+class ContactAdmin(JournalAdminMixin, CliniqueAdminMixin, FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['nom_complet', 'email', 'sujet', 'lu', 'created_at']
     list_filter = ['lu', 'created_at']
     search_fields = ['nom', 'prenom', 'email', 'sujet']
+    fts_table = FTS_TABLES['clinic_contact']
     ordering = ['-created_at']
     list_editable = ['lu']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['patient', 'created_at', 'updated_at']
+
+@admin.register(ListeAttente)
+class ListeAttenteAdmin(CliniqueAdminMixin, admin.ModelAdmin):
+    list_display = ['nom_complet', 'service', 'date_souhaitee', 'telephone', 'statut', 'rendez_vous', 'created_at']
+    list_filter = ['statut', ('service', admin.RelatedOnlyFieldListFilter), 'date_souhaitee']
+    search_fields = ['nom', 'prenom', 'telephone', 'email']
+    ordering = ['date_souhaitee', 'created_at']
+    list_select_related = ['service', 'rendez_vous__service']
+    readonly_fields = ['patient', 'rendez_vous', 'created_at', 'updated_at']
+
+@admin.register(JournalModification)
+class JournalModificationAdmin(CliniqueAdminMixin, admin.ModelAdmin):
+    """Consultation seule du journal (ajout seul, voir journal.py)"""
+    list_display = ['created_at', 'modele', 'objet_id', 'action', 'auteur', 'origine']
+    list_filter = ['modele', 'action', 'created_at']
+    search_fields = ['=objet_id', 'auteur']
+    ordering = ['-created_at']
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(Quarantaine)
+class QuarantaineAdmin(CliniqueAdminMixin, admin.ModelAdmin):
+    """Envois écartés par le filtre anti-spam (voir antispam.py) : vérification et verdict"""
+    list_display = ['created_at', 'type_envoi', 'expediteur', 'apercu', 'score', 'motifs', 'verdict']
+    list_filter = ['type_envoi', 'verdict', 'created_at']
+    ordering = ['-created_at']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['type_envoi', 'donnees', 'score', 'motifs', 'verdict', 'created_at']
+    actions = ['confirmer_spam', 'liberer_envois']
+
+    @admin.display(description="Expéditeur")
+    def expediteur(self, obj):
+        return f"{obj.donnees.get('prenom', '')} {obj.donnees.get('nom', '')} <{obj.donnees.get('email', '')}>"
+
+    @admin.display(description="Message")
+    def apercu(self, obj):
+        texte = obj.donnees.get('sujet') or obj.donnees.get('message') or ''
+        return texte[:80]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Confirmer comme spam (entraînement du filtre)", permissions=['change'])
+    def confirmer_spam(self, request, queryset):
+        nombre = queryset.update(verdict='spam')
+        self.message_user(request, f'{nombre} envoi(s) confirmé(s) comme spam.')
+
+    @admin.action(description="Libérer : enregistrer le message ou le rendez-vous", permissions=['change'])
+    def liberer_envois(self, request, queryset):
+        liberes, refuses = 0, 0
+        for entree in queryset.exclude(verdict='legitime'):
+            try:
+                liberer(entree)
+                liberes += 1
+            except (CapaciteAtteinte, Service.DoesNotExist):
+                refuses += 1
+        self.message_user(request, f'{liberes} envoi(s) libéré(s).')
+        if refuses:
+            self.message_user(
+                request,
+                f'{refuses} rendez-vous non libéré(s) : service introuvable ou plus de place ce jour-là.',
+                level='warning',
+            )
@@ -0,0 +1,245 @@
+# ==========================================
+# AGENDA.PY - Agendas iCalendar (.ics) des dentistes et des services
+# ==========================================
+"""
+Chaque dentiste et chaque service a un agenda .ics de ses rendez-vous
+confirmés (date_confirmee, durée du service), auquel les téléphones
+s'abonnent par une URL contenant un jeton (url_agenda, affichée dans l'admin).
+
+Les clients interrogent l'agenda toutes les 15 minutes environ. Le flux
+généré est gardé dans le cache partagé avec ses événements, un par
+rendez-vous, et ses variantes compressées ; chaque appel ne relit que les
+rendez-vous modifiés depuis la vérification précédente (index updated_at),
+triés en Python entre ceux de l'agenda et les autres :
+
+    aucun changement : une requête qui ne renvoie rien, réponse en cache
+                       (304 si le client l'a déjà : If-Modified-Since, If-None-Match)
+    changements      : seuls les événements concernés sont refaits
+
+L'agenda est reconstruit entièrement après AGENDA_RECONSTRUCTION_SECONDES
+(rendez-vous supprimés, fenêtre des AGENDA_JOURS_PASSES jours passés) ou
+après une modification du catalogue (nom, durée d'un service...).
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .compression import compress_variants
+from .models import Dentiste, RendezVous, Service
+from .sites import site_de
+
+PREFIXE = 'agenda:'
+CLE_VERSION = f'{PREFIXE}version'
+CONTENT_TYPE = 'text/calendar; charset=utf-8'
+# Rendez-vous présents dans un agenda
+STATUTS = ('confirmed', 'completed')
+# Recouvrement des vérifications successives : une écriture validée après la
+# vérification peut porter un updated_at antérieur (horodaté avant le COMMIT)
+MARGE = timedelta(seconds=60)
+
+# Type d'agenda -> (modèle, champ de RendezVous)
+AGENDAS = {
+    'dentiste': (Dentiste, 'dentiste'),
+    'service': (Service, 'service'),
+}
+
+
+def jeton(type_agenda, pk):
+    """Jeton d'abonnement d'un agenda (dérivé de SECRET_KEY, sans stockage)"""
+    return salted_hmac('clinic.agenda', f'{type_agenda}:{pk}').hexdigest()[:32]
+
+
+def url_agenda(objet):
+    type_agenda = objet._meta.model_name
+    url = reverse('agenda', kwargs={'type_agenda': type_agenda, 'pk': objet.pk})
+    return f'{url}?jeton={jeton(type_agenda, objet.pk)}'
+
+
+def invalider_agendas():
+    """Reconstruction complète de tous les agendas au prochain appel (catalogue modifié)"""
+    cache.set(CLE_VERSION, timezone.now().timestamp(), None)
+
+
+# ==========================================
+# FORMAT ICALENDAR (RFC 5545)
+# ==========================================
+
+def echapper(texte):
+    return (
+        str(texte).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def plier(ligne):
+    """Lignes de 75 octets au plus, suites indentées d'une espace"""
+    octets = ligne.encode()
+    if len(octets) <= 75:
+        return ligne
+    morceaux, debut = [], 0
+    while debut < len(octets):
+        fin = min(debut + (75 if not morceaux else 74), len(octets))
+        # Pas de coupure au milieu d'un caractère UTF-8
+        while fin < len(octets) and (octets[fin] & 0xC0) == 0x80:
+            fin -= 1
+        morceaux.append(octets[debut:fin].decode())
+        debut = fin
+    return '\r\n '.join(morceaux)
+
+
+def _horodatage(moment):
+    return moment.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def evenement(rdv):
+    """Bloc VEVENT d'un rendez-vous"""
+    site = site_de(rdv)
+    debut = rdv.date_confirmee
+    description = [f"Patient : {rdv.nom_complet}", f"Téléphone : {rdv.telephone}"]
+    if rdv.message:
+        description.append(rdv.message)
+    lignes = [
+        'BEGIN:VEVENT',
+        f'UID:rdv-{rdv.pk}@{site.domaine or site.slug}',
+        f'DTSTAMP:{_horodatage(rdv.updated_at)}',
+        f'LAST-MODIFIED:{_horodatage(rdv.updated_at)}',
+        f'DTSTART:{_horodatage(debut)}',
+        f'DTEND:{_horodatage(debut + timedelta(minutes=rdv.service.duree_minutes))}',
+        f'SUMMARY:{echapper(f"{rdv.service.nom} - {rdv.nom_complet}")}',
+        f'DESCRIPTION:{echapper(chr(10).join(description))}',
+        f'LOCATION:{echapper(f"{site.nom}, {site.adresse}" if site.adresse else site.nom)}',
+        'STATUS:CONFIRMED',
+        'END:VEVENT',
+    ]
+    return '\r\n'.join(plier(ligne) for ligne in lignes)
+
+
+def _calendrier(nom, evenements):
+    entete = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:-//{echapper(nom)}//Agenda//FR',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        plier(f'X-WR-CALNAME:{echapper(nom)}'),
+        'REFRESH-INTERVAL;VALUE=DURATION:PT15M',
+        'X-PUBLISHED-TTL:PT15M',
+    ]
+    blocs = [bloc for _, bloc in sorted(evenements.values())]
+    return '\r\n'.join([*entete, *blocs, 'END:VCALENDAR', '']).encode()
+
+
+# ==========================================
+# GÉNÉRATION INCRÉMENTALE
+# ==========================================
+
+def _inclus(rdv, champ, pk, fenetre):
+    return (
+        getattr(rdv, f'{champ}_id') == pk
+        and rdv.statut in STATUTS
+        and rdv.date_confirmee is not None
+        and rdv.date_confirmee >= fenetre
+    )
+
+
+def _nom(objet):
+    site = site_de(objet)
+    return f'{site.nom} - {objet}'
+
+
+def agenda(type_agenda, pk):
+    """
+    Entrée en cache de l'agenda (corps, variantes, ETag, date de modification),
+    mise à jour avec les rendez-vous modifiés depuis la vérification précédente.
+    """
+    model, champ = AGENDAS[type_agenda]
+    cle = f'{PREFIXE}{type_agenda}:{pk}'
+    valeurs = cache.get_many([cle, CLE_VERSION])
+    precedente, version = valeurs.get(cle), valeurs.get(CLE_VERSION)
+    entree = precedente
+    maintenant = timezone.now()
+    fenetre = maintenant - timedelta(days=settings.AGENDA_JOURS_PASSES)
+    rendezvous = RendezVous.objects.select_related('service').order_by()
+
+    if (
+        entree is None or entree['version'] != version
+        or (maintenant - entree['construit_le']).total_seconds() > settings.AGENDA_RECONSTRUCTION_SECONDES
+    ):
+        objet = model.objects.filter(pk=pk, actif=True).first()
+        if objet is None:
+            raise Http404("Agenda introuvable")
+        selection = rendezvous.filter(
+            **{champ: objet}, statut__in=STATUTS, date_confirmee__gte=fenetre
+        )
+        entree = {
+            'version': version,
+            'nom': _nom(objet),
+            'construit_le': maintenant,
+            'evenements': {rdv.pk: (rdv.date_confirmee, evenement(rdv)) for rdv in selection},
+        }
+    else:
+        # Rendez-vous de l'agenda ou qui en sortent (changement de dentiste, de service) :
+        # filtre sur updated_at seul, sans liste d'identifiants bornée par SQLite
+        evenements_connus = entree['evenements']
+        modifies = [
+            rdv for rdv in rendezvous.filter(updated_at__gte=entree['verifie_le'] - MARGE)
+            if getattr(rdv, f'{champ}_id') == pk or rdv.pk in evenements_connus
+        ]
+        if not modifies:
+            return entree
+        evenements = dict(entree['evenements'])
+        for rdv in modifies:
+            if _inclus(rdv, champ, pk, fenetre):
+                evenements[rdv.pk] = (rdv.date_confirmee, evenement(rdv))
+            else:
+                evenements.pop(rdv.pk, None)
+        if evenements == entree['evenements']:
+            # Rien de visible n'a changé : seule la date de vérification avance
+            entree = {**entree, 'verifie_le': maintenant}
+            cache.set(cle, entree, settings.AGENDA_RECONSTRUCTION_SECONDES)
+            return entree
+        entree = {**entree, 'evenements': evenements}
+
+    corps = _calendrier(entree['nom'], entree['evenements'])
+    if precedente is not None and corps == precedente['corps']:
+        # Contenu inchangé (reconstruction complète) : mêmes ETag et Last-Modified pour les clients
+        entree.update({nom: precedente[nom] for nom in ('corps', 'variantes', 'etag', 'modifie_le')})
+    else:
+        entree.update(
+            corps=corps,
+            variantes=compress_variants(corps),
+            etag=f'"{hashlib.md5(corps).hexdigest()}"',
+            modifie_le=int(maintenant.timestamp()),
+        )
+    entree['verifie_le'] = maintenant
+    cache.set(cle, entree, settings.AGENDA_RECONSTRUCTION_SECONDES)
+    return entree
+
+
+@require_safe
+def flux_agenda(request, type_agenda, pk):
+    """Agenda .ics d'un dentiste ou d'un service (jeton d'abonnement requis)"""
+    if type_agenda not in AGENDAS or not constant_time_compare(
+        request.GET.get('jeton', ''), jeton(type_agenda, pk)
+    ):
+        raise Http404("Agenda introuvable")
+    entree = agenda(type_agenda, pk)
+
+    reponse = get_conditional_response(request, etag=entree['etag'], last_modified=entree['modifie_le'])
+    if reponse is None:
+        reponse = HttpResponse(entree['corps'], content_type=CONTENT_TYPE)
+        reponse.compressed_variants = entree['variantes']
+        reponse['Content-Disposition'] = f'inline; filename="{type_agenda}-{pk}.ics"'
+    reponse['ETag'] = entree['etag']
+    reponse['Last-Modified'] = http_date(entree['modifie_le'])
+    reponse['Cache-Control'] = 'private, max-age=300'
+    return reponse
@@ -0,0 +1,321 @@
+# ==========================================
+# ANTISPAM.PY - Filtre des envois indésirables (contact, prise de rendez-vous)
+# ==========================================
+"""
+Chaque envoi des formulaires publics est évalué en mémoire, avant toute
+écriture en base, par trois étages dont les scores s'additionnent :
+
+    heuristiques : liens, balises HTML/BBCode, mots-clés, écritures
+                   inattendues (expressions compilées au chargement)
+    modèle       : classifieur bayésien naïf sur les mots du message, entraîné
+                   par `manage.py entrainer_antispam` et enregistré dans
+                   settings.ANTISPAM['MODELE'] (log du rapport de vraisemblance)
+    liste        : filtre de Bloom des téléphones et emails des spams
+                   confirmés (enregistré avec le modèle) ; un envoi de
+                   l'un d'eux atteint directement le seuil
+
+Au-delà de settings.ANTISPAM['SEUIL'], l'envoi est mis en Quarantaine (une
+écriture) au lieu du message ou du rendez-vous : ni patient, ni compteurs,
+ni journal, ni email. La réponse est celle d'un envoi accepté, pour ne rien
+apprendre à l'expéditeur.
+
+Le modèle est chargé une fois par processus (voir cache_local.py) ; sans
+fichier, seules les heuristiques s'appliquent.
+"""
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter, namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from .cache_local import CacheLocal
+from .models import Contact, Quarantaine, RendezVous, Service
+from .telephones import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SEUIL': 3.0,
+    'MODELE': 'antispam.json',
+}
+# Champs texte évalués (les autres : téléphone, email, date, service)
+CHAMPS_TEXTE = ('nom', 'prenom', 'sujet', 'message')
+# Envois de chaque classe en dessous desquels le modèle n'est pas appliqué
+DOCUMENTS_MIN = 20
+# Contribution maximale du modèle, dans un sens ou dans l'autre
+MODELE_MAX = 4.0
+MOTS_MAX = 300
+
+# (expression, poids par occurrence, occurrences comptées au plus, motif)
+HEURISTIQUES = [
+    (re.compile(
+        r'https?://|www\.|\b[\w-]+\.(?:ru|cn|xyz|top|click|link|online|site|shop|buzz|icu)\b',
+        re.IGNORECASE,
+    ), 1.5, 3, 'liens'),
+    (re.compile(r'<\s*a\s+href|\[url[=\]]|\[link[=\]]', re.IGNORECASE), 3.0, 1, 'balises'),
+    (re.compile(
+        r'\b(?:viagra|cialis|casino|crypto|bitcoin|forex|seo|backlinks?|porn|lottery|loterie|'
+        r'gagnez|click here|cliquez ici|unsubscribe|betting|escort)\b',
+        re.IGNORECASE,
+    ), 2.0, 2, 'mots-clés'),
+    # Cyrillique, chinois, japonais
+    (re.compile(r'[\u0400-\u04ff\u3040-\u30ff\u4e00-\u9fff]'), 2.0, 1, 'écriture'),
+    (re.compile(r'(.)\1{9,}'), 1.0, 1, 'répétitions'),
+]
+_MOT = re.compile(r'\w{2,24}')
+
+Verdict = namedtuple('Verdict', 'spam score motifs')
+
+
+def get_config():
+    """Configuration effective (settings.ANTISPAM complété par les valeurs par défaut)"""
+    return {**DEFAULTS, **getattr(settings, 'ANTISPAM', {})}
+
+
+# ==========================================
+# FILTRE DE BLOOM
+# ==========================================
+
+class FiltreBloom:
+    """Ensemble probabiliste : pas de faux négatif, faux positifs au taux choisi"""
+
+    def __init__(self, taille, hachages, bits=None):
+        self.taille = taille
+        self.hachages = hachages
+        self.bits = bytearray(bits) if bits is not None else bytearray((taille + 7) // 8)
+
+    @classmethod
+    def pour(cls, nombre, taux=0.001):
+        """Filtre dimensionné pour `nombre` éléments et un taux de faux positifs `taux`"""
+        taille = max(64, math.ceil(-max(nombre, 1) * math.log(taux) / math.log(2) ** 2))
+        hachages = max(1, round(taille / max(nombre, 1) * math.log(2)))
+        return cls(taille, hachages)
+
+    def _positions(self, valeur):
+        # Double hachage : k positions tirées de deux empreintes de 64 bits
+        empreinte = hashlib.blake2b(valeur.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(empreinte[:8], 'little')
+        h2 = int.from_bytes(empreinte[8:], 'little') | 1
+        return [(h1 + i * h2) % self.taille for i in range(self.hachages)]
+
+    def ajouter(self, valeur):
+        for position in self._positions(valeur):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, valeur):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(valeur))
+
+    def exporter(self):
+        return {'taille': self.taille, 'hachages': self.hachages, 'bits': base64.b64encode(self.bits).decode()}
+
+    @classmethod
+    def importer(cls, donnees):
+        return cls(donnees['taille'], donnees['hachages'], base64.b64decode(donnees['bits']))
+
+
+def identifiants(donnees):
+    """Clés du filtre de Bloom d'un envoi : téléphone normalisé et email"""
+    cles = []
+    telephone = normalize_phone(str(donnees.get('telephone') or ''))
+    if telephone:
+        cles.append(f'tel:{telephone}')
+    email = str(donnees.get('email') or '').strip().lower()
+    if email:
+        cles.append(f'email:{email}')
+    return cles
+
+
+# ==========================================
+# MODÈLE
+# ==========================================
+
+def mots(donnees):
+    """Mots distincts des champs texte, et domaine de l'email"""
+    texte = ' '.join(str(donnees.get(champ) or '') for champ in CHAMPS_TEXTE).lower()
+    resultat = set(_MOT.findall(texte)[:MOTS_MAX])
+    _, arobase, domaine = str(donnees.get('email') or '').lower().rpartition('@')
+    if arobase:
+        resultat.add(f'@{domaine.strip()}')
+    return resultat
+
+
+class Modele:
+    """Poids des mots (log du rapport de vraisemblance spam/légitime) et liste des expéditeurs"""
+
+    def __init__(self, poids=None, a_priori=0.0, liste=None):
+        self.poids = poids or {}
+        self.a_priori = a_priori
+        self.liste = liste
+
+    def score(self, donnees):
+        if not self.poids:
+            return 0.0
+        poids = self.poids
+        total = self.a_priori + sum(poids.get(mot, 0.0) for mot in mots(donnees))
+        return max(-MODELE_MAX, min(MODELE_MAX, total))
+
+    def connu(self, donnees):
+        return self.liste is not None and any(cle in self.liste for cle in identifiants(donnees))
+
+
+def entrainer(exemples, mots_max=20000):
+    """
+    Modèle enregistrable (dict JSON) à partir de (donnees, est_spam) :
+    occurrences des mots par classe et filtre de Bloom des expéditeurs de spam.
+    """
+    documents = Counter()
+    occurrences = {True: Counter(), False: Counter()}
+    expediteurs = set()
+    for donnees, est_spam in exemples:
+        documents[est_spam] += 1
+        occurrences[est_spam].update(mots(donnees))
+        if est_spam:
+            expediteurs.update(identifiants(donnees))
+
+    # Mots vus au moins deux fois, les plus fréquents d'abord
+    totaux = occurrences[True] + occurrences[False]
+    retenus = [mot for mot, nombre in totaux.most_common(mots_max) if nombre >= 2]
+    liste = FiltreBloom.pour(len(expediteurs))
+    for cle in expediteurs:
+        liste.ajouter(cle)
+    return {
+        'version': 1,
+        'documents': {'spam': documents[True], 'legitime': documents[False]},
+        'mots': {mot: [occurrences[True][mot], occurrences[False][mot]] for mot in retenus},
+        'liste': liste.exporter(),
+    }
+
+
+def compiler(donnees):
+    """Modele prêt à l'emploi à partir du dict enregistré"""
+    liste = FiltreBloom.importer(donnees['liste']) if donnees.get('liste') else None
+    spam, legitime = donnees['documents']['spam'], donnees['documents']['legitime']
+    if min(spam, legitime) < DOCUMENTS_MIN:
+        # Trop peu d'exemples : liste des expéditeurs seulement
+        return Modele(liste=liste)
+    # Lissage de Laplace ; seuls les mots présents dans l'envoi comptent
+    poids = {
+        mot: math.log((s + 1) / (spam + 2)) - math.log((l + 1) / (legitime + 2))
+        for mot, (s, l) in donnees['mots'].items()
+    }
+    return Modele(poids, math.log(spam / legitime), liste)
+
+
+def enregistrer(donnees, chemin=None):
+    """Écrit le modèle (remplacement atomique) et le recharge dans tous les processus"""
+    chemin = str(chemin or get_config()['MODELE'])
+    temporaire = f'{chemin}.tmp'
+    with open(temporaire, 'w', encoding='utf-8') as fichier:
+        json.dump(donnees, fichier, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temporaire, chemin)
+    invalider_modele()
+
+
+def _charger(cle):
+    chemin = str(get_config()['MODELE'])
+    try:
+        with open(chemin, encoding='utf-8') as fichier:
+            return compiler(json.load(fichier))
+    except FileNotFoundError:
+        return Modele()
+    except (ValueError, KeyError, TypeError) as e:
+        logger.error(f"Modèle anti-spam illisible ({chemin}): {e}")
+        return Modele()
+
+
+_modele = CacheLocal('antispam', _charger)
+
+
+def modele():
+    return _modele.get()
+
+
+def invalider_modele():
+    _modele.invalider()
+
+
+# ==========================================
+# ÉVALUATION ET QUARANTAINE
+# ==========================================
+
+def evaluer(donnees, seuil=None):
+    """Verdict (spam, score, motifs) d'un envoi, sans accès à la base"""
+    seuil = get_config()['SEUIL'] if seuil is None else seuil
+    texte = ' '.join(str(donnees.get(champ) or '') for champ in CHAMPS_TEXTE)
+    score, motifs = 0.0, []
+    for expression, poids, plafond, motif in HEURISTIQUES:
+        nombre = 0
+        for _ in expression.finditer(texte):
+            nombre += 1
+            if nombre == plafond:
+                break
+        if nombre:
+            score += poids * nombre
+            motifs.append(motif)
+
+    courant = modele()
+    if courant.connu(donnees):
+        score += seuil
+        motifs.append('liste')
+    score_modele = courant.score(donnees)
+    if score_modele > 0:
+        motifs.append('modèle')
+    score += score_modele
+    return Verdict(score >= seuil, round(score, 2), motifs)
+
+
+def filtrer(request, type_envoi, donnees):
+    """
+    Met l'envoi en quarantaine s'il est jugé indésirable ; renvoie True dans
+    ce cas (la vue répond alors comme pour un envoi accepté).
+    """
+    config = get_config()
+    if not config['ENABLED']:
+        return False
+    verdict = evaluer(donnees, config['SEUIL'])
+    if not verdict.spam:
+        return False
+    clinique = getattr(request, 'clinique', None)
+    Quarantaine.objects.create(
+        clinique=clinique,
+        type_envoi=type_envoi,
+        donnees=donnees,
+        score=verdict.score,
+        motifs=', '.join(verdict.motifs)[:255],
+    )
+    logger.info(f"Envoi {type_envoi} mis en quarantaine (score {verdict.score}: {', '.join(verdict.motifs)})")
+    return True
+
+
+@transaction.atomic
+def liberer(entree):
+    """
+    Enregistre le message ou le rendez-vous d'un envoi reconnu légitime
+    (sans email : l'équipe l'a déjà lu), avec le verdict, en une transaction.
+    Peut lever CapaciteAtteinte ou Service.DoesNotExist : rien n'est écrit.
+    """
+    donnees = entree.donnees
+    if entree.type_envoi == 'contact':
+        objet = Contact.objects.create(
+            clinique_id=entree.clinique_id,
+            **{champ: donnees.get(champ) or '' for champ in ('nom', 'prenom', 'email', 'telephone', 'sujet', 'message')},
+        )
+    else:
+        service = Service.objects.get(pk=donnees['service'])
+        objet = RendezVous.objects.create(
+            clinique_id=entree.clinique_id or service.clinique_id,
+            service=service,
+            date_souhaitee=parse_date(donnees['date_souhaitee']),
+            **{champ: donnees.get(champ) or '' for champ in ('nom', 'prenom', 'telephone', 'email', 'message')},
+        )
+    entree.verdict = 'legitime'
+    entree.save(update_fields=['verdict'])
+    return objet
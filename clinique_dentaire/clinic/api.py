@@ -0,0 +1,119 @@
+# ==========================================
+# API.PY - Vues DRF des formulaires publics
+# ==========================================
+# Séparées de views.py : DRF n'est importé qu'au premier appel de ces
+# endpoints, pas au démarrage du worker (voir urls.py)
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from django.core.mail import send_mail
+
+from . import antispam
+from .encoders import FastJsonResponse
+from .lecture import ListeAttenteLecture, RendezVousRecuLecture
+from .models import CapaciteAtteinte, Service, ListeAttente, RendezVous
+from .serializers import ListeAttenteSerializer, RendezVousSerializer
+from .telephones import normalize_phone
+
+# ==========================================
+# VUE PRINCIPALE POUR PRENDRE RENDEZ-VOUS
+# ==========================================
+class PrendreRendezVousView(APIView):
+    @staticmethod
+    def reponse_enregistre(rdv):
+        # Même réponse, rendez-vous enregistré ou envoi en quarantaine (ni id ni date de création)
+        return Response({
+            'status': 'ok',
+            'message': 'Rendez-vous enregistré avec succès',
+            'data': RendezVousRecuLecture.objet(rdv)
+        })
+
+    def post(self, request):
+        serializer = RendezVousSerializer(data=request.data, context={'clinique': request.clinique})
+        
+        if serializer.is_valid():
+            # Vérifier que le service existe, est actif et appartient au site de la requête
+            try:
+                service = Service.objects.get(
+                    id=serializer.validated_data['service'].id, actif=True, clinique=request.clinique
+                )
+            except Service.DoesNotExist:
+                return Response(
+                    {'status': 'error', 'message': 'Service non disponible'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            # Envoi indésirable : mis en quarantaine, même réponse sans rendez-vous (voir antispam.py)
+            donnees = {**serializer.validated_data, 'service': service.pk}
+            if antispam.filtrer(request, 'rendezvous', donnees):
+                rdv = RendezVous(clinique=request.clinique, **{**serializer.validated_data, 'service': service})
+                return self.reponse_enregistre(rdv)
+
+            # Créer le rendez-vous (place prise dans le quota journalier du service)
+            try:
+                rdv = serializer.save(service=service)
+            except CapaciteAtteinte:
+                return Response(
+                    {
+                        'status': 'error',
+                        'message': 'Plus de place disponible pour ce service à cette date. '
+                                   'Choisissez une autre date ou inscrivez-vous sur la liste d\'attente.',
+                        'code': 'capacite_atteinte',
+                    },
+                    status=status.HTTP_409_CONFLICT
+                )
+            
+            return self.reponse_enregistre(rdv)
+        
+        return Response({
+            'status': 'error',
+            'message': 'Données invalides',
+            'errors': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    
+    
+    
+    
+    def test_email(request):
+        try:
+            send_mail(
+                subject='Test email',
+                message='Ceci est un test.',
+                from_email='Clinique <soulemaneyeo99@gmail.com>',
+                recipient_list=['tonemailperso@gmail.com'],
+                fail_silently=False,
+            )
+            return FastJsonResponse({'status': 'envoyé'})
+        except Exception as e:
+            return FastJsonResponse({'status': 'échec', 'erreur': str(e)})
+            
+# ==========================================
+# VUE D'INSCRIPTION EN LISTE D'ATTENTE
+# ==========================================
+class InscrireListeAttenteView(APIView):
+    def post(self, request):
+        serializer = ListeAttenteSerializer(data=request.data, context={'clinique': request.clinique})
+
+        if not serializer.is_valid():
+            return Response({
+                'status': 'error',
+                'message': 'Données invalides',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        donnees = serializer.validated_data
+        # Une seule inscription en attente par patient, service et date
+        inscription = ListeAttente.objects.filter(
+            patient__telephone=normalize_phone(donnees['telephone']),
+            service=donnees['service'],
+            date_souhaitee=donnees['date_souhaitee'],
+            statut='waiting',
+        ).first() or serializer.save()
+
+        return Response({
+            'status': 'ok',
+            'message': 'Vous êtes inscrit sur la liste d\'attente. Nous vous préviendrons dès qu\'un créneau se libère.',
+            'data': ListeAttenteLecture.objet(inscription)
+        })
@@ -8,3 +8,8 @@ class ClinicConfig(AppConfig):
     name = 'clinic'
     verbose_name = 'Clinique Dentaire'
 
+    def ready(self):
+        # Branche les signaux (statistiques, liste d'attente, cache du catalogue)
+        from . import signals  # noqa: F401
+        # Contrôles de configuration (cache partagé entre processus)
+        from . import checks  # noqa: F401
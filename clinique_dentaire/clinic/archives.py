@@ -0,0 +1,69 @@
+# ==========================================
+# ARCHIVES.PY - Archivage des rendez-vous terminés ou annulés
+# ==========================================
+import logging
+import time
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import RendezVous, RendezVousArchive, deplacement
+
+logger = logging.getLogger(__name__)
+
+STATUTS_ARCHIVABLES = ('completed', 'cancelled')
+
+
+def champs_archives():
+    """Colonnes recopiées de RendezVous vers RendezVousArchive"""
+    return [f.column for f in RendezVousArchive._meta.concrete_fields if f.attname != 'archived_at']
+
+
+def _copier(ids, archived_at):
+    """Copie les rendez-vous `ids` dans l'archive par un INSERT ... SELECT côté base"""
+    qn = connection.ops.quote_name
+    colonnes = ', '.join(qn(colonne) for colonne in champs_archives())
+    sql = 'INSERT INTO {archive} ({colonnes}, {archived_at}) SELECT {colonnes}, %s FROM {source} WHERE {pk} IN ({ids})'.format(
+        archive=qn(RendezVousArchive._meta.db_table),
+        source=qn(RendezVous._meta.db_table),
+        colonnes=colonnes,
+        archived_at=qn('archived_at'),
+        pk=qn(RendezVous._meta.pk.column),
+        ids=', '.join(['%s'] * len(ids)),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [connection.ops.adapt_datetimefield_value(archived_at), *ids])
+
+
+def archive_rendezvous(avant, batch_size=500, pause=0.0, max_batches=None, on_batch=None):
+    """
+    Déplace par petits lots les rendez-vous terminés/annulés modifiés avant `avant`.
+
+    Chaque lot (sélection, copie, suppression) tient dans sa propre transaction
+    pour ne jamais garder le verrou d'écriture SQLite longtemps ; `pause`
+    laisse respirer les écritures concurrentes entre deux lots. Les lots sont
+    lus dans l'ordre de l'index (statut, updated_at) : les lignes archivées
+    disparaissant de l'index, une interruption est reprise sans point de reprise.
+    """
+    total, lots = 0, 0
+    for statut in STATUTS_ARCHIVABLES:
+        candidats = RendezVous.objects.filter(statut=statut, updated_at__lt=avant).order_by('updated_at')
+        while max_batches is None or lots < max_batches:
+            with transaction.atomic():
+                ids = list(candidats.values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                _copier(ids, timezone.now())
+                # Lignes déplacées, pas supprimées : hors journal et statistiques
+                with deplacement():
+                    RendezVous.objects.filter(id__in=ids).delete()
+
+            total += len(ids)
+            lots += 1
+            if on_batch:
+                on_batch(lots, total)
+            if pause:
+                time.sleep(pause)
+
+    logger.info(f"{total} rendez-vous archivés en {lots} lots")
+    return total
@@ -0,0 +1,25 @@
+# ==========================================
+# BENCHMARKS - Suite de mesures de performance
+# ==========================================
+"""
+Scénarios exécutés hors ligne par `python manage.py bench <scenario>`.
+
+Chaque module de scénario expose :
+    add_arguments(parser)  -> options propres au scénario
+    run(command, options)  -> {'params': {...}, 'results': [{'name': ..., ...}, ...]}
+
+Les résultats sont écrits en JSON (voir base.write_results) pour comparer
+les exécutions d'une version à l'autre avec --baseline.
+"""
+
+SCENARIOS = {
+    'endpoints': 'clinic.benchmarks.endpoints',
+    'search': 'clinic.benchmarks.search',
+    'compression': 'clinic.benchmarks.compression',
+    'serialisation': 'clinic.benchmarks.serialisation',
+    'middleware': 'clinic.benchmarks.middleware',
+    'demarrage': 'clinic.benchmarks.demarrage',
+    'lecture': 'clinic.benchmarks.lecture',
+    'traces': 'clinic.benchmarks.traces',
+    'antispam': 'clinic.benchmarks.antispam',
+}
@@ -0,0 +1,100 @@
+# ==========================================
+# ANTISPAM.PY - Coût du filtre anti-spam par envoi
+# ==========================================
+"""
+Durée de antispam.evaluer() par envoi (heuristiques, modèle bayésien, filtre
+de Bloom), sur des envois légitimes et indésirables générés, avec un modèle
+entraîné sur un autre tirage des mêmes générateurs. Objectif : bien moins
+d'une milliseconde, face à l'INSERT et à l'envoi d'email évités.
+
+Le taux de détection et de faux positifs est affiché à titre indicatif : les
+envois générés sont bien plus faciles à séparer que les vrais.
+"""
+import os
+import random
+import tempfile
+
+from django.test.utils import override_settings
+
+from clinic import antispam
+
+from .base import latency_summary, timed
+
+SUJETS = ['Prise de rendez-vous', 'Question sur un devis', 'Douleur dentaire', 'Blanchiment', 'Détartrage', 'Orthodontie']
+PHRASES = [
+    "Bonjour, je souhaiterais un rendez-vous pour un détartrage la semaine prochaine.",
+    "J'ai une douleur à une molaire depuis deux jours, est-il possible de passer rapidement ?",
+    "Pouvez-vous m'indiquer le prix d'un blanchiment et la durée du traitement ?",
+    "Mon fils de 12 ans a besoin d'un avis pour un appareil dentaire.",
+    "Je voudrais déplacer mon rendez-vous de jeudi, merci de me rappeler.",
+    "Acceptez-vous les assurances santé pour les soins de caries ?",
+]
+SPAMS = [
+    "Boost your SEO ranking today, cheap backlinks at http://seo-{n}.xyz",
+    "Gagnez 5000 euros par semaine avec le bitcoin, cliquez ici www.crypto-{n}.top",
+    "<a href=\"http://casino-{n}.ru\">Best online casino bonus</a>",
+    "Лучшие предложения для вашего бизнеса {n}",
+    "We can grow your business, reply to get our price list. Unsubscribe at http://spam{n}.click",
+    "Cheap viagra and cialis without prescription http://pharma{n}.shop",
+]
+
+
+def add_arguments(parser):
+    parser.add_argument('--envois', type=int, default=2000, help='Envois évalués (moitié légitimes, moitié indésirables)')
+    parser.add_argument('--entrainement', type=int, default=2000, help="Envois générés pour l'entraînement du modèle")
+    parser.add_argument('--seed', type=int, default=42, help='Graine de génération des envois')
+
+
+def envoi(generateur, spam, n):
+    donnees = {
+        'nom': generateur.choice(['KOUAME', 'TRAORE', 'KONE', 'YAO', 'BAMBA']),
+        'prenom': generateur.choice(['Aya', 'Moussa', 'Awa', 'Koffi', 'Fatou']),
+        'telephone': f'+22507{generateur.randrange(10 ** 8):08d}',
+        'email': f'patient{n}@example.ci',
+        'sujet': generateur.choice(SUJETS),
+        'message': ' '.join(generateur.sample(PHRASES, 2)),
+    }
+    if spam:
+        donnees.update(
+            email=f'offre{n}@{generateur.choice(["mailer.ru", "promo.xyz", "gmail.com"])}',
+            sujet=generateur.choice(['Business offer', 'Partenariat', 'Votre site web']),
+            message=generateur.choice(SPAMS).format(n=n),
+        )
+    return donnees
+
+
+def run(command, options):
+    generateur = random.Random(options['seed'])
+    exemples = [
+        (envoi(generateur, spam, n), spam)
+        for n, spam in enumerate(generateur.random() < 0.5 for _ in range(options['entrainement']))
+    ]
+    envois = [(envoi(generateur, n % 2 == 0, options['entrainement'] + n), n % 2 == 0) for n in range(options['envois'])]
+    results = []
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'antispam.json')
+        with override_settings(ANTISPAM={**antispam.get_config(), 'MODELE': chemin}):
+            niveaux = [('heuristiques', None), ('complet', exemples)]
+            for nom, entrainement in niveaux:
+                if entrainement is not None:
+                    antispam.enregistrer(antispam.entrainer(entrainement), chemin)
+                else:
+                    antispam.invalider_modele()
+                # Chargement du modèle hors mesure (une fois par processus en production)
+                antispam.modele()
+                for classe in ('legitimes', 'indesirables'):
+                    selection = [donnees for donnees, spam in envois if spam == (classe == 'indesirables')]
+                    iterateur = iter(selection)
+                    latences = timed(lambda: antispam.evaluer(next(iterateur)), len(selection))
+                    detectes = sum(antispam.evaluer(donnees).spam for donnees in selection)
+                    results.append({
+                        'name': f'{nom}:{classe}',
+                        'quarantaine': round(detectes / len(selection), 3) if selection else None,
+                        **latency_summary(latences),
+                    })
+                    command.stdout.write(command.format_result(results[-1]))
+            antispam.invalider_modele()
+
+    params = {key: options[key] for key in ('envois', 'entrainement', 'seed')}
+    return {'params': params, 'results': results}
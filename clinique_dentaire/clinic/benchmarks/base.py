@@ -0,0 +1,157 @@
+# ==========================================
+# BASE.PY - Outils communs aux benchmarks
+# ==========================================
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+
+
+def percentile(values, p):
+    """Percentile par interpolation linéaire (values triées ou non)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(latencies, elapsed=None):
+    """Résumé p50/p95/p99 en millisecondes (latencies en secondes) et débit éventuel"""
+    ms = [value * 1000 for value in latencies]
+    summary = {
+        'count': len(ms),
+        'latency_ms': {
+            'mean': sum(ms) / len(ms) if ms else None,
+            'p50': percentile(ms, 50),
+            'p95': percentile(ms, 95),
+            'p99': percentile(ms, 99),
+            'max': max(ms) if ms else None,
+        },
+    }
+    if elapsed:
+        summary['throughput_rps'] = len(ms) / elapsed
+    return summary
+
+
+def timed(func, repeat):
+    """Exécute func `repeat` fois et renvoie la liste des durées (secondes)"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+@contextmanager
+def bench_database(path=None, keepdb=False, rendezvous=0, contacts=0, seed=42):
+    """
+    Base SQLite dédiée au benchmark, migrée puis peuplée par `manage.py seed`.
+
+    La base de développement n'est jamais touchée : on passe par la création
+    de base de test de Django sur un fichier (partageable entre threads).
+    Avec keepdb, une base déjà peuplée est réutilisée telle quelle.
+    """
+    path = str(path or Path(tempfile.gettempdir()) / 'clinique_bench.sqlite3')
+    already_seeded = keepdb and os.path.exists(path)
+
+    connection.settings_dict.setdefault('TEST', {})['NAME'] = path
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb)
+    try:
+        call_command('seed', verbosity=0)
+        if not already_seeded and (rendezvous or contacts):
+            call_command('seed', rendezvous=rendezvous, contacts=contacts, seed=seed, verbosity=0)
+        connection.close()
+        yield path
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def add_database_arguments(parser, rendezvous=10000, contacts=2000):
+    """Options communes des scénarios qui travaillent sur une base peuplée"""
+    parser.add_argument('--rendezvous', type=int, default=rendezvous, help='Rendez-vous générés dans la base de test')
+    parser.add_argument('--contacts', type=int, default=contacts, help='Messages de contact générés dans la base de test')
+    parser.add_argument('--seed', type=int, default=42, help='Graine de génération des données')
+    parser.add_argument('--database', default=None, help='Fichier SQLite de benchmark (défaut: dossier temporaire)')
+    parser.add_argument('--keepdb', action='store_true', help='Conserve et réutilise la base de benchmark')
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def metadata():
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def write_results(scenario, payload, output=None):
+    """Écrit les résultats au format JSON et renvoie le chemin du fichier"""
+    if output is None:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = Path(settings.BASE_DIR) / 'bench_results' / f'{scenario}-{stamp}.json'
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    document = {'scenario': scenario, 'meta': metadata(), **payload}
+    output.write_text(json.dumps(document, indent=2, ensure_ascii=False, default=str), encoding='utf-8')
+    return output
+
+
+def _flatten(result, prefix=''):
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f'{prefix}{key}.'))
+        elif key != 'name':
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+def format_result(result):
+    parts = []
+    for key, value in _flatten(result).items():
+        parts.append(f'{key}={value:.3f}' if isinstance(value, float) else f'{key}={value}')
+    return f"{result['name']}: " + '  '.join(parts)
+
+
+def compare(results, baseline_path):
+    """Écarts relatifs (%) des métriques numériques par rapport à un fichier de résultats précédent"""
+    baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))
+    previous = {item['name']: _flatten(item) for item in baseline.get('results', [])}
+    lines = []
+    for result in results:
+        before = previous.get(result['name'])
+        if before is None:
+            continue
+        deltas = []
+        for key, value in _flatten(result).items():
+            old = before.get(key)
+            if isinstance(value, (int, float)) and isinstance(old, (int, float)) and old:
+                deltas.append(f'{key} {(value - old) / old * 100:+.1f}%')
+        lines.append(f"{result['name']}: " + '  '.join(deltas))
+    return lines
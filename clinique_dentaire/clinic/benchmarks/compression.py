@@ -0,0 +1,76 @@
+# ==========================================
+# COMPRESSION.PY - Octets et CPU par requête selon l'encodage
+# ==========================================
+"""
+Octets envoyés et temps CPU par requête des endpoints du catalogue, pour
+chaque encodage (identity, gzip, br), selon deux stratégies :
+
+    par-requete : la vue construit le JSON et le middleware le compresse à chaque requête
+    cache       : réponse en cache avec ses variantes précompressées (comportement actuel)
+
+Vue et middleware sont appelés directement, sans la chaîne WSGI, pour isoler
+le coût de la sérialisation et de la compression.
+"""
+import time
+
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from clinic import views
+from clinic.compression import ENCODINGS, CompressionMiddleware
+
+from .base import add_database_arguments, bench_database, latency_summary
+
+VUES = {
+    'services': views.get_services,
+    'equipe': views.get_equipe,
+    'horaires': views.get_horaires,
+}
+
+
+def add_arguments(parser):
+    add_database_arguments(parser, rendezvous=0, contacts=0)
+    parser.add_argument('--requests', type=int, default=500, help='Requêtes mesurées par combinaison')
+    parser.add_argument('--endpoints', nargs='+', choices=list(VUES), default=list(VUES))
+
+
+def measure(vue, encodage, total):
+    """Renvoie (octets de la réponse, CPU moyen en µs, latences)"""
+    factory = RequestFactory()
+    entetes = {'HTTP_ACCEPT_ENCODING': encodage} if encodage != 'identity' else {}
+    middleware = CompressionMiddleware(vue)
+    latences = []
+    cpu_debut = time.process_time()
+    for _ in range(total):
+        debut = time.perf_counter()
+        reponse = middleware(factory.get('/', **entetes))
+        latences.append(time.perf_counter() - debut)
+    cpu = (time.process_time() - cpu_debut) / total * 1e6
+    return len(reponse.content), cpu, latences
+
+
+def run(command, options):
+    results = []
+    with bench_database(options['database'], options['keepdb'], options['rendezvous'],
+                        options['contacts'], options['seed']):
+        for nom in options['endpoints']:
+            strategies = {
+                'par-requete': VUES[nom].__wrapped__,
+                'cache': VUES[nom],
+            }
+            for strategie, vue in strategies.items():
+                cache.clear()
+                vue(RequestFactory().get('/'))
+                for encodage in ('identity', *ENCODINGS):
+                    octets, cpu, latences = measure(vue, encodage, options['requests'])
+                    results.append({
+                        'name': f'{nom}:{strategie}:{encodage}',
+                        'bytes': octets,
+                        'cpu_us_per_request': cpu,
+                        **latency_summary(latences),
+                    })
+                    command.stdout.write(command.format_result(results[-1]))
+
+    params = {key: options[key] for key in ('requests', 'endpoints')}
+    params['encodings'] = list(ENCODINGS)
+    return {'params': params, 'results': results}
@@ -0,0 +1,112 @@
+# ==========================================
+# DEMARRAGE.PY - Démarrage à froid d'un worker
+# ==========================================
+"""
+Temps jusqu'à la première réponse d'un worker neuf, par endpoint.
+
+Chaque exécution lance un interpréteur Python qui importe le point d'entrée
+WSGI (settings.WSGI_APPLICATION) puis sert deux requêtes identiques :
+
+    import   : import du module WSGI (django.setup() et chaînes de middlewares)
+    premiere : première requête (chargement des URLs, des vues et de leurs dépendances)
+    suivante : deuxième requête, à chaud, pour comparaison
+    total    : du lancement du processus à la fin de la première réponse
+
+Le worker lit la base de benchmark ; DEBUG et QUERY_INSPECTOR sont coupés,
+les emails partent vers le backend locmem.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+from clinic.profil_imports import module_wsgi
+
+from .base import add_database_arguments, bench_database, latency_summary
+from .endpoints import ENDPOINTS, Payloads, make_environ
+
+# Script exécuté par chaque worker : mesures écrites en JSON sur stdout
+SONDE = '''
+import io, json, os, sys, time
+debut = time.perf_counter()
+from django.conf import settings
+settings.DATABASES['default']['NAME'] = os.environ['BENCH_DATABASE']
+settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+module = __import__(os.environ['BENCH_WSGI'], fromlist=['application'])
+application = module.application
+charge = time.perf_counter()
+requete = json.loads(os.environ['BENCH_REQUETE'])
+statuts, durees = [], []
+for _ in range(2):
+    environ = {**requete, 'wsgi.input': io.BytesIO(requete['wsgi.input'].encode()), 'wsgi.errors': sys.stderr}
+    t = time.perf_counter()
+    reponse = application(environ, lambda statut, entetes, exc_info=None: statuts.append(int(statut.split()[0])))
+    b''.join(reponse)
+    reponse.close()
+    durees.append(time.perf_counter() - t)
+print(json.dumps({
+    'fin': time.time(), 'import': charge - debut, 'premiere': durees[0], 'suivante': durees[1], 'statuts': statuts,
+}))
+'''
+
+
+def add_arguments(parser):
+    add_database_arguments(parser, rendezvous=0, contacts=0)
+    parser.add_argument('--runs', type=int, default=10, help='Workers lancés par endpoint')
+    parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=['services', 'rendezvous'])
+
+
+def requete(name, payloads):
+    """Environ WSGI sérialisable (corps en texte, objets de flux recréés par le worker)"""
+    environ = make_environ(name, payloads)
+    corps = environ['wsgi.input'].read(int(environ.get('CONTENT_LENGTH') or 0)).decode()
+    return {
+        **{cle: valeur for cle, valeur in environ.items() if isinstance(valeur, (str, int, bool, tuple))},
+        'wsgi.input': corps,
+    }
+
+
+def demarrer(database, environ):
+    """Lance un worker et renvoie ses mesures (secondes)"""
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'clinique_dentaire.settings'),
+        'DEBUG': 'False',
+        'QUERY_INSPECTOR': 'False',
+        'BENCH_DATABASE': database,
+        'BENCH_WSGI': module_wsgi(),
+        'BENCH_REQUETE': json.dumps(environ),
+    }
+    lancement = time.time()
+    resultat = subprocess.run([sys.executable, '-c', SONDE], cwd=settings.BASE_DIR, env=env,
+                              capture_output=True, text=True)
+    if resultat.returncode:
+        raise RuntimeError(resultat.stderr.strip())
+    mesures = json.loads(resultat.stdout.strip().splitlines()[-1])
+    mesures['total'] = mesures.pop('fin') - lancement
+    return mesures
+
+
+def run(command, options):
+    results = []
+    with bench_database(options['database'], options['keepdb'], options['rendezvous'],
+                        options['contacts'], options['seed']) as database:
+        payloads = Payloads()
+        for name in options['endpoints']:
+            mesures = [demarrer(database, requete(name, payloads)) for _ in range(options['runs'])]
+            results.append({
+                'name': name,
+                'errors': sum(statut >= 400 for m in mesures for statut in m['statuts']),
+                **{
+                    f'{etape}_ms': latency_summary([m[etape] for m in mesures])['latency_ms']
+                    for etape in ('total', 'import', 'premiere', 'suivante')
+                },
+            })
+            command.stdout.write(command.format_result(results[-1]))
+
+    params = {key: options[key] for key in ('runs', 'endpoints')}
+    params['wsgi'] = module_wsgi()
+    return {'params': params, 'results': results}
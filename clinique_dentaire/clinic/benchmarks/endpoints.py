@@ -0,0 +1,156 @@
+# ==========================================
+# ENDPOINTS.PY - Charge et latence des endpoints publics
+# ==========================================
+"""
+Débit et latences p50/p95/p99 des endpoints publics sous concurrence.
+
+Les requêtes passent par l'application WSGI du projet (settings.WSGI_APPLICATION),
+donc par toute la chaîne de middlewares, dans le processus courant et sans
+réseau. Les emails partent vers le backend locmem.
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.servers.basehttp import get_internal_wsgi_application
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from clinic.calendrier import prochain_jour_ouvert
+from clinic.models import Service, site_par_defaut
+
+from .base import add_database_arguments, bench_database, latency_summary
+
+ENDPOINTS = {
+    'services': ('get', '/api/services/'),
+    'equipe': ('get', '/api/equipe/'),
+    'horaires': ('get', '/api/horaires/'),
+    'rendezvous': ('post', '/prendre-rendez-vous/'),
+    'contact': ('post', '/contact/'),
+}
+
+
+def add_arguments(parser):
+    add_database_arguments(parser)
+    parser.add_argument('--requests', type=int, default=200, help='Requêtes mesurées par endpoint et niveau de concurrence')
+    parser.add_argument('--warmup', type=int, default=10, help='Requêtes de chauffe (non mesurées)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4], help='Niveaux de concurrence (threads)')
+    parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument('--debug', action='store_true', help='Garde DEBUG et QUERY_INSPECTOR (désactivés par défaut)')
+
+
+class Payloads:
+    """Corps JSON valides pour les endpoints d'écriture"""
+
+    def __init__(self):
+        # Requêtes sans préfixe ni domaine de site : servies par le site par défaut
+        clinique_id = site_par_defaut()
+        self.service_ids = list(Service.objects.filter(clinique_id=clinique_id, actif=True).values_list('id', flat=True))
+        jour = prochain_jour_ouvert(timezone.localdate() + timedelta(days=7), clinique_id)
+        self.date = jour.isoformat()
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def next_number(self):
+        with self.lock:
+            self.counter += 1
+            return self.counter
+
+    def rendezvous(self):
+        n = self.next_number()
+        return {
+            'nom': 'KOUAME', 'prenom': 'Aya', 'telephone': f'+22507{n % 100000000:08d}',
+            'email': f'bench{n}@example.ci', 'date_souhaitee': self.date,
+            'service': self.service_ids[n % len(self.service_ids)], 'message': 'Benchmark',
+        }
+
+    def contact(self):
+        n = self.next_number()
+        return {
+            'nom': 'TRAORE', 'prenom': 'Moussa', 'email': f'bench{n}@example.ci',
+            'telephone': f'+22505{n % 100000000:08d}', 'sujet': 'Benchmark', 'message': 'Message de benchmark',
+        }
+
+
+def make_environ(name, payloads):
+    method, path = ENDPOINTS[name]
+    factory = RequestFactory(HTTP_HOST='localhost')
+    if method == 'get':
+        return factory.get(path).environ
+    body = json.dumps(getattr(payloads, name)())
+    return factory.post(path, data=body, content_type='application/json').environ
+
+
+def call(application, environ):
+    """Exécute une requête WSGI et renvoie (statut, durée en secondes)"""
+    status_holder = []
+
+    def start_response(status, headers, exc_info=None):
+        status_holder.append(int(status.split()[0]))
+
+    start = time.perf_counter()
+    response = application(environ, start_response)
+    try:
+        b''.join(response)
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+    return status_holder[0], time.perf_counter() - start
+
+
+def measure(application, name, payloads, total, concurrency):
+    latencies, errors = [], []
+
+    def one(_):
+        status, duration = call(application, make_environ(name, payloads))
+        latencies.append(duration)
+        if status >= 400:
+            errors.append(status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    return {**latency_summary(latencies, elapsed), 'errors': len(errors)}
+
+
+@contextmanager
+def quiet_logging():
+    """Coupe les logs INFO par requête (notifications envoyées...) pendant la mesure"""
+    logging.disable(logging.INFO)
+    try:
+        yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def run(command, options):
+    overrides = {'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend'}
+    if not options['debug']:
+        overrides.update(DEBUG=False, QUERY_INSPECTOR={**getattr(settings, 'QUERY_INSPECTOR', {}), 'ENABLED': False})
+
+    results = []
+    with bench_database(options['database'], options['keepdb'], options['rendezvous'],
+                        options['contacts'], options['seed']):
+        with override_settings(**overrides), quiet_logging():
+            application = get_internal_wsgi_application()
+            payloads = Payloads()
+            for name in options['endpoints']:
+                for _ in range(options['warmup']):
+                    call(application, make_environ(name, payloads))
+                for concurrency in options['concurrency']:
+                    result = measure(application, name, payloads, options['requests'], concurrency)
+                    results.append({'name': f'{name}@c{concurrency}', 'endpoint': ENDPOINTS[name][1],
+                                    'concurrency': concurrency, **result})
+                    command.stdout.write(command.format_result(results[-1]))
+
+    params = {key: options[key] for key in (
+        'rendezvous', 'contacts', 'seed', 'requests', 'warmup', 'concurrency', 'endpoints', 'debug',
+    )}
+    return {'params': params, 'results': results}
@@ -0,0 +1,88 @@
+# ==========================================
+# LECTURE.PY - Sérialiseurs de lecture contre ModelSerializer
+# ==========================================
+"""
+Coût de la sérialisation en lecture : ModelSerializer de DRF contre les
+classes précompilées de clinic/lecture.py, sur --objets instances :
+
+    <modèle>:modelserializer / <modèle>:lecture
+        instances déjà chargées (coût de sérialisation seul) ; le catalogue,
+        qui ne compte que quelques lignes, est répété jusqu'à --objets
+    rendezvous-requete:modelserializer / rendezvous-requete:lecture
+        requête comprise : queryset avec select_related() contre values_list()
+
+Le ModelSerializer de chaque modèle déclare les mêmes champs que la classe de
+lecture ; `identique` indique si les deux sorties encodent au même JSON.
+"""
+from itertools import cycle, islice
+
+from rest_framework import serializers
+
+from clinic.encoders import dumps
+from clinic.lecture import HoraireLecture, RendezVousLecture, ServiceLecture
+from clinic.models import Horaire, RendezVous, Service
+
+from .base import add_database_arguments, bench_database, latency_summary, timed
+
+
+def add_arguments(parser):
+    add_database_arguments(parser, rendezvous=10000, contacts=0)
+    parser.add_argument('--objets', type=int, default=10000, help='Objets sérialisés par mesure')
+    parser.add_argument('--repeat', type=int, default=20, help='Sérialisations mesurées par cas')
+
+
+def model_serializer(lecture):
+    """ModelSerializer équivalent à une classe de lecture (mêmes clés et sources)"""
+    attributs = {
+        nom: serializers.ReadOnlyField(source=chemin.replace('__', '.'))
+        for nom, chemin in lecture.sources.items()
+    }
+    attributs['Meta'] = type('Meta', (), {'model': lecture.model, 'fields': list(lecture.champs)})
+    return type(f'{lecture.model.__name__}ModelSerializer', (serializers.ModelSerializer,), attributs)
+
+
+def run(command, options):
+    results = []
+    nombre = options['objets']
+
+    def comparer(nom, lecture, serialiser, lire):
+        serialiseur = model_serializer(lecture)
+        identique = dumps(serialiser(serialiseur)) == dumps(lire())
+        for cas, fonction in (('modelserializer', lambda: serialiser(serialiseur)), ('lecture', lire)):
+            results.append({
+                'name': f'{nom}:{cas}',
+                'objets': nombre,
+                'identique': identique,
+                **latency_summary(timed(fonction, options['repeat'])),
+            })
+            command.stdout.write(command.format_result(results[-1]))
+
+    with bench_database(options['database'], options['keepdb'], options['rendezvous'],
+                        options['contacts'], options['seed']):
+        catalogue = {
+            'services': (ServiceLecture, list(Service.objects.all())),
+            'horaires': (HoraireLecture, list(Horaire.objects.all())),
+        }
+        for nom, (lecture, instances) in catalogue.items():
+            instances = list(islice(cycle(instances), nombre))
+            comparer(
+                nom, lecture,
+                lambda serialiseur: serialiseur(instances, many=True).data,
+                lambda: lecture.objets(instances),
+            )
+
+        queryset = RendezVous.objects.order_by('id')
+        instances = list(queryset.select_related('service')[:nombre])
+        comparer(
+            'rendezvous', RendezVousLecture,
+            lambda serialiseur: serialiseur(instances, many=True).data,
+            lambda: RendezVousLecture.objets(instances),
+        )
+        comparer(
+            'rendezvous-requete', RendezVousLecture,
+            lambda serialiseur: serialiseur(queryset.select_related('service')[:nombre], many=True).data,
+            lambda: RendezVousLecture.donnees(queryset[:nombre]),
+        )
+
+    params = {key: options[key] for key in ('rendezvous', 'seed', 'objets', 'repeat')}
+    return {'params': params, 'results': results}
@@ -0,0 +1,68 @@
+# ==========================================
+# MIDDLEWARE.PY - Surcoût de la chaîne de middlewares par requête
+# ==========================================
+"""
+Latence des endpoints publics selon la chaîne de middlewares traversée :
+
+    complete : settings.MIDDLEWARE (comportement avant le routage)
+    publique : settings.MIDDLEWARE_API_PUBLIQUE, via le routage de clinic/handlers.py
+
+Les requêtes sont exécutées en séquence dans le processus courant, comme le
+scénario `endpoints`. Le catalogue étant servi depuis le cache, la
+différence mesure presque uniquement le coût des middlewares.
+"""
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.test.utils import override_settings
+
+from clinic.handlers import RoutingWSGIHandler
+
+from .base import add_database_arguments, bench_database, latency_summary
+from .endpoints import ENDPOINTS, Payloads, call, make_environ, quiet_logging
+
+
+def add_arguments(parser):
+    add_database_arguments(parser, rendezvous=0, contacts=0)
+    parser.add_argument('--requests', type=int, default=1000, help='Requêtes mesurées par endpoint et chaîne')
+    parser.add_argument('--warmup', type=int, default=20, help='Requêtes de chauffe (non mesurées)')
+    parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS))
+
+
+def nombre_middlewares(application, path):
+    """Longueur de la chaîne effectivement traversée pour `path`"""
+    if isinstance(application, RoutingWSGIHandler) and application.handler_for(path) is application.public:
+        return len(settings.MIDDLEWARE_API_PUBLIQUE)
+    return len(settings.MIDDLEWARE)
+
+
+def run(command, options):
+    overrides = {
+        'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+        'DEBUG': False,
+        'QUERY_INSPECTOR': {**getattr(settings, 'QUERY_INSPECTOR', {}), 'ENABLED': False},
+    }
+    results = []
+    with bench_database(options['database'], options['keepdb'], options['rendezvous'],
+                        options['contacts'], options['seed']):
+        with override_settings(**overrides), quiet_logging():
+            chaines = {'complete': WSGIHandler(), 'publique': RoutingWSGIHandler()}
+            payloads = Payloads()
+            for name in options['endpoints']:
+                for chaine, application in chaines.items():
+                    for _ in range(options['warmup']):
+                        call(application, make_environ(name, payloads))
+                    latences, erreurs = [], 0
+                    for _ in range(options['requests']):
+                        status, duree = call(application, make_environ(name, payloads))
+                        latences.append(duree)
+                        erreurs += status >= 400
+                    results.append({
+                        'name': f'{name}:{chaine}',
+                        'middlewares': nombre_middlewares(application, ENDPOINTS[name][1]),
+                        'errors': erreurs,
+                        **latency_summary(latences),
+                    })
+                    command.stdout.write(command.format_result(results[-1]))
+
+    params = {key: options[key] for key in ('requests', 'warmup', 'endpoints')}
+    return {'params': params, 'results': results}
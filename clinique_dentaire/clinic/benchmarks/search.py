@@ -0,0 +1,58 @@
+# ==========================================
+# SEARCH.PY - Recherche admin : icontains contre FTS5
+# ==========================================
+"""
+Recherche admin sur RendezVous et Contact : icontains (LIKE) contre FTS5.
+
+Pour chaque terme on mesure ce que fait la liste admin : le COUNT des
+résultats puis la première page triée par -created_at.
+"""
+from django.contrib import admin
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from clinic.models import Contact, RendezVous
+from clinic.search import icontains_search
+
+from .base import add_database_arguments, bench_database, latency_summary, timed
+
+TERMES = ['kouame', 'Aminata', 'kone awa', "N'GUESSAN", '0707', 'gmail', 'Kouamé Affoué', 'inexistant']
+
+
+def add_arguments(parser):
+    add_database_arguments(parser, rendezvous=1000000, contacts=200000)
+    parser.add_argument('--repeat', type=int, default=5, help='Répétitions par terme')
+    parser.add_argument('--termes', nargs='+', default=TERMES)
+
+
+def page(model_admin, request, methode, terme):
+    queryset, _ = methode(request, model_admin.get_queryset(request), terme)
+    queryset.count()
+    list(queryset.order_by('-created_at')[:100])
+
+
+def run(command, options):
+    results = []
+    with bench_database(options['database'], options['keepdb'], options['rendezvous'],
+                        options['contacts'], options['seed']):
+        request = RequestFactory().get('/admin/')
+        request.user = AnonymousUser()
+        for model in (RendezVous, Contact):
+            model_admin = admin.site._registry[model]
+            methodes = {
+                'icontains': lambda req, qs, terme: icontains_search(model_admin, req, qs, terme),
+                'fts5': model_admin.get_search_results,
+            }
+            for terme in options['termes']:
+                for nom_methode, methode in methodes.items():
+                    durees = timed(lambda: page(model_admin, request, methode, terme), options['repeat'])
+                    queryset, _ = methode(request, model.objects.all(), terme)
+                    results.append({
+                        'name': f'{model._meta.model_name}:{nom_methode}:{terme}',
+                        'matches': queryset.count(),
+                        **latency_summary(durees),
+                    })
+                    command.stdout.write(command.format_result(results[-1]))
+
+    params = {key: options[key] for key in ('rendezvous', 'contacts', 'seed', 'repeat', 'termes')}
+    return {'params': params, 'results': results}
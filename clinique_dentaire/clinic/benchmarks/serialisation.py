@@ -0,0 +1,80 @@
+# ==========================================
+# SERIALISATION.PY - Micro-benchmark de l'encodage JSON
+# ==========================================
+"""
+Coût de l'encodage JSON des réponses : json + DjangoJSONEncoder (JsonResponse)
+contre clinic.encoders.dumps_django (mêmes octets, FastJsonResponse) et
+dumps (orjson, JSON compact), et JSONRenderer de DRF contre FastJSONRenderer.
+
+Les documents encodés sont ceux des endpoints : catalogue (Decimal, time),
+rendez-vous sérialisés par DRF, et une liste de rendez-vous en values()
+(dates et datetimes) pour mesurer le coût par ligne.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+from clinic.encoders import dumps, dumps_django, orjson
+from clinic.models import Dentiste, Horaire, RendezVous, Service
+from clinic.renderers import FastJSONRenderer
+from clinic.serializers import RendezVousSerializer
+
+from .base import add_database_arguments, bench_database, latency_summary, timed
+
+
+def add_arguments(parser):
+    add_database_arguments(parser, rendezvous=5000, contacts=0)
+    parser.add_argument('--repeat', type=int, default=200, help='Encodages mesurés par document')
+    parser.add_argument('--lignes', type=int, default=1000, help='Rendez-vous dans le document en values()')
+
+
+def documents(lignes):
+    """Documents Django (JsonResponse) et DRF (Response) à encoder"""
+    services = {'status': 'success', 'services': list(Service.objects.filter(actif=True).values(
+        'id', 'nom', 'description', 'prix_min', 'prix_max', 'duree_minutes', 'icone'))}
+    equipe = {'status': 'success', 'dentistes': list(Dentiste.objects.filter(actif=True).values(
+        'id', 'nom', 'prenom', 'specialite', 'bio', 'photo', 'linkedin'))}
+    horaires = {'status': 'success', 'horaires': list(Horaire.objects.values(
+        'jour', 'ouverture_matin', 'fermeture_matin', 'ouverture_apres_midi', 'fermeture_apres_midi', 'ferme'))}
+    rendezvous = {'status': 'success', 'rendezvous': list(RendezVous.objects.order_by('id').values(
+        'id', 'nom', 'prenom', 'telephone', 'date_souhaitee', 'statut', 'created_at', 'date_confirmee')[:lignes])}
+    serialises = RendezVousSerializer(
+        RendezVous.objects.select_related('service').order_by('id')[:lignes], many=True
+    ).data
+    django_docs = {'services': services, 'equipe': equipe, 'horaires': horaires, f'rendezvous-{lignes}': rendezvous}
+    drf_docs = {f'drf-rendezvous-{lignes}': {'status': 'ok', 'data': serialises}}
+    return django_docs, drf_docs
+
+
+def run(command, options):
+    results = []
+
+    def mesurer(nom, encodeur, document):
+        contenu = encodeur(document)
+        results.append({'name': nom, 'bytes': len(contenu), **latency_summary(timed(lambda: encodeur(document), options['repeat']))})
+        command.stdout.write(command.format_result(results[-1]))
+
+    with bench_database(options['database'], options['keepdb'], options['rendezvous'],
+                        options['contacts'], options['seed']):
+        django_docs, drf_docs = documents(options['lignes'])
+
+    encodeurs_django = {
+        'json': lambda d: json.dumps(d, cls=DjangoJSONEncoder).encode(),
+        'fast': dumps_django,
+        'compact': dumps,
+    }
+    encodeurs_drf = {
+        'json': JSONRenderer().render,
+        'fast': FastJSONRenderer().render,
+    }
+    for nom, document in django_docs.items():
+        for encodeur, fonction in encodeurs_django.items():
+            mesurer(f'{nom}:{encodeur}', fonction, document)
+    for nom, document in drf_docs.items():
+        for encodeur, fonction in encodeurs_drf.items():
+            mesurer(f'{nom}:{encodeur}', fonction, document)
+
+    params = {key: options[key] for key in ('rendezvous', 'seed', 'repeat', 'lignes')}
+    params['orjson'] = getattr(orjson, '__version__', None)
+    return {'params': params, 'results': results}
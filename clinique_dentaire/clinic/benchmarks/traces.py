@@ -0,0 +1,87 @@
+# ==========================================
+# TRACES.PY - Surcoût des traces selon le taux d'échantillonnage
+# ==========================================
+"""
+Latence des endpoints publics selon settings.TRACES :
+
+    sans : TraceMiddleware désactivé
+    0.05 : une requête sur vingt mesurée (valeur par défaut en production)
+    1.0  : toutes les requêtes mesurées
+
+Les spans sont exportés en JSON lines dans un fichier temporaire, par le
+thread d'arrière-plan comme en production ; la file est vidée entre deux
+niveaux pour que l'export de l'un ne ralentisse pas le suivant.
+"""
+import os
+import tempfile
+
+from django.conf import settings
+from django.test.utils import override_settings
+
+from clinic import traces
+from clinic.handlers import RoutingWSGIHandler
+
+from .base import add_database_arguments, bench_database, latency_summary
+from .endpoints import ENDPOINTS, Payloads, call, make_environ, quiet_logging
+
+
+def add_arguments(parser):
+    add_database_arguments(parser, rendezvous=0, contacts=0)
+    parser.add_argument('--requests', type=int, default=1000, help='Requêtes mesurées par endpoint et niveau')
+    parser.add_argument('--warmup', type=int, default=20, help='Requêtes de chauffe (non mesurées)')
+    parser.add_argument('--echantillons', type=float, nargs='+', default=[0.05, 1.0],
+                        help="Taux d'échantillonnage comparés à l'absence de traces")
+    parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS))
+
+
+def _spans(chemin):
+    if not os.path.exists(chemin):
+        return 0
+    with open(chemin, 'rb') as fichier:
+        return sum(1 for _ in fichier)
+
+
+def run(command, options):
+    results = []
+    niveaux = [None, *options['echantillons']]
+    with tempfile.TemporaryDirectory() as dossier, bench_database(
+        options['database'], options['keepdb'], options['rendezvous'], options['contacts'], options['seed']
+    ):
+        for echantillon in niveaux:
+            chemin = os.path.join(dossier, f'traces-{echantillon}.jsonl')
+            overrides = {
+                'EMAIL_BACKEND': 'clinic.traces.EmailBackend',
+                'EMAIL_BACKEND_ENVOI': 'django.core.mail.backends.locmem.EmailBackend',
+                'DEBUG': False,
+                'QUERY_INSPECTOR': {**getattr(settings, 'QUERY_INSPECTOR', {}), 'ENABLED': False},
+                'TRACES': {
+                    'ENABLED': echantillon is not None, 'ECHANTILLON': echantillon or 0.0,
+                    'EXPORT': 'jsonl', 'FICHIER': chemin,
+                },
+            }
+            with override_settings(**overrides), quiet_logging():
+                # Exporteur créé d'après la configuration de ce niveau
+                traces._exporteur = None
+                application = RoutingWSGIHandler()
+                payloads = Payloads()
+                for name in options['endpoints']:
+                    for _ in range(options['warmup']):
+                        call(application, make_environ(name, payloads))
+                    latences, erreurs = [], 0
+                    for _ in range(options['requests']):
+                        status, duree = call(application, make_environ(name, payloads))
+                        latences.append(duree)
+                        erreurs += status >= 400
+                    results.append({
+                        'name': f"{name}:{'sans' if echantillon is None else echantillon}",
+                        'errors': erreurs,
+                        **latency_summary(latences),
+                    })
+                    command.stdout.write(command.format_result(results[-1]))
+                if traces._exporteur is not None:
+                    traces._exporteur.vider()
+                    command.stdout.write(f'  {_spans(chemin)} spans exportés, {traces._exporteur.abandonnees} traces abandonnées')
+        traces._exporteur = None
+
+    params = {key: options[key] for key in ('requests', 'warmup', 'echantillons', 'endpoints')}
+    return {'params': params, 'results': results}
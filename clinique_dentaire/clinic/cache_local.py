@@ -0,0 +1,84 @@
+# ==========================================
+# CACHE_LOCAL.PY - Données compilées gardées en mémoire par processus
+# ==========================================
+"""
+Certaines données changent rarement mais sont lues à chaque requête (sites,
+calendrier d'ouverture) : elles sont compilées une fois et gardées en mémoire
+dans chaque processus, sans requête ni aller-retour réseau à la lecture.
+
+Une modification faite dans un processus y invalide immédiatement la donnée,
+et publie une nouvelle version dans le cache ; les autres processus comparent
+leur version à celle-ci au plus toutes les CACHE_LOCAL_CONTROLE_SECONDES et
+recompilent si elle a changé.
+
+Cela suppose un cache partagé entre les processus (Redis : REDIS_URL). Avec
+le cache par défaut en mémoire locale (LocMemCache, un par processus), les
+autres processus ne voient pas la nouvelle version : les valeurs sont alors
+simplement recompilées toutes les CACHE_LOCAL_CONTROLE_SECONDES, ce qui
+garde le même délai maximal. Un déploiement à plusieurs processus sans cache
+partagé est signalé au démarrage (checks.py).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def cache_partage():
+    """False si le cache par défaut est propre à chaque processus (mémoire locale, factice)"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+class CacheLocal:
+    """
+    Valeurs compilées par `compiler(cle)`, gardées en mémoire par clé.
+
+    `perime(valeur)` permet d'écarter une valeur devenue fausse sans
+    modification (ex. calendrier d'hier).
+    """
+
+    def __init__(self, nom, compiler, perime=None):
+        self.cle_version = f'{nom}:version'
+        self.compiler = compiler
+        self.perime = perime
+        self._valeurs = {}
+        self._version = None
+        self._verifie_le = None
+        self._verrou = threading.Lock()
+
+    def _verifier_version(self):
+        maintenant = time.monotonic()
+        if self._verifie_le is not None and maintenant - self._verifie_le < settings.CACHE_LOCAL_CONTROLE_SECONDES:
+            return
+        version = cache.get(self.cle_version)
+        if version != self._version or not cache_partage():
+            # Sans cache partagé, les modifications des autres processus sont invisibles :
+            # les valeurs expirent à chaque contrôle
+            self._valeurs = {}
+            self._version = version
+        self._verifie_le = maintenant
+
+    def _valide(self, valeur):
+        return valeur is not None and not (self.perime and self.perime(valeur))
+
+    def get(self, cle=None):
+        self._verifier_version()
+        valeur = self._valeurs.get(cle)
+        if self._valide(valeur):
+            return valeur
+        with self._verrou:
+            # Une seule compilation si plusieurs threads constatent l'absence en même temps
+            valeur = self._valeurs.get(cle)
+            if not self._valide(valeur):
+                valeur = self.compiler(cle)
+                self._valeurs = {**self._valeurs, cle: valeur}
+            return valeur
+
+    def invalider(self):
+        """Écarte les valeurs compilées, dans ce processus et (via le cache partagé s'il y en a un) dans les autres"""
+        self._version = time.time_ns()
+        self._valeurs = {}
+        cache.set(self.cle_version, self._version, None)
@@ -0,0 +1,133 @@
+# ==========================================
+# CALENDRIER.PY - Jours d'ouverture de la clinique
+# ==========================================
+"""
+Les jours réservables de chaque clinique sont compilés en une table de bits
+couvrant les HORIZON_JOURS prochains jours, à partir de ses horaires
+hebdomadaires (Horaire.ferme) et des fermetures (Fermeture : congés du site,
+jours fériés communs à tous les sites) :
+
+    bit i = 1  <=>  la clinique est ouverte le jour (origine + i)
+
+Les tables sont gardées en mémoire dans chaque processus (cache_local.py) :
+la validation d'une date ne fait ni requête ni parcours, seulement un
+décalage de bits. Elles sont recompilées au changement de jour, et après une
+modification des horaires ou des fermetures (signals.py), dans ce processus
+immédiatement et dans les autres au plus CACHE_LOCAL_CONTROLE_SECONDES après.
+"""
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache_local import CacheLocal
+from .models import Fermeture, Horaire
+
+# Période réservable (mêmes bornes que la validation des rendez-vous)
+HORIZON_JOURS = 180
+
+# Jours de la semaine fermés quand aucun Horaire n'est saisi pour eux
+FERMES_PAR_DEFAUT = {6}  # dimanche
+
+
+class Calendrier:
+    """Table de bits des jours ouverts, compilée pour [origine, origine + HORIZON_JOURS]"""
+
+    def __init__(self, origine, jours_fermes, fermetures):
+        self.origine = origine
+        self.fin = origine + timedelta(days=HORIZON_JOURS)
+        self.jours_fermes = frozenset(jours_fermes)
+        self.fermetures = list(fermetures)
+        self.motifs = {}
+        bits = 0
+        for i in range(HORIZON_JOURS + 1):
+            jour = origine + timedelta(days=i)
+            motif = self._motif(jour)
+            if motif is None:
+                bits |= 1 << i
+            else:
+                self.motifs[jour] = motif
+        self.bits = bits
+
+    def _motif(self, jour):
+        """Raison de la fermeture de `jour`, ou None s'il est ouvert (calcul complet)"""
+        for fermeture in self.fermetures:
+            if _couvre(fermeture, jour):
+                return fermeture.motif
+        if jour.weekday() in self.jours_fermes:
+            return f"fermeture du {dict(Horaire.JOURS_SEMAINE)[jour.weekday()].lower()}"
+        return None
+
+    def est_ouvert(self, jour):
+        decalage = (jour - self.origine).days
+        if 0 <= decalage <= HORIZON_JOURS:
+            return bool(self.bits >> decalage & 1)
+        # Hors de la table (rare : date passée ou lointaine) : calcul complet
+        return self._motif(jour) is None
+
+    def motif(self, jour):
+        if 0 <= (jour - self.origine).days <= HORIZON_JOURS:
+            return self.motifs.get(jour)
+        return self._motif(jour)
+
+    def bitmap(self):
+        """Table sous forme de texte : un caractère '1' (ouvert) ou '0' par jour, depuis l'origine"""
+        return ''.join('1' if self.bits >> i & 1 else '0' for i in range(HORIZON_JOURS + 1))
+
+
+def _couvre(fermeture, jour):
+    if not fermeture.annuelle:
+        return fermeture.date_debut <= jour <= fermeture.date_fin
+    # Fermeture annuelle : comparée en (mois, jour), y compris à cheval sur deux années
+    debut = (fermeture.date_debut.month, fermeture.date_debut.day)
+    fin = (fermeture.date_fin.month, fermeture.date_fin.day)
+    cle = (jour.month, jour.day)
+    if debut <= fin:
+        return debut <= cle <= fin
+    return cle >= debut or cle <= fin
+
+
+def compiler(clinique_id, origine=None):
+    """Compile le calendrier d'une clinique depuis la base (deux requêtes)"""
+    origine = origine or timezone.localdate()
+    fin = origine + timedelta(days=HORIZON_JOURS)
+    horaires = dict(Horaire.objects.filter(clinique_id=clinique_id).values_list('jour', 'ferme'))
+    jours_fermes = {
+        jour for jour, _ in Horaire.JOURS_SEMAINE
+        if horaires.get(jour, jour in FERMES_PAR_DEFAUT)
+    }
+    fermetures = Fermeture.objects.filter(
+        Q(clinique_id=clinique_id) | Q(clinique__isnull=True),
+        Q(annuelle=True) | Q(date_fin__gte=origine, date_debut__lte=fin),
+    )
+    return Calendrier(origine, jours_fermes, fermetures)
+
+
+# Calendrier de la veille écarté au changement de jour
+_calendriers = CacheLocal(
+    'calendrier', compiler, perime=lambda cal: cal.origine != timezone.localdate(),
+)
+
+
+def calendrier(clinique_id):
+    """Calendrier de la clinique, gardé en mémoire par le processus"""
+    return _calendriers.get(clinique_id)
+
+
+def invalider_calendrier():
+    """Force la recompilation de tous les sites, dans ce processus et dans les autres (voir cache_local.py)"""
+    _calendriers.invalider()
+
+
+def est_ouvert(jour, clinique_id):
+    return calendrier(clinique_id).est_ouvert(jour)
+
+
+def prochain_jour_ouvert(jour, clinique_id):
+    """Premier jour ouvert à partir de `jour` inclus (None si aucun dans l'horizon)"""
+    cal = calendrier(clinique_id)
+    for i in range(HORIZON_JOURS + 1):
+        candidat = jour + timedelta(days=i)
+        if cal.est_ouvert(candidat):
+            return candidat
+    return None
@@ -0,0 +1,87 @@
+# ==========================================
+# CAPACITE.PY - Quotas journaliers par service
+# ==========================================
+"""
+Un service peut limiter le nombre de rendez-vous par jour
+(Service.capacite_journaliere). La table OccupationJournaliere compte les
+places prises par (service, jour souhaité) :
+
+    création d'un rendez-vous  -> OccupationManager.reserver : UPDATE conditionnel
+                                  (reservations < capacité), CapaciteAtteinte sinon
+    annulation, changement de
+    service ou de date         -> place rendue / déplacée sans contrôle (signals.py)
+    suppression                -> place rendue pour les jours à venir (suivre_delete)
+
+Les jours passés ne sont plus réservables : supprimer (archiver, purger) un
+rendez-vous passé ne touche pas aux compteurs. `rebuild_occupation`
+recalcule les compteurs.
+"""
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import OccupationJournaliere, RendezVous
+
+
+def deplacer_places(mouvements):
+    """
+    Applique un lot de mouvements (place avant, place après), chaque place
+    étant (service_id, jour) ou None ; une mise à jour par compteur touché.
+    """
+    deltas = {}
+    for avant, apres in mouvements:
+        if avant == apres:
+            continue
+        if avant is not None:
+            deltas[avant] = deltas.get(avant, 0) - 1
+        if apres is not None:
+            deltas[apres] = deltas.get(apres, 0) + 1
+    for (service_id, jour), delta in deltas.items():
+        if delta:
+            OccupationJournaliere.objects.ajuster(service_id, jour, delta)
+
+
+def suivre_delete(queryset, executer):
+    """
+    Exécute queryset.delete() (`executer`) en rendant les places des
+    rendez-vous supprimés non annulés, à partir d'aujourd'hui (un GROUP BY
+    avant la suppression, dans la même transaction).
+    """
+    with transaction.atomic(using=queryset.db):
+        places = list(
+            queryset.filter(date_souhaitee__gte=timezone.localdate())
+            .exclude(statut='cancelled')
+            .values_list('service_id', 'date_souhaitee')
+            .annotate(nombre=Count('id'))
+            .order_by()
+        )
+        resultat = executer()
+        for service_id, jour, nombre in places:
+            OccupationJournaliere.objects.ajuster(service_id, jour, -nombre)
+    return resultat
+
+
+def rebuild_occupation(depuis=None):
+    """
+    Recalcule les compteurs à partir des rendez-vous non annulés.
+
+    Seuls les jours à partir de `depuis` (aujourd'hui par défaut) sont
+    recalculés : les jours passés ne sont plus réservables. Renvoie le
+    nombre de compteurs écrits.
+    """
+    depuis = depuis or timezone.localdate()
+    agregats = (
+        RendezVous.objects.filter(date_souhaitee__gte=depuis)
+        .exclude(statut='cancelled')
+        .values_list('service_id', 'date_souhaitee')
+        .annotate(nombre=Count('id'))
+        .order_by()
+    )
+    compteurs = [
+        OccupationJournaliere(service_id=service_id, jour=jour, reservations=nombre)
+        for service_id, jour, nombre in agregats
+    ]
+    with transaction.atomic():
+        OccupationJournaliere.objects.filter(jour__gte=depuis).delete()
+        OccupationJournaliere.objects.bulk_create(compteurs, batch_size=1000)
+    return len(compteurs)
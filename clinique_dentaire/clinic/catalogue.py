@@ -0,0 +1,80 @@
+# ==========================================
+# CATALOGUE.PY - Cache des réponses du catalogue (services, équipe, horaires)
+# ==========================================
+"""
+Les endpoints du catalogue changent rarement et sont les plus sollicités :
+leur réponse est mise en cache avec ses variantes gzip/Brotli, compressées
+une seule fois au remplissage du cache au lieu de l'être à chaque requête.
+
+Chaque site (request.clinique, voir sites.py) a ses propres entrées ; elles
+sont invalidées par signaux à chaque modification d'un service, d'un
+dentiste ou d'un horaire du site (voir signals.py).
+
+L'invalidation n'atteint tous les processus qu'à travers un cache partagé
+(REDIS_URL), requis dès que l'application tourne sur plusieurs processus.
+Avec le cache en mémoire locale, chaque processus garde sa propre copie :
+les entrées n'y sont gardées que CACHE_LOCAL_CONTROLE_SECONDES, délai
+maximal avant qu'une modification soit vue partout (voir cache_local.py).
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .cache_local import cache_partage
+from .compression import compress_variants
+
+# Version dans la clé : changée quand le format des réponses en cache change
+PREFIXE = 'catalogue:v2:'
+
+# Modèle modifié -> réponses du catalogue à invalider
+DEPENDANCES = {
+    'service': ('services',),
+    'dentiste': ('equipe',),
+    'horaire': ('horaires',),
+}
+
+
+def cache_key(nom, clinique_id):
+    return f'{PREFIXE}{clinique_id}:{nom}'
+
+
+def duree_cache():
+    """Durée de conservation des réponses, courte si le cache est propre à chaque processus"""
+    if cache_partage():
+        return settings.CATALOGUE_CACHE_SECONDES
+    return min(settings.CATALOGUE_CACHE_SECONDES, settings.CACHE_LOCAL_CONTROLE_SECONDES)
+
+
+def cached_catalogue(nom):
+    """Met en cache la réponse GET de la vue, avec ses variantes compressées"""
+    def decorateur(vue):
+        @wraps(vue)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return vue(request, *args, **kwargs)
+            cle = cache_key(nom, getattr(request.clinique, 'pk', None))
+            entree = cache.get(cle)
+            if entree is None:
+                reponse = vue(request, *args, **kwargs)
+                if reponse.status_code != 200:
+                    return reponse
+                entree = {
+                    'content': reponse.content,
+                    'content_type': reponse['Content-Type'],
+                    'variants': compress_variants(reponse.content),
+                }
+                cache.set(cle, entree, duree_cache())
+            reponse = HttpResponse(entree['content'], content_type=entree['content_type'])
+            reponse.compressed_variants = entree['variants']
+            return reponse
+        return wrapper
+    return decorateur
+
+
+def invalidate_catalogue(model_name, clinique_id):
+    """Supprime du cache les réponses du site qui dépendent du modèle `model_name`"""
+    noms = DEPENDANCES.get(model_name, ())
+    if noms:
+        cache.delete_many([cache_key(nom, clinique_id) for nom in noms])
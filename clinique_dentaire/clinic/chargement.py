@@ -0,0 +1,36 @@
+# ==========================================
+# CHARGEMENT.PY - Chargement différé des vues
+# ==========================================
+"""
+Les workers sont recyclés souvent : chaque import fait au chargement des URLs
+retarde la première réponse de chaque nouveau processus.
+
+vue_differee() inscrit une vue dans urls.py sans importer son module ; le
+module (et ses dépendances, DRF pour clinic/api.py) n'est importé qu'au
+premier appel de la vue, puis la vue est gardée pour les appels suivants.
+"""
+from django.utils.module_loading import import_string
+
+
+def vue_differee(chemin, csrf_exempt=False, **initkwargs):
+    """
+    Vue importée au premier appel.
+
+    `chemin` désigne une vue fonction ('clinic.views.home') ou une vue classe
+    ('clinic.api.PrendreRendezVousView', instanciée par as_view(**initkwargs)).
+    `csrf_exempt` doit refléter la vue réelle : CsrfViewMiddleware lit cet
+    attribut avant l'appel, donc avant l'import (True pour les APIView de DRF).
+    """
+    vue = None
+
+    def appel(request, *args, **kwargs):
+        nonlocal vue
+        if vue is None:
+            cible = import_string(chemin)
+            vue = cible.as_view(**initkwargs) if hasattr(cible, 'as_view') else cible
+        return vue(request, *args, **kwargs)
+
+    appel.__name__ = appel.__qualname__ = chemin.rsplit('.', 1)[-1]
+    appel.__module__ = chemin.rsplit('.', 1)[0]
+    appel.csrf_exempt = csrf_exempt
+    return appel
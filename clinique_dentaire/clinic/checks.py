@@ -0,0 +1,27 @@
+# ==========================================
+# CHECKS.PY - Contrôles de configuration au démarrage (manage.py check)
+# ==========================================
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .cache_local import cache_partage
+
+
+@register()
+def cache_partage_en_production(app_configs, **kwargs):
+    """
+    Les données compilées par processus (cache_local.py) et les réponses du
+    catalogue (catalogue.py) ne sont invalidées dans tous les processus qu'à
+    travers un cache partagé.
+    """
+    if settings.DEBUG or cache_partage():
+        return []
+    return [Warning(
+        "Cache propre à chaque processus (mémoire locale) hors DEBUG.",
+        hint=(
+            "Avec plusieurs processus (gunicorn --workers), définir REDIS_URL : sans cache partagé, "
+            "une modification du catalogue, des sites ou des médias n'est vue par les autres processus "
+            "qu'après CACHE_LOCAL_CONTROLE_SECONDES."
+        ),
+        id='clinic.W001',
+    )]
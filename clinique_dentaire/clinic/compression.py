@@ -0,0 +1,124 @@
+# ==========================================
+# COMPRESSION.PY - Compression des réponses (gzip, Brotli)
+# ==========================================
+"""
+CompressionMiddleware compresse les réponses textuelles (HTML, JSON, ...)
+selon l'en-tête Accept-Encoding : Brotli si le module `brotli` est installé
+et accepté par le client, sinon gzip. Les réponses plus petites que
+settings.COMPRESSION_TAILLE_MIN partent telles quelles.
+
+Une vue peut fournir ses variantes déjà compressées dans l'attribut
+`compressed_variants` ({'br': bytes, 'gzip': bytes}) : le middleware les
+utilise sans recompresser (voir catalogue.py pour les réponses en cache).
+
+Seules les réponses publiques sont compressées : pas celles qui portent un
+jeton CSRF ou dépendent du cookie de session (admin, formulaires), dont la
+taille compressée trahirait le secret à un attaquant capable d'injecter du
+texte dans la page (BREACH, via le paramètre de recherche `q` par exemple).
+"""
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # Brotli est optionnel : gzip seul
+    brotli = None
+
+# Encodages proposés, par ordre de préférence
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_TYPES_COMPRESSIBLES = re.compile(r'^(text/|application/(json|javascript|xml|[\w.+-]+\+(json|xml)))')
+_ACCEPT_ENCODING = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*')
+
+
+def choose_encoding(accept_encoding, disponibles=ENCODINGS):
+    """Meilleur encodage de `disponibles` accepté par le client (q > 0), ou None"""
+    qualites = {}
+    for element in accept_encoding.split(','):
+        correspondance = _ACCEPT_ENCODING.fullmatch(element)
+        if not correspondance:
+            continue
+        nom, q = correspondance.group(1).lower(), correspondance.group(2)
+        try:
+            qualites[nom] = float(q) if q is not None else 1.0
+        except ValueError:
+            continue
+    meilleur, meilleure_q = None, 0.0
+    for encodage in disponibles:
+        q = qualites.get(encodage, qualites.get('*', 0.0))
+        if q > meilleure_q:
+            meilleur, meilleure_q = encodage, q
+    return meilleur
+
+
+def compress(contenu, encodage):
+    if encodage == 'br':
+        return brotli.compress(contenu, quality=BROTLI_QUALITY)
+    return gzip.compress(contenu, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_variants(contenu):
+    """Toutes les variantes compressées d'un contenu, à stocker avec lui en cache"""
+    if len(contenu) < settings.COMPRESSION_TAILLE_MIN:
+        return {}
+    return {encodage: compress(contenu, encodage) for encodage in ENCODINGS}
+
+
+def contient_secret(request, response):
+    """
+    Vrai si la réponse peut contenir un secret : jeton CSRF produit pour la
+    requête (get_token), ou contenu propre au visiteur (Vary: Cookie, posé par
+    les sessions et le cookie CSRF).
+    """
+    if request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+        return True
+    return 'cookie' in (champ.strip().lower() for champ in response.get('Vary', '').split(','))
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compression gzip/Brotli négociée par Accept-Encoding, au-delà d'un seuil de taille, des réponses publiques"""
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or not _TYPES_COMPRESSIBLES.match(response.get('Content-Type', ''))
+            or contient_secret(request, response)
+        ):
+            return response
+
+        variantes = getattr(response, 'compressed_variants', None)
+        if not variantes and len(response.content) < settings.COMPRESSION_TAILLE_MIN:
+            return response
+
+        # La réponse dépend désormais d'Accept-Encoding, compressée ou non
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encodage = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encodage is None:
+            return response
+
+        if variantes:
+            compresse = variantes.get(encodage)
+            if compresse is None:
+                return response
+        else:
+            compresse = compress(response.content, encodage)
+            if len(compresse) >= len(response.content):
+                return response
+
+        response.content = compresse
+        response['Content-Length'] = str(len(compresse))
+        response['Content-Encoding'] = encodage
+        # Un ETag fort désigne la représentation non compressée
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
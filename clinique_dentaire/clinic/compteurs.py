@@ -0,0 +1,194 @@
+# ==========================================
+# COMPTEURS.PY - Compteurs de l'équipe (messages non lus, rendez-vous en attente)
+# ==========================================
+"""
+Les compteurs affichés à l'équipe (en-tête de l'admin, /api/compteurs/) sont
+lus dans la table Compteur, une ligne par site et par compteur, au lieu d'un
+COUNT(*) par page. Chaque modèle suivi déclare ses compteurs
+(SuiviCompteursMixin.COMPTEURS : nom -> condition (champ, valeur)).
+
+Ils sont tenus à jour au fil des écritures :
+
+    - save()                      : signal post_save (signals.py), par
+                                    comparaison avec l'état lu en base
+    - queryset.update() / delete(): CompteursQuerySet, qui compte les lignes
+                                    touchées par site avant d'écrire
+    - instance.delete()           : SuiviCompteursMixin.delete
+
+Pas de signal post_delete : il ferait perdre aux suppressions en lot
+(archivage) leur DELETE direct. Les écritures qui contournent ces chemins
+(SQL brut, seed, suppressions en cascade) sont rattrapées par la commande
+`rebuild_compteurs`, à planifier régulièrement.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.urls import reverse
+
+from .models import Compteur, Contact, RendezVous
+
+MODELES = (Contact, RendezVous)
+
+# Libellé et liste filtrée de l'admin de chaque compteur
+AFFICHAGE = {
+    'contacts_non_lus': ("Messages non lus", 'admin:clinic_contact_changelist', 'lu__exact=0'),
+    'contacts_non_traites': ("Messages non traités", 'admin:clinic_contact_changelist', 'traite__exact=0'),
+    'rendezvous_en_attente': ("Rendez-vous en attente", 'admin:clinic_rendezvous_changelist', 'statut__exact=pending'),
+}
+
+
+def ajuster(clinique_id, nom, delta):
+    """Ajoute `delta` à un compteur par un UPDATE atomique, en créant la ligne au besoin"""
+    if clinique_id is None or not delta:
+        return
+    lignes = Compteur.objects.filter(clinique_id=clinique_id, nom=nom)
+    if lignes.update(valeur=F('valeur') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            Compteur.objects.create(clinique_id=clinique_id, nom=nom, valeur=delta)
+    except IntegrityError:
+        # Ligne créée entre-temps par une écriture concurrente
+        lignes.update(valeur=F('valeur') + delta)
+
+
+def appliquer(deltas):
+    """`deltas` : {(clinique_id, nom): delta}, une mise à jour par compteur touché"""
+    for (clinique_id, nom), delta in deltas.items():
+        ajuster(clinique_id, nom, delta)
+
+
+# ==========================================
+# SUIVI DES ÉCRITURES
+# ==========================================
+
+def enregistrement(instance, created):
+    """Reporte un save() : compteurs quittés -1, compteurs rejoints +1"""
+    avant = frozenset() if created else getattr(instance, '_compteurs_initiaux', None)
+    apres = instance.compteurs_actifs()
+    instance._compteurs_initiaux = apres
+    if avant is None or avant == apres:
+        # État initial inconnu (champs différés) : laissé à la reconstruction
+        return
+    deltas = {(instance.clinique_id, nom): -1 for nom in avant - apres}
+    deltas.update({(instance.clinique_id, nom): 1 for nom in apres - avant})
+    appliquer(deltas)
+
+
+def suivre_suppression(instance):
+    avant = getattr(instance, '_compteurs_initiaux', None)
+    if avant is None:
+        avant = instance.compteurs_actifs()
+    appliquer({(instance.clinique_id, nom): -1 for nom in avant})
+
+
+def _par_site(queryset, compteurs):
+    """Lignes du queryset par site : total et nombre comptées dans chaque compteur (une requête)"""
+    return list(
+        queryset.order_by().values('clinique_id').annotate(
+            total=Count('pk'),
+            **{nom: Count('pk', filter=Q(**{champ: valeur})) for nom, (champ, valeur) in compteurs.items()},
+        )
+    )
+
+
+def suivre_update(queryset, valeurs, executer):
+    """
+    Exécute queryset.update(**valeurs) (`executer`) en reportant son effet sur les compteurs.
+
+    Les lignes sont comptées par site avant l'UPDATE, dans la même
+    transaction ; sans champ suivi dans `valeurs`, l'UPDATE est exécuté seul.
+    """
+    compteurs = {
+        nom: condition for nom, condition in queryset.model.COMPTEURS.items() if condition[0] in valeurs
+    }
+    if not compteurs:
+        return executer()
+    with transaction.atomic(using=queryset.db):
+        groupes = _par_site(queryset, compteurs)
+        lignes = executer()
+        deltas, a_recompter = {}, set()
+        for groupe in groupes:
+            for nom, (champ, valeur) in compteurs.items():
+                nouvelle = valeurs[champ]
+                if hasattr(nouvelle, 'resolve_expression'):
+                    # Valeur calculée en base (F(), Case...) : résultat inconnu ici
+                    a_recompter.add(groupe['clinique_id'])
+                    continue
+                apres = groupe['total'] if nouvelle == valeur else 0
+                deltas[(groupe['clinique_id'], nom)] = apres - groupe[nom]
+        if lignes != sum(groupe['total'] for groupe in groupes):
+            # Lignes modifiées par ailleurs entre le comptage et l'UPDATE
+            a_recompter.update(groupe['clinique_id'] for groupe in groupes)
+        appliquer(deltas)
+        if a_recompter:
+            rebuild_compteurs(a_recompter)
+    return lignes
+
+
+def suivre_delete(queryset, executer):
+    """Exécute queryset.delete() (`executer`) en retirant des compteurs les lignes supprimées"""
+    compteurs = queryset.model.COMPTEURS
+    with transaction.atomic(using=queryset.db):
+        groupes = _par_site(queryset, compteurs)
+        resultat = executer()
+        appliquer({
+            (groupe['clinique_id'], nom): -groupe[nom]
+            for groupe in groupes for nom in compteurs
+        })
+    return resultat
+
+
+# ==========================================
+# LECTURE ET RECONSTRUCTION
+# ==========================================
+
+def valeurs(clinique=None):
+    """Compteurs d'un site (de tous les sites si `clinique` est None), en une requête"""
+    noms = [nom for model in MODELES for nom in model.COMPTEURS]
+    resultat = dict.fromkeys(noms, 0)
+    if clinique is not None:
+        resultat.update(Compteur.objects.filter(clinique=clinique).values_list('nom', 'valeur').order_by())
+    else:
+        resultat.update(Compteur.objects.values_list('nom').annotate(total=Sum('valeur')).order_by())
+    return resultat
+
+
+def badges(clinique=None):
+    """Compteurs avec libellé et lien vers la liste filtrée de l'admin"""
+    return [
+        {
+            'nom': nom,
+            'libelle': AFFICHAGE[nom][0],
+            'valeur': valeur,
+            'url': f'{reverse(AFFICHAGE[nom][1])}?{AFFICHAGE[nom][2]}',
+        }
+        for nom, valeur in valeurs(clinique).items()
+    ]
+
+
+def rebuild_compteurs(cliniques=None):
+    """
+    Recompte les compteurs à partir des lignes (un GROUP BY par modèle suivi).
+
+    Limité aux sites `cliniques` (identifiants) s'ils sont donnés. Renvoie le
+    nombre de compteurs écrits.
+    """
+    comptes = {}
+    for model in MODELES:
+        lignes = model.objects.filter(clinique__isnull=False)
+        if cliniques is not None:
+            lignes = lignes.filter(clinique_id__in=cliniques)
+        for groupe in _par_site(lignes, model.COMPTEURS):
+            for nom in model.COMPTEURS:
+                comptes[(groupe['clinique_id'], nom)] = groupe[nom]
+
+    with transaction.atomic():
+        existants = Compteur.objects.all()
+        if cliniques is not None:
+            existants = existants.filter(clinique_id__in=cliniques)
+        existants.delete()
+        Compteur.objects.bulk_create(
+            [Compteur(clinique_id=c, nom=nom, valeur=n) for (c, nom), n in comptes.items()],
+            batch_size=1000,
+        )
+    return len(comptes)
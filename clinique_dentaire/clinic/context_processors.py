@@ -0,0 +1,22 @@
+# ==========================================
+# CONTEXT_PROCESSORS.PY - Variables communes aux templates
+# ==========================================
+from django.utils.functional import SimpleLazyObject
+
+from .compteurs import badges
+
+
+def compteurs(request):
+    """
+    Compteurs de l'équipe pour l'en-tête de l'admin (templates/admin/base_site.html).
+
+    Évalués seulement si le template les affiche, et vides hors équipe : les
+    pages qui ne les utilisent pas ne font ni requête ni lecture de session.
+    """
+    def charger():
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_staff:
+            return []
+        return badges(getattr(request, 'clinique', None))
+
+    return {'compteurs_equipe': SimpleLazyObject(charger)}
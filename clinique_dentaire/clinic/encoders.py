@@ -0,0 +1,115 @@
+# ==========================================
+# ENCODERS.PY - Encodage JSON rapide (orjson, repli sur json)
+# ==========================================
+"""
+Encodage JSON des réponses : orjson s'il est installé, sinon le module json
+standard. Les octets produits sont ceux des encodeurs remplacés :
+
+    - vues Django (FastJsonResponse) : octets identiques à JsonResponse
+      (DjangoJSONEncoder, espaces après , et :, échappements \\uXXXX) ; le
+      module json standard est conservé, seule la conversion des Decimal,
+      dates et heures passe par l'aiguillage direct de django_default()
+    - API DRF (FastJSONRenderer, clinic/renderers.py) : règles de l'encodeur
+      DRF, et octets identiques à ceux du JSONRenderer (compact, UTF-8,
+      U+2028/U+2029 échappés), produits par orjson
+    - dumps() : JSON compact UTF-8 par orjson, pour les usages internes
+      (export des traces...) où le format des octets est libre
+
+orjson ne connaissant pas Decimal, ni le format de Django pour les dates et
+heures, ces types lui sont renvoyés (OPT_PASSTHROUGH_DATETIME) et confiés à
+la méthode default() de l'encodeur d'origine.
+
+Ce module n'importe pas DRF : les vues Django du catalogue l'utilisent sans
+charger rest_framework au premier appel.
+"""
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : repli sur json
+    orjson = None
+
+_DJANGO = DjangoJSONEncoder()
+
+
+def _django_datetime(o):
+    # Même rendu que DjangoJSONEncoder.default
+    r = o.isoformat()
+    if o.microsecond:
+        r = r[:23] + r[26:]
+    if r.endswith('+00:00'):
+        r = r[:-6] + 'Z'
+    return r
+
+
+def _django_time(o):
+    if o.utcoffset() is not None:
+        return _DJANGO.default(o)  # heure avec fuseau : refusée par DjangoJSONEncoder
+    r = o.isoformat()
+    return r[:12] if o.microsecond else r
+
+
+# Types les plus fréquents (colonnes des values()) traités sans la chaîne d'isinstance
+_RAPIDES = {
+    datetime.datetime: _django_datetime,
+    datetime.date: datetime.date.isoformat,
+    datetime.time: _django_time,
+    Decimal: str,
+}
+
+
+def django_default(o):
+    """DjangoJSONEncoder.default, avec un aiguillage direct pour les dates, heures et Decimal"""
+    conversion = _RAPIDES.get(type(o))
+    if conversion is not None:
+        return conversion(o)
+    return _DJANGO.default(o)
+
+_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def dumps(data, default=django_default):
+    """
+    Sérialise en JSON compact UTF-8 (bytes).
+
+    `default` convertit les types que le JSON ne connaît pas ; par défaut
+    celui de DjangoJSONEncoder.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=default, option=_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Cas que orjson refuse (entier hors 64 bits...) : même rendu par json
+            pass
+    return json.dumps(
+        data, default=default, ensure_ascii=False, separators=(',', ':'),
+    ).encode('utf-8')
+
+
+def dumps_django(data):
+    """Mêmes octets que JsonResponse (json.dumps avec DjangoJSONEncoder), en ASCII"""
+    return json.dumps(data, default=django_default).encode('ascii')
+
+
+def _echapper_separateurs(contenu):
+    """Comme JSONRenderer : séparateurs de ligne U+2028/U+2029 échappés pour JavaScript"""
+    return contenu.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJsonResponse(HttpResponse):
+    """JsonResponse encodé par dumps() (mêmes arguments que django.http.JsonResponse)"""
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                'In order to allow non-dict objects to be serialized set the '
+                'safe parameter to False.'
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps_django(data), **kwargs)
+
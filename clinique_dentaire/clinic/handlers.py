@@ -0,0 +1,115 @@
+# ==========================================
+# HANDLERS.PY - Chaîne de middlewares allégée pour l'API publique
+# ==========================================
+"""
+Les endpoints publics (catalogue, prise de rendez-vous, contact, liste
+d'attente) sont anonymes et renvoient du JSON : sessions, authentification,
+messages, CSRF et X-Frame-Options n'y servent à rien.
+
+L'application WSGI route donc chaque requête, selon son chemin, vers l'un de
+deux handlers Django chargés au démarrage :
+
+    settings.API_PUBLIQUE_PREFIXES  -> chaîne settings.MIDDLEWARE_API_PUBLIQUE
+    tout le reste (admin, API équipe) -> chaîne complète settings.MIDDLEWARE
+
+Le préfixe de site (/sites/<slug>/, voir sites.py) est ignoré pour ce choix.
+
+Seule l'application WSGI (wsgi.py) est routée : sous ASGI (asgi.py), toutes
+les requêtes passent par la chaîne complète.
+"""
+import logging
+
+import django
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler, get_path_info
+from django.utils.module_loading import import_string
+
+from .sites import separer_prefixe
+
+logger = logging.getLogger('django.request')
+
+
+class PublicApiHandler(WSGIHandler):
+    """WSGIHandler dont la chaîne est lue dans settings.MIDDLEWARE_API_PUBLIQUE"""
+
+    def load_middleware(self, is_async=False):
+        """
+        Comme BaseHandler.load_middleware (Django 4.2), pour la liste
+        settings.MIDDLEWARE_API_PUBLIQUE : la chaîne est construite directement,
+        sans toucher à settings.MIDDLEWARE, partagé par tous les threads.
+        """
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        get_response = self._get_response_async if is_async else self._get_response
+        handler = convert_exception_to_response(get_response)
+        handler_is_async = is_async
+        for middleware_path in reversed(settings.MIDDLEWARE_API_PUBLIQUE):
+            middleware = import_string(middleware_path)
+            middleware_can_sync = getattr(middleware, 'sync_capable', True)
+            middleware_can_async = getattr(middleware, 'async_capable', False)
+            if not middleware_can_sync and not middleware_can_async:
+                raise RuntimeError(
+                    f"Middleware {middleware_path} must have at least one of sync_capable/async_capable set to True."
+                )
+            elif not handler_is_async and middleware_can_sync:
+                middleware_is_async = False
+            else:
+                middleware_is_async = middleware_can_async
+            try:
+                adapted_handler = self.adapt_method_mode(
+                    middleware_is_async, handler, handler_is_async,
+                    debug=settings.DEBUG, name=f'middleware {middleware_path}',
+                )
+                mw_instance = middleware(adapted_handler)
+            except MiddlewareNotUsed as exc:
+                if settings.DEBUG:
+                    logger.debug(f"MiddlewareNotUsed({middleware_path!r}): {exc}")
+                continue
+            handler = adapted_handler
+
+            if mw_instance is None:
+                raise ImproperlyConfigured(f"Middleware factory {middleware_path} returned None.")
+
+            if hasattr(mw_instance, 'process_view'):
+                self._view_middleware.insert(0, self.adapt_method_mode(is_async, mw_instance.process_view))
+            if hasattr(mw_instance, 'process_template_response'):
+                self._template_response_middleware.append(
+                    self.adapt_method_mode(is_async, mw_instance.process_template_response)
+                )
+            if hasattr(mw_instance, 'process_exception'):
+                # Pile des exceptions toujours synchrone, comme dans Django
+                self._exception_middleware.append(self.adapt_method_mode(False, mw_instance.process_exception))
+
+            handler = convert_exception_to_response(mw_instance)
+            handler_is_async = middleware_is_async
+
+        # Assignée en dernier : sert d'indicateur de chargement terminé
+        self._middleware_chain = self.adapt_method_mode(is_async, handler, handler_is_async)
+
+
+class RoutingWSGIHandler:
+    """Aiguille les requêtes de l'API publique vers la chaîne allégée"""
+
+    def __init__(self):
+        self.complet = WSGIHandler()
+        self.public = PublicApiHandler()
+        self.prefixes = tuple(settings.API_PUBLIQUE_PREFIXES)
+
+    def handler_for(self, path):
+        _, path = separer_prefixe(path)
+        return self.public if path.startswith(self.prefixes) else self.complet
+
+    def __call__(self, environ, start_response):
+        return self.handler_for(get_path_info(environ))(environ, start_response)
+
+
+def get_wsgi_application():
+    """Comme django.core.wsgi.get_wsgi_application, avec le routage de l'API publique s'il est configuré"""
+    django.setup(set_prefix=False)
+    if getattr(settings, 'API_PUBLIQUE_PREFIXES', None):
+        return RoutingWSGIHandler()
+    return WSGIHandler()
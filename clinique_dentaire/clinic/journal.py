@@ -0,0 +1,205 @@
+# ==========================================
+# JOURNAL.PY - Historique des modifications (rendez-vous, messages de contact)
+# ==========================================
+"""
+Chaque création, modification ou suppression d'un modèle journalisé
+(JournalMixin, champs JOURNALISES) ajoute une ligne à JournalModification :
+champs modifiés avec leurs valeurs avant/après, auteur et origine.
+
+Les lignes ne sont pas écrites une à une : elles sont ajoutées, à la
+validation de la transaction (une modification annulée n'est pas
+journalisée), au tampon de la requête en cours, écrit en un seul
+bulk_create par JournalMiddleware à la fin de la requête. Le journal coûte
+donc au plus un INSERT par requête, quel que soit le nombre d'objets
+modifiés (actions groupées de l'admin comprises).
+
+Hors requête (commandes, shell), chaque modification est écrite à la
+validation de sa transaction, sauf dans un bloc `with tampon(...)`.
+
+Sont suivis : save() (signal post_save), instance.delete(), queryset.delete()
+(une ligne par objet supprimé, action « supprimer » de l'admin comprise :
+CompteursQuerySet, voir suivre_delete) et les changements de statut groupés
+(signal statuts_modifies, voir transitions.py). Les autres queryset.update()
+ne sont pas journalisés, ni la suppression des lignes déplacées par
+l'archivage (bloc `with deplacement()`, voir models.py).
+"""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .models import JournalModification
+
+logger = logging.getLogger(__name__)
+
+# Lignes en attente d'écriture (None hors tampon) et (auteur, origine) de la requête
+_tampon = ContextVar('journal_tampon', default=None)
+_contexte = ContextVar('journal_contexte', default=(None, ''))
+
+
+def ecrire(entrees):
+    """Écrit les lignes en une requête ; une erreur est consignée sans interrompre la réponse"""
+    if not entrees:
+        return
+    try:
+        JournalModification.objects.bulk_create(entrees, batch_size=500)
+    except Exception as e:
+        logger.error(f"Erreur écriture du journal ({len(entrees)} modifications): {e}")
+
+
+@contextmanager
+def tampon(auteur=None, origine=''):
+    """
+    Regroupe les lignes du journal jusqu'à la sortie du bloc.
+
+    `auteur` : nom d'utilisateur, ou fonction qui le renvoie (appelée à la
+    première modification seulement).
+    """
+    entrees = []
+    jeton_tampon = _tampon.set(entrees)
+    jeton_contexte = _contexte.set((auteur, origine))
+    try:
+        yield entrees
+    finally:
+        _tampon.reset(jeton_tampon)
+        _contexte.reset(jeton_contexte)
+        ecrire(entrees)
+
+
+def _ajouter(*nouvelles):
+    entrees = _tampon.get()
+    if entrees is None:
+        ecrire(list(nouvelles))
+    else:
+        entrees.extend(nouvelles)
+
+
+def _auteur_origine():
+    auteur, origine = _contexte.get()
+    if callable(auteur):
+        auteur = auteur() or ''
+        _contexte.set((auteur, origine))
+    return auteur or '', origine
+
+
+def _entree(model, clinique_id, pk, action, modifications):
+    auteur, origine = _auteur_origine()
+    return JournalModification(
+        clinique_id=clinique_id,
+        modele=model._meta.model_name,
+        objet_id=pk,
+        action=action,
+        modifications=modifications,
+        auteur=auteur[:150],
+        origine=origine[:200],
+        created_at=timezone.now(),
+    )
+
+
+def journaliser(instance, action, modifications, pk=None):
+    entree = _entree(instance, instance.clinique_id, instance.pk if pk is None else pk, action, modifications)
+    transaction.on_commit(lambda: _ajouter(entree))
+
+
+def enregistrement(instance, created):
+    """Reporte un save() : tous les champs à la création, les champs modifiés ensuite"""
+    apres = instance.etat_journal()
+    avant = {} if created else getattr(instance, '_journal_initial', None)
+    instance._journal_initial = apres
+    if avant is None:
+        # Instance non lue en base : état précédent inconnu
+        return
+    if created:
+        modifications = {champ: [None, valeur] for champ, valeur in apres.items() if valeur not in (None, '')}
+    else:
+        modifications = {
+            champ: [avant[champ], valeur]
+            for champ, valeur in apres.items() if champ in avant and avant[champ] != valeur
+        }
+    if created or modifications:
+        journaliser(instance, 'creation' if created else 'modification', modifications)
+
+
+def suppression(instance, pk):
+    journaliser(instance, 'suppression', {}, pk=pk)
+
+
+def suivre_delete(queryset, executer):
+    """
+    Exécute queryset.delete() (`executer`) en journalisant une suppression par
+    ligne, d'après les lignes lues avant le DELETE dans la même transaction.
+    """
+    with transaction.atomic(using=queryset.db):
+        lignes = list(queryset.order_by().values_list('pk', 'clinique_id'))
+        resultat = executer()
+        entrees = [_entree(queryset.model, clinique_id, pk, 'suppression', {}) for pk, clinique_id in lignes]
+        if entrees:
+            transaction.on_commit(lambda: _ajouter(*entrees), using=queryset.db)
+    return resultat
+
+
+# ==========================================
+# MIDDLEWARE ET LECTURE
+# ==========================================
+
+def _nom_utilisateur(request):
+    # Chaîne allégée (handlers.py) : pas d'utilisateur
+    user = getattr(request, 'user', None)
+    return user.get_username() if user is not None and user.is_authenticated else ''
+
+
+class JournalMiddleware:
+    """Un tampon par requête : lignes du journal écrites en un INSERT après la vue"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with tampon(lambda: _nom_utilisateur(request), f'{request.method} {request.path}'):
+            return self.get_response(request)
+
+
+def _rendu(champ, valeur, lies):
+    if valeur is None or valeur == '':
+        return '-'
+    if champ.is_relation:
+        return lies.get(champ.name, {}).get(valeur, valeur)
+    if champ.choices:
+        return dict(champ.flatchoices).get(valeur, valeur)
+    try:
+        # Dates enregistrées en texte ISO (DjangoJSONEncoder)
+        return champ.to_python(valeur)
+    except ValidationError:
+        return valeur
+
+
+def historique(model, pk):
+    """
+    Lignes du journal d'un objet, de la plus récente à la plus ancienne, avec
+    les libellés des champs et des objets liés (une requête par relation).
+    """
+    entrees = list(JournalModification.objects.filter(
+        modele=model._meta.model_name, objet_id=pk
+    ).order_by('-created_at', '-id'))
+
+    identifiants = {}
+    for entree in entrees:
+        for nom, valeurs in entree.modifications.items():
+            if model._meta.get_field(nom).is_relation:
+                identifiants.setdefault(nom, set()).update(v for v in valeurs if v is not None)
+    lies = {
+        nom: model._meta.get_field(nom).related_model.objects.in_bulk(ids)
+        for nom, ids in identifiants.items()
+    }
+
+    lignes = []
+    for entree in entrees:
+        changements = []
+        for nom, (avant, apres) in entree.modifications.items():
+            champ = model._meta.get_field(nom)
+            changements.append((champ.verbose_name, _rendu(champ, avant, lies), _rendu(champ, apres, lies)))
+        lignes.append({'entree': entree, 'changements': changements})
+    return lignes
@@ -0,0 +1,129 @@
+# ==========================================
+# LECTURE.PY - Sérialisation précompilée des réponses en lecture
+# ==========================================
+"""
+Les réponses en lecture (catalogue, rendez-vous renvoyés par l'API) n'ont
+besoin ni de validation ni des champs DRF, alors qu'un ModelSerializer
+construit ses champs à chaque instanciation puis appelle, pour chaque ligne,
+get_attribute() et to_representation() de chacun d'eux.
+
+Une classe Lecture déclare ses champs de sortie ; à la définition de la
+classe, chacun est résolu une fois pour toutes en colonne values_list()
+(chemin ORM) et en accesseur d'attribut (operator.attrgetter). Les lignes
+sont ensuite produites sans objet intermédiaire :
+
+    donnees(queryset) : tuples de values_list(), associés aux noms de sortie
+    objet(instance)   : accesseurs précompilés, pour une instance déjà chargée
+
+Les valeurs restent des types Python (Decimal, date, time) : leur rendu est
+celui de l'encodeur de la réponse (encoders.py, renderers.py), si bien que
+le JSON produit est identique à celui des .values() et des ModelSerializer
+remplacés. Ce module n'importe pas DRF.
+"""
+from operator import attrgetter
+
+from django.db import models
+
+from .models import Dentiste, Horaire, ListeAttente, RendezVous, Service
+
+
+def _attribut(model, chemin):
+    """Chemin ORM ('service__nom') -> chemin d'attribut ('service.nom') donnant la valeur de values_list()"""
+    *relations, nom = chemin.split('__')
+    attributs = []
+    for relation in relations:
+        champ = model._meta.get_field(relation)
+        attributs.append(champ.name)
+        model = champ.related_model
+    champ = model._meta.get_field(nom)
+    # Clé étrangère : identifiant (service_id), fichier : nom stocké, comme values_list()
+    attributs.append(champ.attname)
+    if isinstance(champ, models.FileField):
+        attributs.append('name')
+    return '.'.join(attributs)
+
+
+class Lecture:
+    """
+    Sérialiseur de lecture : `champs` donne les clés de sortie, dans l'ordre ;
+    `sources` le chemin ORM des champs dont le nom diffère ('service_nom': 'service__nom').
+    """
+    model = None
+    champs = ()
+    sources = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.colonnes = tuple(cls.sources.get(nom, nom) for nom in cls.champs)
+        accesseur = attrgetter(*(_attribut(cls.model, colonne) for colonne in cls.colonnes))
+        # attrgetter à un seul attribut renvoie la valeur, pas un tuple
+        cls._valeurs = accesseur if len(cls.colonnes) > 1 else (lambda instance: (accesseur(instance),))
+
+    @classmethod
+    def lignes(cls, queryset):
+        """Tuples de valeurs, dans l'ordre de `champs` (une requête, sans instance de modèle)"""
+        return queryset.values_list(*cls.colonnes)
+
+    @classmethod
+    def donnees(cls, queryset):
+        noms = cls.champs
+        return [dict(zip(noms, ligne)) for ligne in cls.lignes(queryset)]
+
+    @classmethod
+    def objet(cls, instance):
+        return dict(zip(cls.champs, cls._valeurs(instance)))
+
+    @classmethod
+    def objets(cls, instances):
+        noms, valeurs = cls.champs, cls._valeurs
+        return [dict(zip(noms, valeurs(instance))) for instance in instances]
+
+
+# ==========================================
+# CATALOGUE (vues de views.py)
+# ==========================================
+
+class ServiceLecture(Lecture):
+    model = Service
+    champs = ('id', 'nom', 'description', 'prix_min', 'prix_max', 'duree_minutes', 'icone')
+
+
+class DentisteLecture(Lecture):
+    model = Dentiste
+    champs = ('id', 'nom', 'prenom', 'specialite', 'bio', 'photo', 'linkedin')
+
+
+class HoraireLecture(Lecture):
+    model = Horaire
+    champs = ('jour', 'ouverture_matin', 'fermeture_matin', 'ouverture_apres_midi', 'fermeture_apres_midi', 'ferme')
+
+
+# ==========================================
+# API DRF (réponses de api.py, mêmes clés que les serializers d'écriture)
+# ==========================================
+
+class RendezVousLecture(Lecture):
+    model = RendezVous
+    champs = (
+        'id', 'nom', 'prenom', 'telephone', 'email',
+        'date_souhaitee', 'service', 'service_nom', 'message', 'statut',
+    )
+    sources = {'service_nom': 'service__nom'}
+
+
+class RendezVousRecuLecture(RendezVousLecture):
+    """
+    Accusé de réception de la prise de rendez-vous publique : sans identifiant,
+    pour qu'un envoi mis en quarantaine (voir antispam.py) reçoive exactement
+    la même réponse qu'un rendez-vous enregistré.
+    """
+    champs = tuple(champ for champ in RendezVousLecture.champs if champ != 'id')
+
+
+class ListeAttenteLecture(Lecture):
+    model = ListeAttente
+    champs = (
+        'id', 'nom', 'prenom', 'telephone', 'email',
+        'date_souhaitee', 'service', 'service_nom', 'statut',
+    )
+    sources = {'service_nom': 'service__nom'}
@@ -0,0 +1,126 @@
+# ==========================================
+# LISTE_ATTENTE.PY - Attribution des créneaux libérés
+# ==========================================
+"""
+Quand un rendez-vous est annulé, son créneau est proposé à la plus ancienne
+demande en attente pour ce jour, parmi les services dont la durée tient dans
+le créneau libéré.
+
+L'index attente_file_idx (service, date_souhaitee, statut, created_at) sert
+de file de priorité par service : la tête de file de chaque service
+compatible est lue dans l'index (sous-requête corrélée, LIMIT 1 sans tri),
+puis la plus ancienne de ces têtes est retenue. Une seule requête, dont le
+coût dépend du nombre de services du site et non de la longueur des files.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import CapaciteAtteinte, ListeAttente, RendezVous, Service
+from .sites import site_de
+
+logger = logging.getLogger(__name__)
+
+
+def jour_du_creneau(rdv):
+    """Jour du créneau d'un rendez-vous : date confirmée si elle existe, sinon date souhaitée"""
+    if rdv.date_confirmee:
+        return timezone.localdate(rdv.date_confirmee)
+    return rdv.date_souhaitee
+
+
+def meilleur_candidat(service, jour, services_complets=()):
+    """
+    Plus ancienne demande en attente pour `jour`, sur le même site, dont le
+    service tient dans la durée de `service` (hors `services_complets`).
+    """
+    tete_de_file = ListeAttente.objects.filter(
+        service_id=OuterRef('pk'), date_souhaitee=jour, statut='waiting',
+    ).order_by('created_at', 'id').values('id')[:1]
+    tetes = Service.objects.filter(
+        clinique_id=service.clinique_id, duree_minutes__lte=service.duree_minutes,
+    ).exclude(pk__in=services_complets).values(tete=Subquery(tete_de_file))
+    return ListeAttente.objects.filter(id__in=tetes).order_by('created_at', 'id').first()
+
+
+def proposer_creneau(rdv):
+    """
+    Propose le créneau du rendez-vous annulé `rdv` à la meilleure demande en attente.
+
+    La demande est réservée par un UPDATE conditionnel (statut 'waiting'),
+    puis un rendez-vous 'pending' est créé pour elle et le patient prévenu
+    par email. Renvoie l'inscription servie, ou None.
+    """
+    jour = jour_du_creneau(rdv)
+    if jour < timezone.localdate():
+        return None
+
+    services_complets = set()
+    while True:
+        candidat = meilleur_candidat(rdv.service, jour, services_complets)
+        if candidat is None:
+            return None
+        try:
+            with transaction.atomic():
+                if not ListeAttente.objects.filter(pk=candidat.pk, statut='waiting').update(
+                    statut='offered', updated_at=timezone.now()
+                ):
+                    # Servie entre-temps par un autre créneau : candidat suivant
+                    continue
+                offre = RendezVous.objects.create(
+                    nom=candidat.nom,
+                    prenom=candidat.prenom,
+                    telephone=candidat.telephone,
+                    email=candidat.email,
+                    patient_id=candidat.patient_id,
+                    service_id=candidat.service_id,
+                    date_souhaitee=jour,
+                    date_confirmee=rdv.date_confirmee,
+                    message="Créneau libéré proposé depuis la liste d'attente",
+                )
+                ListeAttente.objects.filter(pk=candidat.pk).update(rendez_vous=offre)
+                candidat.statut, candidat.rendez_vous = 'offered', offre
+                transaction.on_commit(lambda: send_waitlist_offer(candidat, offre))
+        except CapaciteAtteinte:
+            # Quota du service demandé déjà atteint ce jour-là : l'inscription reste
+            # en attente, le créneau va au candidat suivant d'un autre service
+            logger.info(f"Créneau du RDV {rdv.id} non proposé à l'inscription {candidat.id} : quota atteint")
+            services_complets.add(candidat.service_id)
+            continue
+        logger.info(f"Créneau du RDV {rdv.id} proposé à l'inscription {candidat.id} (RDV {offre.id})")
+        return candidat
+
+
+def send_waitlist_offer(inscription, offre):
+    """Prévient le patient qu'un créneau s'est libéré"""
+    quand = (
+        timezone.localtime(offre.date_confirmee).strftime('%d/%m/%Y à %H:%M')
+        if offre.date_confirmee else offre.date_souhaitee.strftime('%d/%m/%Y')
+    )
+    site = site_de(offre)
+    message = f"""
+Bonjour {inscription.nom_complet},
+
+Un créneau s'est libéré le {quand} pour votre demande ({offre.service.nom}).
+
+Notre équipe vous contactera rapidement pour confirmer ce rendez-vous.
+Si vous n'êtes plus disponible, il vous suffit de nous le signaler au {site.telephone}.
+
+Cordialement,
+L'équipe de la {site.nom}
+"""
+    try:
+        send_mail(
+            f"Un créneau s'est libéré - {site.nom}",
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [inscription.email],
+            fail_silently=False,
+        )
+        logger.info(f"Proposition de créneau envoyée à {inscription.email}")
+    except Exception as e:
+        logger.error(f"Erreur envoi proposition de créneau: {e}")
@@ -0,0 +1,49 @@
+# ==========================================
+# ARCHIVE_RENDEZVOUS.PY - Archivage des anciens rendez-vous
+# ==========================================
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from clinic.archives import STATUTS_ARCHIVABLES, archive_rendezvous
+from clinic.models import RendezVous
+
+
+class Command(BaseCommand):
+    help = "Déplace les rendez-vous terminés ou annulés anciens vers la table d'archive, par petits lots"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jours', type=int, default=settings.ARCHIVE_RENDEZVOUS_APRES_JOURS,
+            help="Âge minimal (jours depuis la dernière modification) des rendez-vous archivés",
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Rendez-vous déplacés par transaction')
+        parser.add_argument('--pause', type=float, default=0.05, help='Pause en secondes entre deux lots')
+        parser.add_argument('--max-batches', type=int, default=None, help="Nombre maximal de lots pour cette exécution")
+        parser.add_argument('--dry-run', action='store_true', help="Affiche le nombre de rendez-vous concernés sans rien déplacer")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['jours'] < 0:
+            raise CommandError('--batch-size doit être positif et --jours ne peut pas être négatif.')
+
+        avant = timezone.now() - timedelta(days=options['jours'])
+
+        if options['dry_run']:
+            total = RendezVous.objects.filter(statut__in=STATUTS_ARCHIVABLES, updated_at__lt=avant).count()
+            self.stdout.write(f'{total} rendez-vous seraient archivés (modifiés avant le {avant:%d/%m/%Y}).')
+            return
+
+        def progression(lots, total):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'  lot {lots}: {total} rendez-vous archivés')
+
+        total = archive_rendezvous(
+            avant,
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            max_batches=options['max_batches'],
+            on_batch=progression,
+        )
+        self.stdout.write(self.style.SUCCESS(f'{total} rendez-vous archivés.'))
@@ -0,0 +1,30 @@
+# ==========================================
+# BACKFILL_PATIENTS.PY - Création des patients à partir de l'existant
+# ==========================================
+from django.core.management.base import BaseCommand, CommandError
+
+from clinic.models import Patient
+from clinic.patients import backfill_patients
+
+
+class Command(BaseCommand):
+    help = "Crée les patients (dédoublonnés par téléphone normalisé) et y rattache rendez-vous et contacts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Lignes traitées par transaction')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size doit être positif.')
+
+        def progression(model, dernier_id, total):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'  {model._meta.verbose_name_plural}: {total} rattachés (id {dernier_id})')
+
+        avant = Patient.objects.count()
+        totaux = backfill_patients(options['batch_size'], on_batch=progression)
+        crees = Patient.objects.count() - avant
+
+        for nom, total in totaux.items():
+            self.stdout.write(f'{nom}: {total} lignes rattachées')
+        self.stdout.write(self.style.SUCCESS(f'{crees} patients créés.'))
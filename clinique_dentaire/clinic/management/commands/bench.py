@@ -0,0 +1,44 @@
+# ==========================================
+# BENCH.PY - Lancement des benchmarks
+# ==========================================
+"""
+    python manage.py bench endpoints --requests 500 --concurrency 1 8
+    python manage.py bench endpoints --baseline bench_results/endpoints-20250101-120000.json
+
+Voir clinic/benchmarks pour la liste des scénarios.
+"""
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+
+from clinic.benchmarks import SCENARIOS
+from clinic.benchmarks.base import compare, format_result, write_results
+
+
+class Command(BaseCommand):
+    help = "Exécute un scénario de benchmark et écrit les résultats en JSON"
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='scenario', required=True)
+        for name, path in SCENARIOS.items():
+            module = import_module(path)
+            subparser = subparsers.add_parser(name, help=(module.__doc__ or '').strip().split('\n')[0])
+            subparser.add_argument('--output', default=None, help='Fichier JSON de résultats (défaut: bench_results/)')
+            subparser.add_argument('--baseline', default=None, help='Résultats précédents à comparer')
+            module.add_arguments(subparser)
+
+    def handle(self, *args, **options):
+        scenario = options['scenario']
+        module = import_module(SCENARIOS[scenario])
+        payload = module.run(self, options)
+
+        path = write_results(scenario, payload, options['output'])
+        self.stdout.write(self.style.SUCCESS(f'Résultats écrits dans {path}'))
+
+        if options['baseline']:
+            self.stdout.write(f"Comparaison avec {options['baseline']}:")
+            for line in compare(payload['results'], options['baseline']):
+                self.stdout.write(f'  {line}')
+
+    def format_result(self, result):
+        return format_result(result)
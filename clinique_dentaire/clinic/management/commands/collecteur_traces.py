@@ -0,0 +1,73 @@
+# ==========================================
+# COLLECTEUR_TRACES.PY - Collecteur OTLP local pour le développement
+# ==========================================
+"""
+    python manage.py collecteur_traces --port 4318 --fichier traces-otlp.jsonl
+
+Reçoit les traces envoyées par TRACES['EXPORT'] = 'otlp' (POST /v1/traces,
+OTLP/HTTP JSON), comme un collecteur OpenTelemetry, et écrit une ligne JSON
+par span. Sans --fichier, les spans sont affichés.
+"""
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+def spans_recus(corps):
+    """Spans d'une requête OTLP/JSON, avec le nom du service émetteur"""
+    for ressource in corps.get('resourceSpans', []):
+        attributs = {a['key']: a['value'] for a in ressource.get('resource', {}).get('attributes', [])}
+        service = attributs.get('service.name', {}).get('stringValue', '')
+        for portee in ressource.get('scopeSpans', []):
+            for s in portee.get('spans', []):
+                yield {'service': service, **s}
+
+
+class Command(BaseCommand):
+    help = "Collecteur OTLP/HTTP JSON minimal : écrit les spans reçus en JSON lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=4318)
+        parser.add_argument('--fichier', default=None, help='Fichier JSON lines des spans reçus (défaut : sortie standard)')
+
+    def handle(self, *args, **options):
+        commande = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != '/v1/traces':
+                    self.send_error(404)
+                    return
+                try:
+                    corps = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                    lignes = [json.dumps(s, ensure_ascii=False) for s in spans_recus(corps)]
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    self.send_error(400)
+                    return
+                commande.ecrire(lignes, options['fichier'])
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+            def log_message(self, format, *args):
+                pass
+
+        serveur = HTTPServer(('127.0.0.1', options['port']), Handler)
+        self.stdout.write(f"Collecteur de traces sur http://127.0.0.1:{options['port']}/v1/traces")
+        try:
+            serveur.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            serveur.server_close()
+
+    def ecrire(self, lignes, fichier):
+        if fichier:
+            with open(fichier, 'a', encoding='utf-8') as sortie:
+                sortie.writelines(f'{ligne}\n' for ligne in lignes)
+        else:
+            for ligne in lignes:
+                self.stdout.write(ligne)
@@ -0,0 +1,59 @@
+# ==========================================
+# ENTRAINER_ANTISPAM.PY - Entraînement du filtre anti-spam
+# ==========================================
+"""
+    python manage.py entrainer_antispam
+    python manage.py entrainer_antispam --fichier exemples.jsonl
+
+Exemples de spam : envois de la quarantaine confirmés par l'équipe.
+Exemples légitimes : envois libérés et derniers messages de contact reçus.
+--fichier ajoute des exemples, une ligne JSON par envoi :
+{"donnees": {"sujet": ..., "message": ..., "email": ...}, "spam": true}.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clinic.antispam import DOCUMENTS_MIN, compiler, enregistrer, entrainer, get_config
+from clinic.models import Contact, Quarantaine
+
+CHAMPS_CONTACT = ('nom', 'prenom', 'email', 'telephone', 'sujet', 'message')
+
+
+class Command(BaseCommand):
+    help = "Entraîne le filtre anti-spam (mots et expéditeurs) et l'enregistre dans settings.ANTISPAM['MODELE']"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fichier', action='append', default=[], help="Exemples supplémentaires (JSON lines, répétable)")
+        parser.add_argument('--contacts', type=int, default=5000, help="Derniers messages de contact pris comme exemples légitimes")
+        parser.add_argument('--sortie', default=None, help="Fichier du modèle (défaut : settings.ANTISPAM['MODELE'])")
+
+    def exemples(self, options):
+        for donnees, verdict in Quarantaine.objects.exclude(verdict='').values_list('donnees', 'verdict').iterator():
+            yield donnees, verdict == 'spam'
+        contacts = Contact.objects.order_by('-created_at').values(*CHAMPS_CONTACT)[:options['contacts']]
+        for donnees in contacts.iterator():
+            yield donnees, False
+        for chemin in options['fichier']:
+            try:
+                with open(chemin, encoding='utf-8') as fichier:
+                    for numero, ligne in enumerate(fichier, 1):
+                        if ligne.strip():
+                            exemple = json.loads(ligne)
+                            yield exemple['donnees'], bool(exemple['spam'])
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"{chemin}: exemple illisible ({e})")
+
+    def handle(self, *args, **options):
+        modele = entrainer(self.exemples(options))
+        documents = modele['documents']
+        enregistrer(modele, options['sortie'] or get_config()['MODELE'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Modèle enregistré : {documents['spam']} spams, {documents['legitime']} légitimes, "
+            f"{len(modele['mots'])} mots"
+        ))
+        if not compiler(modele).poids:
+            self.stdout.write(self.style.WARNING(
+                f"Moins de {DOCUMENTS_MIN} exemples de chaque classe : seule la liste des expéditeurs est appliquée."
+            ))
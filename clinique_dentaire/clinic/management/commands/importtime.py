@@ -0,0 +1,57 @@
+# ==========================================
+# IMPORTTIME.PY - Profil des imports au démarrage d'un worker
+# ==========================================
+"""
+    python manage.py importtime
+    python manage.py importtime --tri cumulative --limit 20 --filtre clinic rest_framework
+    python manage.py importtime --module clinic.api --paquets
+
+Voir clinic/profil_imports.py.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from clinic.profil_imports import module_wsgi, paquet, par_paquet, profil
+
+
+class Command(BaseCommand):
+    help = "Classe les modules importés au démarrage selon leur temps d'import (python -X importtime)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default=None, help="Module importé (défaut: point d'entrée WSGI)")
+        parser.add_argument('--executions', type=int, default=3, help='Interpréteurs lancés (médiane par module)')
+        parser.add_argument('--tri', choices=['self', 'cumulative'], default='self', help='Colonne de classement')
+        parser.add_argument('--limit', type=int, default=25, help='Nombre de lignes affichées')
+        parser.add_argument('--filtre', nargs='+', default=None, help='Paquets de premier niveau à garder (ex: clinic django)')
+        parser.add_argument('--paquets', action='store_true', help='Regroupe le temps propre par paquet de premier niveau')
+
+    def handle(self, *args, **options):
+        if options['executions'] < 1 or options['limit'] < 1:
+            raise CommandError('--executions et --limit doivent être positifs.')
+        module = options['module'] or module_wsgi()
+        try:
+            lignes = profil(module, options['executions'])
+        except RuntimeError as e:
+            raise CommandError(f"Import de {module} impossible : {e}")
+
+        racine = next((l for l in lignes if l['module'] == module), None)
+        total = racine['cumulative_us'] if racine else sum(l['self_us'] for l in lignes if l['profondeur'] == 0)
+        self.stdout.write(f"{module} : {len(lignes)} modules importés, {total / 1000:.1f} ms "
+                          f"(médiane de {options['executions']} exécutions)")
+
+        if options['filtre']:
+            lignes = [l for l in lignes if paquet(l['module']) in options['filtre']]
+
+        if options['paquets']:
+            totaux = sorted(par_paquet(lignes).items(), key=lambda item: item[1], reverse=True)
+            self.stdout.write(f"{'paquet':<40} {'self ms':>9} {'part':>6}")
+            for nom, propre in totaux[:options['limit']]:
+                self.stdout.write(f'{nom:<40} {propre / 1000:>9.1f} {propre / total * 100:>5.1f}%')
+            return
+
+        cle = 'self_us' if options['tri'] == 'self' else 'cumulative_us'
+        classement = sorted(lignes, key=lambda l: l[cle], reverse=True)[:options['limit']]
+        self.stdout.write(f"{'#':>3} {'module':<50} {'self ms':>9} {'cumul ms':>9}")
+        for rang, ligne in enumerate(classement, 1):
+            self.stdout.write(
+                f"{rang:>3} {ligne['module']:<50} {ligne['self_us'] / 1000:>9.2f} {ligne['cumulative_us'] / 1000:>9.2f}"
+            )
@@ -0,0 +1,64 @@
+# ==========================================
+# PURGE_DONNEES.PY - Suppression ou anonymisation des données personnelles expirées
+# ==========================================
+from django.core.management.base import BaseCommand, CommandError
+
+from clinic.retention import POLITIQUES, configuration, limite, purger
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime ou anonymise, par petits lots, les données personnelles dont la durée "
+        "de conservation (settings.RETENTION_DONNEES) est dépassée ; reprend une purge interrompue"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--politique', action='append', choices=sorted(POLITIQUES), dest='politiques',
+            help='Politique à appliquer (répétable ; toutes les politiques actives par défaut)',
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Lignes traitées par transaction')
+        parser.add_argument('--pause', type=float, default=0.05, help='Pause en secondes entre deux lots')
+        parser.add_argument('--max-batches', type=int, default=None, help="Nombre maximal de lots par politique pour cette exécution")
+        parser.add_argument('--dry-run', action='store_true', help="Affiche le nombre de lignes concernées sans rien modifier")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size doit être positif.')
+        try:
+            actives = configuration()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        noms = options['politiques'] or list(actives)
+        for nom in noms:
+            if nom not in actives:
+                self.stdout.write(f'{nom} : aucune durée de conservation configurée, ignorée.')
+                continue
+            jours, mode = actives[nom]
+
+            if options['dry_run']:
+                total = POLITIQUES[nom].expirees(limite(jours), mode).count()
+                self.stdout.write(f'{nom} : {total} lignes à {mode} (plus de {jours} jours).')
+                continue
+
+            def progression(lots, lignes, nom=nom):
+                if options['verbosity'] >= 2:
+                    self.stdout.write(f'  {nom} lot {lots}: {lignes} lignes')
+
+            resultat = purger(
+                nom, jours, mode,
+                batch_size=options['batch_size'],
+                pause=options['pause'],
+                max_batches=options['max_batches'],
+                on_batch=progression,
+            )
+            message = (
+                f"{nom} ({mode}) : {resultat['lignes']} lignes en {resultat['lots']} lots, "
+                f"{resultat['secondes']} s, {resultat['lignes_par_seconde']} lignes/s, "
+                f"verrou max {resultat['verrou_max_ms']} ms"
+            )
+            if resultat['termine']:
+                self.stdout.write(self.style.SUCCESS(message))
+            else:
+                self.stdout.write(self.style.WARNING(f'{message} - interrompu, reprise à la prochaine exécution'))
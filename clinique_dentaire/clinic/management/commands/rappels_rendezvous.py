@@ -0,0 +1,59 @@
+# ==========================================
+# RAPPELS_RENDEZVOUS.PY - Planificateur des rappels de rendez-vous
+# ==========================================
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from clinic.rappels import FileRappels, envoyer_rappels
+
+
+class Command(BaseCommand):
+    help = "Envoie les rappels des rendez-vous confirmés à leur échéance (email + SMS)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Rappels envoyés par connexion')
+        parser.add_argument(
+            '--rafraichir', type=int, default=300,
+            help="Intervalle (s) de relecture des nouvelles confirmations ; c'est aussi la fenêtre chargée en file",
+        )
+        parser.add_argument('--once', action='store_true', help='Envoie les rappels échus puis s\'arrête (usage cron)')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['rafraichir'] < 1:
+            raise CommandError('--batch-size et --rafraichir doivent être positifs.')
+        self.verbosity = options['verbosity']
+        horizon = timedelta(seconds=options['rafraichir'])
+        file = FileRappels()
+
+        prochain_chargement = timezone.now()
+        total = 0
+        while True:
+            maintenant = timezone.now()
+            if maintenant >= prochain_chargement:
+                ajoutes = file.charger(maintenant, horizon)
+                prochain_chargement = maintenant + horizon
+                if ajoutes and self.verbosity >= 2:
+                    self.stdout.write(f'{ajoutes} rappels ajoutés à la file ({len(file)} en attente)')
+
+            while ids := file.extraire_dus(maintenant, options['batch_size']):
+                envoyes = envoyer_rappels(ids, maintenant)
+                total += envoyes
+                if envoyes and self.verbosity >= 1:
+                    self.stdout.write(f'{envoyes} rappels envoyés')
+
+            if options['once']:
+                break
+
+            # Sommeil jusqu'à la prochaine échéance, ou jusqu'au prochain chargement
+            reveil = min(filter(None, [file.prochaine_echeance(), prochain_chargement]))
+            attente = (reveil - timezone.now()).total_seconds()
+            if attente > 0:
+                try:
+                    time.sleep(attente)
+                except KeyboardInterrupt:
+                    break
+
+        self.stdout.write(self.style.SUCCESS(f'{total} rappels envoyés.'))
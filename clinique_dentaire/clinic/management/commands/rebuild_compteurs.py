@@ -0,0 +1,17 @@
+# ==========================================
+# REBUILD_COMPTEURS.PY - Recalcul des compteurs de l'équipe
+# ==========================================
+from django.core.management.base import BaseCommand
+
+from clinic.compteurs import rebuild_compteurs
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompte les messages non lus / non traités et les rendez-vous en attente de chaque site "
+        "(rattrapage des écritures hors ORM, à planifier régulièrement)"
+    )
+
+    def handle(self, *args, **options):
+        compteurs = rebuild_compteurs()
+        self.stdout.write(self.style.SUCCESS(f'{compteurs} compteurs recalculés.'))
@@ -0,0 +1,29 @@
+# ==========================================
+# REBUILD_OCCUPATION.PY - Recalcul des compteurs de quotas journaliers
+# ==========================================
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clinic.capacite import rebuild_occupation
+
+
+class Command(BaseCommand):
+    help = "Recalcule les places occupées par service et par jour à partir des rendez-vous non annulés"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--depuis', default=None,
+            help="Premier jour recalculé (AAAA-MM-JJ) ; aujourd'hui par défaut",
+        )
+
+    def handle(self, *args, **options):
+        depuis = None
+        if options['depuis']:
+            try:
+                depuis = date.fromisoformat(options['depuis'])
+            except ValueError:
+                raise CommandError('--depuis doit être une date au format AAAA-MM-JJ.')
+
+        compteurs = rebuild_occupation(depuis)
+        self.stdout.write(self.style.SUCCESS(f'{compteurs} compteurs de places recalculés.'))
@@ -0,0 +1,29 @@
+# ==========================================
+# REBUILD_STATISTIQUES.PY - Recalcul des statistiques de réservation
+# ==========================================
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clinic.statistiques import rebuild_statistiques
+
+
+class Command(BaseCommand):
+    help = "Recalcule la table des statistiques de réservation à partir des rendez-vous (courants et archivés)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--depuis', default=None,
+            help="Ne recalcule que les jours à partir de cette date (AAAA-MM-JJ) ; tout l'historique par défaut",
+        )
+
+    def handle(self, *args, **options):
+        depuis = None
+        if options['depuis']:
+            try:
+                depuis = date.fromisoformat(options['depuis'])
+            except ValueError:
+                raise CommandError('--depuis doit être une date au format AAAA-MM-JJ.')
+
+        cases = rebuild_statistiques(depuis)
+        self.stdout.write(self.style.SUCCESS(f'{cases} compteurs recalculés.'))
@@ -0,0 +1,395 @@
+# ==========================================
+# SEED.PY - Génération de données synthétiques
+# ==========================================
+"""
+Remplace l'ancien populate_db.py.
+
+    python manage.py seed                          # catalogue seul
+    python manage.py seed --rendezvous 1000000 --contacts 200000 --seed 42
+
+Le catalogue (services, dentistes, horaires) est idempotent. Les rendez-vous
+et messages de contact sont générés de façon déterministe (même graine et
+même date de référence => mêmes données) puis insérés par lots, chacun dans
+sa propre transaction.
+"""
+import random
+import time
+import unicodedata
+from contextlib import contextmanager
+from datetime import date, datetime, time as dtime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from clinic.models import Service, Dentiste, Horaire, Fermeture, RendezVous, Contact, site_par_defaut
+from clinic.capacite import rebuild_occupation
+from clinic.compteurs import rebuild_compteurs
+from clinic.patients import patients_par_numero
+from clinic.search import fts_sync_suspended
+from clinic.statistiques import rebuild_statistiques
+from clinic.telephones import normalize_phone
+
+SERVICES = [
+    {'nom': 'Consultation générale', 'description': 'Examen complet de la bouche et des dents',
+     'prix_min': 25000, 'prix_max': 35000, 'duree_minutes': 30, 'icone': 'stethoscope', 'ordre': 1},
+    {'nom': 'Détartrage', 'description': 'Nettoyage professionnel des dents',
+     'prix_min': 15000, 'prix_max': 25000, 'duree_minutes': 45, 'icone': 'sparkles', 'ordre': 2},
+    {'nom': 'Soins dentaires', 'description': 'Traitement des caries et obturations',
+     'prix_min': 20000, 'prix_max': 50000, 'duree_minutes': 60, 'icone': 'tooth', 'ordre': 3},
+    {'nom': 'Orthodontie', 'description': "Correction de l'alignement des dents",
+     'prix_min': 500000, 'prix_max': 1500000, 'duree_minutes': 90, 'icone': 'braces', 'ordre': 4},
+    {'nom': 'Prothèses dentaires', 'description': 'Couronnes, bridges et prothèses',
+     'prix_min': 100000, 'prix_max': 300000, 'duree_minutes': 120, 'icone': 'crown', 'ordre': 5},
+    {'nom': 'Implants dentaires', 'description': 'Remplacement de dents manquantes',
+     'prix_min': 200000, 'prix_max': 500000, 'duree_minutes': 150, 'icone': 'implant', 'ordre': 6},
+]
+
+DENTISTES = [
+    {'nom': 'KOUAME', 'prenom': 'Marie', 'specialite': 'Dentisterie générale', 'ordre': 1,
+     'bio': "Diplômée de l'Université d'Abidjan, spécialisée en soins dentaires généraux avec 10 ans d'expérience."},
+    {'nom': 'DIABATE', 'prenom': 'Seydou', 'specialite': 'Orthodontie', 'ordre': 2,
+     'bio': 'Orthodontiste certifié avec une expertise en correction dentaire moderne.'},
+    {'nom': 'OUATTARA', 'prenom': 'Aminata', 'specialite': 'Chirurgie dentaire', 'ordre': 3,
+     'bio': 'Chirurgienne dentaire spécialisée en implantologie et extractions complexes.'},
+]
+
+# jour: (ouverture_matin, fermeture_matin, ouverture_apres_midi, fermeture_apres_midi)
+HORAIRES = {
+    0: ('08:00', '12:00', '14:00', '18:00'),
+    1: ('08:00', '12:00', '14:00', '18:00'),
+    2: ('08:00', '12:00', '14:00', '18:00'),
+    3: ('08:00', '12:00', '14:00', '18:00'),
+    4: ('08:00', '12:00', '14:00', '18:00'),
+    5: ('08:00', '12:00', None, None),
+    6: None,  # dimanche: fermé
+}
+
+# Jours fériés à date fixe (fermetures annuelles) ; les fêtes mobiles sont saisies dans l'admin
+JOURS_FERIES = [
+    ((1, 1), "Jour de l'an"),
+    ((5, 1), 'Fête du travail'),
+    ((8, 7), "Fête de l'indépendance"),
+    ((8, 15), 'Assomption'),
+    ((11, 1), 'Toussaint'),
+    ((11, 15), 'Journée nationale de la paix'),
+    ((12, 25), 'Noël'),
+]
+
+NOMS = [
+    'KOUAME', 'KOUASSI', 'KONAN', 'YAO', 'KOFFI', "N'GUESSAN", 'KOUADIO', 'AKA', 'ASSI', 'BROU',
+    'TRAORE', 'COULIBALY', 'OUATTARA', 'DIABATE', 'BAMBA', 'KONE', 'TOURE', 'DIALLO', 'SANOGO',
+    'CISSE', 'FOFANA', 'DOUMBIA', 'YAPI', 'DJEDJE', 'GNAHORE', 'ZADI', 'SERI', 'TAPE', 'AMANI',
+    "N'DRI", 'ATTA', 'ESSOH', 'AHOUA', 'GUEU', 'DOSSO', 'KAMAGATE', 'SORO', 'SILUE', 'TUO', 'YEO',
+]
+
+PRENOMS = [
+    'Aminata', 'Awa', 'Mariam', 'Fatou', 'Adjoua', 'Affoué', 'Akissi', 'Amenan', 'Ahou', 'Aya',
+    'Marie', 'Grâce', 'Christelle', 'Estelle', 'Mireille', 'Ange', 'Nadège', 'Rokia', 'Salimata',
+    'Kouadio', 'Yao', 'Koffi', 'Konan', 'Seydou', 'Moussa', 'Ibrahim', 'Souleymane', 'Drissa',
+    'Adama', 'Lacina', 'Jean-Marc', 'Serge', 'Didier', 'Arnaud', 'Hervé', 'Éric', 'Yannick',
+    'Fabrice', 'Bakary', 'Zoumana',
+]
+
+DOMAINES = ['gmail.com', 'yahoo.fr', 'outlook.com', 'hotmail.fr', 'orange.ci']
+
+# Préfixes mobiles depuis la numérotation à 10 chiffres (Moov, MTN, Orange)
+PREFIXES = ['01', '05', '07']
+
+MESSAGES_RDV = [
+    None, None, None,
+    "J'ai mal à une dent depuis quelques jours.",
+    'Je souhaite un créneau le matin si possible.',
+    'Contrôle annuel.',
+    'Saignement des gencives au brossage.',
+    'Disponible uniquement après 15h.',
+]
+
+SUJETS = [
+    'Demande de tarifs', 'Prise en charge assurance', 'Horaires du samedi',
+    'Urgence dentaire', "Suivi d'un traitement", 'Facturation', 'Demande de devis',
+]
+
+MESSAGES_CONTACT = [
+    'Bonjour, pouvez-vous me communiquer vos tarifs pour un détartrage ?',
+    'Acceptez-vous les assurances MUGEF-CI ?',
+    'Êtes-vous ouverts le samedi après-midi ?',
+    "Je voudrais un devis pour la pose d'un implant.",
+    'Merci de me rappeler au sujet de mon rendez-vous.',
+]
+
+STATUTS_PASSES = ['completed'] * 7 + ['cancelled'] * 2 + ['confirmed']
+STATUTS_FUTURS = ['pending'] * 6 + ['confirmed'] * 3 + ['cancelled']
+
+
+def _utc_naif(valeur):
+    """
+    Datetime naïf en UTC, le fuseau des connexions Django quand USE_TZ est actif.
+    Les adaptateurs de colonnes n'ont alors plus de conversion de fuseau à faire.
+    """
+    return valeur.astimezone(dt_timezone.utc).replace(tzinfo=None)
+
+
+def _ascii(valeur):
+    return unicodedata.normalize('NFKD', valeur).encode('ascii', 'ignore').decode().lower().replace("'", '')
+
+
+class Command(BaseCommand):
+    help = "Peuple la base avec le catalogue et des données synthétiques réalistes (patients ivoiriens)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rendezvous', type=int, default=0, help='Nombre de rendez-vous à générer')
+        parser.add_argument('--contacts', type=int, default=0, help='Nombre de messages de contact à générer')
+        parser.add_argument('--seed', type=int, default=42, help='Graine du générateur pseudo-aléatoire')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Lignes insérées par transaction')
+        parser.add_argument('--jours', type=int, default=730, help="Profondeur d'historique en jours")
+        parser.add_argument('--date-reference', type=date.fromisoformat, default=None,
+                            help="Date « aujourd'hui » des données (AAAA-MM-JJ, défaut: aujourd'hui)")
+        parser.add_argument('--reset', action='store_true',
+                            help='Supprime les rendez-vous et messages existants avant génération')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size doit être positif.')
+
+        debut = time.perf_counter()
+        services = self.seed_catalogue()
+
+        if options['reset']:
+            RendezVous.objects.all().delete()
+            Contact.objects.all().delete()
+            self.log('Rendez-vous et messages de contact existants supprimés.')
+
+        reference = options['date_reference'] or timezone.localdate()
+        with self.ecriture_rapide():
+            self.generer(services, reference, options)
+
+        duree = time.perf_counter() - debut
+        self.log(self.style.SUCCESS(f'Base de données peuplée avec succès en {duree:.1f} s.'))
+
+    @contextmanager
+    def ecriture_rapide(self):
+        """
+        SQLite sans fsync le temps du chargement (PRAGMA synchronous = OFF),
+        rétabli à la sortie. Impossible dans une transaction : ignoré alors.
+        """
+        if connection.vendor != 'sqlite' or connection.in_atomic_block:
+            yield
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            precedent = cursor.fetchone()[0]
+            cursor.execute('PRAGMA synchronous = OFF')
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA synchronous = {int(precedent)}')
+
+    def generer(self, services, reference, options):
+        rng = random.Random(options['seed'])
+        if options['rendezvous']:
+            lignes = self.generer_rendezvous(rng, services, reference, options['jours'])
+            total = self.inserer(RendezVous, self.CHAMPS_RENDEZVOUS, lignes, options['rendezvous'], options['batch_size'])
+            self.log(f'{total} rendez-vous générés.')
+            # Insertion directe : les signaux ne sont pas émis, on recalcule en un GROUP BY
+            self.log(f'{rebuild_statistiques()} compteurs de statistiques recalculés.', niveau=2)
+            self.log(f'{rebuild_occupation()} compteurs de places recalculés.', niveau=2)
+
+        if options['contacts']:
+            lignes = self.generer_contacts(rng, reference, options['jours'])
+            total = self.inserer(Contact, self.CHAMPS_CONTACT, lignes, options['contacts'], options['batch_size'])
+            self.log(f'{total} messages de contact générés.')
+
+        if options['rendezvous'] or options['contacts']:
+            self.log(f'{rebuild_compteurs()} compteurs de l\'équipe recalculés.', niveau=2)
+
+    def log(self, message, niveau=1):
+        if self.verbosity >= niveau:
+            self.stdout.write(message)
+
+    # ==========================================
+    # CATALOGUE
+    # ==========================================
+
+    def seed_catalogue(self):
+        # Catalogue, rendez-vous et messages générés pour le site par défaut
+        self.clinique_id = clinique_id = site_par_defaut()
+        services = [
+            Service.objects.update_or_create(clinique_id=clinique_id, nom=data['nom'], defaults=data)[0]
+            for data in SERVICES
+        ]
+        for data in DENTISTES:
+            Dentiste.objects.update_or_create(
+                clinique_id=clinique_id, nom=data['nom'], prenom=data['prenom'], defaults=data,
+            )
+        for jour, plages in HORAIRES.items():
+            if plages is None:
+                defaults = {'ferme': True, 'ouverture_matin': None, 'fermeture_matin': None,
+                            'ouverture_apres_midi': None, 'fermeture_apres_midi': None}
+            else:
+                defaults = dict(zip(
+                    ['ouverture_matin', 'fermeture_matin', 'ouverture_apres_midi', 'fermeture_apres_midi'],
+                    [dtime.fromisoformat(h) if h else None for h in plages],
+                ), ferme=False)
+            Horaire.objects.update_or_create(clinique_id=clinique_id, jour=jour, defaults=defaults)
+        annee = timezone.localdate().year
+        for (mois, jour), motif in JOURS_FERIES:
+            ferie = date(annee, mois, jour)
+            Fermeture.objects.get_or_create(
+                motif=motif, annuelle=True, defaults={'date_debut': ferie, 'date_fin': ferie},
+            )
+        self.log(f'Catalogue: {len(services)} services, {len(DENTISTES)} dentistes, {len(HORAIRES)} horaires, '
+                 f'{len(JOURS_FERIES)} jours fériés.')
+        return services
+
+    # ==========================================
+    # GÉNÉRATEURS
+    # ==========================================
+    # Les générateurs produisent des tuples dans l'ordre des colonnes déclarées
+    # (CHAMPS_*), avec des dates en UTC naïf, et tirent leurs valeurs avec
+    # rng.random() et des tables précalculées : c'est ce qui permet de tenir
+    # le million de lignes.
+
+    CHAMPS_RENDEZVOUS = (
+        'nom', 'prenom', 'telephone', 'email', 'date_souhaitee', 'service_id', 'message',
+        'statut', 'created_at', 'updated_at', 'date_confirmee', 'clinique_id',
+    )
+    CHAMPS_CONTACT = (
+        'nom', 'prenom', 'email', 'telephone', 'sujet', 'message', 'lu', 'traite',
+        'created_at', 'updated_at', 'clinique_id',
+    )
+
+    def identites(self, rng):
+        """Produit indéfiniment des tuples (nom, prénom, email, téléphone)"""
+        r = rng.random
+        noms = [(nom, _ascii(nom)) for nom in NOMS]
+        prenoms = [(prenom, _ascii(prenom)) for prenom in PRENOMS]
+        nb_noms, nb_prenoms, nb_domaines, nb_prefixes = len(noms), len(prenoms), len(DOMAINES), len(PREFIXES)
+        while True:
+            nom, nom_ascii = noms[int(r() * nb_noms)]
+            prenom, prenom_ascii = prenoms[int(r() * nb_prenoms)]
+            email = f"{prenom_ascii}.{nom_ascii}{int(r() * 999) + 1}@{DOMAINES[int(r() * nb_domaines)]}"
+            telephone = f"{PREFIXES[int(r() * nb_prefixes)]}{int(r() * 100000000):08d}"
+            yield nom, prenom, email, telephone
+
+    def instants(self, reference, profondeur):
+        """Bornes (début, étendue en secondes) de la fenêtre d'historique"""
+        fin = datetime.combine(reference, dtime(21, 0), tzinfo=timezone.get_current_timezone())
+        return _utc_naif(fin - timedelta(days=profondeur)), profondeur * 86400
+
+    def generer_rendezvous(self, rng, services, reference, profondeur):
+        r = rng.random
+        identites = self.identites(rng)
+        debut, etendue = self.instants(reference, profondeur)
+        # Répartition de la demande par service (consultations et détartrages en tête)
+        poids = [30, 25, 20, 8, 9, 8]
+        tirage = [s.id for s, p in zip(services, poids) for _ in range(p)]
+        nb_tirage, nb_messages = len(tirage), len(MESSAGES_RDV)
+        passes, futurs = STATUTS_PASSES, STATUTS_FUTURS
+        tz = timezone.get_current_timezone()
+        while True:
+            nom, prenom, email, telephone = next(identites)
+            cree_le = debut + timedelta(seconds=int(r() * etendue))
+            date_souhaitee = cree_le.date() + timedelta(days=int(r() * 45) + 1)
+            if date_souhaitee.weekday() == 6:
+                date_souhaitee += timedelta(days=1)
+            statuts = passes if date_souhaitee < reference else futurs
+            statut = statuts[int(r() * len(statuts))]
+            date_confirmee = None
+            if statut in ('confirmed', 'completed'):
+                date_confirmee = _utc_naif(datetime.combine(
+                    date_souhaitee, dtime(8 + int(r() * 10), 15 * int(r() * 4)), tzinfo=tz,
+                ))
+            modifie_le = cree_le if statut == 'pending' else cree_le + timedelta(hours=int(r() * 72))
+            yield (
+                nom, prenom, telephone, email, date_souhaitee, tirage[int(r() * nb_tirage)],
+                MESSAGES_RDV[int(r() * nb_messages)], statut, cree_le, modifie_le, date_confirmee,
+                self.clinique_id,
+            )
+
+    def generer_contacts(self, rng, reference, profondeur):
+        r = rng.random
+        identites = self.identites(rng)
+        debut, etendue = self.instants(reference, profondeur)
+        nb_sujets, nb_messages = len(SUJETS), len(MESSAGES_CONTACT)
+        while True:
+            nom, prenom, email, telephone = next(identites)
+            secondes = int(r() * etendue)
+            cree_le = debut + timedelta(seconds=secondes)
+            anciennete = profondeur - secondes // 86400
+            lu = anciennete > 3 or r() < 0.5
+            yield (
+                nom, prenom, email, f'+225{telephone}' if r() < 0.5 else f'225{telephone}',
+                SUJETS[int(r() * nb_sujets)], MESSAGES_CONTACT[int(r() * nb_messages)],
+                lu, lu and anciennete > 7, cree_le, cree_le, self.clinique_id,
+            )
+
+    # ==========================================
+    # INSERTION PAR LOTS
+    # ==========================================
+
+    def inserer(self, model, noms_champs, lignes, total, batch_size):
+        """
+        Insère `total` lignes par lots transactionnels.
+
+        bulk_create prépare chaque valeur champ par champ (~80 µs par ligne ici) ;
+        on réutilise donc ses adaptateurs de colonnes une seule fois par champ et
+        on envoie chaque lot avec un executemany sur la requête INSERT du modèle.
+        Chaque lot est rattaché à ses patients (colonne patient_id, téléphone
+        normalisé : voir patients.py) comme le ferait save(). L'index plein
+        texte est reconstruit une seule fois à la fin.
+        """
+        champs = [model._meta.get_field(nom) for nom in (*noms_champs, 'patient_id')]
+        qn = connection.ops.quote_name
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            qn(model._meta.db_table),
+            ', '.join(qn(champ.column) for champ in champs),
+            ', '.join(['%s'] * len(champs)),
+        )
+        adaptateurs = {
+            'DateTimeField': connection.ops.adapt_datetimefield_value,
+            'DateField': connection.ops.adapt_datefield_value,
+        }
+        conversions = [
+            (i, adaptateurs[champ.get_internal_type()])
+            for i, champ in enumerate(champs) if champ.get_internal_type() in adaptateurs
+        ]
+        coordonnees = [noms_champs.index(nom) for nom in ('telephone', 'nom', 'prenom', 'email')]
+
+        with fts_sync_suspended(model):
+            self.executer_lots(model, sql, conversions, coordonnees, lignes, total, batch_size)
+        return total
+
+    def executer_lots(self, model, sql, conversions, coordonnees, lignes, total, batch_size):
+        insere = 0
+        debut = time.perf_counter()
+        while insere < total:
+            taille = min(batch_size, total - insere)
+            lot = []
+            for _ in range(taille):
+                ligne = list(next(lignes))
+                for i, adapter in conversions:
+                    ligne[i] = adapter(ligne[i])
+                lot.append(ligne)
+            with transaction.atomic():
+                self.rattacher_patients(lot, coordonnees)
+                with connection.cursor() as cursor:
+                    cursor.executemany(sql, lot)
+            insere += taille
+            debit = insere / (time.perf_counter() - debut)
+            self.log(f'  {model._meta.verbose_name_plural}: {insere}/{total} ({debit:.0f} lignes/s)', niveau=2)
+
+    def rattacher_patients(self, lot, coordonnees):
+        """Ajoute à chaque ligne l'identifiant de son patient (None si numéro invalide)"""
+        i_telephone, i_nom, i_prenom, i_email = coordonnees
+        nouveaux, numeros = {}, []
+        for ligne in lot:
+            numero = normalize_phone(ligne[i_telephone])
+            numeros.append(numero)
+            if numero is not None and numero not in nouveaux:
+                nouveaux[numero] = {'nom': ligne[i_nom], 'prenom': ligne[i_prenom], 'email': ligne[i_email]}
+        patients = patients_par_numero(nouveaux) if nouveaux else {}
+        for ligne, numero in zip(lot, numeros):
+            ligne.append(patients.get(numero))
@@ -0,0 +1,253 @@
+# ==========================================
+# MEDIAS.PY - Service des fichiers envoyés (images des services, photos de l'équipe)
+# ==========================================
+"""
+Les fichiers de MEDIA_ROOT sont servis par la vue `servir_media`, en
+production comme en développement. Elle ne fait qu'autoriser la requête et
+poser les en-têtes ; la transmission est déléguée selon settings.MEDIA_ACCEL :
+
+    'x-accel-redirect' : nginx (location interne MEDIA_ACCEL_PREFIXE -> MEDIA_ROOT)
+    'x-sendfile'       : Apache (mod_xsendfile), lighttpd
+    ''                 : FileResponse, transmis par le serveur WSGI
+                         (wsgi.file_wrapper : sendfile() sous gunicorn)
+
+Le serveur frontal gère alors lui-même les requêtes partielles (Range) ; sans
+lui, la vue répond 206/416 pour une plage unique.
+
+Sont publics les fichiers des services et dentistes actifs (liste compilée
+par processus, voir cache_local.py) ; les autres sont réservés à l'équipe.
+Un nom absent de la liste est vérifié en base avant de répondre 404 : un
+fichier envoyé depuis un autre processus est public aussitôt, sans attendre
+la recompilation de la liste.
+
+Les fichiers envoyés sont enregistrés sous un nom contenant l'empreinte de
+leur contenu (StockageMedias : 'services/detartrage.3f2a9c1b7d4e.jpg') : un
+nom ne désigne jamais deux contenus, ces fichiers sont donc mis en cache
+par les navigateurs pour un an sans revalidation. Les autres (fichiers
+antérieurs) gardent une durée courte, revalidée par ETag.
+"""
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .cache_local import CacheLocal
+
+# 'nom.<12 chiffres hexadécimaux>.ext' : nom donné par StockageMedias
+NOM_HACHE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+CACHE_IMMUABLE = 'public, max-age=31536000, immutable'
+
+
+# ==========================================
+# STOCKAGE (noms à empreinte)
+# ==========================================
+
+def nom_hache(name, content):
+    """'services/photo.jpg' -> 'services/photo.<empreinte du contenu>.jpg'"""
+    empreinte = hashlib.sha256()
+    for bloc in content.chunks():
+        empreinte.update(bloc)
+    content.seek(0)
+    racine, extension = posixpath.splitext(name)
+    return f'{racine}.{empreinte.hexdigest()[:12]}{extension.lower()}'
+
+
+class StockageMedias(FileSystemStorage):
+    """Stockage par défaut (settings.STORAGES) : fichiers nommés d'après leur contenu"""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = nom_hache(name, content)
+        if self.exists(name):
+            # Contenu identique déjà enregistré : le fichier est partagé
+            return name
+        return super().save(name, content, max_length)
+
+
+# ==========================================
+# AUTORISATION
+# ==========================================
+
+def _compiler(cle):
+    from .models import Dentiste, Service
+    publics = set(Service.objects.filter(actif=True).exclude(image='').values_list('image', flat=True))
+    publics.update(Dentiste.objects.filter(actif=True).exclude(photo='').values_list('photo', flat=True))
+    return frozenset(publics)
+
+
+_publics = CacheLocal('medias', _compiler)
+
+
+def fichiers_publics():
+    return _publics.get()
+
+
+def invalider_medias():
+    _publics.invalider()
+
+
+def est_public(nom):
+    """Fichier d'un service ou d'un dentiste actif"""
+    if nom in fichiers_publics():
+        return True
+    if not nom.startswith(('services/', 'dentistes/')):
+        return False
+    # Liste compilée avant un envoi fait dans un autre processus
+    from .models import Dentiste, Service
+    return (
+        Service.objects.filter(actif=True, image=nom).exists()
+        or Dentiste.objects.filter(actif=True, photo=nom).exists()
+    )
+
+
+def _equipe(request):
+    # Chaîne allégée (handlers.py) : pas d'utilisateur
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_staff
+
+
+# ==========================================
+# RÉPONSES
+# ==========================================
+
+def _plage(entete, taille):
+    """
+    Plage unique demandée par l'en-tête Range : (début, fin incluse), None
+    si l'en-tête est ignoré (absent, plusieurs plages, autre unité), ou
+    'invalide' si la plage ne peut être satisfaite.
+    """
+    unite, _, plages = entete.partition('=')
+    if unite.strip() != 'bytes' or ',' in plages:
+        return None
+    debut, tiret, fin = plages.strip().partition('-')
+    if not tiret:
+        return None
+    try:
+        if not debut:
+            # bytes=-500 : les 500 derniers octets
+            longueur = int(fin)
+            if longueur <= 0:
+                return 'invalide'
+            return max(taille - longueur, 0), taille - 1
+        debut = int(debut)
+        fin = min(int(fin), taille - 1) if fin else taille - 1
+    except ValueError:
+        return None
+    if debut >= taille or fin < debut:
+        return 'invalide'
+    return debut, fin
+
+
+class Tranche:
+    """Lecture limitée à `longueur` octets à partir de `debut` (sans fileno : jamais transmis en entier)"""
+
+    def __init__(self, fichier, debut, longueur):
+        self.fichier = fichier
+        self.reste = longueur
+        fichier.seek(debut)
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.reste:
+            size = self.reste
+        bloc = self.fichier.read(size)
+        self.reste -= len(bloc)
+        return bloc
+
+    def close(self):
+        self.fichier.close()
+
+
+class ReponseMedia(FileResponse):
+    # Blocs lus quand le fichier n'est pas transmis par sendfile()
+    block_size = 64 * 1024
+
+
+def _fichier(request, chemin, etag, taille, content_type):
+    """Transmission par Django (sans serveur frontal), plage unique comprise"""
+    plage = None
+    if request.method == 'GET' and 'HTTP_RANGE' in request.META:
+        si_plage = request.META.get('HTTP_IF_RANGE')
+        # If-Range : plage servie seulement si le fichier n'a pas changé
+        if si_plage is None or si_plage == etag:
+            plage = _plage(request.META['HTTP_RANGE'], taille)
+
+    if plage == 'invalide':
+        reponse = HttpResponse(status=416)
+        reponse['Content-Range'] = f'bytes */{taille}'
+        return reponse
+
+    fichier = open(chemin, 'rb')
+    if plage is None:
+        # Fichier entier : wsgi.file_wrapper (sendfile) si le serveur le fournit
+        return ReponseMedia(fichier, content_type=content_type)
+    debut, fin = plage
+    reponse = ReponseMedia(Tranche(fichier, debut, fin - debut + 1), status=206, content_type=content_type)
+    reponse['Content-Length'] = fin - debut + 1
+    reponse['Content-Range'] = f'bytes {debut}-{fin}/{taille}'
+    return reponse
+
+
+def _deleguer(nom, chemin, content_type):
+    """Réponse vide : le serveur frontal transmet le fichier (Range compris)"""
+    reponse = HttpResponse(content_type=content_type)
+    if settings.MEDIA_ACCEL == 'x-accel-redirect':
+        reponse['X-Accel-Redirect'] = quote(f'{settings.MEDIA_ACCEL_PREFIXE}{nom}')
+    else:
+        reponse['X-Sendfile'] = chemin
+    return reponse
+
+
+@require_safe
+def servir_media(request, chemin):
+    """Fichier de MEDIA_ROOT : autorisation et en-têtes ici, transmission déléguée"""
+    nom = posixpath.normpath(chemin)
+    if nom != chemin or nom.startswith(('/', '../')):
+        raise Http404("Fichier introuvable")
+    public = est_public(nom)
+    if not public and not _equipe(request):
+        # Fichier non public : même réponse qu'un fichier absent
+        raise Http404("Fichier introuvable")
+    try:
+        fichier = safe_join(settings.MEDIA_ROOT, nom)
+        infos = os.stat(fichier)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404("Fichier introuvable")
+    if not stat.S_ISREG(infos.st_mode):
+        raise Http404("Fichier introuvable")
+
+    etag = f'"{infos.st_mtime_ns:x}-{infos.st_size:x}"'
+    modifie = int(infos.st_mtime)
+    reponse = get_conditional_response(request, etag=etag, last_modified=modifie)
+    if reponse is None:
+        content_type = mimetypes.guess_type(nom)[0] or 'application/octet-stream'
+        if settings.MEDIA_ACCEL:
+            reponse = _deleguer(nom, fichier, content_type)
+        else:
+            reponse = _fichier(request, fichier, etag, infos.st_size, content_type)
+
+    reponse['ETag'] = etag
+    reponse['Last-Modified'] = http_date(modifie)
+    reponse['Accept-Ranges'] = 'bytes'
+    if not public:
+        reponse['Cache-Control'] = 'private, no-cache'
+    elif NOM_HACHE.search(nom):
+        reponse['Cache-Control'] = CACHE_IMMUABLE
+    else:
+        reponse['Cache-Control'] = f'public, max-age={settings.MEDIA_CACHE_SECONDES}'
+    return reponse
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RendezVousArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('nom', models.CharField(max_length=100, verbose_name='Nom')),
+                ('prenom', models.CharField(max_length=100, verbose_name='Prénom')),
+                ('telephone', models.CharField(max_length=20, verbose_name='Téléphone')),
+                ('email', models.EmailField(max_length=254, verbose_name='Email')),
+                ('date_souhaitee', models.DateField(verbose_name='Date souhaitée')),
+                ('message', models.TextField(blank=True, null=True, verbose_name='Message complémentaire')),
+                ('statut', models.CharField(choices=[('pending', 'En attente'), ('confirmed', 'Confirmé'), ('cancelled', 'Annulé'), ('completed', 'Terminé')], max_length=20, verbose_name='Statut')),
+                ('created_at', models.DateTimeField(verbose_name='Créé le')),
+                ('updated_at', models.DateTimeField(verbose_name='Modifié le')),
+                ('date_confirmee', models.DateTimeField(blank=True, null=True, verbose_name='Date et heure confirmées')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archivé le')),
+            ],
+            options={
+                'verbose_name': 'Rendez-vous archivé',
+                'verbose_name_plural': 'Rendez-vous archivés',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='rendezvous',
+            index=models.Index(fields=['-created_at'], name='rdv_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rendezvous',
+            index=models.Index(fields=['statut', 'updated_at'], name='rdv_statut_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='rendezvousarchive',
+            name='service',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='clinic.service', verbose_name='Service demandé'),
+        ),
+        migrations.AddIndex(
+            model_name='rendezvousarchive',
+            index=models.Index(fields=['-created_at'], name='rdv_archive_created_idx'),
+        ),
+    ]
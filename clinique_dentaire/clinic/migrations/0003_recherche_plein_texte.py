@@ -0,0 +1,56 @@
+from django.db import migrations
+
+# Index plein texte FTS5 (SQLite uniquement) sur les champs de recherche de l'admin.
+# Tables à contenu externe : seul l'index est stocké, les triggers le tiennent
+# à jour pour toutes les écritures (save, bulk_create, update, delete, SQL brut).
+TABLES = {
+    'clinic_rendezvous': ('clinic_rendezvous_fts', ['nom', 'prenom', 'telephone', 'email']),
+    'clinic_contact': ('clinic_contact_fts', ['nom', 'prenom', 'email', 'sujet']),
+}
+
+
+def creer_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for source, (fts, colonnes) in TABLES.items():
+        liste = ', '.join(colonnes)
+        nouvelles = ', '.join(f'new.{c}' for c in colonnes)
+        anciennes = ', '.join(f'old.{c}' for c in colonnes)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({liste}, content='{source}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {source} BEGIN "
+            f"INSERT INTO {fts}(rowid, {liste}) VALUES (new.id, {nouvelles}); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {source} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {liste}) VALUES ('delete', old.id, {anciennes}); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {liste} ON {source} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {liste}) VALUES ('delete', old.id, {anciennes}); "
+            f"INSERT INTO {fts}(rowid, {liste}) VALUES (new.id, {nouvelles}); END"
+        )
+        schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def supprimer_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for fts, _ in TABLES.values():
+        for suffixe in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffixe}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0002_rendezvous_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(creer_index, supprimer_index),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:31
+
+import clinic.telephones
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0003_recherche_plein_texte'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Patient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('telephone', models.CharField(max_length=16, unique=True, verbose_name='Téléphone (E.164)')),
+                ('nom', models.CharField(max_length=100, verbose_name='Nom')),
+                ('prenom', models.CharField(max_length=100, verbose_name='Prénom')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='Email')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Patient',
+                'verbose_name_plural': 'Patients',
+                'ordering': ['nom', 'prenom'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='contact',
+            name='telephone',
+            field=models.CharField(max_length=20, validators=[clinic.telephones.validate_phone], verbose_name='Téléphone'),
+        ),
+        migrations.AlterField(
+            model_name='rendezvous',
+            name='telephone',
+            field=models.CharField(max_length=20, validators=[clinic.telephones.validate_phone], verbose_name='Téléphone'),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='patient',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='contacts', to='clinic.patient', verbose_name='Patient'),
+        ),
+        migrations.AddField(
+            model_name='rendezvous',
+            name='patient',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rendezvous', to='clinic.patient', verbose_name='Patient'),
+        ),
+        migrations.AddField(
+            model_name='rendezvousarchive',
+            name='patient',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rendezvous_archives', to='clinic.patient', verbose_name='Patient'),
+        ),
+    ]
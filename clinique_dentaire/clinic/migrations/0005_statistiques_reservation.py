@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0004_patient'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatistiqueReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jour', models.DateField(verbose_name='Jour de réception')),
+                ('statut', models.CharField(choices=[('pending', 'En attente'), ('confirmed', 'Confirmé'), ('cancelled', 'Annulé'), ('completed', 'Terminé')], max_length=20, verbose_name='Statut')),
+                ('nombre', models.IntegerField(default=0, verbose_name='Nombre de rendez-vous')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statistiques', to='clinic.service', verbose_name='Service')),
+            ],
+            options={
+                'verbose_name': 'Statistique de réservation',
+                'verbose_name_plural': 'Statistiques de réservation',
+                'ordering': ['-jour', 'service', 'statut'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='statistiquereservation',
+            constraint=models.UniqueConstraint(fields=('jour', 'service', 'statut'), name='stat_jour_service_statut_uniq'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0005_statistiques_reservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rendezvous',
+            name='rappel_envoye_le',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Rappel envoyé le'),
+        ),
+        migrations.AddField(
+            model_name='rendezvousarchive',
+            name='rappel_envoye_le',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Rappel envoyé le'),
+        ),
+        migrations.AddIndex(
+            model_name='rendezvous',
+            index=models.Index(condition=models.Q(('rappel_envoye_le__isnull', True)), fields=['statut', 'date_confirmee'], name='rdv_rappel_du_idx'),
+        ),
+    ]
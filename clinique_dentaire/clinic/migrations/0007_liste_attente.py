@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:40
+
+import clinic.telephones
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0006_rappels_rendezvous'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListeAttente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=100, verbose_name='Nom')),
+                ('prenom', models.CharField(max_length=100, verbose_name='Prénom')),
+                ('telephone', models.CharField(max_length=20, validators=[clinic.telephones.validate_phone], verbose_name='Téléphone')),
+                ('email', models.EmailField(max_length=254, verbose_name='Email')),
+                ('date_souhaitee', models.DateField(verbose_name='Date souhaitée')),
+                ('statut', models.CharField(choices=[('waiting', 'En attente'), ('offered', 'Créneau proposé'), ('withdrawn', 'Retiré')], default='waiting', max_length=20, verbose_name='Statut')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Inscrit le')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Modifié le')),
+                ('patient', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='listes_attente', to='clinic.patient', verbose_name='Patient')),
+                ('rendez_vous', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='clinic.rendezvous', verbose_name='Rendez-vous proposé')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listes_attente', to='clinic.service', verbose_name='Service demandé')),
+            ],
+            options={
+                'verbose_name': "Inscription en liste d'attente",
+                'verbose_name_plural': "Liste d'attente",
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['service', 'date_souhaitee', 'statut', 'created_at'], name='attente_file_idx')],
+            },
+        ),
+    ]
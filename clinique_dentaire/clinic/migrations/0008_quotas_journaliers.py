@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+from django.utils import timezone
+
+
+def compter_places(apps, schema_editor):
+    """Compteurs initiaux : rendez-vous non annulés à partir d'aujourd'hui (voir clinic/capacite.py)"""
+    RendezVous = apps.get_model('clinic', 'RendezVous')
+    OccupationJournaliere = apps.get_model('clinic', 'OccupationJournaliere')
+    agregats = (
+        RendezVous.objects.filter(date_souhaitee__gte=timezone.localdate())
+        .exclude(statut='cancelled')
+        .values_list('service_id', 'date_souhaitee')
+        .annotate(nombre=Count('id'))
+        .order_by()
+    )
+    OccupationJournaliere.objects.bulk_create(
+        [OccupationJournaliere(service_id=s, jour=j, reservations=n) for s, j, n in agregats],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0007_liste_attente'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='capacite_journaliere',
+            field=models.PositiveIntegerField(blank=True, help_text='Laisser vide pour ne pas limiter les réservations', null=True, verbose_name='Rendez-vous maximum par jour'),
+        ),
+        migrations.CreateModel(
+            name='OccupationJournaliere',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jour', models.DateField(verbose_name='Jour')),
+                ('reservations', models.PositiveIntegerField(default=0, verbose_name='Rendez-vous réservés')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupations', to='clinic.service', verbose_name='Service')),
+            ],
+            options={
+                'verbose_name': 'Occupation journalière',
+                'verbose_name_plural': 'Occupations journalières',
+                'ordering': ['jour', 'service'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='occupationjournaliere',
+            constraint=models.UniqueConstraint(fields=('service', 'jour'), name='occupation_service_jour_uniq'),
+        ),
+        migrations.RunPython(compter_places, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0008_quotas_journaliers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Fermeture',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_debut', models.DateField(verbose_name='Du')),
+                ('date_fin', models.DateField(verbose_name='Au')),
+                ('motif', models.CharField(max_length=100, verbose_name='Motif')),
+                ('annuelle', models.BooleanField(default=False, help_text='Fermeture répétée chaque année aux mêmes dates (jours fériés fixes)', verbose_name='Chaque année')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Fermeture',
+                'verbose_name_plural': 'Fermetures et jours fériés',
+                'ordering': ['date_debut'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='fermeture',
+            constraint=models.CheckConstraint(check=models.Q(('date_fin__gte', models.F('date_debut'))), name='fermeture_periode_valide'),
+        ),
+    ]
@@ -0,0 +1,192 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:04
+
+import clinic.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def rattacher_site_existant(apps, schema_editor):
+    """
+    Site unique d'avant le multi-sites : toutes les données lui sont rattachées,
+    sauf les fermetures annuelles (jours fériés), communes à tous les sites.
+    """
+    Clinique = apps.get_model('clinic', 'Clinique')
+    clinique, _ = Clinique.objects.get_or_create(slug='marcory', defaults={
+        'nom': 'Clinique Ivoire Dentaire',
+        'adresse': "Rue des Jardins, Marcory Zone 4\nAbidjan, Côte d'Ivoire",
+        'telephone': '+225 07 00 00 08 41',
+        'email': 'contact@cliniqueivoiredentaire.ci',
+    })
+    for nom in ('Service', 'Dentiste', 'Horaire', 'RendezVous', 'RendezVousArchive', 'Contact', 'ListeAttente'):
+        apps.get_model('clinic', nom).objects.filter(clinique__isnull=True).update(clinique=clinique)
+    apps.get_model('clinic', 'Fermeture').objects.filter(annuelle=False).update(clinique=clinique)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0009_fermetures'),
+    ]
+
+    # Colonnes `clinique` des grandes tables ajoutées nullables : ALTER TABLE ADD
+    # COLUMN, sans reconstruction de la table (ni de ses déclencheurs plein texte
+    # sous SQLite, voir 0003). Seules les petites tables du catalogue passent
+    # ensuite en NOT NULL, une fois toutes leurs lignes rattachées au site créé
+    # par rattacher_site_existant : la base ne reçoit aucune valeur par défaut,
+    # site_par_defaut() (code de l'application) n'est pas appelé pendant migrate.
+    operations = [
+        migrations.CreateModel(
+            name='Clinique',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=100, verbose_name='Nom')),
+                ('slug', models.SlugField(help_text="Préfixe d'URL du site : /sites/<identifiant>/", unique=True, verbose_name='Identifiant')),
+                ('domaine', models.CharField(blank=True, help_text='Hôte servant ce site (ex: cocody.cliniqueivoiredentaire.ci), sans le port', max_length=255, verbose_name='Nom de domaine')),
+                ('adresse', models.TextField(verbose_name='Adresse')),
+                ('telephone', models.CharField(max_length=30, verbose_name='Téléphone')),
+                ('email', models.EmailField(max_length=254, verbose_name='Email')),
+                ('actif', models.BooleanField(default=True, verbose_name='Site actif')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Clinique',
+                'verbose_name_plural': 'Cliniques',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='clinique',
+            constraint=models.UniqueConstraint(condition=models.Q(('domaine', ''), _negated=True), fields=('domaine',), name='clinique_domaine_uniq'),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='clinique',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='services', to='clinic.clinique', verbose_name='Clinique'),
+        ),
+        migrations.AddField(
+            model_name='dentiste',
+            name='clinique',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dentistes', to='clinic.clinique', verbose_name='Clinique'),
+        ),
+        migrations.AddField(
+            model_name='horaire',
+            name='clinique',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='horaires', to='clinic.clinique', verbose_name='Clinique'),
+        ),
+        migrations.AddField(
+            model_name='fermeture',
+            name='clinique',
+            field=models.ForeignKey(blank=True, help_text='Laisser vide pour fermer tous les sites (jours fériés)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='fermetures', to='clinic.clinique', verbose_name='Clinique'),
+        ),
+        migrations.AddField(
+            model_name='rendezvous',
+            name='clinique',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='rendezvous', to='clinic.clinique', verbose_name='Clinique'),
+        ),
+        migrations.AddField(
+            model_name='rendezvousarchive',
+            name='clinique',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='rendezvous_archives', to='clinic.clinique', verbose_name='Clinique'),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='clinique',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='contacts', to='clinic.clinique', verbose_name='Clinique'),
+        ),
+        migrations.AddField(
+            model_name='listeattente',
+            name='clinique',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='listes_attente', to='clinic.clinique', verbose_name='Clinique'),
+        ),
+        migrations.RunPython(rattacher_site_existant, migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.AlterField(
+                    model_name='service',
+                    name='clinique',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='services', to='clinic.clinique', verbose_name='Clinique'),
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='service',
+                    name='clinique',
+                    field=models.ForeignKey(default=clinic.models.site_par_defaut, on_delete=django.db.models.deletion.CASCADE, related_name='services', to='clinic.clinique', verbose_name='Clinique'),
+                ),
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.AlterField(
+                    model_name='dentiste',
+                    name='clinique',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dentistes', to='clinic.clinique', verbose_name='Clinique'),
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='dentiste',
+                    name='clinique',
+                    field=models.ForeignKey(default=clinic.models.site_par_defaut, on_delete=django.db.models.deletion.CASCADE, related_name='dentistes', to='clinic.clinique', verbose_name='Clinique'),
+                ),
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.AlterField(
+                    model_name='horaire',
+                    name='clinique',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='horaires', to='clinic.clinique', verbose_name='Clinique'),
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='horaire',
+                    name='clinique',
+                    field=models.ForeignKey(default=clinic.models.site_par_defaut, on_delete=django.db.models.deletion.CASCADE, related_name='horaires', to='clinic.clinique', verbose_name='Clinique'),
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='horaire',
+            name='jour',
+            field=models.IntegerField(choices=[(0, 'Lundi'), (1, 'Mardi'), (2, 'Mercredi'), (3, 'Jeudi'), (4, 'Vendredi'), (5, 'Samedi'), (6, 'Dimanche')]),
+        ),
+        migrations.AddConstraint(
+            model_name='horaire',
+            constraint=models.UniqueConstraint(fields=('clinique', 'jour'), name='horaire_clinique_jour_uniq'),
+        ),
+        # Index par site : listes de l'admin et catalogue filtrés par clinique
+        migrations.RemoveIndex(
+            model_name='rendezvous',
+            name='rdv_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='rendezvous',
+            index=models.Index(fields=['clinique', '-created_at'], name='rdv_clinique_created_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='rendezvousarchive',
+            name='rdv_archive_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='rendezvousarchive',
+            index=models.Index(fields=['clinique', '-created_at'], name='rdv_archive_clinique_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['clinique', '-created_at'], name='contact_clinique_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['clinique', 'actif', 'nom'], name='service_clinique_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dentiste',
+            index=models.Index(fields=['clinique', 'actif', 'nom', 'prenom'], name='dentiste_clinique_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fermeture',
+            index=models.Index(fields=['clinique', 'date_debut'], name='fermeture_clinique_idx'),
+        ),
+    ]
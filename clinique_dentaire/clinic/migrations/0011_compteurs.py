@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Q
+
+# Mêmes définitions que les COMPTEURS des modèles (voir clinic/compteurs.py)
+COMPTEURS = {
+    'Contact': {'contacts_non_lus': Q(lu=False), 'contacts_non_traites': Q(traite=False)},
+    'RendezVous': {'rendezvous_en_attente': Q(statut='pending')},
+}
+
+
+def compter(apps, schema_editor):
+    """Compteurs initiaux par site (un GROUP BY par table)"""
+    Compteur = apps.get_model('clinic', 'Compteur')
+    lignes = []
+    for nom_modele, compteurs in COMPTEURS.items():
+        groupes = (
+            apps.get_model('clinic', nom_modele).objects.filter(clinique__isnull=False)
+            .values('clinique_id')
+            .annotate(**{nom: Count('pk', filter=condition) for nom, condition in compteurs.items()})
+            .order_by()
+        )
+        for groupe in groupes:
+            lignes += [Compteur(clinique_id=groupe['clinique_id'], nom=nom, valeur=groupe[nom]) for nom in compteurs]
+    Compteur.objects.bulk_create(lignes, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0010_multi_sites'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Compteur',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=50, verbose_name='Compteur')),
+                ('valeur', models.IntegerField(default=0, verbose_name='Valeur')),
+                ('clinique', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compteurs', to='clinic.clinique', verbose_name='Clinique')),
+            ],
+            options={
+                'verbose_name': 'Compteur',
+                'verbose_name_plural': 'Compteurs',
+                'ordering': ['clinique', 'nom'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='compteur',
+            constraint=models.UniqueConstraint(fields=('clinique', 'nom'), name='compteur_clinique_nom_uniq'),
+        ),
+        migrations.RunPython(compter, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:18
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0011_compteurs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JournalModification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modele', models.CharField(max_length=30, verbose_name="Type d'objet")),
+                ('objet_id', models.BigIntegerField(verbose_name="Identifiant de l'objet")),
+                ('action', models.CharField(choices=[('creation', 'Création'), ('modification', 'Modification'), ('suppression', 'Suppression')], max_length=20, verbose_name='Action')),
+                ('modifications', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Modifications')),
+                ('auteur', models.CharField(blank=True, max_length=150, verbose_name='Auteur')),
+                ('origine', models.CharField(blank=True, max_length=200, verbose_name='Origine')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Date')),
+                ('clinique', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='journal', to='clinic.clinique', verbose_name='Clinique')),
+            ],
+            options={
+                'verbose_name': 'Modification journalisée',
+                'verbose_name_plural': 'Journal des modifications',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['modele', 'objet_id', 'created_at'], name='journal_objet_idx'), models.Index(fields=['clinique', '-created_at'], name='journal_clinique_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0012_journal_modifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rendezvous',
+            name='dentiste',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rendezvous', to='clinic.dentiste', verbose_name='Dentiste'),
+        ),
+        migrations.AddField(
+            model_name='rendezvousarchive',
+            name='dentiste',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rendezvous_archives', to='clinic.dentiste', verbose_name='Dentiste'),
+        ),
+        migrations.AddIndex(
+            model_name='rendezvous',
+            index=models.Index(fields=['dentiste', 'updated_at'], name='rdv_dentiste_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rendezvous',
+            index=models.Index(fields=['service', 'updated_at'], name='rdv_service_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0013_agenda_dentiste'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointDeReprise',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=100, unique=True, verbose_name='Traitement')),
+                ('dernier_id', models.BigIntegerField(default=0, verbose_name='Dernier identifiant traité')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Modifié le')),
+            ],
+            options={
+                'verbose_name': 'Point de reprise',
+                'verbose_name_plural': 'Points de reprise',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:30
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0014_point_de_reprise'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Quarantaine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type_envoi', models.CharField(choices=[('contact', 'Message de contact'), ('rendezvous', 'Rendez-vous')], max_length=20, verbose_name='Formulaire')),
+                ('donnees', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Données')),
+                ('score', models.FloatField(verbose_name='Score')),
+                ('motifs', models.CharField(blank=True, max_length=255, verbose_name='Motifs')),
+                ('verdict', models.CharField(blank=True, choices=[('', 'À vérifier'), ('spam', 'Spam confirmé'), ('legitime', 'Légitime')], default='', max_length=10, verbose_name='Verdict')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Reçu le')),
+                ('clinique', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='clinic.clinique', verbose_name='Clinique')),
+            ],
+            options={
+                'verbose_name': 'Envoi en quarantaine',
+                'verbose_name_plural': 'Quarantaine anti-spam',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
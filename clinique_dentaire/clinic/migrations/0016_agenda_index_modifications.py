@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinic', '0015_quarantaine_antispam'),
+    ]
+
+    # Mise à jour incrémentale des agendas (voir agenda.py) : filtre sur
+    # updated_at seul, le tri entre agendas se fait en Python
+    operations = [
+        migrations.RemoveIndex(
+            model_name='rendezvous',
+            name='rdv_service_updated_idx',
+        ),
+        migrations.AddIndex(
+            model_name='rendezvous',
+            index=models.Index(fields=['updated_at'], name='rdv_updated_idx'),
+        ),
+    ]
@@ -2,13 +2,64 @@
 # MODELS.PY - Modèles Django pour la clinique dentaire
 # ==========================================
 
-from django.db import models
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.core.validators import EmailValidator, RegexValidator
 from django.utils import timezone
 from datetime import date
 
+from .telephones import normalize_phone, validate_phone
+
+
+class Clinique(models.Model):
+    """Site de la clinique : catalogue, horaires, rendez-vous et messages propres"""
+    nom = models.CharField(max_length=100, verbose_name="Nom")
+    slug = models.SlugField(unique=True, verbose_name="Identifiant", help_text="Préfixe d'URL du site : /sites/<identifiant>/")
+    domaine = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name="Nom de domaine",
+        help_text="Hôte servant ce site (ex: cocody.cliniqueivoiredentaire.ci), sans le port"
+    )
+    adresse = models.TextField(verbose_name="Adresse")
+    telephone = models.CharField(max_length=30, verbose_name="Téléphone")
+    email = models.EmailField(verbose_name="Email")
+    actif = models.BooleanField(default=True, verbose_name="Site actif")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Clinique"
+        verbose_name_plural = "Cliniques"
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['domaine'], condition=~models.Q(domaine=''), name='clinique_domaine_uniq'),
+        ]
+
+    def __str__(self):
+        return self.nom
+
+
+def site_par_defaut():
+    """Site des enregistrements créés sans site explicite (lu dans l'annuaire en mémoire, voir sites.py)"""
+    from .sites import annuaire
+    defaut = annuaire().defaut
+    return defaut.pk if defaut else None
+
+
 class Service(models.Model):
     """Modèle pour les services dentaires proposés"""
+    clinique = models.ForeignKey(
+        Clinique,
+        on_delete=models.CASCADE,
+        default=site_par_defaut,
+        related_name='services',
+        verbose_name="Clinique"
+    )
     nom = models.CharField(max_length=100, verbose_name="Nom du service")
     description = models.TextField(verbose_name="Description")
     ordre = models.PositiveIntegerField(default=0)
@@ -31,6 +82,12 @@ class Service(models.Model):
         default=30, 
         verbose_name="Durée en minutes"
     )
+    capacite_journaliere = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Rendez-vous maximum par jour",
+        help_text="Laisser vide pour ne pas limiter les réservations"
+    )
     actif = models.BooleanField(default=True, verbose_name="Service actif")
     icone = models.CharField(
         max_length=50, 
@@ -50,12 +107,22 @@ class Service(models.Model):
         verbose_name = "Service"
         verbose_name_plural = "Services"
         ordering = ['nom']
+        indexes = [
+            models.Index(fields=['clinique', 'actif', 'nom'], name='service_clinique_idx'),
+        ]
 
     def __str__(self):
         return self.nom
 
 class Dentiste(models.Model):
     """Modèle pour les dentistes de la clinique"""
+    clinique = models.ForeignKey(
+        Clinique,
+        on_delete=models.CASCADE,
+        default=site_par_defaut,
+        related_name='dentistes',
+        verbose_name="Clinique"
+    )
     nom = models.CharField(max_length=50, verbose_name="Nom")
     prenom = models.CharField(max_length=50, verbose_name="Prénom")
     specialite = models.CharField(max_length=100, verbose_name="Spécialité")
@@ -77,6 +144,9 @@ class Dentiste(models.Model):
         verbose_name = "Dentiste"
         verbose_name_plural = "Dentistes"
         ordering = ['nom', 'prenom']
+        indexes = [
+            models.Index(fields=['clinique', 'actif', 'nom', 'prenom'], name='dentiste_clinique_idx'),
+        ]
 
     def __str__(self):
         return f"Dr. {self.nom} {self.prenom}"
@@ -97,7 +167,14 @@ class Horaire(models.Model):
         (6, 'Dimanche'),
     ]
     
-    jour = models.IntegerField(choices=JOURS_SEMAINE, unique=True)
+    clinique = models.ForeignKey(
+        Clinique,
+        on_delete=models.CASCADE,
+        default=site_par_defaut,
+        related_name='horaires',
+        verbose_name="Clinique"
+    )
+    jour = models.IntegerField(choices=JOURS_SEMAINE)
     ouverture_matin = models.TimeField(null=True, blank=True)
     fermeture_matin = models.TimeField(null=True, blank=True)
     ouverture_apres_midi = models.TimeField(null=True, blank=True)
@@ -108,12 +185,223 @@ class Horaire(models.Model):
         verbose_name = "Horaire"
         verbose_name_plural = "Horaires"
         ordering = ['jour']
+        constraints = [
+            models.UniqueConstraint(fields=['clinique', 'jour'], name='horaire_clinique_jour_uniq'),
+        ]
 
     def __str__(self):
         return f"{self.get_jour_display()}"
 
 
-class RendezVous(models.Model):
+class Fermeture(models.Model):
+    """Fermeture exceptionnelle ou jour férié (du `date_debut` au `date_fin` inclus)"""
+    clinique = models.ForeignKey(
+        Clinique,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='fermetures',
+        verbose_name="Clinique",
+        help_text="Laisser vide pour fermer tous les sites (jours fériés)"
+    )
+    date_debut = models.DateField(verbose_name="Du")
+    date_fin = models.DateField(verbose_name="Au")
+    motif = models.CharField(max_length=100, verbose_name="Motif")
+    annuelle = models.BooleanField(
+        default=False,
+        verbose_name="Chaque année",
+        help_text="Fermeture répétée chaque année aux mêmes dates (jours fériés fixes)"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Fermeture"
+        verbose_name_plural = "Fermetures et jours fériés"
+        ordering = ['date_debut']
+        constraints = [
+            models.CheckConstraint(check=models.Q(date_fin__gte=models.F('date_debut')), name='fermeture_periode_valide'),
+        ]
+        indexes = [
+            models.Index(fields=['clinique', 'date_debut'], name='fermeture_clinique_idx'),
+        ]
+
+    def __str__(self):
+        if self.date_debut == self.date_fin:
+            return f"{self.motif} ({self.date_debut})"
+        return f"{self.motif} ({self.date_debut} - {self.date_fin})"
+
+
+# Vrai pendant un déplacement de lignes (archivage, voir deplacement())
+_deplacement = ContextVar('deplacement', default=False)
+
+
+@contextmanager
+def deplacement():
+    """
+    Lignes recopiées ailleurs avant leur suppression (archivage) : leur
+    delete() n'est ni journalisé ni retiré des statistiques, qui comptent
+    aussi les archives.
+    """
+    jeton = _deplacement.set(True)
+    try:
+        yield
+    finally:
+        _deplacement.reset(jeton)
+
+
+class CompteursQuerySet(models.QuerySet):
+    """
+    update() et delete() reportés sur les compteurs de l'équipe (voir
+    compteurs.py) ; delete() journalisé pour les modèles à JournalMixin (journal.py).
+    """
+
+    def update(self, **kwargs):
+        from .compteurs import suivre_update
+        return suivre_update(self, kwargs, lambda: super(CompteursQuerySet, self).update(**kwargs))
+
+    update.alters_data = True
+
+    def delete(self):
+        from .compteurs import suivre_delete
+        from .journal import suivre_delete as journaliser_delete
+
+        def supprimer():
+            return suivre_delete(self, lambda: super(CompteursQuerySet, self).delete())
+
+        if issubclass(self.model, JournalMixin) and not _deplacement.get():
+            return journaliser_delete(self, supprimer)
+        return supprimer()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class RendezVousQuerySet(CompteursQuerySet):
+    """
+    delete() rend aussi les places des jours à venir dans les quotas
+    journaliers (voir capacite.py) et retire les lignes des statistiques
+    (statistiques.py), sauf déplacement vers l'archive.
+    """
+
+    def delete(self):
+        from .capacite import suivre_delete
+        from .statistiques import suivre_delete as retirer_des_statistiques
+
+        def supprimer():
+            if _deplacement.get():
+                return super(RendezVousQuerySet, self).delete()
+            return retirer_des_statistiques(self, lambda: super(RendezVousQuerySet, self).delete())
+
+        return suivre_delete(self, supprimer)
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class ArchivesQuerySet(models.QuerySet):
+    """delete() retire les rendez-vous archivés des statistiques (voir statistiques.py)"""
+
+    def delete(self):
+        from .statistiques import suivre_delete
+        return suivre_delete(self, lambda: super(ArchivesQuerySet, self).delete())
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class SuiviCompteursMixin:
+    """
+    Modèle dont des lignes sont comptées dans la table Compteur :
+    COMPTEURS associe chaque compteur à la condition (champ, valeur) des lignes comptées.
+    """
+    COMPTEURS = {}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # État lu en base, pour reporter les changements à l'enregistrement (voir signals.py)
+        if all(champ in field_names for champ, _ in cls.COMPTEURS.values()):
+            instance._compteurs_initiaux = instance.compteurs_actifs()
+        return instance
+
+    def compteurs_actifs(self):
+        """Compteurs dans lesquels la ligne est comptée"""
+        return frozenset(nom for nom, (champ, valeur) in self.COMPTEURS.items() if getattr(self, champ) == valeur)
+
+    def delete(self, *args, **kwargs):
+        from .compteurs import suivre_suppression
+        resultat = super().delete(*args, **kwargs)
+        suivre_suppression(self)
+        return resultat
+
+
+class JournalMixin:
+    """
+    Modèle dont les modifications des champs JOURNALISES sont inscrites dans
+    JournalModification (voir journal.py).
+    """
+    JOURNALISES = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valeurs lues en base, comparées à l'enregistrement (champs différés ignorés)
+        instance._journal_initial = instance.etat_journal(field_names)
+        return instance
+
+    def etat_journal(self, field_names=None):
+        """{champ: valeur} des champs journalisés (identifiant pour une clé étrangère)"""
+        etat = {}
+        for nom in self.JOURNALISES:
+            attname = self._meta.get_field(nom).attname
+            if field_names is None or attname in field_names:
+                etat[nom] = getattr(self, attname)
+        return etat
+
+    def delete(self, *args, **kwargs):
+        from .journal import suppression
+        # Identifiant remis à None par la suppression
+        pk = self.pk
+        resultat = super().delete(*args, **kwargs)
+        suppression(self, pk)
+        return resultat
+
+
+class PatientManager(models.Manager):
+    def for_phone(self, telephone, **coordonnees):
+        """Patient correspondant au téléphone normalisé, créé au besoin (None si numéro invalide)"""
+        numero = normalize_phone(telephone)
+        if numero is None:
+            return None
+        patient, _ = self.get_or_create(telephone=numero, defaults=coordonnees)
+        return patient
+
+
+class Patient(models.Model):
+    """Patient identifié par son numéro de téléphone normalisé (E.164)"""
+    telephone = models.CharField(max_length=16, unique=True, verbose_name="Téléphone (E.164)")
+    nom = models.CharField(max_length=100, verbose_name="Nom")
+    prenom = models.CharField(max_length=100, verbose_name="Prénom")
+    email = models.EmailField(blank=True, verbose_name="Email")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PatientManager()
+
+    class Meta:
+        verbose_name = "Patient"
+        verbose_name_plural = "Patients"
+        ordering = ['nom', 'prenom']
+
+    def __str__(self):
+        return f"{self.prenom} {self.nom} ({self.telephone})"
+
+    @property
+    def nom_complet(self):
+        return f"{self.prenom} {self.nom}"
+
+
+class RendezVous(SuiviCompteursMixin, JournalMixin, models.Model):
     """Modèle principal pour les rendez-vous"""
     # Statuts possibles
     STATUS_CHOICES = [
@@ -122,23 +410,53 @@ class RendezVous(models.Model):
         ('cancelled', 'Annulé'),
         ('completed', 'Terminé'),
     ]
+    # Changements de statut autorisés (admin, actions groupées : voir transitions.py)
+    TRANSITIONS = {
+        'pending': ('confirmed', 'cancelled'),
+        'confirmed': ('completed', 'cancelled'),
+        'cancelled': (),
+        'completed': (),
+    }
+    # Compteurs de l'équipe (en-tête de l'admin, voir compteurs.py)
+    COMPTEURS = {'rendezvous_en_attente': ('statut', 'pending')}
+    objects = RendezVousQuerySet.as_manager()
+    # Historique des modifications (voir journal.py)
+    JOURNALISES = (
+        'nom', 'prenom', 'telephone', 'email', 'service', 'date_souhaitee',
+        'message', 'statut', 'date_confirmee', 'dentiste',
+    )
+    
+    # Renseigné à l'enregistrement (site du service) ; nullable pour ajouter la
+    # colonne sans reconstruire la table ni ses déclencheurs plein texte
+    clinique = models.ForeignKey(
+        Clinique,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='rendezvous',
+        verbose_name="Clinique"
+    )
     
     # Informations personnelles
     nom = models.CharField(max_length=100, verbose_name="Nom")
     prenom = models.CharField(max_length=100, verbose_name="Prénom")
     
     # Validation du téléphone ivoirien
-    phone_regex = RegexValidator(
-        regex=r'^\+225\s?\d{2}\s?\d{2}\s?\d{2}\s?\d{2}$|^\d{10}$',
-        message="Format téléphone invalide. Exemple: +225 07 08 09 10"
-    )
     telephone = models.CharField(
-        validators=[phone_regex], 
+        validators=[validate_phone],
         max_length=20, 
         verbose_name="Téléphone"
     )
     
     email = models.EmailField(verbose_name="Email")
+    patient = models.ForeignKey(
+        Patient,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='rendezvous',
+        verbose_name="Patient"
+    )
     
     # Informations du rendez-vous
     date_souhaitee = models.DateField(verbose_name="Date souhaitée")
@@ -152,6 +470,17 @@ class RendezVous(models.Model):
         null=True, 
         verbose_name="Message complémentaire"
     )
+    # Praticien affecté par l'équipe (agenda du dentiste, voir agenda.py) ;
+    # index composé (dentiste, updated_at) ci-dessous
+    dentiste = models.ForeignKey(
+        Dentiste,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='rendezvous',
+        verbose_name="Dentiste"
+    )
     
     # Statut et métadonnées
     statut = models.CharField(
@@ -171,19 +500,92 @@ class RendezVous(models.Model):
         blank=True, 
         verbose_name="Date et heure confirmées"
     )
+    rappel_envoye_le = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Rappel envoyé le"
+    )
     
     class Meta:
         verbose_name = "Rendez-vous"
         verbose_name_plural = "Rendez-vous"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['clinique', '-created_at'], name='rdv_clinique_created_idx'),
+            # Sélection des rendez-vous archivables
+            models.Index(fields=['statut', 'updated_at'], name='rdv_statut_updated_idx'),
+            # Index de la clé étrangère dentiste (db_index=False ci-dessus)
+            models.Index(fields=['dentiste', 'updated_at'], name='rdv_dentiste_updated_idx'),
+            # Rendez-vous modifiés depuis la dernière génération d'un agenda (voir agenda.py)
+            models.Index(fields=['updated_at'], name='rdv_updated_idx'),
+            # Rappels à envoyer : index partiel, limité aux rendez-vous sans rappel
+            # (le statut est dans la clé, SQLite n'exploitant pas une condition paramétrée)
+            models.Index(
+                fields=['statut', 'date_confirmee'],
+                name='rdv_rappel_du_idx',
+                condition=models.Q(rappel_envoye_le__isnull=True),
+            ),
+        ]
     
     def __str__(self):
-        return f"{self.prenom} {self.nom} - {self.service.nom} ({self.date_souhaitee})"
+        # Service seulement s'il est déjà chargé (select_related) : pas de requête par ligne
+        if self._meta.get_field('service').is_cached(self):
+            return f"{self.prenom} {self.nom} - {self.service.nom} ({self.date_souhaitee})"
+        return f"{self.prenom} {self.nom} ({self.date_souhaitee})"
     
     @property
     def nom_complet(self):
         return f"{self.prenom} {self.nom}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valeurs lues en base, pour détecter les changements de statut (voir signals.py) ;
+        # ignorées si ces champs sont différés, pour ne pas déclencher de requête
+        if 'statut' in field_names and 'service_id' in field_names:
+            instance._etat_initial = instance.etat_statistique()
+            if 'date_souhaitee' in field_names:
+                instance._place_initiale = instance.place()
+        return instance
+
+    def etat_statistique(self):
+        """Case (service, statut) comptée pour ce rendez-vous dans les statistiques"""
+        return (self.service_id, self.statut)
+
+    def place(self):
+        """Place (service, jour) occupée dans les quotas journaliers ; None si le rendez-vous est annulé"""
+        return None if self.statut == 'cancelled' else (self.service_id, self.date_souhaitee)
+
+    def save(self, *args, **kwargs):
+        # Rattachement au patient à l'écriture (sauf sauvegarde partielle)
+        if self.patient_id is None and not kwargs.get('update_fields'):
+            self.patient = Patient.objects.for_phone(
+                self.telephone, nom=self.nom, prenom=self.prenom, email=self.email
+            )
+        if self.clinique_id is None:
+            self.clinique_id = self.service.clinique_id
+        if self._state.adding and self.place() is not None:
+            # Place prise dans le quota du jour, annulée avec l'insertion si celle-ci échoue
+            with transaction.atomic():
+                OccupationJournaliere.objects.reserver(self.service, self.date_souhaitee)
+                super().save(*args, **kwargs)
+            return
+        super().save(*args, **kwargs)
     
+    def delete(self, *args, **kwargs):
+        # Place rendue et statistiques d'après l'état en base, dans la transaction de la suppression
+        from .capacite import suivre_delete
+        from .statistiques import suivre_delete as retirer_des_statistiques
+        ligne = RendezVous.objects.filter(pk=self.pk)
+        return suivre_delete(ligne, lambda: retirer_des_statistiques(
+            ligne, lambda: super(RendezVous, self).delete(*args, **kwargs)
+        ))
+
+    @classmethod
+    def transition_autorisee(cls, avant, apres):
+        """Vrai si un rendez-vous peut passer du statut `avant` au statut `apres`"""
+        return avant == apres or apres in cls.TRANSITIONS.get(avant, ())
+
     def clean(self):
         """Validation personnalisée"""
         from django.core.exceptions import ValidationError
@@ -193,20 +595,130 @@ class RendezVous(models.Model):
             raise ValidationError({
                 'date_souhaitee': 'La date ne peut pas être dans le passé.'
             })
-class Contact(models.Model):
+
+        # Vérifier qu'il reste une place ce jour-là (contrôle repris à l'insertion, voir save)
+        if (
+            self._state.adding and self.place() is not None and self.service_id
+            and OccupationJournaliere.objects.complet(self.service, self.date_souhaitee)
+        ):
+            raise ValidationError({
+                'date_souhaitee': f'Plus de place disponible pour « {self.service.nom} » à cette date.'
+            })
+
+        # Vérifier que le changement de statut est permis
+        initial = getattr(self, '_etat_initial', None)
+        if initial is not None and not self.transition_autorisee(initial[1], self.statut):
+            raise ValidationError({
+                'statut': f"Passage de « {dict(self.STATUS_CHOICES)[initial[1]]} » "
+                          f"à « {self.get_statut_display()} » non autorisé."
+            })
+
+
+class RendezVousArchive(models.Model):
+    """Rendez-vous terminés ou annulés déplacés hors de la table principale"""
+    # Même identifiant que le rendez-vous d'origine
+    id = models.BigIntegerField(primary_key=True)
+    objects = ArchivesQuerySet.as_manager()
+    clinique = models.ForeignKey(
+        Clinique,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='rendezvous_archives',
+        verbose_name="Clinique"
+    )
+    nom = models.CharField(max_length=100, verbose_name="Nom")
+    prenom = models.CharField(max_length=100, verbose_name="Prénom")
+    telephone = models.CharField(max_length=20, verbose_name="Téléphone")
+    email = models.EmailField(verbose_name="Email")
+    patient = models.ForeignKey(
+        Patient,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='rendezvous_archives',
+        verbose_name="Patient"
+    )
+    date_souhaitee = models.DateField(verbose_name="Date souhaitée")
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        verbose_name="Service demandé"
+    )
+    message = models.TextField(blank=True, null=True, verbose_name="Message complémentaire")
+    dentiste = models.ForeignKey(
+        Dentiste,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='rendezvous_archives',
+        verbose_name="Dentiste"
+    )
+    statut = models.CharField(
+        max_length=20,
+        choices=RendezVous.STATUS_CHOICES,
+        verbose_name="Statut"
+    )
+    created_at = models.DateTimeField(verbose_name="Créé le")
+    updated_at = models.DateTimeField(verbose_name="Modifié le")
+    date_confirmee = models.DateTimeField(null=True, blank=True, verbose_name="Date et heure confirmées")
+    rappel_envoye_le = models.DateTimeField(null=True, blank=True, verbose_name="Rappel envoyé le")
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Archivé le")
+
+    class Meta:
+        verbose_name = "Rendez-vous archivé"
+        verbose_name_plural = "Rendez-vous archivés"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['clinique', '-created_at'], name='rdv_archive_clinique_idx'),
+        ]
+
+    def __str__(self):
+        # Service seulement s'il est déjà chargé (select_related) : pas de requête par ligne
+        if self._meta.get_field('service').is_cached(self):
+            return f"{self.prenom} {self.nom} - {self.service.nom} ({self.date_souhaitee})"
+        return f"{self.prenom} {self.nom} ({self.date_souhaitee})"
+
+    @property
+    def nom_complet(self):
+        return f"{self.prenom} {self.nom}"
+
+
+class Contact(SuiviCompteursMixin, JournalMixin, models.Model):
     """Modèle pour les messages de contact"""
+    # Compteurs de l'équipe (en-tête de l'admin, voir compteurs.py)
+    COMPTEURS = {'contacts_non_lus': ('lu', False), 'contacts_non_traites': ('traite', False)}
+    objects = CompteursQuerySet.as_manager()
+    # Historique des modifications (voir journal.py)
+    JOURNALISES = ('nom', 'prenom', 'email', 'telephone', 'sujet', 'message', 'lu', 'traite')
+
+    # Renseigné à l'enregistrement (site de la requête) ; nullable pour ajouter la
+    # colonne sans reconstruire la table ni ses déclencheurs plein texte
+    clinique = models.ForeignKey(
+        Clinique,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='contacts',
+        verbose_name="Clinique"
+    )
     nom = models.CharField(max_length=50, verbose_name="Nom")
     prenom = models.CharField(max_length=50, verbose_name="Prénom")
     email = models.EmailField(verbose_name="Email")
     lu = models.BooleanField(default=False)
     telephone = models.CharField(
         max_length=20,
-        validators=[RegexValidator(
-            regex=r'^\+?225?[0-9]{8,10}$',
-            message="Format: +225XXXXXXXX"
-        )],
+        validators=[validate_phone],
         verbose_name="Téléphone"
     )
+    patient = models.ForeignKey(
+        Patient,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='contacts',
+        verbose_name="Patient"
+    )
     sujet = models.CharField(max_length=100, verbose_name="Sujet")
     message = models.TextField(verbose_name="Message")
     traite = models.BooleanField(default=False, verbose_name="Traité")
@@ -217,10 +729,353 @@ class Contact(models.Model):
         verbose_name = "Message de contact"
         verbose_name_plural = "Messages de contact"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['clinique', '-created_at'], name='contact_clinique_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nom_complet} - {self.sujet}"
 
     @property
     def nom_complet(self):
-        return f"{self.prenom} {self.nom}"
\ No newline at end of file
+        return f"{self.prenom} {self.nom}"
+
+    def save(self, *args, **kwargs):
+        if self.patient_id is None and not kwargs.get('update_fields'):
+            self.patient = Patient.objects.for_phone(
+                self.telephone, nom=self.nom, prenom=self.prenom, email=self.email
+            )
+        if self.clinique_id is None:
+            self.clinique_id = site_par_defaut()
+        super().save(*args, **kwargs)
+
+
+class StatistiqueReservation(models.Model):
+    """
+    Compteurs de rendez-vous par jour de réception, service et statut.
+
+    Tenue à jour par signaux (voir signals.py) et reconstruite par la
+    commande `rebuild_statistiques` : les rapports lisent cette table au
+    lieu de compter les rendez-vous.
+    """
+    jour = models.DateField(verbose_name="Jour de réception")
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        related_name='statistiques',
+        verbose_name="Service"
+    )
+    statut = models.CharField(max_length=20, choices=RendezVous.STATUS_CHOICES, verbose_name="Statut")
+    nombre = models.IntegerField(default=0, verbose_name="Nombre de rendez-vous")
+
+    class Meta:
+        verbose_name = "Statistique de réservation"
+        verbose_name_plural = "Statistiques de réservation"
+        ordering = ['-jour', 'service', 'statut']
+        constraints = [
+            models.UniqueConstraint(fields=['jour', 'service', 'statut'], name='stat_jour_service_statut_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.jour} - {self.service_id} - {self.statut}: {self.nombre}"
+
+
+class Compteur(models.Model):
+    """
+    Compteur de l'équipe par site (messages non lus, rendez-vous en attente...).
+
+    Tenu à jour au fil des écritures (voir compteurs.py) et reconstruit par
+    la commande `rebuild_compteurs` : l'en-tête de l'admin lit cette table
+    au lieu de compter les lignes à chaque page.
+    """
+    clinique = models.ForeignKey(
+        Clinique,
+        on_delete=models.CASCADE,
+        related_name='compteurs',
+        verbose_name="Clinique"
+    )
+    nom = models.CharField(max_length=50, verbose_name="Compteur")
+    valeur = models.IntegerField(default=0, verbose_name="Valeur")
+
+    class Meta:
+        verbose_name = "Compteur"
+        verbose_name_plural = "Compteurs"
+        ordering = ['clinique', 'nom']
+        constraints = [
+            models.UniqueConstraint(fields=['clinique', 'nom'], name='compteur_clinique_nom_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.clinique_id} - {self.nom}: {self.valeur}"
+
+
+class JournalModification(models.Model):
+    """
+    Historique des modifications des rendez-vous et messages de contact,
+    champ par champ : une ligne par enregistrement, jamais modifiée.
+
+    Écrit par lots en fin de requête (voir journal.py). Sans clé étrangère vers
+    l'objet : l'historique survit à l'archivage et à la suppression.
+    """
+    ACTION_CHOICES = [
+        ('creation', 'Création'),
+        ('modification', 'Modification'),
+        ('suppression', 'Suppression'),
+    ]
+
+    clinique = models.ForeignKey(
+        Clinique,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='journal',
+        verbose_name="Clinique"
+    )
+    modele = models.CharField(max_length=30, verbose_name="Type d'objet")
+    objet_id = models.BigIntegerField(verbose_name="Identifiant de l'objet")
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES, verbose_name="Action")
+    # {champ: [avant, après]}
+    modifications = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name="Modifications")
+    auteur = models.CharField(max_length=150, blank=True, verbose_name="Auteur")
+    origine = models.CharField(max_length=200, blank=True, verbose_name="Origine")
+    # Date de la modification (et non de l'écriture du lot)
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Date")
+
+    class Meta:
+        verbose_name = "Modification journalisée"
+        verbose_name_plural = "Journal des modifications"
+        ordering = ['-created_at']
+        indexes = [
+            # Historique d'un objet (page « Historique » de l'admin)
+            models.Index(fields=['modele', 'objet_id', 'created_at'], name='journal_objet_idx'),
+            models.Index(fields=['clinique', '-created_at'], name='journal_clinique_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.modele} {self.objet_id} - {self.get_action_display()} ({self.created_at:%d/%m/%Y %H:%M})"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Le journal des modifications est en ajout seul.")
+        super().save(*args, **kwargs)
+
+
+class PointDeReprise(models.Model):
+    """
+    Avancement d'un traitement par lots parcourant une table dans l'ordre des
+    identifiants (purge des données, voir retention.py) : dernier identifiant
+    traité, écrit dans la même transaction que le lot.
+    """
+    nom = models.CharField(max_length=100, unique=True, verbose_name="Traitement")
+    dernier_id = models.BigIntegerField(default=0, verbose_name="Dernier identifiant traité")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Modifié le")
+
+    class Meta:
+        verbose_name = "Point de reprise"
+        verbose_name_plural = "Points de reprise"
+
+    def __str__(self):
+        return f"{self.nom}: {self.dernier_id}"
+
+
+class Quarantaine(models.Model):
+    """
+    Envoi du formulaire de contact ou de rendez-vous écarté par le filtre
+    anti-spam (voir antispam.py) avant tout enregistrement : ni message, ni
+    rendez-vous, ni patient, ni email. Table sans index secondaire ni
+    signal, pour qu'un spam coûte une seule écriture.
+
+    Le verdict de l'équipe (spam confirmé, légitime) sert à l'entraînement
+    du filtre (manage.py entrainer_antispam).
+    """
+    TYPE_CHOICES = [
+        ('contact', 'Message de contact'),
+        ('rendezvous', 'Rendez-vous'),
+    ]
+    VERDICT_CHOICES = [
+        ('', 'À vérifier'),
+        ('spam', 'Spam confirmé'),
+        ('legitime', 'Légitime'),
+    ]
+
+    clinique = models.ForeignKey(
+        Clinique,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+        related_name='+',
+        verbose_name="Clinique"
+    )
+    type_envoi = models.CharField(max_length=20, choices=TYPE_CHOICES, verbose_name="Formulaire")
+    # Champs envoyés, tels que validés par le formulaire
+    donnees = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name="Données")
+    score = models.FloatField(verbose_name="Score")
+    motifs = models.CharField(max_length=255, blank=True, verbose_name="Motifs")
+    verdict = models.CharField(max_length=10, choices=VERDICT_CHOICES, blank=True, default='', verbose_name="Verdict")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Reçu le")
+
+    class Meta:
+        verbose_name = "Envoi en quarantaine"
+        verbose_name_plural = "Quarantaine anti-spam"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_type_envoi_display()} du {self.created_at:%d/%m/%Y %H:%M} ({self.score:.1f})"
+
+
+class CapaciteAtteinte(Exception):
+    """Le quota journalier du service est atteint"""
+
+
+class OccupationManager(models.Manager):
+    def reserver(self, service, jour):
+        """
+        Prend une place pour `service` le `jour`, ou lève CapaciteAtteinte.
+
+        UPDATE conditionnel sur le compteur (reservations < capacité) : le
+        contrôle ne compte pas les rendez-vous et reste juste sous des
+        réservations concurrentes.
+        """
+        capacite = service.capacite_journaliere
+        lignes = self.filter(service=service, jour=jour)
+        if capacite is not None:
+            lignes = lignes.filter(reservations__lt=capacite)
+        if lignes.update(reservations=F('reservations') + 1):
+            return
+        if capacite is None or capacite > 0:
+            try:
+                with transaction.atomic():
+                    self.create(service=service, jour=jour, reservations=1)
+                return
+            except IntegrityError:
+                # Compteur existant (plein), ou créé entre-temps par une réservation concurrente
+                if lignes.update(reservations=F('reservations') + 1):
+                    return
+        raise CapaciteAtteinte(f"Plus de place pour le service {service.pk} le {jour}")
+
+    def ajuster(self, service_id, jour, delta):
+        """Ajoute `delta` places sans contrôle du quota (annulation, modification par l'équipe)"""
+        lignes = self.filter(service_id=service_id, jour=jour)
+        if lignes.update(reservations=Greatest(F('reservations') + delta, 0)) or delta <= 0:
+            return
+        try:
+            with transaction.atomic():
+                self.create(service_id=service_id, jour=jour, reservations=delta)
+        except IntegrityError:
+            lignes.update(reservations=F('reservations') + delta)
+
+    def complet(self, service, jour):
+        """Vrai si le quota du jour est atteint (lecture seule, pour les messages de validation)"""
+        capacite = service.capacite_journaliere
+        if capacite is None:
+            return False
+        return capacite == 0 or self.filter(service=service, jour=jour, reservations__gte=capacite).exists()
+
+
+class OccupationJournaliere(models.Model):
+    """
+    Places occupées par service et par jour souhaité (rendez-vous non annulés).
+
+    Compteur pris à la création d'un rendez-vous par un UPDATE conditionnel
+    sur la capacité du service, rendu à l'annulation (voir signals.py) ;
+    reconstruit par la commande `rebuild_occupation`.
+    """
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        related_name='occupations',
+        verbose_name="Service"
+    )
+    jour = models.DateField(verbose_name="Jour")
+    reservations = models.PositiveIntegerField(default=0, verbose_name="Rendez-vous réservés")
+
+    objects = OccupationManager()
+
+    class Meta:
+        verbose_name = "Occupation journalière"
+        verbose_name_plural = "Occupations journalières"
+        ordering = ['jour', 'service']
+        constraints = [
+            models.UniqueConstraint(fields=['service', 'jour'], name='occupation_service_jour_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.jour} - {self.service_id}: {self.reservations}"
+
+
+class ListeAttente(models.Model):
+    """Patient en attente d'un créneau pour un service à une date donnée"""
+    STATUS_CHOICES = [
+        ('waiting', 'En attente'),
+        ('offered', 'Créneau proposé'),
+        ('withdrawn', 'Retiré'),
+    ]
+
+    # Site du service demandé, renseigné à l'enregistrement
+    clinique = models.ForeignKey(
+        Clinique,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='listes_attente',
+        verbose_name="Clinique"
+    )
+    nom = models.CharField(max_length=100, verbose_name="Nom")
+    prenom = models.CharField(max_length=100, verbose_name="Prénom")
+    telephone = models.CharField(max_length=20, validators=[validate_phone], verbose_name="Téléphone")
+    email = models.EmailField(verbose_name="Email")
+    patient = models.ForeignKey(
+        Patient,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='listes_attente',
+        verbose_name="Patient"
+    )
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        related_name='listes_attente',
+        verbose_name="Service demandé"
+    )
+    date_souhaitee = models.DateField(verbose_name="Date souhaitée")
+    statut = models.CharField(max_length=20, choices=STATUS_CHOICES, default='waiting', verbose_name="Statut")
+    # Sans contrainte ni cascade : l'archivage garde l'identifiant du rendez-vous
+    # et ses suppressions en lot restent directes (pas de collecte des lignes)
+    rendez_vous = models.ForeignKey(
+        RendezVous,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Rendez-vous proposé"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Inscrit le")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Modifié le")
+
+    class Meta:
+        verbose_name = "Inscription en liste d'attente"
+        verbose_name_plural = "Liste d'attente"
+        ordering = ['created_at']
+        indexes = [
+            # File de priorité par (service, date) : la première entrée de l'index est la plus ancienne demande
+            models.Index(fields=['service', 'date_souhaitee', 'statut', 'created_at'], name='attente_file_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.prenom} {self.nom} - {self.service_id} ({self.date_souhaitee})"
+
+    @property
+    def nom_complet(self):
+        return f"{self.prenom} {self.nom}"
+
+    def save(self, *args, **kwargs):
+        if self.patient_id is None and not kwargs.get('update_fields'):
+            self.patient = Patient.objects.for_phone(
+                self.telephone, nom=self.nom, prenom=self.prenom, email=self.email
+            )
+        if self.clinique_id is None:
+            self.clinique_id = self.service.clinique_id
+        super().save(*args, **kwargs)
@@ -0,0 +1,102 @@
+# ==========================================
+# PATIENTS.PY - Rattachement des rendez-vous et contacts aux patients
+# ==========================================
+import logging
+
+from django.db import connection, transaction
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from .models import Contact, Patient, RendezVous, RendezVousArchive
+from .telephones import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+MODELES_RATTACHES = (RendezVous, RendezVousArchive, Contact)
+
+
+def patients_par_numero(coordonnees):
+    """
+    {numéro normalisé: id du patient} pour `coordonnees` ({numéro: {'nom',
+    'prenom', 'email'}}) : patients existants retrouvés par l'index unique du
+    téléphone, les autres créés par un seul executemany (voir _creer_patients).
+    """
+    existants = dict(Patient.objects.filter(telephone__in=coordonnees).values_list('telephone', 'id'))
+    nouveaux = [numero for numero in coordonnees if numero not in existants]
+    if nouveaux:
+        _creer_patients([(numero, coordonnees[numero]) for numero in nouveaux])
+        existants.update(Patient.objects.filter(telephone__in=nouveaux).values_list('telephone', 'id'))
+    return existants
+
+
+def _creer_patients(nouveaux):
+    """
+    INSERT des patients `nouveaux` ([(numéro, coordonnées)]), numéros déjà
+    enregistrés ignorés. bulk_create prépare chaque valeur champ par champ, ce
+    qui coûtait la moitié du temps de la commande seed : la requête est ici
+    construite une fois et envoyée par executemany.
+    """
+    champs = [Patient._meta.get_field(nom) for nom in ('telephone', 'nom', 'prenom', 'email', 'created_at', 'updated_at')]
+    qn = connection.ops.quote_name
+    sql = '{} {} ({}) VALUES ({}) {}'.format(
+        connection.ops.insert_statement(on_conflict=OnConflict.IGNORE),
+        qn(Patient._meta.db_table),
+        ', '.join(qn(champ.column) for champ in champs),
+        ', '.join(['%s'] * len(champs)),
+        connection.ops.on_conflict_suffix_sql(champs, OnConflict.IGNORE, None, None),
+    )
+    maintenant = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            (numero, infos['nom'], infos['prenom'], infos['email'], maintenant, maintenant)
+            for numero, infos in nouveaux
+        ])
+
+
+def _rattacher_lot(model, lignes):
+    """Crée les patients manquants d'un lot et renseigne patient_id, en quelques requêtes"""
+    par_numero = {}
+    for pk, telephone, nom, prenom, email in lignes:
+        numero = normalize_phone(telephone)
+        if numero is not None:
+            par_numero.setdefault(numero, {'nom': nom, 'prenom': prenom, 'email': email, 'ids': []})['ids'].append(pk)
+    if not par_numero:
+        return 0
+
+    existants = patients_par_numero(par_numero)
+    qn = connection.ops.quote_name
+    sql = 'UPDATE {} SET {} = %s WHERE {} = %s'.format(
+        qn(model._meta.db_table), qn('patient_id'), qn(model._meta.pk.column),
+    )
+    parametres = [(existants[numero], pk) for numero, infos in par_numero.items() for pk in infos['ids']]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, parametres)
+    return len(parametres)
+
+
+def backfill_patients(batch_size=2000, on_batch=None):
+    """
+    Rattache en une passe les lignes sans patient, dédoublonnées par téléphone normalisé.
+
+    Chaque table est parcourue une seule fois par id croissant ; pour chaque
+    lot, les patients déjà connus sont retrouvés par l'index unique du
+    téléphone, les autres créés en bulk, puis les clés étrangères posées.
+    """
+    totaux = {}
+    for model in MODELES_RATTACHES:
+        a_rattacher = model.objects.filter(patient__isnull=True).order_by('id')
+        dernier_id, total = 0, 0
+        while True:
+            with transaction.atomic():
+                lignes = list(a_rattacher.filter(id__gt=dernier_id).values_list(
+                    'id', 'telephone', 'nom', 'prenom', 'email'
+                )[:batch_size])
+                if not lignes:
+                    break
+                total += _rattacher_lot(model, lignes)
+            dernier_id = lignes[-1][0]
+            if on_batch:
+                on_batch(model, dernier_id, total)
+        totaux[model._meta.model_name] = total
+        logger.info(f"{total} {model._meta.verbose_name_plural} rattachés à un patient")
+    return totaux
@@ -0,0 +1,91 @@
+# ==========================================
+# PROFIL_IMPORTS.PY - Temps d'import au démarrage (python -X importtime)
+# ==========================================
+"""
+Exécute l'import d'un module (par défaut le point d'entrée WSGI) dans un
+interpréteur neuf lancé avec `-X importtime`, et analyse le rapport écrit
+sur stderr :
+
+    import time: self [us] | cumulative | imported package
+    import time:       181 |        181 |     clinic
+
+`self` est le temps passé dans le module lui-même, `cumulative` inclut ses
+propres imports ; l'indentation du nom donne la profondeur dans l'arbre.
+Le temps propre du point d'entrée WSGI comprend django.setup() (chargement
+des applications, autodiscover de l'admin), exécuté pendant son import.
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+
+_LIGNE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)\s*$')
+
+
+def module_wsgi():
+    """Module du point d'entrée WSGI du projet (settings.WSGI_APPLICATION)"""
+    return settings.WSGI_APPLICATION.rsplit('.', 1)[0]
+
+
+def analyser(rapport):
+    """Lignes de `-X importtime` -> {module: (self µs, cumulé µs, profondeur)}"""
+    imports = {}
+    for ligne in rapport.splitlines():
+        trouve = _LIGNE.match(ligne)
+        if trouve:
+            propre, cumule, retrait, module = trouve.groups()
+            # Un module n'est importé qu'une fois : la première ligne fait foi
+            imports.setdefault(module, (int(propre), int(cumule), (len(retrait) - 1) // 2))
+    return imports
+
+
+def mesurer(module, python=None):
+    """Importe `module` dans un interpréteur neuf et renvoie son rapport analysé"""
+    code = f'import django; django.setup(); import {module}' if module != module_wsgi() else f'import {module}'
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'clinique_dentaire.settings')}
+    resultat = subprocess.run(
+        [python or sys.executable, '-X', 'importtime', '-c', code],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if resultat.returncode:
+        raise RuntimeError(resultat.stderr.strip().splitlines()[-1] if resultat.stderr.strip() else 'import impossible')
+    return analyser(resultat.stderr)
+
+
+def profil(module, executions=3, python=None):
+    """
+    Médiane sur `executions` interpréteurs neufs, par module importé.
+
+    Renvoie une liste de dicts {module, self_us, cumulative_us, profondeur}
+    (ordre d'import) ; les modules absents d'une exécution sont ignorés.
+    """
+    mesures = [mesurer(module, python) for _ in range(executions)]
+    lignes = []
+    for nom, (_, _, profondeur) in mesures[0].items():
+        valeurs = [m[nom] for m in mesures if nom in m]
+        if len(valeurs) != len(mesures):
+            continue
+        lignes.append({
+            'module': nom,
+            'self_us': statistics.median(v[0] for v in valeurs),
+            'cumulative_us': statistics.median(v[1] for v in valeurs),
+            'profondeur': profondeur,
+        })
+    return lignes
+
+
+def paquet(module):
+    """Paquet de premier niveau ('rest_framework.views' -> 'rest_framework')"""
+    return module.split('.', 1)[0]
+
+
+def par_paquet(lignes):
+    """Temps propre cumulé par paquet de premier niveau"""
+    totaux = {}
+    for ligne in lignes:
+        nom = paquet(ligne['module'])
+        totaux[nom] = totaux.get(nom, 0) + ligne['self_us']
+    return totaux
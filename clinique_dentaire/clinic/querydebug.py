@@ -0,0 +1,179 @@
+# ==========================================
+# QUERYDEBUG.PY - Détection des requêtes lentes et des N+1
+# ==========================================
+"""
+Instrumentation réservée au développement et à la préproduction.
+
+Chaque requête SQL émise pendant une requête HTTP est chronométrée et
+réduite à une empreinte (paramètres et littéraux normalisés). Les empreintes
+répétées (N+1 probable) et les requêtes au-delà du seuil de lenteur sont
+journalisées avec la vue et la ligne de `clinic/views.py` ou
+`clinic/admin.py` qui les ont déclenchées.
+"""
+import logging
+import os
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SLOW_QUERY_MS': 100,
+    'N_PLUS_ONE_THRESHOLD': 5,
+    'SOURCES': ('clinic/views.py', 'clinic/admin.py'),
+}
+
+_LITTERAUX = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTES = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_ESPACES = re.compile(r'\s+')
+
+
+def get_config():
+    """Configuration effective (settings.QUERY_INSPECTOR complété par les valeurs par défaut)"""
+    return {**DEFAULTS, **getattr(settings, 'QUERY_INSPECTOR', {})}
+
+
+def fingerprint_sql(sql):
+    """Réduit une requête SQL à son empreinte (littéraux, paramètres et listes IN normalisés)"""
+    sql = _LITTERAUX.sub('?', sql).replace('%s', '?')
+    sql = _LISTES.sub('(?, ...)', sql)
+    return _ESPACES.sub(' ', sql).strip()
+
+
+def _source_frame(sources):
+    """Retrouve dans la pile d'appel la ligne du code applicatif responsable de la requête"""
+    fallback = None
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename.replace(os.sep, '/')
+        if any(filename.endswith(source) for source in sources):
+            return f"{frame.filename}:{frame.lineno} ({frame.name})"
+        if fallback is None and '/clinic/' in filename and not filename.endswith('querydebug.py'):
+            fallback = f"{frame.filename}:{frame.lineno} ({frame.name})"
+    return fallback
+
+
+class QueryRecorder:
+    """Wrapper d'exécution qui enregistre chaque requête (à installer via connection.execute_wrapper)"""
+
+    def __init__(self, sources=DEFAULTS['SOURCES'], capture_source=True):
+        self.sources = tuple(sources)
+        self.capture_source = capture_source
+        self.queries = []
+        self.counts = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            fingerprint = fingerprint_sql(sql)
+            self.counts[fingerprint] += 1
+            if fingerprint not in self.origins:
+                self.origins[fingerprint] = _source_frame(self.sources) if self.capture_source else None
+            self.queries.append((fingerprint, sql, duration_ms))
+
+    @property
+    def total(self):
+        return len(self.queries)
+
+    @property
+    def total_ms(self):
+        return sum(duration for _, _, duration in self.queries)
+
+    def repeated(self, threshold):
+        """Empreintes exécutées au moins `threshold` fois (N+1 probables)"""
+        return [(fp, count) for fp, count in self.counts.most_common() if count >= threshold]
+
+    def slow(self, threshold_ms):
+        """Requêtes dont la durée dépasse `threshold_ms`"""
+        return [(sql, duration) for fp, sql, duration in self.queries if duration >= threshold_ms]
+
+    def summary(self, limit=10):
+        """Résumé lisible des empreintes les plus fréquentes"""
+        lines = [f"{self.total} requêtes ({self.total_ms:.1f} ms)"]
+        for fingerprint, count in self.counts.most_common(limit):
+            origin = self.origins.get(fingerprint) or 'origine inconnue'
+            lines.append(f"  {count}x {fingerprint}\n      <- {origin}")
+        return '\n'.join(lines)
+
+
+@contextmanager
+def record_queries(using=None, sources=None, capture_source=True):
+    """Enregistre les requêtes exécutées dans le bloc sur une ou toutes les connexions"""
+    recorder = QueryRecorder(sources or get_config()['SOURCES'], capture_source)
+    aliases = [using] if using else list(connections)
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        yield recorder
+
+
+class QueryInspectorMiddleware:
+    """Signale les N+1 et les requêtes lentes de chaque requête HTTP"""
+
+    def __init__(self, get_response):
+        self.config = get_config()
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with record_queries(sources=self.config['SOURCES']) as recorder:
+            response = self.get_response(request)
+        self.report(request, recorder)
+        response['X-Query-Count'] = str(recorder.total)
+        return response
+
+    def report(self, request, recorder):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match._func_path) if match else request.path
+
+        for fingerprint, count in recorder.repeated(self.config['N_PLUS_ONE_THRESHOLD']):
+            logger.warning(
+                f"N+1 probable dans {view}: {count}x {fingerprint} "
+                f"<- {recorder.origins.get(fingerprint) or 'origine inconnue'}"
+            )
+        for sql, duration in recorder.slow(self.config['SLOW_QUERY_MS']):
+            fingerprint = fingerprint_sql(sql)
+            logger.warning(
+                f"Requête lente dans {view} ({duration:.1f} ms): {fingerprint} "
+                f"<- {recorder.origins.get(fingerprint) or 'origine inconnue'}"
+            )
+
+
+# ==========================================
+# OUTIL POUR LES TESTS
+# ==========================================
+
+@contextmanager
+def assert_query_budget(max_queries, max_repeats=None, using=None):
+    """
+    Fait échouer un test si le bloc dépasse son budget de requêtes.
+
+        with assert_query_budget(3, max_repeats=1):
+            self.client.get('/admin/clinic/rendezvous/')
+
+    `max_repeats` borne le nombre d'exécutions d'une même empreinte, ce qui
+    attrape les N+1 même quand le total reste sous le budget.
+    """
+    with record_queries(using=using) as recorder:
+        yield recorder
+
+    errors = []
+    if recorder.total > max_queries:
+        errors.append(f"{recorder.total} requêtes exécutées pour un budget de {max_queries}")
+    if max_repeats is not None:
+        for fingerprint, count in recorder.repeated(max_repeats + 1):
+            errors.append(f"empreinte répétée {count}x (max {max_repeats}): {fingerprint}")
+    if errors:
+        raise AssertionError('\n'.join(errors) + '\n' + recorder.summary())
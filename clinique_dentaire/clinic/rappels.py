@@ -0,0 +1,170 @@
+# ==========================================
+# RAPPELS.PY - Rappels des rendez-vous confirmés (email + SMS)
+# ==========================================
+"""
+Un rappel est dû `settings.RAPPEL_RENDEZVOUS_AVANT_HEURES` heures avant la
+date confirmée. Les rendez-vous à rappeler sont lus par l'index partiel
+rdv_rappel_du_idx (confirmés, sans rappel) sur une fenêtre de temps, puis
+rangés dans une file de priorité par échéance : le planificateur dort
+jusqu'à la prochaine échéance au lieu de parcourir la table.
+
+Chaque rappel est réservé (rappel_envoye_le renseigné par un UPDATE
+conditionnel) avant l'envoi : après un redémarrage, un rendez-vous déjà
+réservé n'est jamais renvoyé.
+"""
+import heapq
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from . import sms
+from .models import RendezVous
+from .sites import site_de
+
+logger = logging.getLogger(__name__)
+
+
+def delai_rappel():
+    return timedelta(hours=settings.RAPPEL_RENDEZVOUS_AVANT_HEURES)
+
+
+def a_rappeler():
+    """Rendez-vous confirmés sans rappel (couverts par l'index partiel)"""
+    return RendezVous.objects.filter(statut='confirmed', rappel_envoye_le__isnull=True, date_confirmee__isnull=False)
+
+
+class FileRappels:
+    """File de priorité (échéance, id) des rappels à venir"""
+
+    def __init__(self):
+        self._tas = []
+        self._ids = set()
+
+    def __len__(self):
+        return len(self._tas)
+
+    def charger(self, maintenant, horizon):
+        """Ajoute les rappels dont l'échéance tombe avant maintenant + horizon ; renvoie le nombre ajouté"""
+        delai = delai_rappel()
+        candidats = a_rappeler().filter(
+            date_confirmee__gt=maintenant,
+            date_confirmee__lte=maintenant + delai + horizon,
+        ).order_by('date_confirmee').values_list('id', 'date_confirmee')
+        ajoutes = 0
+        for pk, date_confirmee in candidats:
+            if pk in self._ids:
+                continue
+            heapq.heappush(self._tas, (date_confirmee - delai, pk))
+            self._ids.add(pk)
+            ajoutes += 1
+        return ajoutes
+
+    def prochaine_echeance(self):
+        return self._tas[0][0] if self._tas else None
+
+    def extraire_dus(self, maintenant, limite):
+        """Retire de la file au plus `limite` rappels échus"""
+        ids = []
+        while self._tas and self._tas[0][0] <= maintenant and len(ids) < limite:
+            _, pk = heapq.heappop(self._tas)
+            self._ids.discard(pk)
+            ids.append(pk)
+        return ids
+
+
+def reserver(ids, maintenant):
+    """
+    Marque comme envoyés les rappels encore dus parmi `ids` et renvoie ces rendez-vous.
+
+    Les lignes annulées, déjà rappelées ou dont la date a changé entre-temps
+    sont écartées par la condition de l'UPDATE.
+    """
+    with transaction.atomic():
+        dus = a_rappeler().filter(
+            id__in=ids,
+            date_confirmee__gt=maintenant,
+            date_confirmee__lte=maintenant + delai_rappel(),
+        ).select_for_update(skip_locked=True, of=('self',))
+        rendez_vous = list(dus.select_related('service').order_by())
+        RendezVous.objects.filter(id__in=[r.id for r in rendez_vous]).update(rappel_envoye_le=maintenant)
+    return rendez_vous
+
+
+def liberer(rendez_vous):
+    """Rend à nouveau dus des rappels réservés mais non envoyés"""
+    RendezVous.objects.filter(id__in=[r.id for r in rendez_vous]).update(rappel_envoye_le=None)
+
+
+def message_email(rdv):
+    quand = timezone.localtime(rdv.date_confirmee)
+    site = site_de(rdv)
+    return EmailMessage(
+        subject=f'Rappel de votre rendez-vous - {site.nom}',
+        body=f"""
+Bonjour {rdv.nom_complet},
+
+Nous vous rappelons votre rendez-vous du {quand.strftime('%d/%m/%Y à %H:%M')}.
+
+- Service: {rdv.service.nom}
+
+En cas d'empêchement, merci de nous prévenir au {site.telephone}.
+
+Cordialement,
+L'équipe de la {site.nom}
+""",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[rdv.email],
+    )
+
+
+def message_sms(rdv):
+    quand = timezone.localtime(rdv.date_confirmee)
+    site = site_de(rdv)
+    return sms.SmsMessage(
+        rdv.telephone,
+        f"{site.nom} : rappel de votre RDV ({rdv.service.nom}) le "
+        f"{quand.strftime('%d/%m à %H:%M')}. Empêchement ? {site.telephone}",
+    )
+
+
+def envoyer_rappels(ids, maintenant=None):
+    """
+    Réserve puis envoie un lot de rappels sur une seule connexion email et une seule connexion SMS.
+
+    Les emails partent un à un sur la connexion : si l'un échoue, seuls les
+    rappels non encore envoyés (celui en échec compris) sont libérés pour
+    être retentés, ceux déjà partis restent marqués et ne sont jamais
+    renvoyés. Les SMS ne sont envoyés que pour les emails partis. Renvoie le
+    nombre de rappels envoyés.
+    """
+    maintenant = maintenant or timezone.now()
+    rendez_vous = reserver(ids, maintenant)
+    if not rendez_vous:
+        return 0
+
+    envoyes = []
+    try:
+        with get_connection() as connexion:
+            for rdv in rendez_vous:
+                connexion.send_messages([message_email(rdv)])
+                envoyes.append(rdv)
+    except Exception as e:
+        non_envoyes = rendez_vous[len(envoyes):]
+        logger.error(f"Erreur envoi des rappels par email ({len(non_envoyes)} rendez-vous libérés): {e}")
+        liberer(non_envoyes)
+    if not envoyes:
+        return 0
+
+    try:
+        with sms.get_connection() as connexion:
+            connexion.send_messages([message_sms(rdv) for rdv in envoyes])
+    except Exception as e:
+        # Les emails sont partis : le rappel reste marqué envoyé
+        logger.error(f"Erreur envoi des rappels par SMS: {e}")
+
+    logger.info(f"{len(envoyes)} rappels de rendez-vous envoyés")
+    return len(envoyes)
@@ -0,0 +1,92 @@
+# ==========================================
+# RENDERERS.PY - Renderer JSON rapide pour l'API DRF
+# ==========================================
+"""
+JSONRenderer de DRF encodé par orjson (voir clinic/encoders.py).
+
+orjson n'écrit pas les flottants comme json (1e-05 -> 1e-5, 1e+16 -> 1e16,
+NaN -> null là où DRF lève ValueError) : les données contenant un flottant
+hors de [1e-4, 1e16[ (ou un Decimal, converti en flottant par l'encodeur de
+DRF), ou un type dont la conversion est inconnue, sont rendues par
+JSONRenderer. Les flottants usuels s'écrivent à l'identique.
+
+Séparé de clinic/encoders.py pour que les vues Django n'importent pas DRF :
+ce module n'est chargé qu'avec les vues de clinic/api.py.
+"""
+import datetime
+import math
+import uuid
+from decimal import Decimal
+
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder as DRFJSONEncoder
+
+from .encoders import _OPTIONS, _echapper_separateurs, orjson
+from .traces import span
+
+_DRF = DRFJSONEncoder()
+
+# Types écrits à l'identique par orjson et par l'encodeur de DRF
+_SURS = (str, int, type(None), datetime.date, datetime.time, datetime.timedelta, uuid.UUID, Promise)
+# Les mêmes, sans sous-classes : reconnus sans isinstance (colonnes des serializers)
+_SCALAIRES = frozenset({str, int, bool, type(None), datetime.date, datetime.datetime, datetime.time})
+_CLES = frozenset({str})
+
+
+def _flottant_sur(valeur):
+    return valeur == 0 or 1e-4 <= abs(valeur) < 1e16
+
+
+def _rendu_identique(data):
+    """Faux si orjson peut écrire `data` autrement que le JSONRenderer (flottants, types inconnus)"""
+    a_voir = [data]
+    while a_voir:
+        valeur = a_voir.pop()
+        if isinstance(valeur, dict):
+            # Types comparés en bloc (map, set : sans boucle Python sur les valeurs simples)
+            if not _SCALAIRES.issuperset(map(type, valeur.values())):
+                a_voir.extend(v for v in valeur.values() if type(v) not in _SCALAIRES)
+            if not _CLES.issuperset(map(type, valeur)):
+                a_voir.extend(cle for cle in valeur if type(cle) is not str)
+        elif isinstance(valeur, (list, tuple)):
+            if not _SCALAIRES.issuperset(map(type, valeur)):
+                a_voir.extend(v for v in valeur if type(v) not in _SCALAIRES)
+        elif isinstance(valeur, float):
+            if not (math.isfinite(valeur) and _flottant_sur(valeur)):
+                return False
+        elif isinstance(valeur, Decimal):
+            if not (valeur.is_finite() and _flottant_sur(float(valeur))):
+                return False
+        elif not isinstance(valeur, _SURS):
+            return False
+    return True
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer de DRF encodé par orjson quand la sortie demandée est la sortie compacte par défaut"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with span('rendu.json') as attributs:
+            contenu = self._render(data, accepted_media_type, renderer_context)
+            attributs['octets'] = len(contenu)
+        return contenu
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (
+            orjson is None
+            or indent is not None
+            or not self.compact
+            or self.ensure_ascii
+            or self.encoder_class is not DRFJSONEncoder
+            or not _rendu_identique(data)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            contenu = orjson.dumps(data, default=_DRF.default, option=_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return _echapper_separateurs(contenu)
@@ -0,0 +1,203 @@
+# ==========================================
+# RETENTION.PY - Purge des données personnelles après leur durée de conservation
+# ==========================================
+"""
+Chaque politique (settings.RETENTION_DONNEES) donne une durée de conservation
+en jours et un traitement des lignes expirées :
+
+    'supprimer'  : DELETE des lignes (rendez-vous retirés des statistiques)
+    'anonymiser' : UPDATE des champs personnels (nom, téléphone, email,
+                   message...) ; la ligne reste comptée dans les statistiques,
+                   recalculées à partir des rendez-vous (statistiques.py)
+
+Une seule requête sur des années de lignes garderait le verrou d'écriture
+SQLite pendant toute sa durée. Les lignes sont donc traitées par petits lots,
+lus dans l'ordre des identifiants à partir du dernier lot traité (pagination
+par clé, sans OFFSET) ; chaque lot tient dans sa propre transaction, suivie
+d'une pause qui laisse passer les écritures de l'application. Le dernier
+identifiant traité est enregistré avec le lot (PointDeReprise) : une purge
+interrompue reprend où elle s'était arrêtée. Un passage complet remet le
+point de reprise à zéro, le suivant relisant les lignes expirées entre-temps.
+
+Les valeurs avant/après du journal (journal.py) recopient les noms,
+téléphones et messages : dans la transaction de chaque lot, les lignes du
+journal des objets supprimés sont supprimées, celles des objets anonymisés
+réécrites avec les valeurs anonymes. Un patient (Patient) sans plus aucune
+ligne liée (rendez-vous, archives, messages, liste d'attente) est supprimé
+par la politique 'patients', appliquée après les autres.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import (
+    Contact, JournalModification, ListeAttente, Patient, PointDeReprise, Quarantaine, RendezVous, RendezVousArchive,
+)
+
+logger = logging.getLogger(__name__)
+
+ANONYME = 'Anonyme'
+MODES = ('supprimer', 'anonymiser')
+
+# Champs personnels remplacés à l'anonymisation
+_RENDEZVOUS_ANONYME = {
+    'nom': ANONYME, 'prenom': '', 'telephone': '', 'email': '', 'message': None, 'patient': None,
+}
+
+
+class Politique:
+    """Lignes d'un modèle soumises à une durée de conservation"""
+
+    def __init__(self, model, champ_date, filtre=None, anonyme=None, journal=None):
+        self.model = model
+        self.champ_date = champ_date
+        self.filtre = filtre or Q()
+        # Valeurs d'anonymisation (None : suppression seulement)
+        self.anonyme = anonyme
+        # Type d'objet des lignes du journal à effacer avec les lignes traitées
+        self.journal = journal
+
+    def expirees(self, limite, mode):
+        lignes = self.model.objects.filter(self.filtre, **{f'{self.champ_date}__lt': limite})
+        if mode == 'anonymiser':
+            # Lignes déjà anonymisées exclues : un nouveau passage ne les réécrit pas
+            lignes = lignes.exclude(nom=ANONYME, prenom='')
+        return lignes
+
+    def traiter(self, lignes, mode):
+        """Supprime ou anonymise `lignes` et leur journal ; renvoie le nombre de lignes traitées"""
+        if self.journal:
+            self.effacer_journal(list(lignes.values_list('pk', flat=True)), mode)
+        if mode == 'anonymiser':
+            return lignes.update(**self.anonyme)
+        return lignes.delete()[1].get(self.model._meta.label, 0)
+
+    def effacer_journal(self, ids, mode):
+        """Supprime les lignes du journal des objets `ids`, ou y remplace les valeurs personnelles"""
+        entrees = JournalModification.objects.filter(modele=self.journal, objet_id__in=ids)
+        if mode == 'supprimer':
+            entrees.delete()
+            return
+        reecrites = []
+        for entree in entrees.only('pk', 'modifications'):
+            personnels = [champ for champ in entree.modifications if champ in self.anonyme]
+            if personnels:
+                for champ in personnels:
+                    entree.modifications[champ] = [
+                        valeur if valeur in (None, '') else self.anonyme[champ]
+                        for valeur in entree.modifications[champ]
+                    ]
+                reecrites.append(entree)
+        JournalModification.objects.bulk_update(reecrites, ['modifications'], batch_size=500)
+
+
+def _sans_lignes_liees():
+    """Patients auxquels plus aucune ligne n'est rattachée"""
+    filtre = Q()
+    for model in (RendezVous, RendezVousArchive, Contact, ListeAttente):
+        filtre &= ~Exists(model.objects.filter(patient=OuterRef('pk')))
+    return filtre
+
+
+POLITIQUES = {
+    'contacts': Politique(
+        Contact, 'created_at',
+        anonyme={'nom': ANONYME, 'prenom': '', 'telephone': '', 'email': '', 'sujet': '', 'message': '', 'patient': None},
+        journal='contact',
+    ),
+    # Rendez-vous terminés ou annulés encore dans la table principale (non archivés)
+    'rendezvous': Politique(
+        RendezVous, 'updated_at', filtre=Q(statut__in=('completed', 'cancelled')), anonyme=_RENDEZVOUS_ANONYME,
+        journal='rendezvous',
+    ),
+    # Archives : identifiants des rendez-vous d'origine, journal compris
+    'archives': Politique(RendezVousArchive, 'updated_at', anonyme=_RENDEZVOUS_ANONYME, journal='rendezvous'),
+    'liste_attente': Politique(
+        ListeAttente, 'created_at',
+        anonyme={'nom': ANONYME, 'prenom': '', 'telephone': '', 'email': '', 'patient': None},
+    ),
+    # Valeurs avant/après des champs modifiés (noms, téléphones...)
+    'journal': Politique(JournalModification, 'created_at'),
+    # Envois écartés par le filtre anti-spam (antispam.py)
+    'quarantaine': Politique(Quarantaine, 'created_at'),
+    # Patients dont toutes les lignes ont été supprimées ou anonymisées ; le délai
+    # épargne un patient créé juste avant l'enregistrement de son rendez-vous
+    'patients': Politique(Patient, 'created_at', filtre=_sans_lignes_liees()),
+}
+
+
+def configuration():
+    """{politique: (jours, mode)} des politiques actives (durée > 0), contrôlées"""
+    actives = {}
+    for nom, regle in settings.RETENTION_DONNEES.items():
+        if nom not in POLITIQUES:
+            raise ValueError(f"Politique de conservation inconnue : {nom}")
+        jours, mode = regle['jours'], regle.get('mode', 'supprimer')
+        if mode not in MODES or (mode == 'anonymiser' and POLITIQUES[nom].anonyme is None):
+            raise ValueError(f"Traitement « {mode} » impossible pour la politique {nom}")
+        if jours:
+            actives[nom] = (jours, mode)
+    return actives
+
+
+def limite(jours):
+    return timezone.now() - timedelta(days=jours)
+
+
+def purger(nom, jours, mode, batch_size=500, pause=0.0, max_batches=None, on_batch=None):
+    """
+    Traite par lots les lignes expirées de la politique `nom`.
+
+    Renvoie les mesures de l'exécution : lignes traitées, lots, durée, débit
+    (lignes par seconde), durée maximale d'une transaction d'écriture (temps
+    de détention du verrou SQLite) et `termine` (False si --max-batches a
+    interrompu le passage, repris à l'exécution suivante).
+    """
+    politique = POLITIQUES[nom]
+    reprise, _ = PointDeReprise.objects.get_or_create(nom=f'retention:{nom}')
+    candidates = politique.expirees(limite(jours), mode)
+    dernier = reprise.dernier_id
+    lignes, lots, verrou_max, termine = 0, 0, 0.0, False
+    debut = time.monotonic()
+
+    while max_batches is None or lots < max_batches:
+        # Lecture hors transaction d'écriture : pas de verrou pendant la recherche
+        ids = list(candidates.filter(pk__gt=dernier).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            termine = True
+            break
+        debut_lot = time.perf_counter()
+        with transaction.atomic():
+            # Critères vérifiés de nouveau : une ligne modifiée depuis la lecture est épargnée
+            lignes += politique.traiter(candidates.filter(pk__in=ids), mode)
+            PointDeReprise.objects.filter(pk=reprise.pk).update(dernier_id=ids[-1])
+        verrou_max = max(verrou_max, time.perf_counter() - debut_lot)
+        dernier = ids[-1]
+        lots += 1
+        if on_batch:
+            on_batch(lots, lignes)
+        if pause:
+            time.sleep(pause)
+
+    if termine and dernier:
+        PointDeReprise.objects.filter(pk=reprise.pk).update(dernier_id=0)
+
+    secondes = time.monotonic() - debut
+    resultat = {
+        'lignes': lignes,
+        'lots': lots,
+        'secondes': round(secondes, 3),
+        'lignes_par_seconde': round(lignes / secondes, 1) if secondes else 0.0,
+        'verrou_max_ms': round(verrou_max * 1000, 2),
+        'termine': termine,
+    }
+    logger.info(
+        f"Conservation {nom} ({mode}, {jours} jours) : {lignes} lignes en {lots} lots, "
+        f"{resultat['lignes_par_seconde']} lignes/s, verrou max {resultat['verrou_max_ms']} ms"
+    )
+    return resultat
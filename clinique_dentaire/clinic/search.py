@@ -0,0 +1,103 @@
+# ==========================================
+# SEARCH.PY - Recherche plein texte (SQLite FTS5)
+# ==========================================
+"""
+Recherche admin sur les index FTS5 créés par la migration 0003.
+
+Chaque mot saisi devient un préfixe ("kouam" trouve KOUAME) et tous les mots
+doivent être présents, comme pour la recherche admin standard. Les accents
+sont ignorés des deux côtés ("Kouamé" trouve KOUAME). Sur une base sans FTS5
+on retombe sur la recherche icontains de Django.
+"""
+import re
+from contextlib import contextmanager
+
+from django.contrib import admin
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+# Table source -> index FTS5 (voir la migration 0003)
+FTS_TABLES = {
+    'clinic_rendezvous': 'clinic_rendezvous_fts',
+    'clinic_contact': 'clinic_contact_fts',
+}
+
+_MOTS = re.compile(r'\w+')
+
+
+def fts_query(terme):
+    """Traduit une saisie libre en requête FTS5 (préfixes, tous les mots requis)"""
+    return ' '.join(f'"{mot}"*' for mot in _MOTS.findall(terme))
+
+
+def fts_available(table, using='default'):
+    """
+    Vrai si l'index FTS5 `table` existe. Vérifié une fois par objet connexion
+    (connections[using], propre à chaque thread) et par base : la base de test
+    remplace celle du projet sur le même objet, d'où NAME dans la clé.
+    """
+    connection = connections[using]
+    tables = connection.__dict__.setdefault('_fts_disponibles', {})
+    cle = (connection.settings_dict['NAME'], table)
+    if cle not in tables:
+        tables[cle] = (
+            connection.vendor == 'sqlite'
+            and table in connection.introspection.table_names(include_views=False)
+        )
+    return tables[cle]
+
+
+def fts_filter(queryset, table, terme):
+    """Restreint queryset aux lignes dont l'index FTS5 correspond au terme"""
+    qn = connections[queryset.db].ops.quote_name
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {qn(table)} WHERE {qn(table)} MATCH %s', [fts_query(terme)]
+    ))
+
+
+@contextmanager
+def fts_sync_suspended(model, using='default'):
+    """
+    Suspend la synchronisation par triggers pendant un chargement massif.
+
+    Les triggers sont supprimés puis recréés à l'identique (SQL relu dans
+    sqlite_master) et l'index est reconstruit en une passe, bien plus vite
+    qu'une mise à jour ligne par ligne.
+    """
+    table = model._meta.db_table
+    fts = FTS_TABLES.get(table)
+    if fts is None or not fts_available(fts, using):
+        yield
+        return
+
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s AND name LIKE %s",
+            [table, f'{fts}_%'],
+        )
+        triggers = cursor.fetchall()
+        for name, _ in triggers:
+            cursor.execute(f'DROP TRIGGER {connection.ops.quote_name(name)}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in triggers:
+                cursor.execute(sql)
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+class FullTextSearchMixin:
+    """Remplace la recherche icontains de l'admin par l'index FTS5 `fts_table`"""
+    fts_table = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not fts_query(search_term) or not fts_available(self.fts_table, queryset.db):
+            return super().get_search_results(request, queryset, search_term)
+        return fts_filter(queryset, self.fts_table, search_term), False
+
+
+def icontains_search(model_admin, request, queryset, search_term):
+    """Recherche admin standard (référence pour les benchmarks)"""
+    return admin.ModelAdmin.get_search_results(model_admin, request, queryset, search_term)
@@ -2,7 +2,10 @@
 # 4. SERIALIZERS.PY
 # ==========================================
 from rest_framework import serializers
-from .models import Service, Dentiste, Horaire, RendezVous, Contact
+from .models import Service, Dentiste, Horaire, RendezVous, Contact, ListeAttente
+from .calendrier import HORIZON_JOURS, calendrier
+from .telephones import validate_phone
+from .traces import span
 from django.utils import timezone
 from datetime import date
 from django.core.validators import RegexValidator  # Import ajouté
@@ -28,7 +31,24 @@ class HoraireSerializer(serializers.ModelSerializer):
         fields = ['jour', 'ouverture_matin', 'fermeture_matin', 
                  'ouverture_apres_midi', 'fermeture_apres_midi', 'ferme']
 
-class RendezVousSerializer(serializers.ModelSerializer):
+class TraceMixin:
+    """Validation, enregistrement et rendu mesurés dans la trace de la requête (voir traces.py)"""
+
+    def is_valid(self, *args, **kwargs):
+        with span(f'{type(self).__name__}.validation') as attributs:
+            valide = super().is_valid(*args, **kwargs)
+            attributs['valide'] = valide
+        return valide
+
+    def save(self, **kwargs):
+        with span(f'{type(self).__name__}.enregistrement'):
+            return super().save(**kwargs)
+
+    def to_representation(self, instance):
+        with span(f'{type(self).__name__}.rendu'):
+            return super().to_representation(instance)
+
+class RendezVousSerializer(TraceMixin, serializers.ModelSerializer):
     """Serializer pour les rendez-vous avec validation complète"""
     
     # Relation avec le service
@@ -44,15 +64,10 @@ class RendezVousSerializer(serializers.ModelSerializer):
     # Champ en lecture seule pour afficher le nom du service
     service_nom = serializers.CharField(source='service.nom', read_only=True)
     
-    # Validation du téléphone avec regex pour la Côte d'Ivoire
+    # Validation du téléphone (format commun, voir telephones.py)
     telephone = serializers.CharField(
         max_length=20,
-        validators=[
-            RegexValidator(
-                regex=r'^\+?225?[0-9]{8,10}$',
-                message="Format de téléphone invalide pour la Côte d'Ivoire. Exemple: +22507123456 ou 07123456"
-            )
-        ]
+        validators=[validate_phone]
     )
     
     # Validation de l'email
@@ -112,20 +127,43 @@ class RendezVousSerializer(serializers.ModelSerializer):
             )
         
         # Vérifier que la date n'est pas trop éloignée (max 6 mois)
-        max_date = today + timedelta(days=180)
+        max_date = today + timedelta(days=HORIZON_JOURS)
         if value > max_date:
             raise serializers.ValidationError(
                 "La date ne peut pas être supérieure à 6 mois."
             )
         
-        # Vérifier que ce n'est pas un dimanche (clinique fermée)
-        if value.weekday() == 6:  # 6 = dimanche
-            raise serializers.ValidationError(
-                "La clinique est fermée le dimanche. Veuillez choisir une autre date."
-            )
-        
         return value
 
+    def validate_service(self, value):
+        """Service du site de la requête (context['clinique']) uniquement"""
+        clinique = self.context.get('clinique')
+        if clinique is not None and value.clinique_id != clinique.pk:
+            raise serializers.ValidationError(self.fields['service'].error_messages['does_not_exist'])
+        return value
+
+    def validate(self, attrs):
+        # Vérifier que la clinique du service est ouverte ce jour-là (horaires, congés, jours fériés)
+        cal = calendrier(attrs['service'].clinique_id)
+        jour = attrs['date_souhaitee']
+        if not cal.est_ouvert(jour):
+            raise serializers.ValidationError({'date_souhaitee': [
+                f"La clinique est fermée ce jour-là ({cal.motif(jour)}). Veuillez choisir une autre date."
+            ]})
+        return attrs
+
+class ListeAttenteSerializer(RendezVousSerializer):
+    """Inscription en liste d'attente : mêmes règles de validation qu'un rendez-vous"""
+    message = None
+
+    class Meta:
+        model = ListeAttente
+        fields = [
+            'id', 'nom', 'prenom', 'telephone', 'email',
+            'date_souhaitee', 'service', 'service_nom', 'statut',
+        ]
+        read_only_fields = ['id', 'statut', 'service_nom']
+
 class ContactSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contact
@@ -0,0 +1,137 @@
+# ==========================================
+# SIGNALS.PY - Réactions aux écritures sur les modèles
+# ==========================================
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .calendrier import invalider_calendrier
+from .capacite import deplacer_places
+from . import journal
+from .agenda import invalider_agendas
+from .compteurs import enregistrement
+from .catalogue import invalidate_catalogue
+from .liste_attente import proposer_creneau
+from .medias import invalider_medias
+from .models import Clinique, Contact, Dentiste, Fermeture, Horaire, RendezVous, Service
+from .sites import invalider_annuaire
+from .statistiques import ajuster, deplacer, deplacer_lot, jour_reception
+from .transitions import statuts_modifies
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=RendezVous, dispatch_uid='clinic_rendezvous_enregistre')
+def rendezvous_enregistre(sender, instance, created, raw=False, **kwargs):
+    """Statistiques de réservation et liste d'attente, à la création et au changement de statut"""
+    if raw:
+        return
+    etat = instance.etat_statistique()
+    initial = getattr(instance, '_etat_initial', None)
+    instance._etat_initial = etat
+
+    # Statistiques : une unité par rendez-vous, dans la case de son statut courant
+    jour = jour_reception(instance.created_at)
+    if created:
+        ajuster(jour, *etat, 1)
+    elif initial is not None:
+        deplacer(jour, initial, etat)
+
+    # Quotas journaliers : place prise à l'insertion (RendezVous.save),
+    # rendue ou déplacée ici si le statut, le service ou la date change
+    place = instance.place()
+    if not created and hasattr(instance, '_place_initiale'):
+        deplacer_places([(instance._place_initiale, place)])
+    instance._place_initiale = place
+
+    # Liste d'attente : le créneau d'un rendez-vous annulé est proposé après validation
+    if instance.statut == 'cancelled' and initial is not None and initial[1] != 'cancelled':
+        transaction.on_commit(lambda: liberer_creneau(instance))
+
+
+@receiver(statuts_modifies, sender=RendezVous, dispatch_uid='clinic_rendezvous_statuts_modifies')
+def rendezvous_modifies(sender, rendezvous, statut, **kwargs):
+    """Équivalent groupé de rendezvous_enregistre, pour les changements de statut en masse"""
+    mouvements, places, liberes = [], [], []
+    for rdv in rendezvous:
+        # Compteurs de l'équipe déjà reportés par RendezVous.objects.update() (voir compteurs.py)
+        rdv._compteurs_initiaux = rdv.compteurs_actifs()
+        journal.enregistrement(rdv, created=False)
+        if hasattr(rdv, '_place_initiale'):
+            places.append((rdv._place_initiale, rdv.place()))
+        rdv._place_initiale = rdv.place()
+        initial = getattr(rdv, '_etat_initial', None)
+        etat = rdv.etat_statistique()
+        rdv._etat_initial = etat
+        if initial is None:
+            continue
+        mouvements.append((jour_reception(rdv.created_at), initial, etat))
+        if statut == 'cancelled' and initial[1] != 'cancelled':
+            liberes.append(rdv)
+
+    deplacer_lot(mouvements)
+    deplacer_places(places)
+    if liberes:
+        transaction.on_commit(lambda: liberer_creneaux(liberes))
+
+
+@receiver(post_save, sender=RendezVous, dispatch_uid='clinic_compteurs_rendezvous_save')
+@receiver(post_save, sender=Contact, dispatch_uid='clinic_compteurs_contact_save')
+def compteurs_enregistrement(sender, instance, created, raw=False, **kwargs):
+    """Compteurs de l'équipe (messages non lus, rendez-vous en attente) : voir compteurs.py"""
+    if not raw:
+        enregistrement(instance, created)
+
+
+@receiver(post_save, sender=RendezVous, dispatch_uid='clinic_journal_rendezvous_save')
+@receiver(post_save, sender=Contact, dispatch_uid='clinic_journal_contact_save')
+def journal_enregistrement(sender, instance, created, raw=False, **kwargs):
+    """Historique des modifications : voir journal.py"""
+    if not raw:
+        journal.enregistrement(instance, created)
+
+
+def liberer_creneau(rdv):
+    try:
+        proposer_creneau(rdv)
+    except Exception as e:
+        logger.error(f"Erreur attribution du créneau libéré par le RDV {rdv.id}: {e}")
+
+
+def liberer_creneaux(rendezvous):
+    for rdv in rendezvous:
+        liberer_creneau(rdv)
+
+
+@receiver(post_save, sender=Service, dispatch_uid='clinic_catalogue_service_save')
+@receiver(post_delete, sender=Service, dispatch_uid='clinic_catalogue_service_delete')
+@receiver(post_save, sender=Dentiste, dispatch_uid='clinic_catalogue_dentiste_save')
+@receiver(post_delete, sender=Dentiste, dispatch_uid='clinic_catalogue_dentiste_delete')
+@receiver(post_save, sender=Horaire, dispatch_uid='clinic_catalogue_horaire_save')
+@receiver(post_delete, sender=Horaire, dispatch_uid='clinic_catalogue_horaire_delete')
+def catalogue_modifie(sender, instance, **kwargs):
+    """Invalide les réponses du catalogue du site en cache (et leurs variantes compressées)"""
+    invalidate_catalogue(sender._meta.model_name, instance.clinique_id)
+    if sender is not Horaire:
+        # Images et photos publiques (voir medias.py), noms et durées des agendas (agenda.py)
+        invalider_medias()
+        invalider_agendas()
+
+
+@receiver(post_save, sender=Horaire, dispatch_uid='clinic_calendrier_horaire_save')
+@receiver(post_delete, sender=Horaire, dispatch_uid='clinic_calendrier_horaire_delete')
+@receiver(post_save, sender=Fermeture, dispatch_uid='clinic_calendrier_fermeture_save')
+@receiver(post_delete, sender=Fermeture, dispatch_uid='clinic_calendrier_fermeture_delete')
+def calendrier_modifie(sender, **kwargs):
+    """Recompile la table des jours ouverts (voir calendrier.py)"""
+    invalider_calendrier()
+
+
+@receiver(post_save, sender=Clinique, dispatch_uid='clinic_sites_clinique_save')
+@receiver(post_delete, sender=Clinique, dispatch_uid='clinic_sites_clinique_delete')
+def clinique_modifiee(sender, **kwargs):
+    """Recompile l'annuaire des sites (voir sites.py) ; noms et adresses des agendas"""
+    invalider_annuaire()
+    invalider_agendas()
@@ -0,0 +1,123 @@
+# ==========================================
+# SITES.PY - Résolution du site (clinique) de chaque requête
+# ==========================================
+"""
+Chaque requête est rattachée à une clinique, dans cet ordre :
+
+    1. préfixe d'URL /sites/<slug>/ (settings.CLINIQUE_PREFIXE_URL), retiré
+       du chemin avant la résolution des URLs ;
+    2. nom de domaine de la requête (Clinique.domaine) ;
+    3. site par défaut (settings.CLINIQUE_PAR_DEFAUT, sinon le plus ancien).
+
+L'annuaire des sites actifs est compilé une fois par processus (cache_local.py) :
+la résolution ne fait aucune requête. Il est invalidé à chaque modification
+d'une clinique (signals.py).
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404
+from django.http.request import split_domain_port
+from django.urls import get_script_prefix, set_script_prefix
+
+from .cache_local import CacheLocal
+
+
+class Annuaire:
+    """Sites actifs indexés par domaine et par slug"""
+
+    def __init__(self, cliniques, slug_par_defaut=''):
+        self.par_slug = {clinique.slug: clinique for clinique in cliniques}
+        self.par_id = {clinique.pk: clinique for clinique in cliniques}
+        self.par_domaine = {clinique.domaine.lower(): clinique for clinique in cliniques if clinique.domaine}
+        self.defaut = self.par_slug.get(slug_par_defaut) or (cliniques[0] if cliniques else None)
+
+
+def _compiler(cle):
+    from .models import Clinique
+    cliniques = list(Clinique.objects.filter(actif=True).order_by('id').only(
+        'id', 'nom', 'slug', 'domaine', 'adresse', 'telephone', 'email', 'actif'
+    ))
+    return Annuaire(cliniques, settings.CLINIQUE_PAR_DEFAUT)
+
+
+_annuaire = CacheLocal('sites', _compiler)
+
+
+def annuaire():
+    return _annuaire.get()
+
+
+def invalider_annuaire():
+    _annuaire.invalider()
+
+
+def clinique(pk):
+    """Site actif d'identifiant `pk` (depuis l'annuaire), ou None"""
+    return annuaire().par_id.get(pk)
+
+
+def separer_prefixe(path):
+    """
+    Sépare le préfixe de site d'un chemin :
+    '/sites/cocody/api/services/' -> ('cocody', '/api/services/').
+    Renvoie (None, path) si le chemin n'en a pas.
+    """
+    prefixe = settings.CLINIQUE_PREFIXE_URL
+    if not prefixe or not path.startswith(prefixe):
+        return None, path
+    slug, separateur, reste = path[len(prefixe):].partition('/')
+    if not slug:
+        return None, path
+    return slug, '/' + reste
+
+
+def resoudre(path, host):
+    """(clinique, chemin sans préfixe, slug du préfixe ou None) ; Http404 si le préfixe désigne un site inconnu"""
+    sites = annuaire()
+    slug, path = separer_prefixe(path)
+    if slug is not None:
+        site = sites.par_slug.get(slug)
+        if site is None:
+            raise Http404(f"Site inconnu : {slug}")
+        return site, path, slug
+    domaine, _ = split_domain_port(host)
+    return sites.par_domaine.get(domaine, sites.defaut), path, None
+
+
+class CliniqueMiddleware:
+    """Renseigne request.clinique ; retire le préfixe /sites/<slug>/ du chemin"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Http404 (site inconnu) convertie en réponse par le handler, comme pour une URL inconnue
+        site, path_info, slug = resoudre(request.path_info, request.get_host())
+        request.clinique = site
+        if slug is not None:
+            request.path_info = path_info
+            # reverse() produit les URLs du site (préfixe remis par le handler à chaque requête)
+            set_script_prefix(f'{get_script_prefix()}{settings.CLINIQUE_PREFIXE_URL.lstrip("/")}{slug}/')
+        return self.get_response(request)
+
+
+def site_requis(vue):
+    """
+    Vue propre à un site : request.clinique est garanti. Sans CliniqueMiddleware
+    (tests, chaîne personnalisée), c'est le site par défaut ; sans aucun site
+    actif, la vue répond 404 au lieu d'échouer sur request.clinique.
+    """
+    @wraps(vue)
+    def wrapper(request, *args, **kwargs):
+        if getattr(request, 'clinique', None) is None:
+            request.clinique = annuaire().defaut
+            if request.clinique is None:
+                raise Http404("Aucun site actif")
+        return vue(request, *args, **kwargs)
+    return wrapper
+
+
+def site_de(objet):
+    """Clinique d'un rendez-vous, contact... (depuis l'annuaire, sans requête), à défaut le site par défaut"""
+    return clinique(objet.clinique_id) or annuaire().defaut
@@ -0,0 +1,87 @@
+# ==========================================
+# SMS.PY - Envoi de SMS par backend interchangeable
+# ==========================================
+"""
+Même principe que django.core.mail : le backend est choisi par
+settings.SMS_BACKEND et s'utilise comme connexion réutilisable.
+
+    with get_connection() as connexion:
+        connexion.send_messages([SmsMessage('+2250707123456', 'Bonjour')])
+
+Backends fournis (substituts locaux) :
+    clinic.sms.ConsoleBackend  -> écrit les SMS sur la sortie standard
+    clinic.sms.LocmemBackend   -> les conserve dans clinic.sms.outbox (tests)
+    clinic.sms.DummyBackend    -> n'envoie rien
+
+Un fournisseur réel s'intègre en sous-classant BaseSmsBackend.
+"""
+import sys
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Boîte d'envoi du LocmemBackend
+outbox = []
+
+
+class SmsMessage:
+    def __init__(self, telephone, texte):
+        self.telephone = telephone
+        self.texte = texte
+
+    def __repr__(self):
+        return f'SmsMessage({self.telephone!r}, {self.texte!r})'
+
+
+class BaseSmsBackend:
+    def __init__(self, fail_silently=False, **kwargs):
+        self.fail_silently = fail_silently
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def send_messages(self, messages):
+        """Envoie les messages et renvoie le nombre de SMS envoyés"""
+        raise NotImplementedError('Les backends SMS doivent implémenter send_messages()')
+
+
+class ConsoleBackend(BaseSmsBackend):
+    def __init__(self, *args, stream=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stream = stream or sys.stdout
+        self._lock = threading.RLock()
+
+    def send_messages(self, messages):
+        with self._lock:
+            for message in messages:
+                self.stream.write(f'SMS -> {message.telephone}\n{message.texte}\n{"-" * 40}\n')
+            self.stream.flush()
+        return len(messages)
+
+
+class LocmemBackend(BaseSmsBackend):
+    def send_messages(self, messages):
+        outbox.extend(messages)
+        return len(messages)
+
+
+class DummyBackend(BaseSmsBackend):
+    def send_messages(self, messages):
+        return len(messages)
+
+
+def get_connection(backend=None, fail_silently=False, **kwargs):
+    """Instancie le backend SMS configuré (settings.SMS_BACKEND par défaut)"""
+    klass = import_string(backend or settings.SMS_BACKEND)
+    return klass(fail_silently=fail_silently, **kwargs)
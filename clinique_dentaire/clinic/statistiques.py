@@ -0,0 +1,202 @@
+# ==========================================
+# STATISTIQUES.PY - Compteurs de réservation (jour x service x statut)
+# ==========================================
+"""
+La table StatistiqueReservation compte, pour chaque jour de réception de la
+demande, les rendez-vous de chaque service dans chaque statut. Un rendez-vous
+y est compté une seule fois, dans son statut courant : un changement de
+statut déplace une unité d'une case à l'autre.
+
+Les compteurs suivent une seule règle, celle de rebuild_statistiques : ils
+comptent les rendez-vous présents en base, table principale et archives.
+L'archivage déplace les lignes sans toucher aux compteurs ; l'anonymisation
+(retention.py) les garde comptées ; une suppression (admin, purge en mode
+'supprimer') les retire (suivre_delete). Un recalcul donne donc toujours
+les compteurs tenus au fil de l'eau.
+"""
+from datetime import date, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import RendezVous, RendezVousArchive, Service, StatistiqueReservation
+
+# Statuts comptés comme une demande aboutie dans le taux de conversion
+STATUTS_CONVERTIS = ('confirmed', 'completed')
+
+
+def jour_reception(created_at):
+    """Jour (heure locale) auquel une demande est comptée"""
+    return timezone.localdate(created_at)
+
+
+def ajuster(jour, service_id, statut, delta):
+    """Ajoute `delta` à un compteur par un UPDATE atomique, en créant la case au besoin"""
+    cases = StatistiqueReservation.objects.filter(jour=jour, service_id=service_id, statut=statut)
+    if cases.update(nombre=F('nombre') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            StatistiqueReservation.objects.create(jour=jour, service_id=service_id, statut=statut, nombre=delta)
+    except IntegrityError:
+        # Case créée entre-temps par une écriture concurrente
+        cases.update(nombre=F('nombre') + delta)
+
+
+def deplacer(jour, avant, apres):
+    """Reporte un rendez-vous de la case `avant` (service_id, statut) vers la case `apres`"""
+    if avant == apres:
+        return
+    ajuster(jour, *avant, -1)
+    ajuster(jour, *apres, 1)
+
+
+def deplacer_lot(mouvements):
+    """
+    Reporte un lot de rendez-vous : `mouvements` est une liste de (jour, avant, apres).
+
+    Les mouvements sont d'abord agrégés par case : une mise à jour par case
+    touchée, quel que soit le nombre de rendez-vous du lot.
+    """
+    deltas = {}
+    for jour, avant, apres in mouvements:
+        if avant == apres:
+            continue
+        deltas[(jour, *avant)] = deltas.get((jour, *avant), 0) - 1
+        deltas[(jour, *apres)] = deltas.get((jour, *apres), 0) + 1
+    for (jour, service_id, statut), delta in deltas.items():
+        if delta:
+            ajuster(jour, service_id, statut, delta)
+
+
+def suivre_delete(queryset, executer):
+    """
+    Exécute queryset.delete() (`executer`) en retirant des compteurs les
+    rendez-vous supprimés (un GROUP BY avant la suppression, dans la même transaction).
+    """
+    with transaction.atomic(using=queryset.db):
+        cases = list(
+            queryset.annotate(jour=TruncDate('created_at'))
+            .values_list('jour', 'service_id', 'statut')
+            .annotate(nombre=Count('id'))
+            .order_by()
+        )
+        resultat = executer()
+        for jour, service_id, statut, nombre in cases:
+            ajuster(jour, service_id, statut, -nombre)
+    return resultat
+
+
+def rebuild_statistiques(depuis=None):
+    """
+    Recalcule les compteurs à partir des rendez-vous courants et archivés.
+
+    Un seul GROUP BY par table ; si `depuis` est donné, seuls les jours à
+    partir de cette date sont recalculés. Renvoie le nombre de cases écrites.
+    """
+    cases = {}
+    for model in (RendezVous, RendezVousArchive):
+        lignes = model.objects.all()
+        if depuis is not None:
+            lignes = lignes.filter(created_at__date__gte=depuis)
+        agregats = (
+            lignes.annotate(jour=TruncDate('created_at'))
+            .values_list('jour', 'service_id', 'statut')
+            .annotate(nombre=Count('id'))
+            .order_by()
+        )
+        for jour, service_id, statut, nombre in agregats:
+            cle = (jour, service_id, statut)
+            cases[cle] = cases.get(cle, 0) + nombre
+
+    with transaction.atomic():
+        existantes = StatistiqueReservation.objects.all()
+        if depuis is not None:
+            existantes = existantes.filter(jour__gte=depuis)
+        existantes.delete()
+        StatistiqueReservation.objects.bulk_create(
+            [StatistiqueReservation(jour=j, service_id=s, statut=st, nombre=n) for (j, s, st), n in cases.items()],
+            batch_size=1000,
+        )
+    return len(cases)
+
+
+def _taux(convertis, total):
+    return round(100 * convertis / total, 1) if total else None
+
+
+def rapport(debut, fin, clinique=None):
+    """
+    Rapport de réservation entre `debut` et `fin` (inclus), lu dans la seule table de synthèse.
+
+    Limité aux services de `clinique` si elle est donnée (tous les sites sinon).
+    Le coût dépend du nombre de jours et de services, pas du nombre de rendez-vous.
+    """
+    cases = StatistiqueReservation.objects.filter(jour__gte=debut, jour__lte=fin)
+    services = Service.objects.all()
+    if clinique is not None:
+        cases = cases.filter(service__clinique=clinique)
+        services = services.filter(clinique=clinique)
+    statuts = [code for code, _ in RendezVous.STATUS_CHOICES]
+
+    def vide():
+        return dict.fromkeys(statuts, 0)
+
+    par_jour = {}
+    for jour, statut, nombre in cases.values_list('jour', 'statut').annotate(total=Sum('nombre')).order_by('jour'):
+        par_jour.setdefault(jour, vide())[statut] = nombre
+
+    noms = dict(services.values_list('id', 'nom'))
+    par_service = {}
+    for service_id, statut, nombre in cases.values_list('service_id', 'statut').annotate(total=Sum('nombre')).order_by():
+        par_service.setdefault(service_id, vide())[statut] = nombre
+
+    def ligne(compteurs, **extra):
+        total = sum(compteurs.values())
+        convertis = sum(compteurs[s] for s in STATUTS_CONVERTIS)
+        return {**extra, 'statuts': compteurs, 'total': total, 'taux_conversion': _taux(convertis, total)}
+
+    totaux = vide()
+    for compteurs in par_service.values():
+        for statut, nombre in compteurs.items():
+            totaux[statut] += nombre
+
+    return {
+        'periode': {'debut': debut.isoformat(), 'fin': fin.isoformat()},
+        'statuts': dict(RendezVous.STATUS_CHOICES),
+        'jours': [
+            ligne(compteurs, jour=jour.isoformat())
+            for jour, compteurs in sorted(par_jour.items())
+        ],
+        'services': sorted(
+            (ligne(compteurs, service_id=sid, service=noms.get(sid, '')) for sid, compteurs in par_service.items()),
+            key=lambda l: -l['total'],
+        ),
+        'total': ligne(totaux),
+    }
+
+
+PERIODE_PAR_DEFAUT = 30
+PERIODE_MAX = 366
+
+
+def periode(params):
+    """
+    Bornes (debut, fin) d'un rapport lues dans les paramètres GET.
+
+    `du`/`au` (AAAA-MM-JJ) ou `jours` (les N derniers jours, aujourd'hui
+    inclus). Lève ValueError si les paramètres sont invalides.
+    """
+    fin = date.fromisoformat(params['au']) if params.get('au') else timezone.localdate()
+    if params.get('du'):
+        debut = date.fromisoformat(params['du'])
+    else:
+        jours = int(params.get('jours', PERIODE_PAR_DEFAUT))
+        if jours < 1:
+            raise ValueError('jours doit être positif')
+        debut = fin - timedelta(days=jours - 1)
+    if debut > fin or (fin - debut).days >= PERIODE_MAX:
+        raise ValueError(f'période invalide (au plus {PERIODE_MAX} jours)')
+    return debut, fin
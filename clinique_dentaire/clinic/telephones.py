@@ -0,0 +1,63 @@
+# ==========================================
+# TELEPHONES.PY - Numéros ivoiriens : normalisation et validation
+# ==========================================
+"""
+Un seul format de référence : E.164, soit +225 suivi des 10 chiffres du
+numéro national (numérotation en vigueur depuis 2021).
+
+Formats acceptés en saisie : 0707123456, 07 07 12 34 56, +2250707123456,
+002250707123456, 2250707123456, ainsi que les anciens numéros à 8 chiffres
+(avec ou sans +225), convertis selon la règle de migration de 2021.
+"""
+import re
+
+from django.core.exceptions import ValidationError
+
+INDICATIF = '225'
+_SEPARATEURS = re.compile(r'[\s.\-()/]')
+_CHIFFRES = re.compile(r'^\+?\d+$')
+
+
+def _prefixe_2021(ancien):
+    """Préfixe ajouté en 2021 devant un ancien numéro à 8 chiffres"""
+    if ancien[0] in '23':
+        # Lignes fixes : préfixe 27 de l'opérateur historique
+        return '27'
+    # Mobiles : selon le 2e chiffre, Moov (0-3) / MTN (4-6) / Orange (7-9)
+    deuxieme = int(ancien[1])
+    if deuxieme <= 3:
+        return '01'
+    if deuxieme <= 6:
+        return '05'
+    return '07'
+
+
+def normalize_phone(valeur):
+    """Renvoie le numéro au format E.164 (+225XXXXXXXXXX), ou None s'il n'est pas reconnu"""
+    if not valeur:
+        return None
+    compact = _SEPARATEURS.sub('', str(valeur))
+    if not _CHIFFRES.match(compact):
+        return None
+    chiffres = compact.lstrip('+')
+    if chiffres.startswith('00' + INDICATIF):
+        chiffres = chiffres[2:]
+    if chiffres.startswith(INDICATIF) and len(chiffres) in (11, 13):
+        chiffres = chiffres[len(INDICATIF):]
+    elif compact.startswith('+'):
+        return None
+
+    if len(chiffres) == 8:
+        chiffres = _prefixe_2021(chiffres) + chiffres
+    if len(chiffres) != 10:
+        return None
+    return f'+{INDICATIF}{chiffres}'
+
+
+def validate_phone(valeur):
+    """Validateur commun aux modèles, au serializer et à la vue de contact"""
+    if normalize_phone(valeur) is None:
+        raise ValidationError(
+            "Format de téléphone invalide pour la Côte d'Ivoire. Exemple: +225 07 12 34 56 78 ou 0712345678",
+            code='invalid_phone',
+        )
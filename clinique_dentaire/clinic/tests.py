@@ -1,3 +1,1567 @@
-from django.test import TestCase
+# ==========================================
+# TESTS.PY - Tests de l'application clinique
+# ==========================================
+import datetime
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F, Sum
+from django.http import HttpResponse, JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from . import antispam, sms, traces
+from .agenda import agenda
+from .archives import archive_rendezvous
+from .cache_local import CacheLocal
+from .calendrier import HORIZON_JOURS, calendrier, compiler, est_ouvert, prochain_jour_ouvert
+from .capacite import rebuild_occupation
+from .catalogue import duree_cache
+from .checks import cache_partage_en_production
+from .compteurs import badges, rebuild_compteurs, valeurs
+from .encoders import FastJsonResponse
+from .journal import tampon
+from .lecture import DentisteLecture, HoraireLecture, ListeAttenteLecture, RendezVousLecture, ServiceLecture
+from .liste_attente import meilleur_candidat, proposer_creneau
+from .medias import CACHE_IMMUABLE, fichiers_publics, invalider_medias
+from .management.commands.collecteur_traces import spans_recus
+from .management.commands.seed import Command as SeedCommand
+from .models import (
+    CapaciteAtteinte, Clinique, Compteur, Contact, Dentiste, Fermeture, Horaire, JournalModification, ListeAttente,
+    OccupationJournaliere, Patient, PointDeReprise, Quarantaine, RendezVous, RendezVousArchive, Service, StatistiqueReservation,
+)
+from .patients import backfill_patients
+from .querydebug import assert_query_budget
+from .rappels import envoyer_rappels
+from .renderers import FastJSONRenderer
+from .retention import ANONYME, configuration, purger
+from .search import FTS_TABLES, fts_available, fts_filter, fts_query, fts_sync_suspended
+from .serializers import (
+    DentisteSerializer, HoraireSerializer, ListeAttenteSerializer, RendezVousSerializer, ServiceSerializer,
+)
+from .sites import annuaire, invalider_annuaire
+from .statistiques import rebuild_statistiques
+from .telephones import normalize_phone
+from .transitions import changer_statut, statuts_modifies
+
+HOTE = 'localhost'
+
+
+class CliniqueTestMixin:
+    """Site, services et rendez-vous communs aux tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Site créé par la migration 0010, site par défaut des requêtes de test
+        cls.clinique = Clinique.objects.get(slug='marcory')
+        cls.services = [
+            Service.objects.create(
+                clinique=cls.clinique, nom=nom, description=nom, prix_min=10000, prix_max=20000, ordre=ordre,
+            )
+            for ordre, nom in enumerate(['Consultation générale', 'Détartrage', 'Orthodontie'], 1)
+        ]
+        cls.service = cls.services[0]
+
+    def setUp(self):
+        cache.clear()
+        # Annuaire des sites compilé hors des budgets de requêtes
+        invalider_annuaire()
+        annuaire()
+
+    @staticmethod
+    def jour_ouvre(decalage=7):
+        jour = date.today() + timedelta(days=decalage)
+        return jour + timedelta(days=1) if jour.weekday() == 6 else jour
+
+    def creer_rendezvous(self, nombre=1, service=None, date_souhaitee=None, **champs):
+        date_souhaitee = date_souhaitee or self.jour_ouvre()
+        return [
+            RendezVous.objects.create(
+                clinique=self.clinique, service=service or self.service, date_souhaitee=date_souhaitee,
+                nom='KOUAME', prenom='Aya', telephone=f'+22507{n:08d}', email=f'aya{n}@example.ci',
+                **champs,
+            )
+            for n in range(nombre)
+        ]
+
+
+# ==========================================
+# BUDGET DE REQUÊTES (querydebug.py)
+# ==========================================
+
+@override_settings(ALLOWED_HOSTS=[HOTE])
+class BudgetRequetesTests(CliniqueTestMixin, TestCase):
+    """Les pages les plus appelées restent à un nombre de requêtes constant"""
+
+    def test_liste_admin_rendezvous(self):
+        self.creer_rendezvous(20)
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.ci', 'secret')
+        self.client.force_login(admin)
+        # COUNT répété par l'admin : total filtré et total du site
+        with assert_query_budget(8, max_repeats=2):
+            reponse = self.client.get('/admin/clinic/rendezvous/', HTTP_HOST=HOTE)
+        self.assertEqual(reponse.status_code, 200)
+        self.assertContains(reponse, 'KOUAME')
+
+    def test_services(self):
+        with assert_query_budget(1):
+            reponse = self.client.get('/api/services/', HTTP_HOST=HOTE)
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(len(reponse.json()['services']), len(self.services))
+        # Deuxième appel servi par le cache du catalogue
+        with assert_query_budget(0):
+            self.client.get('/api/services/', HTTP_HOST=HOTE)
+
+    def test_prise_de_rendezvous(self):
+        donnees = {
+            'nom': 'Traore', 'prenom': 'Moussa', 'telephone': '+2250701020304',
+            'email': 'moussa@example.ci', 'service': self.service.pk,
+            'date_souhaitee': self.jour_ouvre().isoformat(), 'message': 'Détartrage annuel',
+        }
+        # Écriture complète : patient, quota du jour, statistiques, compteurs, journal
+        with assert_query_budget(25, max_repeats=2):
+            reponse = self.client.post('/prendre-rendez-vous/', donnees, content_type='application/json', HTTP_HOST=HOTE)
+        self.assertEqual(reponse.status_code, 200, reponse.content)
+        self.assertEqual(RendezVous.objects.count(), 1)
+
+    def test_str_sans_requete(self):
+        self.creer_rendezvous(3)
+        with assert_query_budget(1):
+            libelles = [str(rdv) for rdv in RendezVous.objects.all()]
+        self.assertTrue(all('KOUAME' in libelle for libelle in libelles))
+        with assert_query_budget(1):
+            libelles = [str(rdv) for rdv in RendezVous.objects.select_related('service')]
+        self.assertTrue(all(self.service.nom in libelle for libelle in libelles))
+
+
+# ==========================================
+# COMPRESSION (compression.py)
+# ==========================================
+
+@override_settings(ALLOWED_HOSTS=[HOTE], COMPRESSION_TAILLE_MIN=0)
+class CompressionTests(CliniqueTestMixin, TestCase):
+    """Réponses publiques compressées, jamais celles qui portent un secret (BREACH)"""
+
+    def test_catalogue_compresse(self):
+        reponse = self.client.get('/api/services/', HTTP_HOST=HOTE, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(reponse['Content-Encoding'], 'gzip')
+
+    def test_admin_non_compresse(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.ci', 'secret')
+        self.client.force_login(admin)
+        reponse = self.client.get('/admin/clinic/rendezvous/?q=KOUAME', HTTP_HOST=HOTE, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(reponse.status_code, 200)
+        self.assertFalse(reponse.has_header('Content-Encoding'))
+
+    def test_formulaire_avec_jeton_csrf_non_compresse(self):
+        reponse = self.client.get('/admin/login/', HTTP_HOST=HOTE, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertContains(reponse, 'csrfmiddlewaretoken')
+        self.assertFalse(reponse.has_header('Content-Encoding'))
+
+
+# ==========================================
+# ENCODAGE JSON (encoders.py, renderers.py)
+# ==========================================
+
+class EncodageTests(TestCase):
+    """Octets identiques à ceux des encodeurs remplacés"""
+
+    DOCUMENT = {
+        'status': 'success',
+        'services': [{
+            'id': 1, 'nom': 'Détartrage', 'prix_min': Decimal('15000.00'), 'actif': True, 'icone': None,
+            'ouverture': datetime.time(8, 0), 'jour': date(2025, 3, 14),
+            'cree_le': datetime.datetime(2025, 3, 14, 9, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'message': 'Ligne\u2028suivante « guillemets » 日本',
+        }],
+    }
+
+    def test_fast_json_response(self):
+        self.assertEqual(FastJsonResponse(self.DOCUMENT).content, JsonResponse(self.DOCUMENT).content)
+
+    def test_fast_json_renderer(self):
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import FastJSONRenderer
+        self.assertEqual(FastJSONRenderer().render(self.DOCUMENT), JSONRenderer().render(self.DOCUMENT))
+
+    def test_fast_json_renderer_flottants(self):
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import FastJSONRenderer
+        for valeur in (0.0, -0.0, 0.5, 15000.0, 1e-05, 1e16, 1.7976931348623157e308, Decimal('1E+20'), Decimal('0.00001')):
+            document = {'taux': valeur, 'serie': [1, valeur], 2.5: 'cle'}
+            self.assertEqual(FastJSONRenderer().render(document), JSONRenderer().render(document), valeur)
+        for valeur in (float('nan'), float('inf')):
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({'taux': valeur})
+
+
+# ==========================================
+# ANTI-SPAM (antispam.py)
+# ==========================================
+
+@override_settings(ALLOWED_HOSTS=[HOTE], ANTISPAM={'ENABLED': True, 'SEUIL': 3.0, 'MODELE': '/nonexistent/antispam.json'})
+class AntispamTests(CliniqueTestMixin, TestCase):
+    """Envoi en quarantaine indiscernable d'un envoi accepté ; libération tout ou rien"""
+
+    def setUp(self):
+        super().setUp()
+        antispam.invalider_modele()
+
+    def envoyer(self, message):
+        donnees = {
+            'nom': 'Traore', 'prenom': 'Moussa', 'telephone': '+2250701020304',
+            'email': 'moussa@example.ci', 'service': self.service.pk,
+            'date_souhaitee': self.jour_ouvre().isoformat(), 'message': message,
+        }
+        return self.client.post('/prendre-rendez-vous/', donnees, content_type='application/json', HTTP_HOST=HOTE)
+
+    def test_reponse_identique(self):
+        acceptee = self.envoyer('Détartrage annuel')
+        ecartee = self.envoyer('Cheap viagra casino http://pharma.ru www.bonus.xyz')
+        self.assertEqual(RendezVous.objects.count(), 1)
+        self.assertEqual(Quarantaine.objects.count(), 1)
+        self.assertEqual(acceptee.status_code, ecartee.status_code)
+        self.assertEqual(acceptee.json().keys(), ecartee.json().keys())
+        self.assertEqual(acceptee.json()['data'].keys(), ecartee.json()['data'].keys())
+        self.assertNotIn('id', ecartee.json()['data'])
+
+    def test_liberation_annulee_si_complet(self):
+        service = self.services[1]
+        Service.objects.filter(pk=service.pk).update(capacite_journaliere=1)
+        jour = self.jour_ouvre()
+        self.creer_rendezvous(service=Service.objects.get(pk=service.pk), date_souhaitee=jour)
+        entree = Quarantaine.objects.create(
+            clinique=self.clinique, type_envoi='rendezvous', score=5, motifs='liens',
+            donnees={'nom': 'Yao', 'prenom': 'Awa', 'telephone': '+2250705060708', 'email': 'awa@example.ci',
+                     'service': service.pk, 'date_souhaitee': jour.isoformat(), 'message': ''},
+        )
+        with self.assertRaises(CapaciteAtteinte):
+            antispam.liberer(entree)
+        entree.refresh_from_db()
+        self.assertEqual(entree.verdict, '')
+        self.assertFalse(RendezVous.objects.filter(nom='Yao').exists())
+
+
+# ==========================================
+# MULTI-SITES (sites.py, admin.py)
+# ==========================================
+
+@override_settings(ALLOWED_HOSTS=[HOTE])
+class SitesTests(CliniqueTestMixin, TestCase):
+    """Données du site de la requête uniquement ; pas d'erreur sans site"""
+
+    def test_fiche_patient_limitee_au_site(self):
+        autre = Clinique.objects.create(
+            nom='Clinique Cocody', slug='cocody', adresse='Cocody', telephone='+2250700000001', email='cocody@example.ci',
+        )
+        service_autre = Service.objects.create(clinique=autre, nom='Blanchiment', description='', prix_min=1, prix_max=2)
+        rdv, = self.creer_rendezvous()
+        RendezVous.objects.create(
+            clinique=autre, service=service_autre, date_souhaitee=self.jour_ouvre(), patient=rdv.patient,
+            nom='KOUAME', prenom='Aya', telephone=rdv.telephone, email=rdv.email,
+        )
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.ci', 'secret')
+        self.client.force_login(admin)
+        reponse = self.client.get(f'/admin/clinic/patient/{rdv.patient_id}/change/', HTTP_HOST=HOTE)
+        self.assertContains(reponse, self.service.nom)
+        self.assertNotContains(reponse, 'Blanchiment')
+        reponse = self.client.get(f'/sites/cocody/admin/clinic/patient/{rdv.patient_id}/change/', HTTP_HOST=HOTE)
+        self.assertContains(reponse, 'Blanchiment')
+
+    def test_sans_site_actif(self):
+        Clinique.objects.update(actif=False)
+        invalider_annuaire()
+        for url in ('/api/services/', '/api/jours-ouverts/'):
+            self.assertEqual(self.client.get(url, HTTP_HOST=HOTE).status_code, 404, url)
+
+    def test_sans_middleware_site_par_defaut(self):
+        from django.test import RequestFactory
+        from .views import get_jours_ouverts
+        reponse = get_jours_ouverts(RequestFactory().get('/api/jours-ouverts/'))
+        self.assertEqual(reponse.status_code, 200)
+
+
+# ==========================================
+# LISTE D'ATTENTE (liste_attente.py)
+# ==========================================
+
+class ListeAttenteTests(CliniqueTestMixin, TestCase):
+    """Créneau libéré proposé à la plus ancienne demande compatible, en une requête par candidat"""
+
+    def inscrire(self, service, jour, nom):
+        return ListeAttente.objects.create(
+            clinique=self.clinique, service=service, date_souhaitee=jour,
+            nom=nom, prenom='Awa', telephone='+2250705060708', email=f'{nom.lower()}@example.ci',
+        )
+
+    def test_meilleur_candidat_une_requete(self):
+        jour = self.jour_ouvre()
+        premier = self.inscrire(self.services[1], jour, 'Yao')
+        self.inscrire(self.services[0], jour, 'Kone')
+        with assert_query_budget(1):
+            self.assertEqual(meilleur_candidat(self.service, jour), premier)
+
+        # Tête de chaque file par date d'inscription, pas par identifiant
+        ancien = self.inscrire(self.services[0], jour, 'Bamba')
+        retire = self.inscrire(self.services[1], jour, 'Toure')
+        ListeAttente.objects.filter(pk=ancien.pk).update(created_at=premier.created_at - timedelta(hours=1))
+        ListeAttente.objects.filter(pk=retire.pk).update(created_at=premier.created_at - timedelta(hours=2), statut='withdrawn')
+        with assert_query_budget(1):
+            self.assertEqual(meilleur_candidat(self.service, jour), ancien)
+        self.assertEqual(meilleur_candidat(self.service, jour, services_complets={self.services[0].pk}), premier)
+
+    def test_candidat_suivant_si_quota_atteint(self):
+        jour = self.jour_ouvre()
+        complet, libre = self.services[1], self.services[2]
+        Service.objects.filter(pk=complet.pk).update(capacite_journaliere=1)
+        self.creer_rendezvous(service=Service.objects.get(pk=complet.pk), date_souhaitee=jour)
+        bloque = self.inscrire(complet, jour, 'Yao')
+        servi = self.inscrire(libre, jour, 'Kone')
+        annule, = self.creer_rendezvous(service=self.services[2], date_souhaitee=jour)
+        with self.captureOnCommitCallbacks():
+            self.assertEqual(proposer_creneau(annule), servi)
+        bloque.refresh_from_db()
+        servi.refresh_from_db()
+        self.assertEqual((bloque.statut, servi.statut), ('waiting', 'offered'))
+
+
+# ==========================================
+# CHAÎNE ALLÉGÉE DE L'API PUBLIQUE (handlers.py)
+# ==========================================
+
+class HandlersTests(TestCase):
+    """Chaîne de l'API publique chargée sans modifier settings.MIDDLEWARE"""
+
+    def test_chaine_publique(self):
+        from django.conf import settings
+        from django.core.handlers.wsgi import WSGIHandler
+        from django.middleware.csrf import CsrfViewMiddleware
+        from .handlers import PublicApiHandler
+
+        def classes(handler):
+            return {type(methode.__self__) for methode in handler._view_middleware}
+
+        avant = list(settings.MIDDLEWARE)
+        public = PublicApiHandler()
+        self.assertEqual(settings.MIDDLEWARE, avant)
+        self.assertNotIn(CsrfViewMiddleware, classes(public))
+        self.assertIn(CsrfViewMiddleware, classes(WSGIHandler()))
+
+
+# ==========================================
+# CHANGEMENTS DE STATUT GROUPÉS (transitions.py)
+# ==========================================
+
+class TransitionsTests(CliniqueTestMixin, TestCase):
+    """Seules les transitions de RendezVous.TRANSITIONS sont appliquées, puis signalées"""
+
+    def setUp(self):
+        super().setUp()
+        self.recus = []
+        statuts_modifies.connect(self.recevoir, sender=RendezVous)
+        self.addCleanup(statuts_modifies.disconnect, self.recevoir, sender=RendezVous)
+
+    def recevoir(self, sender, rendezvous, statut, **kwargs):
+        self.recus.append(([rdv.pk for rdv in rendezvous], statut))
+
+    def test_transitions_permises_et_refusees(self):
+        attente, confirme, annule = self.creer_rendezvous(3)
+        RendezVous.objects.filter(pk=confirme.pk).update(statut='confirmed')
+        RendezVous.objects.filter(pk=annule.pk).update(statut='cancelled')
+        with self.captureOnCommitCallbacks(execute=True):
+            modifies, ignores = changer_statut(RendezVous.objects.all(), 'confirmed')
+        self.assertEqual([rdv.pk for rdv in modifies], [attente.pk])
+        self.assertEqual(ignores, 2)
+        self.assertEqual(
+            dict(RendezVous.objects.values_list('pk', 'statut')),
+            {attente.pk: 'confirmed', confirme.pk: 'confirmed', annule.pk: 'cancelled'},
+        )
+        self.assertEqual(self.recus, [([attente.pk], 'confirmed')])
+        self.assertEqual([message.to for message in mail.outbox], [[attente.email]])
+
+    def test_aucune_transition_aucun_signal(self):
+        rdv, = self.creer_rendezvous()
+        RendezVous.objects.filter(pk=rdv.pk).update(statut='completed')
+        modifies, ignores = changer_statut(RendezVous.objects.all(), 'cancelled')
+        self.assertEqual((modifies, ignores), ([], 1))
+        self.assertEqual(self.recus, [])
+
+    def test_statistiques_suivies(self):
+        self.creer_rendezvous(2)
+        changer_statut(RendezVous.objects.all(), 'cancelled')
+        totaux = dict(StatistiqueReservation.objects.values_list('statut').annotate(total=Sum('nombre')))
+        self.assertEqual(totaux.get('cancelled'), 2)
+        self.assertFalse(totaux.get('pending'))
+
+
+# ==========================================
+# QUOTAS JOURNALIERS (capacite.py)
+# ==========================================
+
+class CapaciteTests(CliniqueTestMixin, TestCase):
+    """Places prises par UPDATE conditionnel, rendues ou déplacées avec le rendez-vous"""
+
+    def setUp(self):
+        super().setUp()
+        self.jour = self.jour_ouvre()
+        Service.objects.filter(pk__in=[s.pk for s in self.services]).update(capacite_journaliere=2)
+        self.service = Service.objects.get(pk=self.services[0].pk)
+
+    def places(self, service=None, jour=None):
+        occupation = OccupationJournaliere.objects.filter(service=service or self.service, jour=jour or self.jour).first()
+        return occupation.reservations if occupation else 0
+
+    def test_quota_atteint(self):
+        self.creer_rendezvous(2)
+        self.assertEqual(self.places(), 2)
+        self.assertTrue(OccupationJournaliere.objects.complet(self.service, self.jour))
+        with self.assertRaises(CapaciteAtteinte):
+            self.creer_rendezvous()
+        self.assertEqual(RendezVous.objects.count(), 2)
+        self.assertEqual(self.places(), 2)
+
+    def test_annulation_rend_la_place(self):
+        rdv, _ = self.creer_rendezvous(2)
+        rdv.statut = 'cancelled'
+        rdv.save()
+        self.assertEqual(self.places(), 1)
+        self.creer_rendezvous()
+        self.assertEqual(self.places(), 2)
+
+    def test_suppression_rend_la_place(self):
+        premier, _ = self.creer_rendezvous(2)
+        premier.delete()
+        self.assertEqual(self.places(), 1)
+        RendezVous.objects.all().delete()
+        self.assertEqual(self.places(), 0)
+
+    def test_suppression_d_un_annule(self):
+        rdv, = self.creer_rendezvous()
+        RendezVous.objects.filter(pk=rdv.pk).update(statut='cancelled')
+        RendezVous.objects.filter(pk=rdv.pk).delete()
+        self.assertEqual(self.places(), 1)
+
+    def test_changement_de_date_et_de_service(self):
+        rdv, = self.creer_rendezvous()
+        autre_jour = self.jour_ouvre(8)
+        rdv.date_souhaitee = autre_jour
+        rdv.save()
+        self.assertEqual((self.places(), self.places(jour=autre_jour)), (0, 1))
+        autre_service = Service.objects.get(pk=self.services[1].pk)
+        rdv.service = autre_service
+        rdv.save()
+        self.assertEqual((self.places(jour=autre_jour), self.places(autre_service, autre_jour)), (0, 1))
+
+    def test_rebuild_occupation(self):
+        self.creer_rendezvous(2)
+        OccupationJournaliere.objects.all().delete()
+        rebuild_occupation()
+        self.assertEqual(self.places(), 2)
+
+
+# ==========================================
+# CONSERVATION DES DONNÉES (retention.py)
+# ==========================================
+
+class RetentionTests(CliniqueTestMixin, TestCase):
+    """Purge par lots interrompue puis reprise au dernier identifiant traité"""
+
+    def creer_contacts(self, nombre, age_jours):
+        contacts = [
+            Contact.objects.create(
+                clinique=self.clinique, nom='Bamba', prenom='Fatou', email=f'fatou{n}@example.ci',
+                telephone=f'+22505{n:08d}', sujet='Question', message='Bonjour',
+            )
+            for n in range(nombre)
+        ]
+        Contact.objects.filter(pk__in=[c.pk for c in contacts]).update(
+            created_at=timezone.now() - timedelta(days=age_jours)
+        )
+        return contacts
+
+    def test_purge_interrompue_puis_reprise(self):
+        anciens = self.creer_contacts(7, 800)
+        recents = self.creer_contacts(2, 10)
+
+        premier = purger('contacts', 730, 'supprimer', batch_size=2, max_batches=2)
+        self.assertEqual((premier['lignes'], premier['lots'], premier['termine']), (4, 2, False))
+        reprise = PointDeReprise.objects.get(nom='retention:contacts')
+        self.assertEqual(reprise.dernier_id, anciens[3].pk)
+
+        # Ligne expirée entre-temps, au-delà du point de reprise : traitée par la reprise
+        Contact.objects.filter(pk=recents[0].pk).update(created_at=timezone.now() - timedelta(days=800))
+        second = purger('contacts', 730, 'supprimer', batch_size=2)
+        self.assertEqual((second['lignes'], second['termine']), (4, True))
+        self.assertEqual(list(Contact.objects.values_list('pk', flat=True)), [recents[1].pk])
+        reprise.refresh_from_db()
+        self.assertEqual(reprise.dernier_id, 0)
+
+    def test_anonymisation_reprise(self):
+        rdvs = self.creer_rendezvous(3)
+        RendezVous.objects.update(statut='completed')
+        RendezVous.objects.update(updated_at=timezone.now() - timedelta(days=2000))
+        purger('rendezvous', 1825, 'anonymiser', batch_size=1, max_batches=1)
+        self.assertEqual(RendezVous.objects.filter(nom=ANONYME).count(), 1)
+        resultat = purger('rendezvous', 1825, 'anonymiser', batch_size=1)
+        self.assertEqual((resultat['lignes'], resultat['termine']), (2, True))
+        self.assertEqual(RendezVous.objects.filter(nom=ANONYME, telephone='').count(), len(rdvs))
+
+    def test_aucune_donnee_personnelle_apres_purge(self):
+        """Ni nom, ni téléphone, ni email dans aucune table (journal et patients compris)"""
+        coordonnees = {'nom': 'ZOUNGRANA', 'prenom': 'Salimata', 'telephone': '07 01 02 03 04', 'email': 'salimata@example.ci'}
+        with self.captureOnCommitCallbacks(execute=True):
+            termine, archive = [
+                RendezVous.objects.create(
+                    clinique=self.clinique, service=self.service, date_souhaitee=self.jour_ouvre(), **coordonnees,
+                )
+                for _ in range(2)
+            ]
+            contact = Contact.objects.create(clinique=self.clinique, sujet='Question', message='Bonjour', **coordonnees)
+        with self.captureOnCommitCallbacks(execute=True):
+            # Valeurs avant/après dans le journal
+            termine.prenom, contact.nom = 'Sali', 'ZOUNGRANA-KONE'
+            termine.save()
+            contact.save()
+            changer_statut(RendezVous.objects.filter(pk__in=[termine.pk, archive.pk]), 'cancelled')
+        # Inscrite après l'annulation : aucun créneau proposé
+        ListeAttente.objects.create(service=self.service, date_souhaitee=self.jour_ouvre(), **coordonnees)
+        ancien = timezone.now() - timedelta(days=2000)
+        RendezVous.objects.update(updated_at=ancien)
+        archive_rendezvous(timezone.now())
+        Contact.objects.update(created_at=ancien)
+        ListeAttente.objects.update(created_at=ancien)
+        Patient.objects.update(created_at=ancien)
+
+        for nom, (jours, mode) in configuration().items():
+            if nom != 'journal':
+                purger(nom, jours, mode)
+
+        self.assertFalse(Patient.objects.exists())
+        self.assertTrue(JournalModification.objects.filter(modele='rendezvous').exists())
+        lignes = [ligne.lower() for ligne in connection.connection.iterdump()]
+        for valeur in ('zoungrana', 'salimata', 'sali', '01020304', 'example.ci'):
+            self.assertEqual([ligne for ligne in lignes if valeur in ligne], [], valeur)
+
+
+# ==========================================
+# AGENDAS ICALENDAR (agenda.py)
+# ==========================================
+
+class AgendaTests(CliniqueTestMixin, TestCase):
+    """Mise à jour incrémentale : rendez-vous ajoutés, modifiés et sortis de l'agenda"""
+
+    def setUp(self):
+        super().setUp()
+        self.dentistes = [
+            Dentiste.objects.create(clinique=self.clinique, nom=nom, prenom='Marie', specialite='Générale', bio='')
+            for nom in ('KOUAME', 'DIABATE')
+        ]
+
+    def confirmer(self, rdv, dentiste):
+        rdv.statut, rdv.dentiste = 'confirmed', dentiste
+        rdv.date_confirmee = timezone.now() + timedelta(days=2)
+        rdv.save()
+
+    def test_changement_de_dentiste(self):
+        premier, second = self.creer_rendezvous(2)
+        self.confirmer(premier, self.dentistes[0])
+        self.assertEqual(set(agenda('dentiste', self.dentistes[0].pk)['evenements']), {premier.pk})
+
+        # Vérification suivante : seuls les rendez-vous modifiés depuis sont relus, en une requête
+        self.confirmer(second, self.dentistes[0])
+        premier.dentiste = self.dentistes[1]
+        premier.save()
+        with assert_query_budget(1):
+            entree = agenda('dentiste', self.dentistes[0].pk)
+        self.assertEqual(set(entree['evenements']), {second.pk})
+        self.assertIn(b'BEGIN:VEVENT', entree['corps'])
+
+
+# ==========================================
+# DONNÉES SYNTHÉTIQUES (commande seed)
+# ==========================================
+
+class SeedTests(TestCase):
+    """Même graine et même date de référence : mêmes lignes, toutes rattachées à un patient"""
+
+    OPTIONS = {'rendezvous': 60, 'contacts': 30, 'seed': 7, 'date_reference': date(2025, 1, 15), 'batch_size': 25}
+
+    def generer(self):
+        call_command('seed', verbosity=0, **self.OPTIONS)
+        return {
+            model: list(model.objects.order_by('id').values_list(
+                *(champ.replace('_id', '') for champ in champs if champ != 'clinique_id'), 'patient__telephone',
+            ))
+            for model, champs in ((RendezVous, SeedCommand.CHAMPS_RENDEZVOUS), (Contact, SeedCommand.CHAMPS_CONTACT))
+        }
+
+    def test_generation_deterministe(self):
+        premiere = self.generer()
+        RendezVous.objects.all().delete()
+        Contact.objects.all().delete()
+        Patient.objects.all().delete()
+        self.assertEqual(self.generer(), premiere)
+        self.assertEqual((len(premiere[RendezVous]), len(premiere[Contact])), (60, 30))
+
+        for model in (RendezVous, Contact):
+            self.assertFalse(model.objects.filter(patient__isnull=True).exists())
+            for telephone, numero in model.objects.values_list('telephone', 'patient__telephone'):
+                self.assertEqual(normalize_phone(telephone), numero)
+        # Un patient par numéro, quel que soit le format saisi
+        self.assertEqual(
+            Patient.objects.count(),
+            len({normalize_phone(t) for m in (RendezVous, Contact) for t in m.objects.values_list('telephone', flat=True)}),
+        )
+
+
+# ==========================================
+# DONNÉES COMPILÉES PAR PROCESSUS (cache_local.py)
+# ==========================================
+
+class CacheLocalTests(TestCase):
+    """Une invalidation atteint les autres processus, avec ou sans cache partagé"""
+
+    # Cache partagé entre processus
+    CACHE_FICHIERS = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'clinic-tests-cache'),
+    }}
+
+    def setUp(self):
+        self.compilations = []
+
+        def compiler(cle):
+            self.compilations.append(cle)
+            return len(self.compilations)
+
+        # Deux instances du même nom : deux processus
+        self.processus = [CacheLocal('essai', compiler) for _ in range(2)]
+
+    @override_settings(CACHE_LOCAL_CONTROLE_SECONDES=0, CACHES=CACHE_FICHIERS)
+    def test_version_publiee_dans_le_cache_partage(self):
+        cache.clear()
+        premier, second = self.processus
+        self.assertEqual((premier.get(), second.get()), (1, 2))
+        self.assertEqual(second.get(), 2)
+        premier.invalider()
+        self.assertEqual(second.get(), 3)
+        self.assertEqual(second.get(), 3)
+
+    @override_settings(CACHE_LOCAL_CONTROLE_SECONDES=0)
+    def test_expiration_sans_cache_partage(self):
+        premier, second = self.processus
+        self.assertEqual((premier.get(), second.get()), (1, 2))
+        # Invalidation invisible des autres processus : recompilation à chaque contrôle
+        self.assertEqual(second.get(), 3)
+
+    @override_settings(CACHE_LOCAL_CONTROLE_SECONDES=3600)
+    def test_valeur_gardee_entre_deux_controles(self):
+        premier, _ = self.processus
+        self.assertEqual((premier.get(), premier.get()), (1, 1))
+
+    @override_settings(CATALOGUE_CACHE_SECONDES=3600, CACHE_LOCAL_CONTROLE_SECONDES=30)
+    def test_duree_du_catalogue(self):
+        self.assertEqual(duree_cache(), 30)
+        with override_settings(CACHES=self.CACHE_FICHIERS):
+            self.assertEqual(duree_cache(), 3600)
+
+    def test_avertissement_hors_debug(self):
+        with override_settings(DEBUG=False):
+            self.assertEqual([w.id for w in cache_partage_en_production(None)], ['clinic.W001'])
+        with override_settings(DEBUG=True):
+            self.assertEqual(cache_partage_en_production(None), [])
+
+
+# ==========================================
+# FICHIERS MEDIA (medias.py)
+# ==========================================
+
+@override_settings(ALLOWED_HOSTS=[HOTE], MEDIA_ACCEL='')
+class MediasTests(CliniqueTestMixin, TestCase):
+    """Plages, requêtes conditionnelles et durée de cache des fichiers publics"""
+
+    HACHE = 'services/detartrage.3f2a9c1b7d4e.jpg'
+    ANCIEN = 'services/detartrage.jpg'
+    CONTENU = b'0123456789'
+
+    def setUp(self):
+        super().setUp()
+        racine = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, racine)
+        reglages = override_settings(MEDIA_ROOT=racine)
+        reglages.enable()
+        self.addCleanup(reglages.disable)
+        os.makedirs(os.path.join(racine, 'services'))
+        for nom in (self.HACHE, self.ANCIEN):
+            with open(os.path.join(racine, nom), 'wb') as fichier:
+                fichier.write(self.CONTENU)
+        Service.objects.filter(pk=self.services[0].pk).update(image=self.HACHE)
+        Service.objects.filter(pk=self.services[1].pk).update(image=self.ANCIEN)
+        invalider_medias()
+
+    def get(self, nom, **entetes):
+        reponse = self.client.get(f'/media/{nom}', HTTP_HOST=HOTE, **entetes)
+        if reponse.streaming:
+            reponse.contenu = b''.join(reponse.streaming_content)
+        reponse.close()
+        return reponse
+
+    def test_nom_hache_immuable(self):
+        reponse = self.get(self.HACHE)
+        self.assertEqual((reponse.status_code, reponse.contenu), (200, self.CONTENU))
+        self.assertEqual(reponse['Cache-Control'], CACHE_IMMUABLE)
+        self.assertEqual(self.get(self.ANCIEN)['Cache-Control'], 'public, max-age=3600')
+
+    def test_plage(self):
+        reponse = self.get(self.HACHE, HTTP_RANGE='bytes=2-5')
+        self.assertEqual((reponse.status_code, reponse.contenu), (206, b'2345'))
+        self.assertEqual(reponse['Content-Range'], 'bytes 2-5/10')
+        reponse = self.get(self.HACHE, HTTP_RANGE='bytes=-3')
+        self.assertEqual((reponse.status_code, reponse.contenu), (206, b'789'))
+        reponse = self.get(self.HACHE, HTTP_RANGE='bytes=20-30')
+        self.assertEqual((reponse.status_code, reponse['Content-Range']), (416, 'bytes */10'))
+        # Plusieurs plages : fichier entier
+        self.assertEqual(self.get(self.HACHE, HTTP_RANGE='bytes=0-1,4-5').status_code, 200)
+
+    def test_requetes_conditionnelles(self):
+        etag = self.get(self.HACHE)['ETag']
+        self.assertEqual(self.get(self.HACHE, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # If-Range : plage servie si l'ETag correspond, fichier entier sinon
+        reponse = self.get(self.HACHE, HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE=etag)
+        self.assertEqual((reponse.status_code, reponse.contenu), (206, b'01'))
+        reponse = self.get(self.HACHE, HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"perime"')
+        self.assertEqual((reponse.status_code, reponse.contenu), (200, self.CONTENU))
+
+    def test_fichier_envoye_par_un_autre_processus(self):
+        self.assertNotIn('services/implant.9a8b7c6d5e4f.jpg', fichiers_publics())
+        with open(os.path.join(settings.MEDIA_ROOT, 'services/implant.9a8b7c6d5e4f.jpg'), 'wb') as fichier:
+            fichier.write(self.CONTENU)
+        # Enregistré sans signal : la liste compilée de ce processus n'est pas invalidée
+        Service.objects.filter(pk=self.services[2].pk).update(image='services/implant.9a8b7c6d5e4f.jpg')
+        self.assertEqual(self.get('services/implant.9a8b7c6d5e4f.jpg').status_code, 200)
+        Service.objects.filter(pk=self.services[2].pk).update(actif=False)
+        self.assertEqual(self.get('services/implant.9a8b7c6d5e4f.jpg').status_code, 404)
+
+
+# ==========================================
+# JOURNAL DES MODIFICATIONS (journal.py)
+# ==========================================
+
+@override_settings(ALLOWED_HOSTS=[HOTE])
+class JournalTests(CliniqueTestMixin, TestCase):
+    """Suppressions groupées journalisées ligne par ligne, sauf déplacement vers l'archive"""
+
+    def suppressions(self):
+        return sorted(JournalModification.objects.filter(action='suppression').values_list('modele', 'objet_id', 'auteur'))
+
+    def test_suppression_en_lot(self):
+        rdvs = self.creer_rendezvous(3)
+        with tampon('accueil', 'test') as entrees, self.captureOnCommitCallbacks(execute=True):
+            RendezVous.objects.filter(pk__in=[rdv.pk for rdv in rdvs[:2]]).delete()
+        self.assertEqual(len(entrees), 2)
+        self.assertEqual(self.suppressions(), [('rendezvous', rdv.pk, 'accueil') for rdv in rdvs[:2]])
+
+    def test_action_supprimer_de_l_admin(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.ci', 'secret')
+        self.client.force_login(admin)
+        rdvs = self.creer_rendezvous(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            reponse = self.client.post('/admin/clinic/rendezvous/', {
+                'action': 'delete_selected', '_selected_action': [rdv.pk for rdv in rdvs], 'post': 'yes',
+            }, HTTP_HOST=HOTE)
+        self.assertEqual(reponse.status_code, 302)
+        self.assertFalse(RendezVous.objects.exists())
+        self.assertEqual(self.suppressions(), [('rendezvous', rdv.pk, 'admin') for rdv in rdvs])
+
+    def test_archivage_non_journalise(self):
+        self.creer_rendezvous(2, statut='completed')
+        RendezVous.objects.update(updated_at=timezone.now() - timedelta(days=400))
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_rendezvous(timezone.now())
+        self.assertFalse(RendezVous.objects.exists())
+        self.assertEqual(self.suppressions(), [])
+
+
+# ==========================================
+# RAPPELS (rappels.py)
+# ==========================================
+
+class EmailEchecBackend(locmem.EmailBackend):
+    """Backend email de test : échec à l'envoi d'un message adressé à echec@example.ci"""
+
+    def send_messages(self, messages):
+        if any('echec@example.ci' in message.to for message in messages):
+            raise ConnectionError('Serveur SMTP indisponible')
+        return super().send_messages(messages)
+
+
+@override_settings(SMS_BACKEND='clinic.sms.LocmemBackend', RAPPEL_RENDEZVOUS_AVANT_HEURES=24)
+class RappelsTests(CliniqueTestMixin, TestCase):
+    """Rappel réservé avant l'envoi, libéré s'il n'est pas parti, jamais envoyé deux fois"""
+
+    def setUp(self):
+        super().setUp()
+        sms.outbox.clear()
+        self.rdvs = self.creer_rendezvous(3, statut='confirmed', date_confirmee=timezone.now() + timedelta(hours=12))
+
+    def test_reservation(self):
+        self.assertEqual(envoyer_rappels([rdv.pk for rdv in self.rdvs]), 3)
+        self.assertEqual(RendezVous.objects.filter(rappel_envoye_le__isnull=True).count(), 0)
+        self.assertEqual((len(mail.outbox), len(sms.outbox)), (3, 3))
+        # Déjà réservés : rien n'est renvoyé
+        self.assertEqual(envoyer_rappels([rdv.pk for rdv in self.rdvs]), 0)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_echec_en_cours_de_lot(self):
+        RendezVous.objects.filter(pk=self.rdvs[1].pk).update(email='echec@example.ci')
+        ids = [rdv.pk for rdv in self.rdvs]
+        with override_settings(EMAIL_BACKEND='clinic.tests.EmailEchecBackend'):
+            envoyes = envoyer_rappels(ids)
+        # Emails partis avant l'échec : seuls leurs rappels restent réservés
+        partis = [message.to[0] for message in mail.outbox]
+        self.assertEqual(envoyes, len(partis))
+        self.assertLess(envoyes, 3)
+        self.assertEqual(len(sms.outbox), envoyes)
+        self.assertEqual(
+            set(RendezVous.objects.filter(rappel_envoye_le__isnull=False).values_list('email', flat=True)), set(partis),
+        )
+
+        RendezVous.objects.filter(pk=self.rdvs[1].pk).update(email='aya1@example.ci')
+        self.assertEqual(envoyer_rappels(ids), 3 - envoyes)
+        adresses = [message.to[0] for message in mail.outbox]
+        self.assertEqual(sorted(adresses), sorted(set(adresses)))
+        self.assertEqual(len(adresses), 3)
+
+
+# ==========================================
+# STATISTIQUES (statistiques.py)
+# ==========================================
+
+class StatistiquesTests(CliniqueTestMixin, TestCase):
+    """Compteurs tenus au fil de l'eau identiques à ceux d'un recalcul complet"""
+
+    def compteurs(self):
+        return sorted(
+            StatistiqueReservation.objects.exclude(nombre=0).values_list('jour', 'service_id', 'statut', 'nombre')
+        )
+
+    def assertRecalculIdentique(self):
+        tenus = self.compteurs()
+        rebuild_statistiques()
+        self.assertEqual(self.compteurs(), tenus)
+
+    def test_creation_statut_archivage_purge(self):
+        rdvs = self.creer_rendezvous(6)
+        rdvs += self.creer_rendezvous(2, service=self.services[1])
+        self.assertRecalculIdentique()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            changer_statut(RendezVous.objects.filter(pk__in=[r.pk for r in rdvs[:4]]), 'confirmed')
+            changer_statut(RendezVous.objects.filter(pk__in=[r.pk for r in rdvs[:2]]), 'completed')
+            changer_statut(RendezVous.objects.filter(pk__in=[r.pk for r in rdvs[4:6]]), 'cancelled')
+        self.assertRecalculIdentique()
+
+        RendezVous.objects.filter(pk__in=[r.pk for r in rdvs[:6]]).update(updated_at=timezone.now() - timedelta(days=2000))
+        archive_rendezvous(timezone.now())
+        self.assertEqual(RendezVous.objects.count(), 4)
+        self.assertRecalculIdentique()
+
+        # Anonymisation : lignes gardées ; suppression : lignes retirées
+        purger('archives', 1825, 'anonymiser')
+        self.assertRecalculIdentique()
+        purger('archives', 1825, 'supprimer')
+        self.assertFalse(RendezVousArchive.objects.exists())
+        self.assertRecalculIdentique()
+
+        RendezVous.objects.get(pk=rdvs[6].pk).delete()
+        RendezVous.objects.filter(pk=rdvs[3].pk).delete()
+        self.assertRecalculIdentique()
+        self.assertEqual(StatistiqueReservation.objects.aggregate(total=Sum('nombre'))['total'], 2)
+
+
+# ==========================================
+# SÉRIALISATION PRÉCOMPILÉE (lecture.py)
+# ==========================================
+
+class LectureTests(CliniqueTestMixin, TestCase):
+    """Mêmes valeurs JSON, champ par champ, que les ModelSerializer correspondants"""
+
+    def setUp(self):
+        super().setUp()
+        Service.objects.filter(pk=self.service.pk).update(image='services/detartrage.3f2a9c1b7d4e.jpg')
+        Dentiste.objects.create(
+            clinique=self.clinique, nom='KOUAME', prenom='Marie', specialite='Générale', bio='Bio',
+            photo='dentistes/marie.0a1b2c3d4e5f.jpg', linkedin='https://linkedin.example/marie',
+        )
+        Dentiste.objects.create(clinique=self.clinique, nom='DIABATE', prenom='Seydou', specialite='Orthodontie', bio='')
+        Horaire.objects.create(
+            clinique=self.clinique, jour=0, ouverture_matin=datetime.time(8), fermeture_matin=datetime.time(12, 30),
+            ouverture_apres_midi=datetime.time(14), fermeture_apres_midi=datetime.time(18), ferme=False,
+        )
+        Horaire.objects.create(clinique=self.clinique, jour=6, ferme=True)
+
+    def assertMemesChamps(self, lecture, attendu, fichiers=()):
+        """Clés de `lecture` toutes présentes et égales dans `attendu` (rendu JSON des deux côtés)"""
+        self.assertEqual(len(lecture), len(attendu))
+        for ligne, reference in zip(lecture, attendu):
+            for champ, valeur in ligne.items():
+                if champ in fichiers:
+                    # Nom stocké, comme les .values() remplacés (le serializer renvoie l'URL)
+                    self.assertEqual(settings.MEDIA_URL + valeur if valeur else None, reference[champ], champ)
+                else:
+                    self.assertEqual(valeur, reference[champ], champ)
+
+    def rendu_drf(self, donnees):
+        return json.loads(JSONRenderer().render(donnees))
+
+    def test_catalogue(self):
+        cas = (
+            (ServiceLecture, ServiceSerializer, Service.objects.filter(clinique=self.clinique).order_by('id'), ()),
+            (DentisteLecture, DentisteSerializer, Dentiste.objects.order_by('id'), ('photo',)),
+            (HoraireLecture, HoraireSerializer, Horaire.objects.filter(clinique=self.clinique).order_by('jour'), ()),
+        )
+        for lecture, serializer, queryset, fichiers in cas:
+            with self.subTest(lecture.__name__):
+                obtenu = json.loads(FastJsonResponse(lecture.donnees(queryset), safe=False).content)
+                self.assertMemesChamps(obtenu, self.rendu_drf(serializer(queryset, many=True).data), fichiers)
+                # Lignes d'instances déjà chargées : mêmes valeurs que values_list()
+                self.assertEqual(lecture.objets(queryset), lecture.donnees(queryset))
+
+    def test_rendez_vous_et_liste_d_attente(self):
+        self.creer_rendezvous(2, message='Contrôle annuel')
+        self.creer_rendezvous(1, service=self.services[1])
+        ListeAttente.objects.create(
+            service=self.service, date_souhaitee=self.jour_ouvre(), nom='Bamba', prenom='Awa',
+            telephone='0705060708', email='awa@example.ci',
+        )
+        cas = (
+            (RendezVousLecture, RendezVousSerializer, RendezVous.objects.select_related('service').order_by('id')),
+            (ListeAttenteLecture, ListeAttenteSerializer, ListeAttente.objects.select_related('service').order_by('id')),
+        )
+        for lecture, serializer, queryset in cas:
+            with self.subTest(lecture.__name__):
+                self.assertEqual(list(lecture.champs), list(serializer.Meta.fields))
+                obtenu = json.loads(FastJSONRenderer().render(lecture.objets(queryset)))
+                self.assertMemesChamps(obtenu, self.rendu_drf(serializer(queryset, many=True).data))
+
+
+# ==========================================
+# ARCHIVAGE (archives.py)
+# ==========================================
+
+class ArchivesTests(CliniqueTestMixin, TestCase):
+    """Déplacement par lots vers RendezVousArchive : copie intégrale, reprise, statistiques"""
+
+    def terminer(self, rdvs, statut):
+        ids = [r.pk for r in rdvs]
+        with self.captureOnCommitCallbacks(execute=True):
+            if statut == 'completed':
+                changer_statut(RendezVous.objects.filter(pk__in=ids), 'confirmed')
+            changer_statut(RendezVous.objects.filter(pk__in=ids), statut)
+        RendezVous.objects.filter(pk__in=ids).update(updated_at=timezone.now() - timedelta(days=30))
+
+    def compteurs(self):
+        return sorted(
+            StatistiqueReservation.objects.exclude(nombre=0).values_list('jour', 'service_id', 'statut', 'nombre')
+        )
+
+    def test_copie_de_toutes_les_colonnes(self):
+        rdvs = self.creer_rendezvous(3, message='Douleur molaire')
+        rdvs += self.creer_rendezvous(1, service=self.services[2])
+        self.terminer(rdvs[:2], 'completed')
+        self.terminer(rdvs[2:], 'cancelled')
+        champs = [f.attname for f in RendezVousArchive._meta.concrete_fields if f.attname != 'archived_at']
+        self.assertIn('patient_id', champs)
+        self.assertIn('clinique_id', champs)
+        avant = {ligne['id']: ligne for ligne in RendezVous.objects.values(*champs)}
+        self.assertTrue(all(ligne['patient_id'] for ligne in avant.values()))
+        compteurs = self.compteurs()
+
+        self.assertEqual(archive_rendezvous(timezone.now()), 4)
+
+        self.assertFalse(RendezVous.objects.exists())
+        apres = {ligne['id']: ligne for ligne in RendezVousArchive.objects.values(*champs)}
+        self.assertEqual(apres, avant)
+        self.assertFalse(RendezVousArchive.objects.filter(archived_at__isnull=True).exists())
+        # Lignes déplacées : statistiques inchangées, et identiques à un recalcul
+        self.assertEqual(self.compteurs(), compteurs)
+        rebuild_statistiques()
+        self.assertEqual(self.compteurs(), compteurs)
+
+    def test_reprise_apres_max_batches(self):
+        rdvs = self.creer_rendezvous(5)
+        recent = self.creer_rendezvous(1, service=self.services[1])
+        self.terminer(rdvs, 'cancelled')
+        with self.captureOnCommitCallbacks(execute=True):
+            changer_statut(RendezVous.objects.filter(pk=recent[0].pk), 'cancelled')
+        lots = []
+
+        total = archive_rendezvous(
+            timezone.now() - timedelta(days=1), batch_size=2, max_batches=1,
+            on_batch=lambda lot, cumul: lots.append((lot, cumul)),
+        )
+        self.assertEqual((total, lots), (2, [(1, 2)]))
+        self.assertEqual(RendezVous.objects.count(), 4)
+
+        # Relance : reprend là où l'interruption s'est arrêtée, sans doublon
+        self.assertEqual(archive_rendezvous(timezone.now() - timedelta(days=1), batch_size=2), 3)
+        self.assertEqual(
+            sorted(RendezVousArchive.objects.values_list('id', flat=True)), sorted(r.pk for r in rdvs),
+        )
+        # Modifié après la date limite : reste dans la table courante
+        self.assertEqual(list(RendezVous.objects.values_list('id', flat=True)), [recent[0].pk])
+        self.assertEqual(archive_rendezvous(timezone.now() - timedelta(days=1)), 0)
+
+
+# ==========================================
+# RECHERCHE PLEIN TEXTE (search.py, migration 0003)
+# ==========================================
+
+class RechercheTests(CliniqueTestMixin, TestCase):
+    """Index FTS5 tenus par les triggers, recherche insensible aux accents"""
+    FTS = FTS_TABLES['clinic_rendezvous']
+
+    def rendez_vous(self, nom, prenom):
+        return RendezVous.objects.create(
+            clinique=self.clinique, service=self.service, date_souhaitee=self.jour_ouvre(),
+            nom=nom, prenom=prenom, telephone='+2250701020304', email='patient@example.ci',
+        )
+
+    def chercher(self, terme, model=RendezVous, table=FTS):
+        return sorted(fts_filter(model.objects.all(), table, terme).values_list('pk', flat=True))
+
+    def triggers(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [table])
+            return sorted(cursor.fetchall())
+
+    def test_accents_et_prefixes(self):
+        self.assertTrue(fts_available(self.FTS))
+        self.assertFalse(fts_available('clinic_inexistante_fts'))
+        aicha = self.rendez_vous('Kouamé', 'Aïcha')
+        self.rendez_vous('Yao', 'Aya')
+        for terme in ('kouame', 'KOUAMÉ', 'kouam aich', 'Aicha', 'aïcha kouamé'):
+            with self.subTest(terme=terme):
+                self.assertEqual(self.chercher(terme), [aicha.pk])
+        # Tous les mots sont requis
+        self.assertEqual(self.chercher('kouame yao'), [])
+        self.assertEqual(fts_query('  «Kouamé», aya!'), '"Kouamé"* "aya"*')
+
+    def test_triggers_sur_update_et_delete(self):
+        rdv = self.rendez_vous('Diabaté', 'Seydou')
+        contact = Contact.objects.create(
+            clinique=self.clinique, nom='Bamba', prenom='Fatou', email='fatou@example.ci',
+            telephone='+2250501020304', sujet='Devis orthodontie', message='Bonjour',
+        )
+
+        RendezVous.objects.filter(pk=rdv.pk).update(nom='Traoré')
+        self.assertEqual(self.chercher('diabate'), [])
+        self.assertEqual(self.chercher('traore seydou'), [rdv.pk])
+        contact.sujet = 'Blanchiment'
+        contact.save()
+        fts_contact = FTS_TABLES['clinic_contact']
+        self.assertEqual(self.chercher('orthodontie', Contact, fts_contact), [])
+        self.assertEqual(self.chercher('blanchiment bamba', Contact, fts_contact), [contact.pk])
+
+        RendezVous.objects.filter(pk=rdv.pk).delete()
+        contact.delete()
+        self.assertEqual(self.chercher('traore'), [])
+        self.assertEqual(self.chercher('bamba', Contact, fts_contact), [])
+
+    def test_synchronisation_suspendue_puis_reconstruite(self):
+        ancien = self.rendez_vous('Koné', 'Ibrahim')
+        triggers = self.triggers('clinic_rendezvous')
+        self.assertEqual(len([nom for nom, _ in triggers if nom.startswith(self.FTS)]), 3)
+
+        with fts_sync_suspended(RendezVous):
+            self.assertFalse([nom for nom, _ in self.triggers('clinic_rendezvous') if nom.startswith(self.FTS)])
+            nouveau = self.rendez_vous('Ouattara', 'Awa')
+            RendezVous.objects.filter(pk=ancien.pk).update(nom='Coulibaly')
+
+        # Triggers recréés à l'identique, index reconstruit en une passe
+        self.assertEqual(self.triggers('clinic_rendezvous'), triggers)
+        self.assertEqual(self.chercher('ouattara'), [nouveau.pk])
+        self.assertEqual(self.chercher('coulibaly ibrahim'), [ancien.pk])
+        self.assertEqual(self.chercher('kone'), [])
+
+
+# ==========================================
+# TÉLÉPHONES ET PATIENTS (telephones.py, patients.py)
+# ==========================================
+
+class TelephonesTests(CliniqueTestMixin, TestCase):
+    """Normalisation E.164 et rattachement des lignes existantes à un patient par numéro"""
+    NUMEROS = (
+        # Numéros à 10 chiffres, avec ou sans indicatif, séparateurs usuels
+        ('0707123456', '+2250707123456'),
+        ('07 07 12 34 56', '+2250707123456'),
+        ('07.07.12.34.56', '+2250707123456'),
+        ('07-07-12-34-56', '+2250707123456'),
+        ('(07) 07/12/34/56', '+2250707123456'),
+        ('+2250707123456', '+2250707123456'),
+        ('+225 07 07 12 34 56', '+2250707123456'),
+        ('2250707123456', '+2250707123456'),
+        ('002250707123456', '+2250707123456'),
+        ('00225 27 20 21 23 45', '+2252720212345'),
+        # Anciens numéros à 8 chiffres : préfixe de 2021 selon l'opérateur
+        ('01234567', '+2250101234567'),
+        ('03234567', '+2250103234567'),
+        ('44123456', '+2250544123456'),
+        ('06123456', '+2250506123456'),
+        ('07123456', '+2250707123456'),
+        ('89123456', '+2250789123456'),
+        ('20212345', '+2252720212345'),
+        ('30123456', '+2252730123456'),
+        ('+225 07 12 34 56', '+2250707123456'),
+        ('22507123456', '+2250707123456'),
+        ('0022520212345', '+2252720212345'),
+        # Non reconnus
+        ('', None),
+        (None, None),
+        ('123456', None),
+        ('070712345', None),
+        ('07071234567', None),
+        ('+33612345678', None),
+        ('+0707123456', None),
+        ('07 07 12 34 5a', None),
+    )
+
+    def test_normalisation(self):
+        for saisie, attendu in self.NUMEROS:
+            with self.subTest(saisie=saisie):
+                self.assertEqual(normalize_phone(saisie), attendu)
+
+    def test_backfill_un_patient_par_numero(self):
+        formats = ['07 07 12 34 56', '+2250707123456', '07123456', '0505060708', '+225 05 05 06 07 08']
+        rdvs = [
+            RendezVous.objects.create(
+                clinique=self.clinique, service=self.service, date_souhaitee=self.jour_ouvre(),
+                nom='KOUAME', prenom='Aya', telephone=telephone, email='aya@example.ci',
+            )
+            for telephone in formats[:3] + ['0101020304', '01 01 02 03 04']
+        ]
+        # Rendez-vous déjà archivé : rattaché lui aussi
+        with self.captureOnCommitCallbacks(execute=True):
+            changer_statut(RendezVous.objects.filter(pk=rdvs[-1].pk), 'cancelled')
+        archive_rendezvous(timezone.now() + timedelta(seconds=1))
+        for telephone in formats[3:]:
+            Contact.objects.create(
+                clinique=self.clinique, nom='Bamba', prenom='Fatou', email='fatou@example.ci',
+                telephone=telephone, sujet='Question', message='Bonjour',
+            )
+        # Patient déjà connu (par le numéro normalisé) : réutilisé, pas dupliqué
+        for model in (RendezVous, RendezVousArchive, Contact):
+            model.objects.update(patient=None)
+        Patient.objects.exclude(telephone='+2250505060708').delete()
+        connu = Patient.objects.get()
+        lots = []
+
+        totaux = backfill_patients(batch_size=2, on_batch=lambda model, dernier, total: lots.append(model))
+
+        self.assertEqual(totaux, {'rendezvous': 4, 'rendezvousarchive': 1, 'contact': 2})
+        self.assertEqual(lots, [RendezVous, RendezVous, RendezVousArchive, Contact])
+        self.assertEqual(
+            sorted(Patient.objects.values_list('telephone', flat=True)),
+            ['+2250101020304', '+2250505060708', '+2250707123456'],
+        )
+        self.assertEqual(len({r.patient_id for r in RendezVous.objects.filter(pk__in=[r.pk for r in rdvs[:3]])}), 1)
+        self.assertEqual(set(Contact.objects.values_list('patient_id', flat=True)), {connu.pk})
+        self.assertEqual(
+            RendezVousArchive.objects.get().patient_id, RendezVous.objects.get(pk=rdvs[3].pk).patient_id,
+        )
+        for model in (RendezVous, RendezVousArchive, Contact):
+            for telephone, numero in model.objects.values_list('telephone', 'patient__telephone'):
+                self.assertEqual(normalize_phone(telephone), numero)
+        # Rien à refaire au second passage
+        self.assertEqual(backfill_patients(), {'rendezvous': 0, 'rendezvousarchive': 0, 'contact': 0})
+
+
+# ==========================================
+# CALENDRIER DES JOURS OUVERTS (calendrier.py)
+# ==========================================
+
+class CalendrierTests(CliniqueTestMixin, TestCase):
+    """Table de bits des jours ouverts : horaires, fermetures, bornes et recompilation"""
+    # Un lundi : la table couvre jusqu'au samedi 1er mai 2027 inclus
+    ORIGINE = date(2026, 11, 2)
+
+    def setUp(self):
+        super().setUp()
+        self.autre = Clinique.objects.create(
+            nom='Clinique Cocody', slug='cocody', adresse='Cocody', telephone='+2250700000001', email='cocody@example.ci',
+        )
+
+    def assertTableCoherente(self, cal):
+        """Chaque bit égal au calcul complet du jour"""
+        self.assertEqual(len(cal.bitmap()), HORIZON_JOURS + 1)
+        for i, bit in enumerate(cal.bitmap()):
+            jour = self.ORIGINE + timedelta(days=i)
+            self.assertEqual(bit == '1', cal._motif(jour) is None, jour)
+            self.assertEqual(cal.motif(jour), cal._motif(jour), jour)
+
+    def test_horaires_et_fermetures(self):
+        Horaire.objects.create(clinique=self.clinique, jour=2, ferme=True)
+        Horaire.objects.create(clinique=self.clinique, jour=5, ferme=False)
+        Horaire.objects.create(clinique=self.autre, jour=0, ferme=True)
+        # Jours fériés communs (annuel, à cheval sur deux années) ; congés propres à un site
+        Fermeture.objects.create(date_debut=date(2000, 12, 24), date_fin=date(2001, 1, 2), motif='Fêtes', annuelle=True)
+        Fermeture.objects.create(
+            clinique=self.clinique, date_debut=date(2026, 11, 10), date_fin=date(2026, 11, 12), motif='Travaux',
+        )
+        Fermeture.objects.create(clinique=self.autre, date_debut=date(2026, 11, 16), date_fin=date(2026, 11, 16), motif='Inventaire')
+
+        cal = compiler(self.clinique.pk, self.ORIGINE)
+
+        attendus = {
+            date(2026, 11, 2): None,                        # lundi fermé sur l'autre site seulement
+            date(2026, 11, 4): 'fermeture du mercredi',     # Horaire.ferme
+            date(2026, 11, 7): None,                        # samedi ouvert
+            date(2026, 11, 8): 'fermeture du dimanche',     # sans Horaire : fermé par défaut
+            date(2026, 11, 10): 'Travaux',
+            date(2026, 11, 12): 'Travaux',
+            date(2026, 11, 13): None,
+            date(2026, 11, 16): None,                       # congé de l'autre site
+            date(2026, 12, 23): 'fermeture du mercredi',
+            date(2026, 12, 24): 'Fêtes',
+            date(2027, 1, 1): 'Fêtes',
+            date(2027, 1, 2): 'Fêtes',
+            date(2027, 1, 4): None,
+        }
+        for jour, motif in attendus.items():
+            with self.subTest(jour=jour):
+                self.assertEqual(cal.motif(jour), motif)
+                self.assertEqual(cal.est_ouvert(jour), motif is None)
+        self.assertTableCoherente(cal)
+        # Hors de la table : fermeture annuelle retrouvée par le calcul complet
+        self.assertEqual(cal.motif(date(2030, 12, 25)), 'Fêtes')
+        self.assertEqual(compiler(self.autre.pk, self.ORIGINE).motif(date(2026, 11, 16)), 'Inventaire')
+
+    def test_bornes_de_l_horizon(self):
+        Horaire.objects.create(clinique=self.clinique, jour=5, ferme=False)
+        # Terminée la veille de l'origine : ignorée ; en cours à l'origine : prise en compte
+        Fermeture.objects.create(clinique=self.clinique, date_debut=date(2026, 10, 26), date_fin=date(2026, 11, 1), motif='Passée')
+        Fermeture.objects.create(clinique=self.clinique, date_debut=date(2026, 10, 30), date_fin=date(2026, 11, 2), motif='En cours')
+        # Commence le dernier jour de la table
+        Fermeture.objects.create(clinique=self.clinique, date_debut=date(2027, 5, 1), date_fin=date(2027, 5, 3), motif='Congés')
+        Fermeture.objects.create(clinique=self.clinique, date_debut=date(2027, 5, 2), date_fin=date(2027, 5, 9), motif='Au-delà')
+
+        cal = compiler(self.clinique.pk, self.ORIGINE)
+
+        self.assertEqual(cal.fin, self.ORIGINE + timedelta(days=HORIZON_JOURS))
+        self.assertEqual(cal.fin, date(2027, 5, 1))
+        self.assertEqual([f.motif for f in cal.fermetures], ['En cours', 'Congés'])
+        self.assertEqual(cal.motif(self.ORIGINE), 'En cours')
+        self.assertEqual(cal.motif(cal.fin), 'Congés')
+        self.assertEqual(cal.bitmap()[0] + cal.bitmap()[-1], '00')
+        self.assertEqual(cal.bitmap()[1], '1')
+        self.assertTableCoherente(cal)
+        # Lendemain de la fin : calcul complet, avec les fermetures chargées
+        self.assertEqual(cal.motif(date(2027, 5, 3)), 'Congés')
+        self.assertTrue(cal.est_ouvert(date(2027, 5, 4)))
+
+    def test_recompilation_apres_modification(self):
+        jour = self.jour_ouvre(10)
+        cal = calendrier(self.clinique.pk)
+        self.assertTrue(cal.est_ouvert(jour))
+        self.assertIs(calendrier(self.clinique.pk), cal)
+
+        fermeture = Fermeture.objects.create(clinique=self.clinique, date_debut=jour, date_fin=jour, motif='Formation')
+        self.assertFalse(est_ouvert(jour, self.clinique.pk))
+        self.assertGreater(prochain_jour_ouvert(jour, self.clinique.pk), jour)
+        fermeture.delete()
+        self.assertTrue(est_ouvert(jour, self.clinique.pk))
+
+        horaire = Horaire.objects.create(clinique=self.clinique, jour=jour.weekday(), ferme=True)
+        self.assertFalse(est_ouvert(jour, self.clinique.pk))
+        horaire.ferme = False
+        horaire.save()
+        self.assertTrue(est_ouvert(jour, self.clinique.pk))
+
+        # Changement de jour : table de la veille écartée
+        cal = calendrier(self.clinique.pk)
+        cal.origine -= timedelta(days=1)
+        self.assertIsNot(calendrier(self.clinique.pk), cal)
+        self.assertEqual(calendrier(self.clinique.pk).origine, timezone.localdate())
+
+
+# ==========================================
+# COMPTEURS DE L'ÉQUIPE (compteurs.py)
+# ==========================================
+
+class CompteursTests(CliniqueTestMixin, TestCase):
+    """Compteurs tenus au fil des écritures, par site, identiques à une reconstruction"""
+
+    def setUp(self):
+        super().setUp()
+        self.autre = Clinique.objects.create(
+            nom='Clinique Cocody', slug='cocody', adresse='Cocody', telephone='+2250700000001', email='cocody@example.ci',
+        )
+        self.service_autre = Service.objects.create(
+            clinique=self.autre, nom='Blanchiment', description='', prix_min=1, prix_max=2,
+        )
+
+    def contact(self, clinique=None, **champs):
+        return Contact.objects.create(
+            clinique=clinique or self.clinique, nom='Bamba', prenom='Fatou', email='fatou@example.ci',
+            telephone='+2250501020304', sujet='Question', message='Bonjour', **champs,
+        )
+
+    def tenus(self):
+        return {clinique.pk: valeurs(clinique) for clinique in (self.clinique, self.autre)}
+
+    def assertCompteurs(self, site, autre):
+        attendus = {
+            self.clinique.pk: dict(zip(('contacts_non_lus', 'contacts_non_traites', 'rendezvous_en_attente'), site)),
+            self.autre.pk: dict(zip(('contacts_non_lus', 'contacts_non_traites', 'rendezvous_en_attente'), autre)),
+        }
+        self.assertEqual(self.tenus(), attendus)
+        # Reconstruction : mêmes valeurs
+        rebuild_compteurs()
+        self.assertEqual(self.tenus(), attendus)
+
+    def test_creation(self):
+        self.contact()
+        self.contact(lu=True)
+        self.contact(clinique=self.autre, lu=True, traite=True)
+        self.creer_rendezvous(3)
+        RendezVous.objects.create(
+            clinique=self.autre, service=self.service_autre, date_souhaitee=self.jour_ouvre(),
+            nom='Yao', prenom='Awa', telephone='+2250708091011', email='awa@example.ci',
+        )
+        self.assertCompteurs((1, 2, 3), (0, 0, 1))
+        self.assertEqual(valeurs(), {'contacts_non_lus': 1, 'contacts_non_traites': 2, 'rendezvous_en_attente': 4})
+        self.assertEqual(
+            [(badge['nom'], badge['valeur']) for badge in badges(self.clinique)],
+            [('contacts_non_lus', 1), ('contacts_non_traites', 2), ('rendezvous_en_attente', 3)],
+        )
+
+    def test_bascule_lu(self):
+        contact = self.contact()
+        self.assertCompteurs((1, 1, 0), (0, 0, 0))
+        contact.lu = True
+        contact.save()
+        self.assertCompteurs((0, 1, 0), (0, 0, 0))
+        # Enregistrement sans changement : rien à reporter
+        contact.save()
+        contact = Contact.objects.get(pk=contact.pk)
+        contact.save()
+        self.assertCompteurs((0, 1, 0), (0, 0, 0))
+        contact.lu = False
+        contact.traite = True
+        contact.save()
+        self.assertCompteurs((1, 0, 0), (0, 0, 0))
+        contact.delete()
+        self.assertCompteurs((0, 0, 0), (0, 0, 0))
+
+    def test_update_et_delete_groupes(self):
+        for _ in range(3):
+            self.contact()
+        self.contact(clinique=self.autre)
+        self.contact(clinique=self.autre, lu=True)
+        self.creer_rendezvous(2)
+
+        Contact.objects.filter(nom='Bamba').update(lu=True)
+        self.assertCompteurs((0, 3, 2), (0, 2, 0))
+        # Champ non suivi : compteurs inchangés
+        Contact.objects.update(sujet='Devis')
+        self.assertCompteurs((0, 3, 2), (0, 2, 0))
+        # Valeur calculée en base : sites touchés recomptés
+        Contact.objects.filter(clinique=self.autre).update(traite=F('lu'))
+        self.assertCompteurs((0, 3, 2), (0, 0, 0))
+        RendezVous.objects.filter(pk=RendezVous.objects.first().pk).update(statut='confirmed')
+        self.assertCompteurs((0, 3, 1), (0, 0, 0))
+
+        Contact.objects.filter(pk__in=Contact.objects.filter(clinique=self.clinique).values('pk')[:2]).delete()
+        RendezVous.objects.filter(statut='pending').delete()
+        self.assertCompteurs((0, 1, 0), (0, 0, 0))
+
+    def test_rebuild_compteurs(self):
+        self.contact()
+        self.contact(clinique=self.autre)
+        # Écritures hors des chemins suivis : rattrapées par la reconstruction
+        Contact.objects.bulk_create([
+            Contact(clinique=self.clinique, nom='Koné', prenom='Ali', email='ali@example.ci', sujet='Question', message='Bonjour')
+            for _ in range(2)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE clinic_contact SET traite = %s WHERE clinique_id = %s', [True, self.autre.pk])
+        Compteur.objects.filter(clinique=self.autre).update(valeur=7)
+
+        # Limitée à un site : l'autre garde ses valeurs (un compteur écrit par condition des contacts)
+        self.assertEqual(rebuild_compteurs([self.autre.pk]), 2)
+        self.assertEqual(valeurs(self.autre), {'contacts_non_lus': 1, 'contacts_non_traites': 0, 'rendezvous_en_attente': 0})
+        self.assertEqual(valeurs(self.clinique)['contacts_non_lus'], 1)
+
+        self.assertEqual(rebuild_compteurs(), 4)
+        self.assertEqual(valeurs(self.clinique), {'contacts_non_lus': 3, 'contacts_non_traites': 3, 'rendezvous_en_attente': 0})
+
+
+# ==========================================
+# TRACES DES REQUÊTES (traces.py)
+# ==========================================
+
+class TracesTests(TestCase):
+    """Échantillonnage, traceparent, imbrication des spans et formats d'export"""
+    TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+    PARENT_ID = '00f067aa0ba902b7'
+
+    def setUp(self):
+        dossier = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, dossier)
+        self.fichier = os.path.join(dossier, 'traces.jsonl')
+        # Exporteur du test à la place de celui des settings
+        self.exporteur = traces.ExportJsonl(self.fichier)
+        precedent, traces._exporteur = traces._exporteur, self.exporteur
+        self.addCleanup(setattr, traces, '_exporteur', precedent)
+
+    def exportes(self):
+        self.exporteur.vider()
+        if not os.path.exists(self.fichier):
+            return []
+        with open(self.fichier, encoding='utf-8') as fichier:
+            return [json.loads(ligne) for ligne in fichier]
+
+    def vue(self, request):
+        with traces.span('calcul', lignes=2):
+            Service.objects.count()
+        Clinique.objects.count()
+        return HttpResponse('ok')
+
+    def middleware(self, echantillon):
+        with override_settings(TRACES={'ENABLED': True, 'ECHANTILLON': echantillon}):
+            return traces.TraceMiddleware(self.vue)
+
+    def test_traceparent(self):
+        cas = (
+            (f'00-{self.TRACE_ID}-{self.PARENT_ID}-01', (self.TRACE_ID, self.PARENT_ID)),
+            (f'  00-{self.TRACE_ID}-{self.PARENT_ID}-00 ', (self.TRACE_ID, self.PARENT_ID)),
+            (f'00-{self.TRACE_ID.upper()}-{self.PARENT_ID}-01', None),
+            (f'00-{"0" * 32}-{self.PARENT_ID}-01', None),
+            (f'00-{self.TRACE_ID}-{self.PARENT_ID}', None),
+            (f'00-{self.TRACE_ID[:-1]}-{self.PARENT_ID}-01', None),
+            ('', None),
+            (None, None),
+        )
+        for entete, attendu in cas:
+            with self.subTest(entete=entete):
+                trace_id, parent_id = traces._traceparent(entete)
+                if attendu:
+                    self.assertEqual((trace_id, parent_id), attendu)
+                else:
+                    # Nouvelle trace, sans parent
+                    self.assertRegex(trace_id, r'^[0-9a-f]{32}$')
+                    self.assertIsNone(parent_id)
+
+    def test_requete_echantillonnee(self):
+        middleware = self.middleware(1.0)
+        request = RequestFactory().get('/api/services/', HTTP_TRACEPARENT=f'00-{self.TRACE_ID}-{self.PARENT_ID}-01')
+
+        reponse = middleware(request)
+
+        self.assertEqual(reponse['X-Trace-Id'], self.TRACE_ID)
+        spans = {s['nom'] if s['nom'] != 'db' else s['parent_id']: s for s in self.exportes()}
+        self.assertEqual({s['trace_id'] for s in spans.values()}, {self.TRACE_ID})
+        racine, calcul = spans['requete'], spans['calcul']
+        # Parent de la racine : le span appelant (traceparent) ; puis imbrication des blocs
+        self.assertEqual(racine['parent_id'], self.PARENT_ID)
+        self.assertEqual(calcul['parent_id'], racine['span_id'])
+        self.assertEqual(spans[calcul['span_id']]['attributs']['db.alias'], 'default')
+        self.assertIn('SELECT COUNT', spans[racine['span_id']]['attributs']['db.statement'])
+        self.assertEqual(len(spans), 4)
+        self.assertEqual(calcul['attributs'], {'lignes': 2})
+        self.assertEqual(racine['attributs']['http.status_code'], 200)
+        self.assertLessEqual(racine['debut_ns'], calcul['debut_ns'])
+        self.assertLessEqual(calcul['fin_ns'], racine['fin_ns'])
+
+    def test_requete_non_echantillonnee(self):
+        middleware = self.middleware(0.0)
+        reponse = middleware(RequestFactory().get('/api/services/'))
+        self.assertRegex(reponse['X-Trace-Id'], r'^[0-9a-f]{32}$')
+        self.assertEqual(self.exportes(), [])
+        # Hors trace : span() ne mesure rien
+        with traces.span('hors_trace') as attributs:
+            attributs['x'] = 1
+        self.assertEqual(self.exportes(), [])
+
+    def test_taux_d_echantillonnage(self):
+        middleware = self.middleware(0.25)
+        middleware.get_response = lambda request: HttpResponse('ok')
+        # Tirage reproductible, générateur rendu aux autres tests
+        self.addCleanup(random.setstate, random.getstate())
+        random.seed(1)
+        for _ in range(400):
+            middleware(RequestFactory().get('/'))
+        racines = [s for s in self.exportes() if s['nom'] == 'requete']
+        self.assertTrue(60 <= len(racines) <= 140, len(racines))
+
+    def test_span_en_erreur(self):
+        with self.assertRaises(ValueError):
+            with traces.trace(self.TRACE_ID), traces.span('rappels'):
+                raise ValueError('SMTP indisponible')
+        [s] = self.exportes()
+        self.assertEqual(s['erreur'], 'ValueError: SMTP indisponible')
+        self.assertIsNone(s['parent_id'])
+        self.assertEqual(traces.span_otlp(s)['status'], {'code': 2, 'message': 'ValueError: SMTP indisponible'})
+
+    def test_charge_otlp(self):
+        recus = []
+
+        class Collecteur(BaseHTTPRequestHandler):
+            def do_POST(self):
+                recus.append((self.path, self.headers['Content-Type'], self.rfile.read(int(self.headers['Content-Length']))))
+                self.send_response(200)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+            def log_message(self, format, *args):
+                pass
+
+        serveur = HTTPServer(('127.0.0.1', 0), Collecteur)
+        threading.Thread(target=serveur.handle_request, daemon=True).start()
+        self.addCleanup(serveur.server_close)
+        exporteur = traces.ExportOtlp(f'http://127.0.0.1:{serveur.server_port}/v1/traces', 'clinique_test')
+        with traces.trace(self.TRACE_ID, self.PARENT_ID) as courante:
+            with traces.span('requete', **{'http.method': 'GET', 'http.status_code': 200, 'cache': True}):
+                with traces.span('rendu.json', ratio=0.5):
+                    pass
+
+        exporteur.exporter(courante.spans)
+
+        [(chemin, type_contenu, corps)] = recus
+        self.assertEqual((chemin, type_contenu), ('/v1/traces', 'application/json'))
+        corps = json.loads(corps)
+        [ressource] = corps['resourceSpans']
+        self.assertEqual(ressource['resource'], {'attributes': [{'key': 'service.name', 'value': {'stringValue': 'clinique_test'}}]})
+        [portee] = ressource['scopeSpans']
+        self.assertEqual(portee['scope'], {'name': 'clinic.traces'})
+        rendu, requete = portee['spans']
+        self.assertEqual(requete['traceId'], self.TRACE_ID)
+        self.assertEqual((requete['kind'], rendu['kind']), (2, 1))
+        self.assertEqual(requete['parentSpanId'], self.PARENT_ID)
+        self.assertEqual(rendu['parentSpanId'], requete['spanId'])
+        self.assertEqual(requete['attributes'], [
+            {'key': 'http.method', 'value': {'stringValue': 'GET'}},
+            {'key': 'http.status_code', 'value': {'intValue': '200'}},
+            {'key': 'cache', 'value': {'boolValue': True}},
+        ])
+        self.assertEqual(rendu['attributes'], [{'key': 'ratio', 'value': {'doubleValue': 0.5}}])
+        self.assertEqual(requete['status'], {'code': 1})
+        self.assertGreaterEqual(int(requete['endTimeUnixNano']), int(requete['startTimeUnixNano']))
+        # Lisible par le collecteur local
+        self.assertEqual([s['service'] for s in spans_recus(corps)], ['clinique_test'] * 2)
@@ -0,0 +1,382 @@
+# ==========================================
+# TRACES.PY - Traces des requêtes (base de données, sérialisation, emails)
+# ==========================================
+"""
+Chaque requête HTTP reçoit un identifiant de trace (en-tête X-Trace-Id,
+repris de l'en-tête W3C `traceparent` s'il est fourni). Pour une fraction
+des requêtes (settings.TRACES['ECHANTILLON'], tirage en tête de requête),
+TraceMiddleware mesure des intervalles (spans) imbriqués :
+
+    requete                      toute la chaîne de middlewares et la vue
+      db                         chaque requête SQL (empreinte, sans les valeurs)
+      RendezVousSerializer.*     validation, enregistrement et rendu (serializers.py)
+      rendu.json                 encodage de la réponse de l'API (renderers.py)
+      email.envoi                chaque envoi (EmailBackend ci-dessous)
+
+Les requêtes non échantillonnées ne paient que le tirage et l'identifiant :
+aucun wrapper SQL n'est installé et span() ne mesure rien.
+
+Les spans d'une requête sont exportés par un thread d'arrière-plan, selon
+settings.TRACES['EXPORT'] :
+
+    'jsonl' : une ligne JSON par span dans TRACES['FICHIER']
+    'otlp'  : OTLP/HTTP JSON vers TRACES['OTLP_URL'] (collecteur OpenTelemetry,
+              ou `manage.py collecteur_traces` en local)
+
+La file d'export est bornée : si l'exporteur ne suit pas, les traces
+suivantes sont abandonnées plutôt que de ralentir les réponses.
+"""
+import atexit
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from .encoders import dumps
+from .querydebug import fingerprint_sql
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'ECHANTILLON': 0.05,
+    'EXPORT': 'jsonl',
+    'FICHIER': 'traces.jsonl',
+    'OTLP_URL': 'http://localhost:4318/v1/traces',
+    'SERVICE': 'clinique_dentaire',
+    # Traces en attente d'export au-delà desquelles les suivantes sont abandonnées
+    'FILE_MAX': 1000,
+}
+
+# version-trace_id-parent_id-options (https://www.w3.org/TR/trace-context/)
+_TRACEPARENT = re.compile(r'^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+# Trace en cours (None : requête non échantillonnée) et span parent
+_trace = ContextVar('trace', default=None)
+_parent = ContextVar('trace_parent', default=None)
+
+
+def get_config():
+    """Configuration effective (settings.TRACES complété par les valeurs par défaut)"""
+    return {**DEFAULTS, **getattr(settings, 'TRACES', {})}
+
+
+def nouvel_id(octets=16):
+    return f'{random.getrandbits(octets * 8):0{octets * 2}x}'
+
+
+class Trace:
+    """Spans terminés d'une trace, exportés ensemble à la sortie de trace()"""
+
+    __slots__ = ('trace_id', 'spans')
+
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+        self.spans = []
+
+    def ajouter(self, nom, span_id, parent_id, debut, fin, attributs, erreur=None):
+        self.spans.append({
+            'trace_id': self.trace_id,
+            'span_id': span_id,
+            'parent_id': parent_id,
+            'nom': nom,
+            'debut_ns': debut,
+            'fin_ns': fin,
+            'attributs': attributs,
+            'erreur': erreur,
+        })
+
+
+@contextmanager
+def trace(trace_id=None, parent_id=None):
+    """
+    Enregistre les spans du bloc (requêtes SQL comprises) dans une nouvelle
+    trace, exportée à la sortie.
+
+    Utilisé par TraceMiddleware ; aussi utilisable dans une commande :
+
+        with traces.trace(), traces.span('rappels'):
+            ...
+    """
+    courante = Trace(trace_id or nouvel_id())
+    jeton_trace = _trace.set(courante)
+    jeton_parent = _parent.set(parent_id)
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(requetes_sql))
+            yield courante
+    finally:
+        _trace.reset(jeton_trace)
+        _parent.reset(jeton_parent)
+        if courante.spans:
+            get_exporteur().soumettre(courante.spans)
+
+
+@contextmanager
+def span(nom, **attributs):
+    """
+    Mesure le bloc dans la trace en cours ; ne fait rien hors trace.
+
+    Renvoie le dictionnaire des attributs, complétable dans le bloc :
+
+        with span('email.envoi', messages=3) as attributs:
+            attributs['envoyes'] = backend.send_messages(messages)
+    """
+    courante = _trace.get()
+    if courante is None:
+        yield attributs
+        return
+    span_id = nouvel_id(8)
+    parent_id = _parent.get()
+    jeton = _parent.set(span_id)
+    erreur = None
+    debut = time.time_ns()
+    try:
+        yield attributs
+    except BaseException as e:
+        erreur = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        fin = time.time_ns()
+        _parent.reset(jeton)
+        courante.ajouter(nom, span_id, parent_id, debut, fin, attributs, erreur)
+
+
+def requetes_sql(execute, sql, params, many, context):
+    """Wrapper d'exécution (connection.execute_wrapper) : un span 'db' par requête SQL"""
+    courante = _trace.get()
+    if courante is None:
+        return execute(sql, params, many, context)
+    erreur = None
+    debut = time.time_ns()
+    try:
+        return execute(sql, params, many, context)
+    except Exception as e:
+        erreur = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        fin = time.time_ns()
+        # Empreinte plutôt que la requête : ni noms ni téléphones dans les traces
+        attributs = {'db.statement': fingerprint_sql(sql), 'db.alias': context['connection'].alias}
+        if many:
+            attributs['db.many'] = True
+        courante.ajouter('db', nouvel_id(8), _parent.get(), debut, fin, attributs, erreur)
+
+
+# ==========================================
+# EXPORT
+# ==========================================
+
+class Exporteur:
+    """Export des traces par un thread d'arrière-plan (file bornée, lots)"""
+
+    lot_max = 100
+
+    def __init__(self, file_max=DEFAULTS['FILE_MAX']):
+        self.file = queue.Queue(maxsize=file_max)
+        self.abandonnees = 0
+        self._pid = None
+        self._verrou = threading.Lock()
+
+    def soumettre(self, spans):
+        if self._pid != os.getpid():
+            self._demarrer()
+        try:
+            self.file.put_nowait(spans)
+        except queue.Full:
+            self.abandonnees += 1
+
+    def _demarrer(self):
+        with self._verrou:
+            # Premier export du processus (le thread d'un parent ne survit pas au fork)
+            if self._pid != os.getpid():
+                threading.Thread(target=self._boucle, name='traces', daemon=True).start()
+                if self._pid is None:
+                    atexit.register(self.vider)
+                self._pid = os.getpid()
+
+    def _boucle(self):
+        while True:
+            lot = [self.file.get()]
+            while len(lot) < self.lot_max:
+                try:
+                    lot.append(self.file.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.exporter([s for spans in lot for s in spans])
+            except Exception as e:
+                logger.warning(f"Export de {len(lot)} traces impossible: {e}")
+            finally:
+                for _ in lot:
+                    self.file.task_done()
+
+    def vider(self):
+        """Attend l'export des traces soumises (tests, arrêt du processus)"""
+        if self._pid == os.getpid():
+            self.file.join()
+
+    def exporter(self, spans):
+        raise NotImplementedError
+
+
+class ExportJsonl(Exporteur):
+    """Une ligne JSON par span, ajoutée au fichier (lisible par jq, chargeable dans un tableur)"""
+
+    def __init__(self, chemin, **kwargs):
+        super().__init__(**kwargs)
+        self.chemin = chemin
+
+    def exporter(self, spans):
+        lignes = b''.join(dumps(s) + b'\n' for s in spans)
+        with open(self.chemin, 'ab') as fichier:
+            fichier.write(lignes)
+
+
+def _valeur_otlp(valeur):
+    if isinstance(valeur, bool):
+        return {'boolValue': valeur}
+    if isinstance(valeur, int):
+        return {'intValue': str(valeur)}
+    if isinstance(valeur, float):
+        return {'doubleValue': valeur}
+    return {'stringValue': str(valeur)}
+
+
+def _attributs_otlp(attributs):
+    return [{'key': cle, 'value': _valeur_otlp(valeur)} for cle, valeur in attributs.items()]
+
+
+def span_otlp(s):
+    """Span au format OTLP/JSON (identifiants en hexadécimal, dates en nanosecondes)"""
+    resultat = {
+        'traceId': s['trace_id'],
+        'spanId': s['span_id'],
+        'name': s['nom'],
+        # 2 : SPAN_KIND_SERVER (racine), 1 : SPAN_KIND_INTERNAL
+        'kind': 2 if s['nom'] == 'requete' else 1,
+        'startTimeUnixNano': str(s['debut_ns']),
+        'endTimeUnixNano': str(s['fin_ns']),
+        'attributes': _attributs_otlp(s['attributs']),
+        # 1 : STATUS_CODE_OK, 2 : STATUS_CODE_ERROR
+        'status': {'code': 2, 'message': s['erreur']} if s['erreur'] else {'code': 1},
+    }
+    if s['parent_id']:
+        resultat['parentSpanId'] = s['parent_id']
+    return resultat
+
+
+class ExportOtlp(Exporteur):
+    """OTLP/HTTP JSON (POST /v1/traces) vers un collecteur OpenTelemetry"""
+
+    timeout = 2
+
+    def __init__(self, url, service, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.ressource = {'attributes': _attributs_otlp({'service.name': service})}
+
+    def exporter(self, spans):
+        corps = dumps({'resourceSpans': [{
+            'resource': self.ressource,
+            'scopeSpans': [{'scope': {'name': __name__}, 'spans': [span_otlp(s) for s in spans]}],
+        }]})
+        requete = urllib.request.Request(
+            self.url, data=corps, method='POST', headers={'Content-Type': 'application/json'},
+        )
+        with urllib.request.urlopen(requete, timeout=self.timeout) as reponse:
+            reponse.read()
+
+
+_exporteur = None
+
+
+def get_exporteur():
+    global _exporteur
+    if _exporteur is None:
+        config = get_config()
+        if config['EXPORT'] == 'otlp':
+            _exporteur = ExportOtlp(config['OTLP_URL'], config['SERVICE'], file_max=config['FILE_MAX'])
+        elif config['EXPORT'] == 'jsonl':
+            _exporteur = ExportJsonl(config['FICHIER'], file_max=config['FILE_MAX'])
+        else:
+            raise ValueError(f"Export des traces inconnu : {config['EXPORT']}")
+    return _exporteur
+
+
+# ==========================================
+# MIDDLEWARE ET EMAILS
+# ==========================================
+
+def _traceparent(entete):
+    """(trace_id, parent_id) de l'en-tête traceparent, ou une nouvelle trace"""
+    if entete:
+        correspondance = _TRACEPARENT.match(entete.strip())
+        if correspondance and correspondance.group(1) != '0' * 32:
+            return correspondance.group(1), correspondance.group(2)
+    return nouvel_id(), None
+
+
+class TraceMiddleware:
+    """Identifiant de trace de chaque requête ; spans des requêtes échantillonnées"""
+
+    def __init__(self, get_response):
+        self.config = get_config()
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.echantillon = self.config['ECHANTILLON']
+        get_exporteur()
+
+    def __call__(self, request):
+        trace_id, parent_id = _traceparent(request.META.get('HTTP_TRACEPARENT'))
+        request.trace_id = trace_id
+        # Tirage local : un client ne peut pas imposer la mesure de ses requêtes
+        if random.random() >= self.echantillon:
+            response = self.get_response(request)
+        else:
+            with trace(trace_id, parent_id):
+                with span('requete', **{'http.method': request.method, 'http.target': request.path}) as attributs:
+                    response = self.get_response(request)
+                    attributs['http.status_code'] = response.status_code
+                    match = getattr(request, 'resolver_match', None)
+                    if match:
+                        attributs['http.route'] = match.route
+        response['X-Trace-Id'] = trace_id
+        return response
+
+
+class EmailBackend(BaseEmailBackend):
+    """
+    Backend d'emails (settings.EMAIL_BACKEND) : délègue à settings.EMAIL_BACKEND_ENVOI
+    et mesure chaque envoi dans la trace en cours.
+    """
+
+    def __init__(self, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently)
+        self.backend = import_string(settings.EMAIL_BACKEND_ENVOI)(fail_silently=fail_silently, **kwargs)
+
+    def open(self):
+        return self.backend.open()
+
+    def close(self):
+        return self.backend.close()
+
+    def send_messages(self, email_messages):
+        with span('email.envoi', **{'email.messages': len(email_messages)}) as attributs:
+            envoyes = self.backend.send_messages(email_messages)
+            attributs['email.envoyes'] = envoyes or 0
+        return envoyes
@@ -0,0 +1,135 @@
+# ==========================================
+# TRANSITIONS.PY - Changements de statut groupés des rendez-vous
+# ==========================================
+"""
+Confirmation, annulation et clôture d'une sélection de rendez-vous (actions
+de l'admin), dans le respect de RendezVous.TRANSITIONS.
+
+Le nombre de requêtes ne dépend pas de la taille de la sélection :
+
+    1 SELECT  des rendez-vous sélectionnés (verrouillés, avec leur service)
+    1 UPDATE  de ceux dont la transition est permise
+    statistiques : une mise à jour par case (jour, service, statut) touchée
+    emails : envoyés ensemble, sur une seule connexion, après validation
+
+Concurrence : select_for_update() verrouille la sélection sous PostgreSQL,
+mais n'a aucun effet sous SQLite (ignoré par Django). La garantie vient de
+l'UPDATE conditionnel (statut encore parmi les statuts de départ permis) :
+un rendez-vous changé par une autre requête entre le SELECT et l'UPDATE n'est
+pas modifié, ni compté, ni notifié.
+
+queryset.update() n'émet pas post_save : les réactions aux changements de
+statut (statistiques, liste d'attente) reçoivent le signal statuts_modifies,
+équivalent groupé de post_save (voir signals.py).
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import RendezVous
+from .sites import site_de
+
+logger = logging.getLogger(__name__)
+
+# Envoyé avec rendezvous=[instances modifiées, _etat_initial = état d'avant] et statut=nouveau statut
+statuts_modifies = Signal()
+
+
+def changer_statut(queryset, statut, date_confirmee=None):
+    """
+    Passe au statut `statut` les rendez-vous de `queryset` qui le permettent.
+
+    `date_confirmee`, si elle est donnée, est affectée à tous les rendez-vous
+    modifiés. Renvoie (rendez-vous modifiés, nombre de rendez-vous ignorés
+    car la transition est interdite).
+    """
+    sources = [avant for avant, apres in RendezVous.TRANSITIONS.items() if statut in apres]
+    with transaction.atomic():
+        selection = list(queryset.select_related('service').select_for_update(of=('self',)).order_by())
+        modifies = [rdv for rdv in selection if rdv.statut in sources]
+        if not modifies:
+            return [], len(selection)
+
+        valeurs = {'statut': statut, 'updated_at': timezone.now()}
+        if date_confirmee is not None:
+            valeurs['date_confirmee'] = date_confirmee
+        cibles = RendezVous.objects.filter(pk__in=[rdv.pk for rdv in modifies])
+        if cibles.filter(statut__in=sources).update(**valeurs) != len(modifies):
+            # Statut changé entre-temps (SQLite : pas de verrou) : seules les lignes mises à jour comptent
+            faits = set(cibles.filter(**valeurs).values_list('pk', flat=True))
+            modifies = [rdv for rdv in modifies if rdv.pk in faits]
+            if not modifies:
+                return [], len(selection)
+        for rdv in modifies:
+            for champ, valeur in valeurs.items():
+                setattr(rdv, champ, valeur)
+
+        statuts_modifies.send(sender=RendezVous, rendezvous=modifies, statut=statut)
+        transaction.on_commit(lambda: envoyer_notifications(modifies, statut))
+
+    logger.info(f"{len(modifies)} rendez-vous passés au statut {statut} ({len(selection) - len(modifies)} ignorés)")
+    return modifies, len(selection) - len(modifies)
+
+
+def _quand(rdv):
+    if rdv.date_confirmee:
+        return timezone.localtime(rdv.date_confirmee).strftime('%d/%m/%Y à %H:%M')
+    return rdv.date_souhaitee.strftime('%d/%m/%Y')
+
+
+def _confirmation(rdv):
+    site = site_de(rdv)
+    return f"Votre rendez-vous est confirmé - {site.nom}", f"""
+Bonjour {rdv.nom_complet},
+
+Votre rendez-vous ({rdv.service.nom}) est confirmé pour le {_quand(rdv)}.
+
+En cas d'empêchement, merci de nous prévenir au {site.telephone}.
+
+Cordialement,
+L'équipe de la {site.nom}
+"""
+
+
+def _annulation(rdv):
+    site = site_de(rdv)
+    return f"Annulation de votre rendez-vous - {site.nom}", f"""
+Bonjour {rdv.nom_complet},
+
+Votre rendez-vous ({rdv.service.nom}) du {_quand(rdv)} est annulé.
+
+Pour convenir d'une nouvelle date, contactez-nous au {site.telephone}
+ou faites une nouvelle demande sur notre site.
+
+Cordialement,
+L'équipe de la {site.nom}
+"""
+
+
+# Email envoyé au patient selon le nouveau statut (aucun à la clôture)
+NOTIFICATIONS = {
+    'confirmed': _confirmation,
+    'cancelled': _annulation,
+}
+
+
+def envoyer_notifications(rendezvous, statut):
+    """Prévient les patients du changement de statut, en un seul envoi groupé"""
+    gabarit = NOTIFICATIONS.get(statut)
+    if gabarit is None:
+        return 0
+    messages = [
+        (*gabarit(rdv), settings.DEFAULT_FROM_EMAIL, [rdv.email])
+        for rdv in rendezvous
+    ]
+    try:
+        envoyes = send_mass_mail(messages, fail_silently=False)
+        logger.info(f"{envoyes} notifications de statut {statut} envoyées")
+        return envoyes
+    except Exception as e:
+        logger.error(f"Erreur envoi groupé des notifications ({statut}): {e}")
+        return 0
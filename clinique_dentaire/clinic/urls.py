@@ -1,10 +1,11 @@
 # ==========================================
 # URLS.PY - Configuration des URLs Django
 # ==========================================
-from .views import PrendreRendezVousView
-
 from django.urls import path
 from . import views
+from .agenda import flux_agenda
+from .chargement import vue_differee
+from .sites import site_requis
 
 # Configuration des URLs pour l'application clinique
 urlpatterns = [
@@ -15,10 +16,18 @@ urlpatterns = [
     path('api/services/', views.get_services, name='get_services'),
     path('api/equipe/', views.get_equipe, name='get_equipe'),
     path('api/horaires/', views.get_horaires, name='get_horaires'),
+    path('api/jours-ouverts/', views.get_jours_ouverts, name='get_jours_ouverts'),
+    path('api/statistiques/', views.get_statistiques, name='get_statistiques'),
+    path('api/compteurs/', views.get_compteurs, name='get_compteurs'),
     
-    # Endpoints pour les formulaires
-    path('prendre-rendez-vous/', PrendreRendezVousView.as_view(), name='prendre_rendezvous'),
+    # Endpoints pour les formulaires (vues DRF : DRF chargé au premier appel)
+    path('prendre-rendez-vous/', site_requis(vue_differee('clinic.api.PrendreRendezVousView', csrf_exempt=True)),
+         name='prendre_rendezvous'),
+    path('liste-attente/', site_requis(vue_differee('clinic.api.InscrireListeAttenteView', csrf_exempt=True)),
+         name='liste_attente'),
 
     path('contact/', views.contact_message, name='contact_message'),
-]
 
+    # Agendas .ics des dentistes et des services (abonnement par jeton)
+    path('agenda/<str:type_agenda>/<int:pk>.ics', flux_agenda, name='agenda'),
+]
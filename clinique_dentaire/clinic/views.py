@@ -1,26 +1,27 @@
 # ==========================================
 # VIEWS.PY - Vues Django pour la clinique dentaire
 # ==========================================
-from rest_framework import status
-from rest_framework.response import Response
-from .serializers import RendezVousSerializer
-from rest_framework.views import APIView
-
+# Les vues DRF (prise de rendez-vous, liste d'attente) sont dans api.py,
+# chargé au premier appel seulement (voir urls.py)
 from django.shortcuts import render
-from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.exceptions import ValidationError
 from django.core.mail import send_mail
 from django.conf import settings
-from django.utils.decorators import method_decorator
-from django.views import View
 import json
 import logging
-from datetime import date
 
 # Import des modèles
-from .models import Service, Dentiste, Horaire, RendezVous, Contact
+from . import antispam, compteurs
+from .calendrier import calendrier
+from .catalogue import cached_catalogue
+from .encoders import FastJsonResponse
+from .lecture import DentisteLecture, HoraireLecture, ServiceLecture
+from .models import Service, Dentiste, Horaire, Contact
+from .sites import site_de, site_requis
+from .statistiques import periode, rapport
+from .telephones import normalize_phone
 
 # Configuration du logging
 logger = logging.getLogger(__name__)
@@ -33,114 +34,111 @@ def home(request):
     """Vue principale - rendu de la page d'accueil"""
     return render(request, 'index.html')
 
+@site_requis
+@cached_catalogue('services')
 def get_services(request):
     """API pour récupérer tous les services actifs"""
     try:
-        services = Service.objects.filter(actif=True).values(
-            'id', 'nom', 'description', 'prix_min', 'prix_max', 
-            'duree_minutes', 'icone'
-        )
-        return JsonResponse({
+        services = Service.objects.filter(clinique=request.clinique, actif=True)
+        return FastJsonResponse({
             'status': 'success',
-            'services': list(services)
+            'services': ServiceLecture.donnees(services)
         })
     except Exception as e:
         logger.error(f"Erreur get_services: {e}")
-        return JsonResponse({
+        return FastJsonResponse({
             'status': 'error',
             'message': 'Erreur lors de la récupération des services'
         }, status=500)
 
+@site_requis
+@cached_catalogue('equipe')
 def get_equipe(request):
     """API pour récupérer l'équipe de dentistes"""
     try:
-        dentistes = Dentiste.objects.filter(actif=True).values(
-            'id', 'nom', 'prenom', 'specialite', 'bio', 'photo', 'linkedin'
-        )
-        return JsonResponse({
+        dentistes = Dentiste.objects.filter(clinique=request.clinique, actif=True)
+        return FastJsonResponse({
             'status': 'success',
-            'dentistes': list(dentistes)
+            'dentistes': DentisteLecture.donnees(dentistes)
         })
     except Exception as e:
         logger.error(f"Erreur get_equipe: {e}")
-        return JsonResponse({
+        return FastJsonResponse({
             'status': 'error',
             'message': 'Erreur lors de la récupération de l\'équipe'
         }, status=500)
 
+@site_requis
+@cached_catalogue('horaires')
 def get_horaires(request):
     """API pour récupérer les horaires de la clinique"""
     try:
-        horaires = Horaire.objects.all().values(
-            'jour', 'ouverture_matin', 'fermeture_matin',
-            'ouverture_apres_midi', 'fermeture_apres_midi', 'ferme'
-        )
-        return JsonResponse({
+        horaires = Horaire.objects.filter(clinique=request.clinique)
+        return FastJsonResponse({
             'status': 'success',
-            'horaires': list(horaires)
+            'horaires': HoraireLecture.donnees(horaires)
         })
     except Exception as e:
         logger.error(f"Erreur get_horaires: {e}")
-        return JsonResponse({
+        return FastJsonResponse({
             'status': 'error',
             'message': 'Erreur lors de la récupération des horaires'
         }, status=500)
 
-# ==========================================
-# VUE PRINCIPALE POUR PRENDRE RENDEZ-VOUS
-# ==========================================
-class PrendreRendezVousView(APIView):
-    def post(self, request):
-        serializer = RendezVousSerializer(data=request.data)
-        
-        if serializer.is_valid():
-            # Vérifier que le service existe et est actif
-            try:
-                service = Service.objects.get(id=serializer.validated_data['service'].id, actif=True)
-            except Service.DoesNotExist:
-                return Response(
-                    {'status': 'error', 'message': 'Service non disponible'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Créer le rendez-vous
-            rdv = serializer.save(service=service)
-            
-            return Response({
-                'status': 'ok',
-                'message': 'Rendez-vous enregistré avec succès',
-                'data': RendezVousSerializer(rdv).data
-            })
-        
-        return Response({
+@site_requis
+def get_jours_ouverts(request):
+    """API des jours réservables du site : table précompilée (aucune requête en base)"""
+    cal = calendrier(request.clinique.pk)
+    return FastJsonResponse({
+        'status': 'success',
+        'debut': cal.origine,
+        'fin': cal.fin,
+        'ouverts': cal.bitmap(),
+        'fermetures': [
+            {'date': jour, 'motif': motif} for jour, motif in sorted(cal.motifs.items())
+        ],
+    })
+
+@site_requis
+def get_statistiques(request):
+    """API (équipe uniquement) : rapport de réservation lu dans la table de synthèse"""
+    if not request.user.is_staff:
+        return FastJsonResponse({
             'status': 'error',
-            'message': 'Données invalides',
-            'errors': serializer.errors
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
-    
-    
-    
-    
-    def test_email(request):
-        try:
-            send_mail(
-                subject='Test email',
-                message='Ceci est un test.',
-                from_email='Clinique <soulemaneyeo99@gmail.com>',
-                recipient_list=['tonemailperso@gmail.com'],
-                fail_silently=False,
-            )
-            return JsonResponse({'status': 'envoyé'})
-        except Exception as e:
-            return JsonResponse({'status': 'échec', 'erreur': str(e)})
-            
+            'message': 'Accès réservé à l\'équipe'
+        }, status=403)
+    try:
+        debut, fin = periode(request.GET)
+    except ValueError as e:
+        return FastJsonResponse({
+            'status': 'error',
+            'message': f'Période invalide: {e}'
+        }, status=400)
+    return FastJsonResponse({
+        'status': 'success',
+        **rapport(debut, fin, clinique=request.clinique)
+    })
+
+@site_requis
+def get_compteurs(request):
+    """API (équipe uniquement) : compteurs du site lus dans la table Compteur (une requête)"""
+    if not request.user.is_staff:
+        return FastJsonResponse({
+            'status': 'error',
+            'message': 'Accès réservé à l\'équipe'
+        }, status=403)
+    return FastJsonResponse({
+        'status': 'success',
+        'compteurs': compteurs.valeurs(request.clinique)
+    })
+
 # ==========================================
 # VUE POUR LES MESSAGES DE CONTACT
 # ==========================================
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@site_requis
 def contact_message(request):
     """Vue pour gérer les messages de contact"""
     try:
@@ -151,16 +149,15 @@ def contact_message(request):
         missing_fields = [field for field in required_fields if not data.get(field)]
         
         if missing_fields:
-            return JsonResponse({
+            return FastJsonResponse({
                 'status': 'error',
                 'message': f'Champs manquants: {", ".join(missing_fields)}'
             }, status=400)
 
         # Validation du téléphone
-        import re
         telephone = data['telephone'].strip()
-        if not re.match(r'^\+?225?[0-9]{8,10}$', telephone):
-            return JsonResponse({
+        if normalize_phone(telephone) is None:
+            return FastJsonResponse({
                 'status': 'error',
                 'message': 'Format de téléphone invalide'
             }, status=400)
@@ -170,40 +167,44 @@ def contact_message(request):
         try:
             validate_email(data['email'])
         except ValidationError:
-            return JsonResponse({
+            return FastJsonResponse({
                 'status': 'error',
                 'message': 'Format d\'email invalide'
             }, status=400)
 
-        # Création du message de contact
-        contact = Contact.objects.create(
-            nom=data['nom'].strip(),
-            prenom=data['prenom'].strip(),
-            email=data['email'].strip(),
-            telephone=telephone,
-            sujet=data['sujet'].strip(),
-            message=data['message'].strip()
-        )
-
-        # Envoi de l'email de notification
-        try:
-            send_contact_notification(contact)
-        except Exception as e:
-            logger.error(f"Erreur envoi email contact: {e}")
+        champs = {
+            'nom': data['nom'].strip(),
+            'prenom': data['prenom'].strip(),
+            'email': data['email'].strip(),
+            'telephone': telephone,
+            'sujet': data['sujet'].strip(),
+            'message': data['message'].strip(),
+        }
+
+        # Envoi indésirable : mis en quarantaine, sans message ni email (voir antispam.py)
+        if not antispam.filtrer(request, 'contact', champs):
+            # Création du message de contact
+            contact = Contact.objects.create(clinique=request.clinique, **champs)
+
+            # Envoi de l'email de notification
+            try:
+                send_contact_notification(contact)
+            except Exception as e:
+                logger.error(f"Erreur envoi email contact: {e}")
 
-        return JsonResponse({
+        return FastJsonResponse({
             'status': 'ok',
             'message': 'Votre message a été envoyé avec succès. Nous vous répondrons rapidement.'
         }, status=201)
 
     except json.JSONDecodeError:
-        return JsonResponse({
+        return FastJsonResponse({
             'status': 'error',
             'message': 'Données JSON invalides'
         }, status=400)
     except Exception as e:
         logger.error(f"Erreur dans contact_message: {e}")
-        return JsonResponse({
+        return FastJsonResponse({
             'status': 'error',
             'message': 'Une erreur interne est survenue. Veuillez réessayer.'
         }, status=500)
@@ -214,7 +215,8 @@ def contact_message(request):
 
 def send_confirmation_email(rendez_vous):
     """Envoie un email de confirmation au patient"""
-    subject = f'Confirmation de votre demande de rendez-vous - Clinique Ivoire Dentaire'
+    site = site_de(rendez_vous)
+    subject = f'Confirmation de votre demande de rendez-vous - {site.nom}'
     
     message = f"""
 Bonjour {rendez_vous.nom_complet},
@@ -230,14 +232,13 @@ Détails de votre demande:
 Notre équipe vous contactera dans les plus brefs délais pour confirmer votre rendez-vous.
 
 Cordialement,
-L'équipe de la Clinique Ivoire Dentaire
+L'équipe de la {site.nom}
 
 ---
-Clinique Ivoire Dentaire
-Rue des Jardins, Marcory Zone 4
-Abidjan, Côte d'Ivoire
-Tél: +225 07 00 00 08 41
-Email: contact@cliniqueivoiredentaire.ci
+{site.nom}
+{site.adresse}
+Tél: {site.telephone}
+Email: {site.email}
 """
     
     try:
@@ -292,7 +293,7 @@ Accédez à l'administration pour gérer ce rendez-vous.
 
 def send_contact_notification(contact):
     """Envoie une notification pour les messages de contact"""
-    subject = f'Nouveau message de contact - {contact.nom_complet}'
+    subject = f'Nouveau message de contact - {contact.nom_complet} ({site_de(contact).nom})'
     
     message = f"""
 Nouveau message de contact reçu:
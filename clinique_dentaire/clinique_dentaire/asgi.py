@@ -1,5 +1,5 @@
 """
-ASGI config for cabinet_dentaire project.
+ASGI config for clinique_dentaire project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
@@ -11,6 +11,6 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cabinet_dentaire.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clinique_dentaire.settings')
 
 application = get_asgi_application()
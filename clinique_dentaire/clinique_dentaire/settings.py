@@ -28,16 +28,45 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'clinic.traces.TraceMiddleware',
+    'clinic.sites.CliniqueMiddleware',
+    'clinic.querydebug.QueryInspectorMiddleware',
+    'clinic.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'clinic.journal.JournalMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Chaîne allégée des endpoints publics anonymes (voir clinic/handlers.py) :
+# ni sessions, ni authentification, ni messages, ni CSRF, ni X-Frame-Options.
+# Les endpoints réservés à l'équipe (/api/statistiques/) gardent la chaîne complète.
+API_PUBLIQUE_PREFIXES = [
+    '/api/services/',
+    '/api/equipe/',
+    '/api/horaires/',
+    '/api/jours-ouverts/',
+    '/prendre-rendez-vous/',
+    '/contact/',
+    '/liste-attente/',
+    '/agenda/',
+]
+MIDDLEWARE_API_PUBLIQUE = [
+    'clinic.traces.TraceMiddleware',
+    'clinic.sites.CliniqueMiddleware',
+    'clinic.querydebug.QueryInspectorMiddleware',
+    'clinic.compression.CompressionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'clinic.journal.JournalMiddleware',
+]
+
 ROOT_URLCONF = 'clinique_dentaire.urls'
 
 TEMPLATES = [
@@ -51,6 +80,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'clinic.context_processors.compteurs',
             ],
         },
     },
@@ -66,6 +96,24 @@ DATABASES = {
     }
 }
 
+# Cache : partagé entre les processus via Redis si REDIS_URL est défini,
+# sinon mémoire locale (un cache par processus, suffisant en développement).
+# REDIS_URL est requis avec plusieurs processus (check clinic.W001)
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -95,9 +143,22 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
-# Media files
+# Media files (servis par clinic/medias.py)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Transmission déléguée au serveur frontal : 'x-accel-redirect' (nginx), 'x-sendfile'
+# (Apache, lighttpd), vide = par Django. MEDIA_ACCEL_PREFIXE : location interne
+# nginx pointant sur MEDIA_ROOT (alias, directive internal)
+MEDIA_ACCEL = config('MEDIA_ACCEL', default='')
+MEDIA_ACCEL_PREFIXE = config('MEDIA_ACCEL_PREFIXE', default='/medias-internes/')
+# Durée de cache des fichiers sans empreinte dans le nom (les autres : un an)
+MEDIA_CACHE_SECONDES = config('MEDIA_CACHE_SECONDES', default=3600, cast=int)
+
+STORAGES = {
+    # Fichiers envoyés nommés d'après l'empreinte de leur contenu
+    'default': {'BACKEND': 'clinic.medias.StockageMedias'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -108,7 +169,8 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        # JSONRenderer encodé par orjson (mêmes octets, voir clinic/renderers.py)
+        'clinic.renderers.FastJSONRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
@@ -149,7 +211,9 @@ CSRF_COOKIE_HTTPONLY = False  # Important pour permettre l'accès via JavaScript
 CSRF_COOKIE_SAMESITE = 'Lax'
 
 # Email configuration (pour les notifications de RDV)
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Chaque envoi est mesuré par clinic.traces.EmailBackend, qui délègue à EMAIL_BACKEND_ENVOI
+EMAIL_BACKEND = 'clinic.traces.EmailBackend'
+EMAIL_BACKEND_ENVOI = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
@@ -160,6 +224,70 @@ DEFAULT_FROM_EMAIL = config(
     default='Clinique Ivoire Dentaire <soulemaneyeo99@gmail.com>'
 )
 
+# Archivage des rendez-vous terminés ou annulés (manage.py archive_rendezvous)
+ARCHIVE_RENDEZVOUS_APRES_JOURS = config('ARCHIVE_RENDEZVOUS_APRES_JOURS', default=365, cast=int)
+
+# Conservation des données personnelles (manage.py purge_donnees, voir clinic/retention.py) :
+# durée en jours (0 = conservées sans limite) et traitement, 'supprimer' ou 'anonymiser'.
+# Les rendez-vous sont anonymisés plutôt que supprimés : ils restent dans les statistiques.
+RETENTION_DONNEES = {
+    'contacts': {'jours': config('RETENTION_CONTACTS_JOURS', default=730, cast=int), 'mode': 'supprimer'},
+    'rendezvous': {'jours': config('RETENTION_RENDEZVOUS_JOURS', default=1825, cast=int), 'mode': 'anonymiser'},
+    'archives': {'jours': config('RETENTION_RENDEZVOUS_JOURS', default=1825, cast=int), 'mode': 'anonymiser'},
+    'liste_attente': {'jours': config('RETENTION_LISTE_ATTENTE_JOURS', default=365, cast=int), 'mode': 'supprimer'},
+    'journal': {'jours': config('RETENTION_JOURNAL_JOURS', default=1825, cast=int), 'mode': 'supprimer'},
+    'quarantaine': {'jours': config('RETENTION_QUARANTAINE_JOURS', default=30, cast=int), 'mode': 'supprimer'},
+    # Après les autres politiques : patients restés sans rendez-vous ni message
+    'patients': {'jours': config('RETENTION_PATIENTS_JOURS', default=30, cast=int), 'mode': 'supprimer'},
+}
+
+# Filtre anti-spam des formulaires de contact et de rendez-vous (voir clinic/antispam.py) :
+# score au-delà duquel l'envoi est mis en quarantaine, modèle entraîné par manage.py entrainer_antispam
+ANTISPAM = {
+    'ENABLED': config('ANTISPAM', default=True, cast=bool),
+    'SEUIL': config('ANTISPAM_SEUIL', default=3.0, cast=float),
+    'MODELE': config('ANTISPAM_MODELE', default=str(BASE_DIR / 'antispam.json')),
+}
+
+# Rappels des rendez-vous confirmés (manage.py rappels_rendezvous)
+RAPPEL_RENDEZVOUS_AVANT_HEURES = config('RAPPEL_RENDEZVOUS_AVANT_HEURES', default=24, cast=int)
+SMS_BACKEND = config('SMS_BACKEND', default='clinic.sms.ConsoleBackend')
+
+# Compression des réponses (gzip, Brotli si le module est installé) au-delà de ce seuil en octets
+COMPRESSION_TAILLE_MIN = config('COMPRESSION_TAILLE_MIN', default=860, cast=int)
+# Durée de cache des réponses du catalogue (invalidées à chaque modification ; limitée
+# à CACHE_LOCAL_CONTROLE_SECONDES sans cache partagé, voir clinic/catalogue.py)
+CATALOGUE_CACHE_SECONDES = config('CATALOGUE_CACHE_SECONDES', default=3600, cast=int)
+# Délai maximal avant qu'un processus voie une modification des sites, horaires ou fermetures
+# faite par un autre (données compilées en mémoire, voir clinic/cache_local.py)
+CACHE_LOCAL_CONTROLE_SECONDES = config('CACHE_LOCAL_CONTROLE_SECONDES', default=30, cast=int)
+
+# Agendas .ics (voir clinic/agenda.py) : rendez-vous passés gardés, délai de reconstruction complète
+AGENDA_JOURS_PASSES = config('AGENDA_JOURS_PASSES', default=30, cast=int)
+AGENDA_RECONSTRUCTION_SECONDES = config('AGENDA_RECONSTRUCTION_SECONDES', default=86400, cast=int)
+
+# Multi-sites (voir clinic/sites.py) : site des requêtes dont ni le préfixe d'URL
+# ni le nom de domaine ne désignent une clinique (slug ; vide = la plus ancienne)
+CLINIQUE_PAR_DEFAUT = config('CLINIQUE_PAR_DEFAUT', default='')
+CLINIQUE_PREFIXE_URL = '/sites/'
+
+# Détection des requêtes lentes et des N+1 (développement et préproduction)
+QUERY_INSPECTOR = {
+    'ENABLED': config('QUERY_INSPECTOR', default=DEBUG, cast=bool),
+    'SLOW_QUERY_MS': config('SLOW_QUERY_MS', default=100, cast=int),
+    'N_PLUS_ONE_THRESHOLD': config('N_PLUS_ONE_THRESHOLD', default=5, cast=int),
+}
+
+# Traces des requêtes (voir clinic/traces.py) : fraction des requêtes mesurées,
+# export 'jsonl' (fichier) ou 'otlp' (collecteur OpenTelemetry, manage.py collecteur_traces)
+TRACES = {
+    'ENABLED': config('TRACES', default=False, cast=bool),
+    'ECHANTILLON': config('TRACES_ECHANTILLON', default=0.05, cast=float),
+    'EXPORT': config('TRACES_EXPORT', default='jsonl'),
+    'FICHIER': config('TRACES_FICHIER', default=str(BASE_DIR / 'traces.jsonl')),
+    'OTLP_URL': config('TRACES_OTLP_URL', default='http://localhost:4318/v1/traces'),
+}
+
 # Logging pour le développement
 LOGGING = {
     'version': 1,
@@ -174,5 +302,9 @@ LOGGING = {
             'handlers': ['console'],
             'level': 'INFO',
         },
+        'clinic': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
     },
 }
\ No newline at end of file
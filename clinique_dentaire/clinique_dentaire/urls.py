@@ -3,12 +3,15 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from clinic.medias import servir_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Fichiers media : autorisés ici, transmis par le serveur frontal (voir clinic/medias.py)
+    path(f'{settings.MEDIA_URL.lstrip("/")}<path:chemin>', servir_media, name='media'),
     path('', include('clinic.urls')),  # Remplacez 'votre_app' par le nom de votre app
 ]
 
-# Servir les fichiers media en développement
+# Servir les fichiers statiques en développement
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
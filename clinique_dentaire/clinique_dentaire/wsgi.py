@@ -9,8 +9,9 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+from clinic.handlers import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'clinique_dentaire.settings')
 
+# Chaîne de middlewares allégée pour l'API publique (voir clinic/handlers.py)
 application = get_wsgi_application()